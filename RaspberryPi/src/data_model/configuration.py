@@ -22,6 +22,8 @@ Classes:
                     zu den benötigten Kameras in sich kapselt.
     PiConfiguration: Repräsentiert eine Datenhaltungsklasse, welche alle relevanten Daten und Konstanten
                     zu dem benötigten Pi in sich kapselt.
+    LDAPConfiguration: Repräsentiert eine Datenhaltungsklasse, welche alle relevanten Daten und Konstanten
+                    zu der Anbindung eines LDAP-Servers in sich kapselt.
 
 @author Ahmad Eynawi
 @version 24.02.2022
@@ -144,6 +146,16 @@ class MQTTProtocolConfiguration(Configuration):
                          den Broker sendet.
         port (int): Der Netzwerkport des Serverhosts (MQTT-Broker), zu dem
                     eine Verbindung hergestellt werden soll.
+        maxQueuedMessages (int): Die maximale Anzahl an Nachrichten, die ein dauerhaft verbundener
+                                 MQTT-Publisher während einer Verbindungsunterbrechung zwischenspeichert.
+        reconnectMinDelay (int): Die Wartezeit in Sekunden vor dem ersten Versuch, eine unterbrochene
+                                 Verbindung wieder aufzubauen.
+        reconnectMaxDelay (int): Die maximale Wartezeit in Sekunden zwischen zwei Versuchen, eine
+                                 unterbrochene Verbindung wieder aufzubauen.
+        publishTimeout (float): Die maximale Wartezeit in Sekunden auf die Bestätigung (PUBACK)
+                                einer Nachricht mit der Dienstgüte 1.
+        handlerWorkers (int): Die Anzahl der Threads, in denen eine MQTT-Sitzung die Handler
+                              empfangener Nachrichten außerhalb der Netzwerkschleife ausführt.
 
     Methods:
         topic: Get-Methode für das Thema, zu dem im MQTT-Protokoll Nachrichten ausgetauscht
@@ -158,6 +170,11 @@ class MQTTProtocolConfiguration(Configuration):
         keepalive: Get-Methode für den maximalen Zeitraum (in Sekunden) zwischen
                    aufeinanderfolgenden Kommunikationsversuchen mit dem Broker.
         port: Get-Methode für den Netzwerkport des MQTT-Brokers.
+        maxQueuedMessages: Get-Methode für die maximale Anzahl zwischengespeicherter Nachrichten.
+        reconnectMinDelay: Get-Methode für die minimale Wartezeit vor einem Wiederverbindungsversuch.
+        reconnectMaxDelay: Get-Methode für die maximale Wartezeit vor einem Wiederverbindungsversuch.
+        publishTimeout: Get-Methode für die maximale Wartezeit auf die Bestätigung einer Nachricht.
+        handlerWorkers: Get-Methode für die Anzahl der Threads für die Handler empfangener Nachrichten.
         __init__: Konstruktor der Klasse :class:`~configuration.MQTTProtocolConfiguration`
     """
 
@@ -167,9 +184,17 @@ class MQTTProtocolConfiguration(Configuration):
     __WILL_PAYLOAD: Final[str] = "Der MQTT-Client hat die Verbindung mit dem MQTT-Broker verloren!"
     __KEEPALIVE: Final[int] = 60
     __PORT: Final[int] = 1883
+    __MAX_QUEUED_MESSAGES: Final[int] = 100
+    __RECONNECT_MIN_DELAY: Final[int] = 1
+    __RECONNECT_MAX_DELAY: Final[int] = 30
+    __PUBLISH_TIMEOUT: Final[float] = 5.0
+    __HANDLER_WORKERS: Final[int] = 2
 
     def __init__(self, topic, payload, broker=__BROKER, username=__USERNAME, password=__PASSWORD,
-                 willPayload=__WILL_PAYLOAD, keepalive=__KEEPALIVE, port=__PORT):
+                 willPayload=__WILL_PAYLOAD, keepalive=__KEEPALIVE, port=__PORT,
+                 maxQueuedMessages=__MAX_QUEUED_MESSAGES, reconnectMinDelay=__RECONNECT_MIN_DELAY,
+                 reconnectMaxDelay=__RECONNECT_MAX_DELAY, publishTimeout=__PUBLISH_TIMEOUT,
+                 handlerWorkers=__HANDLER_WORKERS):
         """
         Konstruktor der Klasse :class:`~configuration.MQTTProtocolConfiguration`.
 
@@ -202,6 +227,17 @@ class MQTTProtocolConfiguration(Configuration):
         @param port: Der Netzwerkport des Serverhosts (MQTT-Broker), zu dem
                      eine Verbindung hergestellt werden soll.
         @type port: int
+        @param maxQueuedMessages: Die maximale Anzahl an Nachrichten, die während einer
+                                  Verbindungsunterbrechung zwischengespeichert werden.
+        @type maxQueuedMessages: int
+        @param reconnectMinDelay: Die Wartezeit in Sekunden vor dem ersten Wiederverbindungsversuch.
+        @type reconnectMinDelay: int
+        @param reconnectMaxDelay: Die maximale Wartezeit in Sekunden zwischen zwei Wiederverbindungsversuchen.
+        @type reconnectMaxDelay: int
+        @param publishTimeout: Die maximale Wartezeit in Sekunden auf die Bestätigung einer Nachricht.
+        @type publishTimeout: float
+        @param handlerWorkers: Die Anzahl der Threads für die Handler empfangener Nachrichten.
+        @type handlerWorkers: int
         """
         super().__init__()
         self.__topic = topic
@@ -212,6 +248,11 @@ class MQTTProtocolConfiguration(Configuration):
         self.__willPayload = willPayload
         self.__keepalive = keepalive
         self.__port = port
+        self.__maxQueuedMessages = maxQueuedMessages
+        self.__reconnectMinDelay = reconnectMinDelay
+        self.__reconnectMaxDelay = reconnectMaxDelay
+        self.__publishTimeout = publishTimeout
+        self.__handlerWorkers = handlerWorkers
 
     @property
     def topic(self):
@@ -303,6 +344,61 @@ class MQTTProtocolConfiguration(Configuration):
         """
         return self.__port
 
+    @property
+    def maxQueuedMessages(self):
+        """
+        Gibt die maximale Anzahl an Nachrichten zurück, die ein dauerhaft verbundener MQTT-Publisher
+        während einer Verbindungsunterbrechung zwischenspeichert und nach dem Wiederverbinden sendet.
+
+        @return: Die maximale Anzahl zwischengespeicherter Nachrichten.
+        @rtype: int
+        """
+        return self.__maxQueuedMessages
+
+    @property
+    def reconnectMinDelay(self):
+        """
+        Gibt die Wartezeit in Sekunden vor dem ersten Versuch zurück, eine unterbrochene Verbindung
+        mit dem MQTT-Broker wieder aufzubauen. Die Wartezeit verdoppelt sich bei jedem weiteren Versuch.
+
+        @return: Die minimale Wartezeit in Sekunden.
+        @rtype: int
+        """
+        return self.__reconnectMinDelay
+
+    @property
+    def reconnectMaxDelay(self):
+        """
+        Gibt die maximale Wartezeit in Sekunden zwischen zwei Versuchen zurück, eine unterbrochene
+        Verbindung mit dem MQTT-Broker wieder aufzubauen.
+
+        @return: Die maximale Wartezeit in Sekunden.
+        @rtype: int
+        """
+        return self.__reconnectMaxDelay
+
+    @property
+    def publishTimeout(self):
+        """
+        Gibt die maximale Wartezeit in Sekunden auf die Bestätigung (PUBACK) einer Nachricht
+        mit der Dienstgüte 1 durch den MQTT-Broker zurück.
+
+        @return: Die maximale Wartezeit in Sekunden.
+        @rtype: float
+        """
+        return self.__publishTimeout
+
+    @property
+    def handlerWorkers(self):
+        """
+        Gibt die Anzahl der Threads zurück, in denen eine MQTT-Sitzung die Handler empfangener
+        Nachrichten außerhalb der Netzwerkschleife ausführt.
+
+        @return: Die Anzahl der Threads.
+        @rtype: int
+        """
+        return self.__handlerWorkers
+
 
 class BotConfiguration(Configuration):
     """
@@ -326,6 +422,20 @@ class BotConfiguration(Configuration):
             bot_i_channel_id(BotChannelToken):Die Channel ID des Channels,
                 welcher das Log mit der Log Stufe Info darstellt.
             bot_msg_visible(int): Die Zeitspanne, in der die Nachrichten bei einem Klingelereignis sichtbar sein sollen.
+            bot_delete_batch_window(float): Die Zeitspanne in Sekunden, innerhalb der fällige Löschungen gemeinsam
+                ausgeführt werden.
+            bot_delete_retry_delay(float): Die Zeit in Sekunden, nach der eine fehlgeschlagene Löschung wiederholt wird.
+            bot_delete_max_attempts(int): Die maximale Anzahl an Versuchen, eine Nachricht zu löschen.
+            log_queue_size(int): Die maximale Anzahl an Log-Nachrichten, die auf ihren Versand warten.
+            log_ship_interval(float): Die Zeitspanne in Sekunden, deren Log-Nachrichten zusammengefasst werden.
+            log_min_post_interval(float): Der Mindestabstand in Sekunden zwischen zwei Log-Nachrichten an Slack.
+            log_max_post_length(int): Die maximale Anzahl an Zeichen einer zusammengefassten Log-Nachricht.
+            log_ts_capacity(int): Die maximale Anzahl gespeicherter Timestamps je Log.
+            log_delete_rate(float): Die maximale Anzahl an Löschanfragen pro Sekunde beim Löschen eines Logs.
+            log_clear_batch_size(int): Die Anzahl an Nachrichten, nach denen der Fortschritt des Löschens
+                gespeichert wird.
+            log_retry_backoff(float): Die Wartezeit in Sekunden vor der ersten Wiederholung einer Log-Nachricht
+                nach einem vorübergehenden Fehler, jede weitere Wiederholung wartet doppelt so lange.
 
         Methods:
             bot_channel_id: Getter für die Channel IDs.
@@ -336,6 +446,17 @@ class BotConfiguration(Configuration):
             bot_e_channel_id: Getter für die Error-Log Channel-ID
             bot_i_channel_id: Getter für die Info-Log Channel-ID
             bot_msg_visible: Getter für die Zeitspanne der Bot Nachrichten.
+            bot_delete_batch_window: Getter für die Zeitspanne gemeinsam ausgeführter Löschungen.
+            bot_delete_retry_delay: Getter für die Zeit bis zur Wiederholung einer fehlgeschlagenen Löschung.
+            bot_delete_max_attempts: Getter für die maximale Anzahl an Versuchen einer Löschung.
+            log_queue_size: Getter für die Größe des Puffers der Log-Nachrichten.
+            log_ship_interval: Getter für die Zeitspanne zusammengefasster Log-Nachrichten.
+            log_min_post_interval: Getter für den Mindestabstand zwischen zwei Log-Nachrichten.
+            log_max_post_length: Getter für die maximale Länge einer zusammengefassten Log-Nachricht.
+            log_ts_capacity: Getter für die maximale Anzahl gespeicherter Timestamps je Log.
+            log_delete_rate: Getter für die maximale Anzahl an Löschanfragen pro Sekunde.
+            log_clear_batch_size: Getter für die Größe eines Stapels beim Löschen eines Logs.
+            log_retry_backoff: Getter für die Wartezeit vor der ersten Wiederholung einer Log-Nachricht.
             __init__: Konstruktor der Klasse :class:`~configuration.BotConfiguration`
     """
 
@@ -350,10 +471,27 @@ class BotConfiguration(Configuration):
     __BOT_LOG_CHANNEL_ID_ERROR: Final[BotChannelToken] = BotChannelToken(Identifier(""))
     __BOT_LOG_CHANNEL_ID_INFO: Final[BotChannelToken] = BotChannelToken(Identifier(""))
     __TIME_BOT_MESSAGE_VISIBLE: Final[int] = 60
+    __BOT_DELETE_BATCH_WINDOW: Final[float] = 1.0
+    __BOT_DELETE_RETRY_DELAY: Final[float] = 30.0
+    __BOT_DELETE_MAX_ATTEMPTS: Final[int] = 3
+    __LOG_QUEUE_SIZE: Final[int] = 1000
+    __LOG_SHIP_INTERVAL: Final[float] = 2.0
+    __LOG_MIN_POST_INTERVAL: Final[float] = 1.0
+    __LOG_MAX_POST_LENGTH: Final[int] = 3500
+    __LOG_TS_CAPACITY: Final[int] = 10000
+    __LOG_DELETE_RATE: Final[float] = 0.8
+    __LOG_CLEAR_BATCH_SIZE: Final[int] = 50
+    __LOG_RETRY_BACKOFF: Final[float] = 1.0
 
     def __init__(self, bot_channel_id=None, bot_token=None, bot_msg=None, bot_log_token=__BOT_LOG_TOKEN,
                  bot_f_channel_id=__BOT_LOG_CHANNEL_ID_FATAL, bot_e_channel_id=__BOT_LOG_CHANNEL_ID_ERROR,
-                 bot_i_channel_id=__BOT_LOG_CHANNEL_ID_INFO, bot_msg_visible=__TIME_BOT_MESSAGE_VISIBLE):
+                 bot_i_channel_id=__BOT_LOG_CHANNEL_ID_INFO, bot_msg_visible=__TIME_BOT_MESSAGE_VISIBLE,
+                 bot_delete_batch_window=__BOT_DELETE_BATCH_WINDOW, bot_delete_retry_delay=__BOT_DELETE_RETRY_DELAY,
+                 bot_delete_max_attempts=__BOT_DELETE_MAX_ATTEMPTS,
+                 log_queue_size=__LOG_QUEUE_SIZE, log_ship_interval=__LOG_SHIP_INTERVAL,
+                 log_min_post_interval=__LOG_MIN_POST_INTERVAL, log_max_post_length=__LOG_MAX_POST_LENGTH,
+                 log_ts_capacity=__LOG_TS_CAPACITY, log_delete_rate=__LOG_DELETE_RATE,
+                 log_clear_batch_size=__LOG_CLEAR_BATCH_SIZE, log_retry_backoff=__LOG_RETRY_BACKOFF):
         super().__init__()
         if bot_msg is None:
             bot_msg = self.__BOT_RING_MESSAGE
@@ -370,6 +508,17 @@ class BotConfiguration(Configuration):
         self.__bot_err_channel_id = bot_e_channel_id
         self.__bot_inf_channel_id = bot_i_channel_id
         self.__bot_msg_visible = bot_msg_visible
+        self.__bot_delete_batch_window = bot_delete_batch_window
+        self.__bot_delete_retry_delay = bot_delete_retry_delay
+        self.__bot_delete_max_attempts = bot_delete_max_attempts
+        self.__log_queue_size = log_queue_size
+        self.__log_ship_interval = log_ship_interval
+        self.__log_min_post_interval = log_min_post_interval
+        self.__log_max_post_length = log_max_post_length
+        self.__log_ts_capacity = log_ts_capacity
+        self.__log_delete_rate = log_delete_rate
+        self.__log_clear_batch_size = log_clear_batch_size
+        self.__log_retry_backoff = log_retry_backoff
 
     @property
     def bot_channel_id(self) -> list[BotChannelToken]:
@@ -461,6 +610,127 @@ class BotConfiguration(Configuration):
         """
         return self.__bot_msg_visible
 
+    @property
+    def bot_delete_batch_window(self) -> float:
+        """
+        Gibt die Zeitspanne in Sekunden zurück, innerhalb der fällige Löschungen von Nachrichten gemeinsam ausgeführt
+        werden.
+
+        @return: Die Zeitspanne in Sekunden.
+        @rtype: float
+        """
+        return self.__bot_delete_batch_window
+
+    @property
+    def bot_delete_retry_delay(self) -> float:
+        """
+        Gibt die Zeit in Sekunden zurück, nach der eine fehlgeschlagene Löschung einer Nachricht wiederholt wird.
+
+        @return: Die Zeit in Sekunden.
+        @rtype: float
+        """
+        return self.__bot_delete_retry_delay
+
+    @property
+    def bot_delete_max_attempts(self) -> int:
+        """
+        Gibt die maximale Anzahl an Versuchen zurück, eine Nachricht zu löschen. Danach wird die Löschung
+        verworfen.
+
+        @return: Die maximale Anzahl an Versuchen.
+        @rtype: int
+        """
+        return self.__bot_delete_max_attempts
+
+    @property
+    def log_queue_size(self) -> int:
+        """
+        Gibt die maximale Anzahl an Log-Nachrichten zurück, die auf ihren Versand warten können. Ist der Puffer
+        voll, werden Nachrichten verworfen.
+
+        @return: Die maximale Anzahl an Log-Nachrichten.
+        @rtype: int
+        """
+        return self.__log_queue_size
+
+    @property
+    def log_ship_interval(self) -> float:
+        """
+        Gibt die Zeitspanne in Sekunden zurück, innerhalb der alle Log-Nachrichten eines Logs zu einer Nachricht
+        zusammengefasst werden.
+
+        @return: Die Zeitspanne in Sekunden.
+        @rtype: float
+        """
+        return self.__log_ship_interval
+
+    @property
+    def log_min_post_interval(self) -> float:
+        """
+        Gibt den Mindestabstand in Sekunden zwischen zwei an Slack gesendeten Log-Nachrichten zurück. Slack erlaubt
+        ungefähr eine Nachricht pro Sekunde.
+
+        @return: Der Mindestabstand in Sekunden.
+        @rtype: float
+        """
+        return self.__log_min_post_interval
+
+    @property
+    def log_max_post_length(self) -> int:
+        """
+        Gibt die maximale Anzahl an Zeichen einer zusammengefassten Log-Nachricht zurück. Längere Zusammenfassungen
+        werden auf mehrere Nachrichten aufgeteilt.
+
+        @return: Die maximale Anzahl an Zeichen.
+        @rtype: int
+        """
+        return self.__log_max_post_length
+
+    @property
+    def log_ts_capacity(self) -> int:
+        """
+        Gibt die maximale Anzahl an Timestamps gesendeter Nachrichten zurück, die je Log für das Löschen des
+        Verlaufs gespeichert werden.
+
+        @return: Die maximale Anzahl an Timestamps.
+        @rtype: int
+        """
+        return self.__log_ts_capacity
+
+    @property
+    def log_delete_rate(self) -> float:
+        """
+        Gibt die maximale Anzahl an Löschanfragen pro Sekunde beim Löschen des Verlaufs eines Logs zurück. Slack
+        ordnet chat.delete der Rate-Limit-Stufe 3 zu, die ungefähr 50 Anfragen pro Minute je App und Workspace
+        erlaubt. Mit 0.8 Anfragen pro Sekunde (48 pro Minute) bleibt das Löschen knapp darunter. Gleichzeitige
+        Anfragen würden das Löschen daher nicht beschleunigen, sondern nur Ablehnungen durch Slack auslösen.
+
+        @return: Die maximale Anzahl an Anfragen pro Sekunde.
+        @rtype: float
+        """
+        return self.__log_delete_rate
+
+    @property
+    def log_clear_batch_size(self) -> int:
+        """
+        Gibt die Anzahl an Nachrichten zurück, nach deren Löschen der Fortschritt gespeichert und gemeldet wird.
+
+        @return: Die Anzahl an Nachrichten.
+        @rtype: int
+        """
+        return self.__log_clear_batch_size
+
+    @property
+    def log_retry_backoff(self) -> float:
+        """
+        Gibt die Wartezeit in Sekunden vor der ersten Wiederholung einer Log-Nachricht nach einem vorübergehenden
+        Fehler zurück. Jede weitere Wiederholung wartet doppelt so lange.
+
+        @return: Die Wartezeit in Sekunden.
+        @rtype: float
+        """
+        return self.__log_retry_backoff
+
 
 class CameraConfiguration(Configuration):
     """
@@ -636,6 +906,52 @@ class PiConfiguration(Configuration):
                 Nutzers beginnt
             no_firstname(str): Zeichenkette die verwendet wird um einen Namen mit unbekanntem Vornamen zu erstellen.
             no_lastname(str): Zeichenkette die verwendet wird um einen Namen mit unbekanntem Nachnamen zu erstellen.
+            path_valid_tokens_journal(str): Der Pfad zum Journal der Änderungen an den validen Tokens.
+            journal_compaction_threshold(int): Die Anzahl an Einträgen im Journal, ab der das Journal in die Datei
+                der validen Tokens übernommen wird.
+            path_token_database(str): Der Pfad zur binären Datenbank der validen Tokens, gegen die die Tür prüft.
+            token_watch_debounce(float): Die Zeitspanne in Sekunden, über die mehrere Änderungen an der Datei der
+                validen Tokens zu einer Aktualisierung zusammengefasst werden.
+            token_change_history(int): Die maximale Anzahl an Änderungen der validen Tokens, die für eine
+                inkrementelle Aktualisierung der Tür vorgehalten werden.
+            path_sqlite_database(str): Der Pfad zur SQLite-Datenbank der Nutzer und ihrer Tokens.
+            app_max_connections(int): Die maximale Anzahl gleichzeitiger Verbindungen der App.
+            app_idle_timeout(float): Die Zeit in Sekunden, nach der eine Verbindung ohne Anfrage geschlossen wird.
+            app_handshake_timeout(float): Die Zeit in Sekunden, die ein TLS-Handshake maximal dauern darf.
+            app_executor_workers(int): Die Anzahl der Threads, in denen Anfragen der App bearbeitet werden.
+            app_metrics_interval(float): Der Abstand in Sekunden, in dem die Messwerte des Servers der App geloggt
+                werden. Bei 0 werden keine Messwerte geloggt.
+            command_login(str): Das Schlüsselwort mit dem sich ein Admin für die Dauer einer Verbindung anmeldet.
+            command_batch(str): Das Schlüsselwort mit dem mehrere Änderungen an Tokens gemeinsam angefragt werden.
+            app_login_pattern(str): Der Regex dem eine Anmeldung an den Server genügen muss.
+            app_session_request_pattern(str): Der Regex dem eine Anfrage nach einer Anmeldung genügen muss.
+            app_response_ok(str): Die Antwort auf eine erfolgreiche Anmeldung.
+            app_response_denied(str): Die Antwort auf eine fehlgeschlagene Anmeldung.
+            app_frame_max_size(int): Die maximale Anzahl an Byte einer Anfrage mit Längenpräfix.
+            app_tls_session_tickets(int): Die Anzahl der TLS-Sitzungstickets, die ein Klient je Handshake erhält.
+            app_evict_idle_after(float): Die Zeit in Sekunden ohne Anfrage, nach der eine Verbindung für eine neue
+                Verbindung geschlossen werden darf.
+            command_ping(str): Das Schlüsselwort mit dem ein Klient prüft, ob seine Verbindung noch besteht.
+            app_response_pong(str): Die Antwort auf eine Prüfung der Verbindung.
+            password_hash_iterations(int): Die Anzahl der PBKDF2-Iterationen für neu gespeicherte Passwörter.
+            credential_cache_ttl(float): Die Zeit in Sekunden, für die eine erfolgreiche Überprüfung eines Passworts
+                zwischengespeichert wird.
+            credential_cache_size(int): Die maximale Anzahl zwischengespeicherter Passwortüberprüfungen.
+            bell_observer_workers(int): Die Anzahl der Threads, die die Beobachter des Klingeltasters benachrichtigen.
+            bell_observer_timeout(float): Die Zeit in Sekunden, nach der ein nicht fertiger Beobachter des
+                Klingeltasters als fehlgeschlagen gilt.
+            path_bot_deletion_journal(str): Der Pfad zum Journal der noch ausstehenden Löschungen von Bot-Nachrichten.
+            path_log_segments(str): Der Pfad zum Verzeichnis der Segmentdateien der lokalen Log-Einträge.
+            log_store_capacity(int): Die Anzahl der Log-Einträge im Ringpuffer im Arbeitsspeicher.
+            log_segment_size(int): Die Größe in Bytes, ab der eine neue Segmentdatei begonnen wird.
+            log_segment_count(int): Die Anzahl der Segmentdateien, die aufbewahrt werden.
+            path_log_timestamps(str): Der Pfad zum Verzeichnis der gespeicherten Timestamps der Log-Nachrichten.
+            button_bounce_time(float): Die Entprellzeit des Klingeltasters in Sekunden.
+            socket_restart_delay(float): Die Wartezeit in Sekunden, bevor der Socket für die Webseite neu geöffnet wird.
+            door_open_duration(float): Die Zeitspanne in Sekunden, für die die Tür nach einer Anfrage geöffnet bleibt.
+            nfc_duplicate_window(float): Die Zeitspanne in Sekunden, in der ein erneut gelesener Token verworfen wird.
+            nfc_queue_size(int): Die maximale Anzahl gelesener Tokens, die auf ihre Prüfung warten.
+            nfc_reject_led_time(float): Die Zeitspanne in Sekunden, für die die rote LED einen ungültigen Token anzeigt.
 
         Methods:
             button: Getter für die Pinnummer des Buttons.
@@ -663,6 +979,47 @@ class PiConfiguration(Configuration):
                 erstellen.
             no_lastname: Getter für den Nachnamen der Verwendet wird um einen Namen mit unbekanntem Vornamen zu
                 erstellen.
+            path_valid_tokens_journal: Getter für den Pfad zum Journal der Änderungen an den validen Tokens.
+            journal_compaction_threshold: Getter für die Anzahl an Journaleinträgen, ab der das Journal
+                übernommen wird.
+            path_token_database: Getter für den Pfad zur binären Datenbank der validen Tokens.
+            token_watch_debounce: Getter für die Zeitspanne, über die Änderungen an den validen Tokens
+                zusammengefasst werden.
+            token_change_history: Getter für die maximale Anzahl an vorgehaltenen Änderungen der validen Tokens.
+            path_sqlite_database: Getter für den Pfad zur SQLite-Datenbank der Nutzer und ihrer Tokens.
+            app_max_connections: Getter für die maximale Anzahl gleichzeitiger Verbindungen der App.
+            app_idle_timeout: Getter für die Zeit, nach der eine Verbindung ohne Anfrage geschlossen wird.
+            app_handshake_timeout: Getter für die Zeit, die ein TLS-Handshake maximal dauern darf.
+            app_executor_workers: Getter für die Anzahl der Threads, in denen Anfragen der App bearbeitet werden.
+            app_metrics_interval: Getter für den Abstand, in dem die Messwerte des Servers der App geloggt werden.
+            command_login: Getter für das Schlüsselwort, mit dem sich ein Admin für eine Verbindung anmeldet.
+            command_batch: Getter für das Schlüsselwort, mit dem mehrere Änderungen gemeinsam angefragt werden.
+            app_login_pattern: Getter für den Regex dem eine Anmeldung an den Server genügen muss.
+            app_session_request_pattern: Getter für den Regex dem eine Anfrage nach einer Anmeldung genügen muss.
+            app_response_ok: Getter für die Antwort auf eine erfolgreiche Anmeldung.
+            app_response_denied: Getter für die Antwort auf eine fehlgeschlagene Anmeldung.
+            app_frame_max_size: Getter für die maximale Anzahl an Byte einer Anfrage mit Längenpräfix.
+            app_tls_session_tickets: Getter für die Anzahl der TLS-Sitzungstickets je Handshake.
+            app_evict_idle_after: Getter für die Zeit, nach der eine ruhende Verbindung verdrängt werden darf.
+            command_ping: Getter für das Schlüsselwort, mit dem ein Klient seine Verbindung prüft.
+            app_response_pong: Getter für die Antwort auf eine Prüfung der Verbindung.
+            password_hash_iterations: Getter für die Anzahl der PBKDF2-Iterationen der Passwörter.
+            credential_cache_ttl: Getter für die Gültigkeit zwischengespeicherter Passwortüberprüfungen.
+            credential_cache_size: Getter für die maximale Anzahl zwischengespeicherter Passwortüberprüfungen.
+            bell_observer_workers: Getter für die Anzahl der Threads für die Beobachter des Klingeltasters.
+            bell_observer_timeout: Getter für die Zeit, nach der ein Beobachter der Klingel als fehlgeschlagen gilt.
+            path_bot_deletion_journal: Getter für den Pfad zum Journal der ausstehenden Löschungen von Bot-Nachrichten.
+            path_log_segments: Getter für den Pfad zum Verzeichnis der Segmentdateien der Log-Einträge.
+            log_store_capacity: Getter für die Anzahl der Log-Einträge im Ringpuffer.
+            log_segment_size: Getter für die Größe einer Segmentdatei.
+            log_segment_count: Getter für die Anzahl aufbewahrter Segmentdateien.
+            path_log_timestamps: Getter für den Pfad zum Verzeichnis der Timestamps der Log-Nachrichten.
+            button_bounce_time: Getter für die Entprellzeit des Klingeltasters.
+            socket_restart_delay: Getter für die Wartezeit vor dem erneuten Öffnen des Sockets der Webseite.
+            door_open_duration: Getter für die Zeitspanne, für die die Tür geöffnet bleibt.
+            nfc_duplicate_window: Getter für die Zeitspanne, in der ein erneut gelesener Token verworfen wird.
+            nfc_queue_size: Getter für die maximale Anzahl wartender Tokens.
+            nfc_reject_led_time: Getter für die Leuchtdauer der roten LED bei einem ungültigen Token.
             __init__: Konstruktor der Klasse :class:`~configuration.PiConfiguration`
     """
 
@@ -691,6 +1048,45 @@ class PiConfiguration(Configuration):
     __COMMAND_DELETE_ALL: Final[str] = "deleteAll"
     __NO_FIRSTNAME: Final[str] = 'a'
     __NO_LASTNAME: Final[str] = 'a'
+    __PATH_TO_VALID_TOKENS_JOURNAL: Final[str] = "/RaspberryPi/src/ValidTokens.journal"
+    __JOURNAL_COMPACTION_THRESHOLD: Final[int] = 100
+    __PATH_TO_TOKEN_DATABASE: Final[str] = "/RaspberryPi/src/ValidTokens.db"
+    __TOKEN_WATCH_DEBOUNCE: Final[float] = 0.2
+    __TOKEN_CHANGE_HISTORY: Final[int] = 1000
+    __PATH_TO_SQLITE_DATABASE: Final[str] = "/RaspberryPi/src/ValidTokens.sqlite"
+    __APP_MAX_CONNECTIONS: Final[int] = 8
+    __APP_IDLE_TIMEOUT: Final[float] = 60.0
+    __APP_HANDSHAKE_TIMEOUT: Final[float] = 10.0
+    __APP_EXECUTOR_WORKERS: Final[int] = 2
+    __APP_METRICS_INTERVAL: Final[float] = 3600.0
+    __COMMAND_LOGIN: Final[str] = "login"
+    __COMMAND_BATCH: Final[str] = "batch"
+    __APP_LOGIN_PATTERN: Final[str] = "login\\$([^$]+)\\$([^$]+)"
+    __APP_SESSION_REQUEST_PATTERN: Final[str] = "(search|addToken|deleteToken|deleteAll)\\$([^$]+)(?:\\$([^$]+))?"
+    __APP_RESPONSE_OK: Final[str] = "ok"
+    __APP_RESPONSE_DENIED: Final[str] = "denied"
+    __APP_FRAME_MAX_SIZE: Final[int] = 1048576
+    __APP_TLS_SESSION_TICKETS: Final[int] = 2
+    __APP_EVICT_IDLE_AFTER: Final[float] = 5.0
+    __COMMAND_PING: Final[str] = "ping"
+    __APP_RESPONSE_PONG: Final[str] = "pong"
+    __PASSWORD_HASH_ITERATIONS: Final[int] = 100000
+    __CREDENTIAL_CACHE_TTL: Final[float] = 300.0
+    __CREDENTIAL_CACHE_SIZE: Final[int] = 16
+    __BELL_OBSERVER_WORKERS: Final[int] = 4
+    __BELL_OBSERVER_TIMEOUT: Final[float] = 180.0
+    __PATH_TO_BOT_DELETION_JOURNAL: Final[str] = "/RaspberryPi/src/BotDeletions.journal"
+    __PATH_TO_LOG_SEGMENTS: Final[str] = "/RaspberryPi/src/logs"
+    __LOG_STORE_CAPACITY: Final[int] = 5000
+    __LOG_SEGMENT_SIZE: Final[int] = 1000000
+    __LOG_SEGMENT_COUNT: Final[int] = 5
+    __PATH_TO_LOG_TIMESTAMPS: Final[str] = "/RaspberryPi/src/logs/timestamps"
+    __BUTTON_BOUNCE_TIME: Final[float] = 0.05
+    __SOCKET_RESTART_DELAY: Final[float] = 0.5
+    __DOOR_OPEN_DURATION: Final[float] = 5.0
+    __NFC_DUPLICATE_WINDOW: Final[float] = 2.0
+    __NFC_QUEUE_SIZE: Final[int] = 16
+    __NFC_REJECT_LED_TIME: Final[float] = 5.0
 
     def __init__(self, button=__PIN_NUMBER_BUTTON, pin_red=__LED_RED, pin_green=__LED_GREEN, pin_yellow=__LED_YELLOW,
                  sleep_after_ring=__SLEEP_AFTER_RING, admin=__ADMIN, path_project=__PATH_TO_PROJECT, path_pem=__PATH_TO_CERT_PEM,
@@ -699,7 +1095,32 @@ class PiConfiguration(Configuration):
                  app_encoding=__APP_ENCODING, app_socket_buf_size=__APP_SOCKET_BUF_SIZE,
                  command_search=__COMMAND_SEARCH,command_add_token=__COMMAND_ADD_TOKEN,
                  command_delete_token=__COMMAND_DELETE_TOKEN,command_delete_all=__COMMAND_DELETE_ALL,
-                 no_firstname=__NO_FIRSTNAME, no_lastname=__NO_LASTNAME):
+                 no_firstname=__NO_FIRSTNAME, no_lastname=__NO_LASTNAME,
+                 path_valid_tokens_journal=__PATH_TO_VALID_TOKENS_JOURNAL,
+                 journal_compaction_threshold=__JOURNAL_COMPACTION_THRESHOLD,
+                 path_token_database=__PATH_TO_TOKEN_DATABASE,
+                 token_watch_debounce=__TOKEN_WATCH_DEBOUNCE,
+                 token_change_history=__TOKEN_CHANGE_HISTORY,
+                 path_sqlite_database=__PATH_TO_SQLITE_DATABASE,
+                 app_max_connections=__APP_MAX_CONNECTIONS, app_idle_timeout=__APP_IDLE_TIMEOUT,
+                 app_handshake_timeout=__APP_HANDSHAKE_TIMEOUT, app_executor_workers=__APP_EXECUTOR_WORKERS,
+                 app_metrics_interval=__APP_METRICS_INTERVAL,
+                 command_login=__COMMAND_LOGIN, command_batch=__COMMAND_BATCH, app_login_pattern=__APP_LOGIN_PATTERN,
+                 app_session_request_pattern=__APP_SESSION_REQUEST_PATTERN, app_response_ok=__APP_RESPONSE_OK,
+                 app_response_denied=__APP_RESPONSE_DENIED, app_frame_max_size=__APP_FRAME_MAX_SIZE,
+                 app_tls_session_tickets=__APP_TLS_SESSION_TICKETS, app_evict_idle_after=__APP_EVICT_IDLE_AFTER,
+                 command_ping=__COMMAND_PING, app_response_pong=__APP_RESPONSE_PONG,
+                 password_hash_iterations=__PASSWORD_HASH_ITERATIONS, credential_cache_ttl=__CREDENTIAL_CACHE_TTL,
+                 credential_cache_size=__CREDENTIAL_CACHE_SIZE,
+                 bell_observer_workers=__BELL_OBSERVER_WORKERS, bell_observer_timeout=__BELL_OBSERVER_TIMEOUT,
+                 path_bot_deletion_journal=__PATH_TO_BOT_DELETION_JOURNAL,
+                 path_log_segments=__PATH_TO_LOG_SEGMENTS, log_store_capacity=__LOG_STORE_CAPACITY,
+                 log_segment_size=__LOG_SEGMENT_SIZE, log_segment_count=__LOG_SEGMENT_COUNT,
+                 path_log_timestamps=__PATH_TO_LOG_TIMESTAMPS,
+                 button_bounce_time=__BUTTON_BOUNCE_TIME, socket_restart_delay=__SOCKET_RESTART_DELAY,
+                 door_open_duration=__DOOR_OPEN_DURATION,
+                 nfc_duplicate_window=__NFC_DUPLICATE_WINDOW, nfc_queue_size=__NFC_QUEUE_SIZE,
+                 nfc_reject_led_time=__NFC_REJECT_LED_TIME):
         super().__init__()
         self.__button = button
         self.__pin_red = pin_red
@@ -722,6 +1143,45 @@ class PiConfiguration(Configuration):
         self.__command_delete_all = command_delete_all
         self.__no_firstname = no_firstname
         self.__no_lastname = no_lastname
+        self.__path_valid_tokens_journal = path_valid_tokens_journal
+        self.__journal_compaction_threshold = journal_compaction_threshold
+        self.__path_token_database = path_token_database
+        self.__token_watch_debounce = token_watch_debounce
+        self.__token_change_history = token_change_history
+        self.__path_sqlite_database = path_sqlite_database
+        self.__app_max_connections = app_max_connections
+        self.__app_idle_timeout = app_idle_timeout
+        self.__app_handshake_timeout = app_handshake_timeout
+        self.__app_executor_workers = app_executor_workers
+        self.__app_metrics_interval = app_metrics_interval
+        self.__command_login = command_login
+        self.__command_batch = command_batch
+        self.__app_login_pattern = app_login_pattern
+        self.__app_session_request_pattern = app_session_request_pattern
+        self.__app_response_ok = app_response_ok
+        self.__app_response_denied = app_response_denied
+        self.__app_frame_max_size = app_frame_max_size
+        self.__app_tls_session_tickets = app_tls_session_tickets
+        self.__app_evict_idle_after = app_evict_idle_after
+        self.__command_ping = command_ping
+        self.__app_response_pong = app_response_pong
+        self.__password_hash_iterations = password_hash_iterations
+        self.__credential_cache_ttl = credential_cache_ttl
+        self.__credential_cache_size = credential_cache_size
+        self.__bell_observer_workers = bell_observer_workers
+        self.__bell_observer_timeout = bell_observer_timeout
+        self.__path_bot_deletion_journal = path_bot_deletion_journal
+        self.__path_log_segments = path_log_segments
+        self.__log_store_capacity = log_store_capacity
+        self.__log_segment_size = log_segment_size
+        self.__log_segment_count = log_segment_count
+        self.__path_log_timestamps = path_log_timestamps
+        self.__button_bounce_time = button_bounce_time
+        self.__socket_restart_delay = socket_restart_delay
+        self.__door_open_duration = door_open_duration
+        self.__nfc_duplicate_window = nfc_duplicate_window
+        self.__nfc_queue_size = nfc_queue_size
+        self.__nfc_reject_led_time = nfc_reject_led_time
 
     @property
     def button(self) -> int:
@@ -943,3 +1403,695 @@ class PiConfiguration(Configuration):
         @rtype: str
         """
         return self.__no_lastname
+
+    @property
+    def path_valid_tokens_journal(self) -> str:
+        """
+        Gibt den Pfad zu dem Journal wieder, an das Änderungen an den validen Tokens angehängt werden,
+        bevor sie in die txt Datei mit den validen Tokens übernommen werden.
+
+        @return: Der Pfad zum Journal der validen Tokens.
+        @rtype: str
+        """
+        return self.__path_project + self.__path_valid_tokens_journal
+
+    @property
+    def journal_compaction_threshold(self) -> int:
+        """
+        Gibt die Anzahl an Einträgen im Journal zurück, ab der das Journal im Hintergrund in die txt Datei mit den
+        validen Tokens übernommen und anschließend geleert wird.
+
+        @return: Die Anzahl an Journaleinträgen, ab der das Journal übernommen wird.
+        @rtype: int
+        """
+        return self.__journal_compaction_threshold
+
+    @property
+    def path_token_database(self) -> str:
+        """
+        Get-Methode für den Pfad zur binären Datenbank der validen Tokens.
+
+        @return: Den Pfad zur binären Datenbank der validen Tokens.
+        @rtype: str
+        """
+        return self.__path_project + self.__path_token_database
+
+    @property
+    def token_watch_debounce(self) -> float:
+        """
+        Get-Methode für die Zeitspanne, über die Änderungen an der Datei der validen Tokens zusammengefasst werden.
+
+        @return: Die Zeitspanne in Sekunden.
+        @rtype: float
+        """
+        return self.__token_watch_debounce
+
+    @property
+    def token_change_history(self) -> int:
+        """
+        Get-Methode für die maximale Anzahl an vorgehaltenen Änderungen der validen Tokens.
+
+        @return: Die maximale Anzahl an vorgehaltenen Änderungen.
+        @rtype: int
+        """
+        return self.__token_change_history
+
+    @property
+    def path_sqlite_database(self) -> str:
+        """
+        Gibt den Pfad zur SQLite-Datenbank zurück, in der die Nutzer und ihre Tokens gespeichert sind.
+
+        @return: Den Pfad zur SQLite-Datenbank.
+        @rtype: str
+        """
+        return self.__path_project + self.__path_sqlite_database
+
+    @property
+    def app_max_connections(self) -> int:
+        """
+        Gibt die maximale Anzahl gleichzeitiger Verbindungen der App zurück. Weitere Verbindungen werden noch vor
+        dem TLS-Handshake geschlossen.
+
+        @return: Die maximale Anzahl gleichzeitiger Verbindungen.
+        @rtype: int
+        """
+        return self.__app_max_connections
+
+    @property
+    def app_idle_timeout(self) -> float:
+        """
+        Gibt die Zeit in Sekunden zurück, nach der eine Verbindung der App ohne neue Anfrage geschlossen wird.
+
+        @return: Die Zeit in Sekunden.
+        @rtype: float
+        """
+        return self.__app_idle_timeout
+
+    @property
+    def app_handshake_timeout(self) -> float:
+        """
+        Gibt die Zeit in Sekunden zurück, die ein TLS-Handshake mit der App maximal dauern darf.
+
+        @return: Die Zeit in Sekunden.
+        @rtype: float
+        """
+        return self.__app_handshake_timeout
+
+    @property
+    def app_executor_workers(self) -> int:
+        """
+        Gibt die Anzahl der Threads zurück, in denen die blockierenden Anfragen der App an den Adapter bearbeitet
+        werden.
+
+        @return: Die Anzahl der Threads.
+        @rtype: int
+        """
+        return self.__app_executor_workers
+
+    @property
+    def app_metrics_interval(self) -> float:
+        """
+        Gibt den Abstand in Sekunden zurück, in dem die Messwerte des Servers der App geloggt werden.
+        Bei 0 werden keine Messwerte geloggt.
+
+        @return: Der Abstand in Sekunden.
+        @rtype: float
+        """
+        return self.__app_metrics_interval
+
+    @property
+    def command_login(self) -> str:
+        """
+        Gibt das Kommando zurück, mit dem sich ein Admin für die Dauer einer Verbindung anmeldet.
+
+        @return: Das Kommando für die Anmeldung.
+        @rtype: str
+        """
+        return self.__command_login
+
+    @property
+    def command_batch(self) -> str:
+        """
+        Gibt das Kommando zurück, mit dem mehrere Änderungen an Tokens in einer Anfrage gemeinsam angefragt werden.
+        Jede weitere Zeile der Anfrage enthält eine Änderung.
+
+        @return: Das Kommando für mehrere Änderungen.
+        @rtype: str
+        """
+        return self.__command_batch
+
+    @property
+    def app_login_pattern(self) -> str:
+        """
+        Gibt den Regex zurück, dem eine Anmeldung eines Admins an den Server genügen muss.
+
+        @return: Den Regex für eine Anmeldung.
+        @rtype: str
+        """
+        return self.__app_login_pattern
+
+    @property
+    def app_session_request_pattern(self) -> str:
+        """
+        Gibt den Regex zurück, dem eine Anfrage genügen muss, nachdem sich ein Admin für die Verbindung angemeldet
+        hat. Sie enthält weder den Identifikator noch das Passwort des Admins.
+
+        @return: Den Regex für eine Anfrage nach einer Anmeldung.
+        @rtype: str
+        """
+        return self.__app_session_request_pattern
+
+    @property
+    def app_response_ok(self) -> str:
+        """
+        Gibt die Antwort des Servers auf eine erfolgreiche Anmeldung zurück.
+
+        @return: Die Antwort auf eine erfolgreiche Anmeldung.
+        @rtype: str
+        """
+        return self.__app_response_ok
+
+    @property
+    def app_response_denied(self) -> str:
+        """
+        Gibt die Antwort des Servers auf eine fehlgeschlagene Anmeldung oder eine Anfrage ohne Anmeldung zurück.
+
+        @return: Die Antwort auf eine fehlgeschlagene Anmeldung.
+        @rtype: str
+        """
+        return self.__app_response_denied
+
+    @property
+    def app_frame_max_size(self) -> int:
+        """
+        Gibt die maximale Anzahl an Byte zurück, die eine Anfrage mit vorangestellter Länge haben darf.
+
+        @return: Die maximale Anzahl an Byte.
+        @rtype: int
+        """
+        return self.__app_frame_max_size
+
+    @property
+    def app_tls_session_tickets(self) -> int:
+        """
+        Gibt die Anzahl der TLS-1.3-Sitzungstickets zurück, die ein Klient nach einem Handshake erhält. Mit einem
+        Ticket kann der Klient die Sitzung beim nächsten Verbindungsaufbau ohne vollständigen Handshake fortsetzen.
+
+        @return: Die Anzahl der Sitzungstickets.
+        @rtype: int
+        """
+        return self.__app_tls_session_tickets
+
+    @property
+    def app_evict_idle_after(self) -> float:
+        """
+        Gibt die Zeit in Sekunden zurück, die eine Verbindung ohne Anfrage sein muss, damit sie bei erreichter
+        maximaler Anzahl an Verbindungen für eine neue Verbindung geschlossen werden darf.
+
+        @return: Die Zeit in Sekunden.
+        @rtype: float
+        """
+        return self.__app_evict_idle_after
+
+    @property
+    def command_ping(self) -> str:
+        """
+        Gibt das Kommando zurück, mit dem ein Klient prüft, ob seine Verbindung noch besteht. Es wird direkt vom
+        Server beantwortet.
+
+        @return: Das Kommando für die Prüfung der Verbindung.
+        @rtype: str
+        """
+        return self.__command_ping
+
+    @property
+    def app_response_pong(self) -> str:
+        """
+        Gibt die Antwort des Servers auf eine Prüfung der Verbindung zurück.
+
+        @return: Die Antwort auf eine Prüfung der Verbindung.
+        @rtype: str
+        """
+        return self.__app_response_pong
+
+    @property
+    def password_hash_iterations(self) -> int:
+        """
+        Gibt die Anzahl der PBKDF2-Iterationen zurück, mit der Passwörter gehasht gespeichert werden. Bereits
+        gespeicherte Hashes enthalten ihre eigene Anzahl und bleiben gültig.
+
+        @return: Die Anzahl der Iterationen.
+        @rtype: int
+        """
+        return self.__password_hash_iterations
+
+    @property
+    def credential_cache_ttl(self) -> float:
+        """
+        Gibt die Zeit in Sekunden zurück, für die eine erfolgreiche Überprüfung eines Passworts zwischengespeichert
+        wird, damit nicht jede Anfrage den Hash erneut berechnet.
+
+        @return: Die Zeit in Sekunden.
+        @rtype: float
+        """
+        return self.__credential_cache_ttl
+
+    @property
+    def credential_cache_size(self) -> int:
+        """
+        Gibt die maximale Anzahl zwischengespeicherter Überprüfungen von Passwörtern zurück.
+
+        @return: Die maximale Anzahl an Einträgen.
+        @rtype: int
+        """
+        return self.__credential_cache_size
+
+    @property
+    def bell_observer_workers(self) -> int:
+        """
+        Gibt die Anzahl der dauerhaft laufenden Threads zurück, in denen die Beobachter des Klingeltasters
+        benachrichtigt werden.
+
+        @return: Die Anzahl der Threads.
+        @rtype: int
+        """
+        return self.__bell_observer_workers
+
+    @property
+    def bell_observer_timeout(self) -> float:
+        """
+        Gibt die Zeit in Sekunden zurück, nach der ein Beobachter des Klingeltasters, der noch nicht fertig ist, als
+        fehlgeschlagen gilt. Sie muss länger sein als die Zeit, die der Bot und die Kamera für ihre Aktion benötigen.
+
+        @return: Die Zeit in Sekunden.
+        @rtype: float
+        """
+        return self.__bell_observer_timeout
+
+    @property
+    def path_bot_deletion_journal(self) -> str:
+        """
+        Gibt den Pfad zum Journal zurück, in dem die noch ausstehenden Löschungen von Bot-Nachrichten gespeichert
+        werden, damit sie auch nach einem Neustart ausgeführt werden.
+
+        @return: Der Pfad zum Journal.
+        @rtype: str
+        """
+        return self.__path_project + self.__path_bot_deletion_journal
+
+    @property
+    def path_log_segments(self) -> str:
+        """
+        Gibt den Pfad zum Verzeichnis zurück, in dem die Log-Einträge in rotierenden Segmentdateien gespeichert
+        werden.
+
+        @return: Der Pfad zum Verzeichnis.
+        @rtype: str
+        """
+        return self.__path_project + self.__path_log_segments
+
+    @property
+    def log_store_capacity(self) -> int:
+        """
+        Gibt die Anzahl der neuesten Log-Einträge zurück, die im Ringpuffer im Arbeitsspeicher gehalten werden.
+
+        @return: Die Anzahl der Log-Einträge.
+        @rtype: int
+        """
+        return self.__log_store_capacity
+
+    @property
+    def log_segment_size(self) -> int:
+        """
+        Gibt die Größe in Bytes zurück, ab der eine neue Segmentdatei der Log-Einträge begonnen wird.
+
+        @return: Die Größe in Bytes.
+        @rtype: int
+        """
+        return self.__log_segment_size
+
+    @property
+    def log_segment_count(self) -> int:
+        """
+        Gibt die Anzahl der Segmentdateien zurück, die aufbewahrt werden. Ältere Segmentdateien werden gelöscht.
+
+        @return: Die Anzahl der Segmentdateien.
+        @rtype: int
+        """
+        return self.__log_segment_count
+
+    @property
+    def path_log_timestamps(self) -> str:
+        """
+        Gibt den Pfad zum Verzeichnis zurück, in dem die Timestamps der gesendeten Log-Nachrichten je Log
+        gespeichert werden.
+
+        @return: Der Pfad zum Verzeichnis.
+        @rtype: str
+        """
+        return self.__path_project + self.__path_log_timestamps
+
+    @property
+    def button_bounce_time(self) -> float:
+        """
+        Gibt die Entprellzeit des Klingeltasters in Sekunden zurück. Flanken innerhalb dieser Zeit werden bereits bei
+        der Flankenerkennung verworfen.
+
+        @return: Die Entprellzeit in Sekunden.
+        @rtype: float
+        """
+        return self.__button_bounce_time
+
+    @property
+    def socket_restart_delay(self) -> float:
+        """
+        Gibt die Wartezeit in Sekunden zurück, nach der der Socket für die Webseite nach einer beantworteten
+        Nachricht erneut geöffnet wird.
+
+        @return: Die Wartezeit in Sekunden.
+        @rtype: float
+        """
+        return self.__socket_restart_delay
+
+    @property
+    def door_open_duration(self) -> float:
+        """
+        Gibt die Zeitspanne in Sekunden zurück, für die die Tür nach einer Anfrage zum Öffnen geöffnet bleibt. Eine
+        weitere Anfrage in dieser Zeit verlängert das Öffnen entsprechend.
+
+        @return: Die Zeitspanne in Sekunden.
+        @rtype: float
+        """
+        return self.__door_open_duration
+
+    @property
+    def nfc_duplicate_window(self) -> float:
+        """
+        Gibt die Zeitspanne in Sekunden zurück, in der ein erneut gelesener Token verworfen wird. Solange ein Token
+        auf dem Lesegerät liegt, wird die Zeitspanne mit jedem Lesen verlängert.
+
+        @return: Die Zeitspanne in Sekunden.
+        @rtype: float
+        """
+        return self.__nfc_duplicate_window
+
+    @property
+    def nfc_queue_size(self) -> int:
+        """
+        Gibt die maximale Anzahl gelesener Tokens zurück, die auf ihre Prüfung warten. Weitere Tokens werden
+        verworfen.
+
+        @return: Die maximale Anzahl wartender Tokens.
+        @rtype: int
+        """
+        return self.__nfc_queue_size
+
+    @property
+    def nfc_reject_led_time(self) -> float:
+        """
+        Gibt die Zeitspanne in Sekunden zurück, für die die rote LED nach einem ungültigen Token leuchtet.
+
+        @return: Die Zeitspanne in Sekunden.
+        @rtype: float
+        """
+        return self.__nfc_reject_led_time
+
+
+class LDAPConfiguration(Configuration):
+    """
+    Diese Klasse ist eine Unterklasse der Klasse :class:`~configuration.Configuration`
+    und repräsentiert eine Datenhaltungsklasse, in der Konstanten und
+    Konfigurationsdaten für die Anbindung eines LDAP-Servers gekapselt werden.
+
+    Alle Attribute in dieser Klasse haben Standardwerte, die mit den als Klassenvariablen
+    definierten (nicht veränderbaren) Konstanten identisch sind.
+
+        Attributes:
+            server_address(str): Die IP-Adresse bzw. der Hostname des LDAP-Servers.
+            server_port(int): Der Port des LDAP-Servers.
+            use_ssl(bool): Gibt an, ob die Verbindung zum LDAP-Server über SSL aufgebaut wird.
+            connect_timeout(int): Die maximale Zeitspanne in Sekunden für den Aufbau einer Verbindung.
+            bind_dn(str): Der DN des Dienstkontos, über das die Verbindung zum Server aufgebaut wird.
+            bind_password(str): Das Passwort des Dienstkontos.
+            search_base(str): Der Suchzweig, unter dem die Nutzer im LDAP gespeichert sind.
+            user_filter(str): Der Filter, dem alle Nutzer im LDAP genügen.
+            attribute_identifier(str): Das LDAP-Attribut, das den Identifikator eines Nutzers enthält.
+            attribute_first_name(str): Das LDAP-Attribut, das den Vornamen eines Nutzers enthält.
+            attribute_last_name(str): Das LDAP-Attribut, das den Nachnamen eines Nutzers enthält.
+            attribute_tokens(str): Das mehrwertige LDAP-Attribut, das die Tokens eines Nutzers enthält.
+            client_strategy(str): Der Name der ldap3-Strategie der Verbindung, z.B. REUSABLE für einen Pool von
+                Verbindungen oder MOCK_SYNC für Tests ohne Server.
+            pool_size(int): Die Anzahl an Verbindungen im Pool.
+            pool_lifetime(int): Die Zeitspanne in Sekunden, nach der eine Verbindung im Pool erneuert wird.
+            page_size(int): Die Anzahl an Einträgen pro Seite einer Suche über alle Nutzer.
+            cache_ttl(int): Die Zeitspanne in Sekunden, für die Nutzer und erfolgreiche Anmeldungen zwischengespeichert
+                werden.
+            cache_size(int): Die maximale Anzahl an Einträgen im Zwischenspeicher.
+
+        Methods:
+            server_address: Getter für die Adresse des LDAP-Servers.
+            server_port: Getter für den Port des LDAP-Servers.
+            use_ssl: Getter dafür, ob die Verbindung über SSL aufgebaut wird.
+            connect_timeout: Getter für die maximale Zeitspanne für den Aufbau einer Verbindung.
+            bind_dn: Getter für den DN des Dienstkontos.
+            bind_password: Getter für das Passwort des Dienstkontos.
+            search_base: Getter für den Suchzweig der Nutzer.
+            user_filter: Getter für den Filter der Nutzer.
+            attribute_identifier: Getter für das Attribut des Identifikators.
+            attribute_first_name: Getter für das Attribut des Vornamens.
+            attribute_last_name: Getter für das Attribut des Nachnamens.
+            attribute_tokens: Getter für das Attribut der Tokens.
+            client_strategy: Getter für die ldap3-Strategie der Verbindung.
+            pool_size: Getter für die Anzahl an Verbindungen im Pool.
+            pool_lifetime: Getter für die Lebensdauer einer Verbindung im Pool.
+            page_size: Getter für die Anzahl an Einträgen pro Seite einer Suche.
+            cache_ttl: Getter für die Gültigkeitsdauer des Zwischenspeichers.
+            cache_size: Getter für die maximale Anzahl an Einträgen im Zwischenspeicher.
+            __init__: Konstruktor der Klasse :class:`~configuration.LDAPConfiguration`
+    """
+
+    __SERVER_ADDRESS: Final[str] = "ldap.forumsys.com"
+    __SERVER_PORT: Final[int] = 389
+    __USE_SSL: Final[bool] = False
+    __CONNECT_TIMEOUT: Final[int] = 5
+    __BIND_DN: Final[str] = ''
+    __BIND_PASSWORD: Final[str] = ''
+    __SEARCH_BASE: Final[str] = "dc=example,dc=com"
+    __USER_FILTER: Final[str] = "(objectClass=person)"
+    __ATTRIBUTE_IDENTIFIER: Final[str] = "uid"
+    __ATTRIBUTE_FIRST_NAME: Final[str] = "givenName"
+    __ATTRIBUTE_LAST_NAME: Final[str] = "sn"
+    __ATTRIBUTE_TOKENS: Final[str] = "description"
+    __CLIENT_STRATEGY: Final[str] = "REUSABLE"
+    __POOL_SIZE: Final[int] = 4
+    __POOL_LIFETIME: Final[int] = 3600
+    __PAGE_SIZE: Final[int] = 500
+    __CACHE_TTL: Final[int] = 60
+    __CACHE_SIZE: Final[int] = 256
+
+    def __init__(self, server_address=__SERVER_ADDRESS, server_port=__SERVER_PORT, use_ssl=__USE_SSL,
+                 connect_timeout=__CONNECT_TIMEOUT, bind_dn=__BIND_DN, bind_password=__BIND_PASSWORD,
+                 search_base=__SEARCH_BASE, user_filter=__USER_FILTER, attribute_identifier=__ATTRIBUTE_IDENTIFIER,
+                 attribute_first_name=__ATTRIBUTE_FIRST_NAME, attribute_last_name=__ATTRIBUTE_LAST_NAME,
+                 attribute_tokens=__ATTRIBUTE_TOKENS, client_strategy=__CLIENT_STRATEGY, pool_size=__POOL_SIZE,
+                 pool_lifetime=__POOL_LIFETIME, page_size=__PAGE_SIZE, cache_ttl=__CACHE_TTL,
+                 cache_size=__CACHE_SIZE):
+        super().__init__()
+        self.__server_address = server_address
+        self.__server_port = server_port
+        self.__use_ssl = use_ssl
+        self.__connect_timeout = connect_timeout
+        self.__bind_dn = bind_dn
+        self.__bind_password = bind_password
+        self.__search_base = search_base
+        self.__user_filter = user_filter
+        self.__attribute_identifier = attribute_identifier
+        self.__attribute_first_name = attribute_first_name
+        self.__attribute_last_name = attribute_last_name
+        self.__attribute_tokens = attribute_tokens
+        self.__client_strategy = client_strategy
+        self.__pool_size = pool_size
+        self.__pool_lifetime = pool_lifetime
+        self.__page_size = page_size
+        self.__cache_ttl = cache_ttl
+        self.__cache_size = cache_size
+
+    @property
+    def server_address(self) -> str:
+        """
+        Gibt die IP-Adresse bzw. den Hostnamen des LDAP-Servers zurück.
+
+        @return: Die Adresse des LDAP-Servers.
+        @rtype: str
+        """
+        return self.__server_address
+
+    @property
+    def server_port(self) -> int:
+        """
+        Gibt den Port des LDAP-Servers zurück.
+
+        @return: Den Port des LDAP-Servers.
+        @rtype: int
+        """
+        return self.__server_port
+
+    @property
+    def use_ssl(self) -> bool:
+        """
+        Gibt zurück, ob die Verbindung zum LDAP-Server über SSL aufgebaut wird.
+
+        @return: True, wenn SSL verwendet wird, anderenfalls False.
+        @rtype: bool
+        """
+        return self.__use_ssl
+
+    @property
+    def connect_timeout(self) -> int:
+        """
+        Gibt die maximale Zeitspanne für den Aufbau einer Verbindung zum LDAP-Server zurück.
+
+        @return: Die Zeitspanne in Sekunden.
+        @rtype: int
+        """
+        return self.__connect_timeout
+
+    @property
+    def bind_dn(self) -> str:
+        """
+        Gibt den DN des Dienstkontos zurück, über das die Verbindung zum Server aufgebaut wird.
+
+        @return: Den DN des Dienstkontos.
+        @rtype: str
+        """
+        return self.__bind_dn
+
+    @property
+    def bind_password(self) -> str:
+        """
+        Gibt das Passwort des Dienstkontos zurück.
+
+        @return: Das Passwort des Dienstkontos.
+        @rtype: str
+        """
+        return self.__bind_password
+
+    @property
+    def search_base(self) -> str:
+        """
+        Gibt den Suchzweig zurück, unter dem die Nutzer im LDAP gespeichert sind.
+
+        @return: Den Suchzweig der Nutzer.
+        @rtype: str
+        """
+        return self.__search_base
+
+    @property
+    def user_filter(self) -> str:
+        """
+        Gibt den Filter zurück, dem alle Nutzer im LDAP genügen.
+
+        @return: Den Filter der Nutzer.
+        @rtype: str
+        """
+        return self.__user_filter
+
+    @property
+    def attribute_identifier(self) -> str:
+        """
+        Gibt das LDAP-Attribut zurück, das den Identifikator eines Nutzers enthält.
+
+        @return: Den Namen des Attributs.
+        @rtype: str
+        """
+        return self.__attribute_identifier
+
+    @property
+    def attribute_first_name(self) -> str:
+        """
+        Gibt das LDAP-Attribut zurück, das den Vornamen eines Nutzers enthält.
+
+        @return: Den Namen des Attributs.
+        @rtype: str
+        """
+        return self.__attribute_first_name
+
+    @property
+    def attribute_last_name(self) -> str:
+        """
+        Gibt das LDAP-Attribut zurück, das den Nachnamen eines Nutzers enthält.
+
+        @return: Den Namen des Attributs.
+        @rtype: str
+        """
+        return self.__attribute_last_name
+
+    @property
+    def attribute_tokens(self) -> str:
+        """
+        Gibt das mehrwertige LDAP-Attribut zurück, das die Tokens eines Nutzers enthält.
+
+        @return: Den Namen des Attributs.
+        @rtype: str
+        """
+        return self.__attribute_tokens
+
+    @property
+    def client_strategy(self) -> str:
+        """
+        Gibt den Namen der ldap3-Strategie der Verbindung zurück.
+
+        @return: Den Namen der Strategie.
+        @rtype: str
+        """
+        return self.__client_strategy
+
+    @property
+    def pool_size(self) -> int:
+        """
+        Gibt die Anzahl an Verbindungen im Pool zurück.
+
+        @return: Die Anzahl an Verbindungen.
+        @rtype: int
+        """
+        return self.__pool_size
+
+    @property
+    def pool_lifetime(self) -> int:
+        """
+        Gibt die Zeitspanne zurück, nach der eine Verbindung im Pool erneuert wird.
+
+        @return: Die Zeitspanne in Sekunden.
+        @rtype: int
+        """
+        return self.__pool_lifetime
+
+    @property
+    def page_size(self) -> int:
+        """
+        Gibt die Anzahl an Einträgen pro Seite einer Suche über alle Nutzer zurück.
+
+        @return: Die Anzahl an Einträgen pro Seite.
+        @rtype: int
+        """
+        return self.__page_size
+
+    @property
+    def cache_ttl(self) -> int:
+        """
+        Gibt die Zeitspanne zurück, für die Nutzer und erfolgreiche Anmeldungen zwischengespeichert werden.
+
+        @return: Die Zeitspanne in Sekunden.
+        @rtype: int
+        """
+        return self.__cache_ttl
+
+    @property
+    def cache_size(self) -> int:
+        """
+        Gibt die maximale Anzahl an Einträgen im Zwischenspeicher zurück.
+
+        @return: Die maximale Anzahl an Einträgen.
+        @rtype: int
+        """
+        return self.__cache_size
@@ -1,5 +1,8 @@
+import threading
+
 from RaspberryPi.src.data_model.identifier import Identifier
 from RaspberryPi.src.data_model.key_token import Token
+from RaspberryPi.src.data_model.token_database import TokenDatabase
 
 """
 Dieses Modul kapselt alle Klassen, die für die Speicherung und Verwaltung der Daten der
@@ -18,22 +21,33 @@ class DoorDataStorage:
     Diese Klasse repräsentiert einen Datenspeicher für eine ferngesteuerte Tür.
 
     Dieser Datenspeicher speichert den eindeutigen Identifikator der Tür
-    sowie die Liste der mit dieser Tür assoziierten Tokens.
+    sowie die Menge der mit dieser Tür assoziierten Tokens.
+
+    Die Tokens werden als unveränderliche Momentaufnahme (frozenset) gehalten. Jede Änderung erzeugt eine neue
+    Momentaufnahme und veröffentlicht sie durch einen einzigen Austausch der Referenz. Eine gleichzeitig
+    laufende Prüfung eines Tokens sieht so entweder den alten oder den neuen Stand, aber nie einen halb
+    angewendeten.
 
     Attributes:
         doorIdentifier (Identifier): Der eindeutige Identifikator der ferngesteuerten Tür.
-        doorTokens (list): Die Liste der mit dieser Tür assoziierten Schlüsseltokens.
+        doorTokens (frozenset): Die Menge der mit dieser Tür assoziierten Schlüsseltokens.
+        tokenDatabase (:class:`~token_database.TokenDatabase`): Die optionale, per mmap eingeblendete
+                                                                Datenbank der gültigen Tokens.
 
     Methods:
         doorIdentifier (Getter): Gibt den eindeutigen Identifikator der Tür,
                         deren Daten in diesem :class:`~door.DoorDataStorage` gespeichert sind, zurück.
-        doorTokens (Getter): Gibt die mit dieser Tür assoziierten Schlüsseltokens als Tupel zurück.
+        doorTokens (Getter): Gibt die aktuelle Momentaufnahme der mit dieser Tür assoziierten Schlüsseltokens zurück.
         doorTokens (Setter): Set-Methode für die Schlüsseltokens, die zum Datenspeicher dieser Tür
                              hinzugefügt werden sollen.
-        addToken: Fügt einen Token zur Liste der mit dieser Tür assoziierten Tokens hinzu
-                  (sofern dieser Token nicht bereits in der Liste enthalten ist).
-        deleteToken: Entfernt einen Token aus der Liste der mit dieser Tür assoziierten Tokens
-                     (sofern dieser Token bereits in der Liste enthalten ist).
+        tokenDatabase (Getter): Gibt die Token-Datenbank dieser Tür zurück.
+        tokenDatabase (Setter): Ersetzt die Token-Datenbank dieser Tür.
+        replaceTokens: Ersetzt alle mit dieser Tür assoziierten Tokens in einem Schritt.
+        applyChanges: Fügt Tokens hinzu und entfernt Tokens in einem Schritt.
+        addToken: Fügt einen Token zur Menge der mit dieser Tür assoziierten Tokens hinzu
+                  (sofern dieser Token nicht bereits in der Menge enthalten ist).
+        deleteToken: Entfernt einen Token aus der Menge der mit dieser Tür assoziierten Tokens
+                     (sofern dieser Token bereits in der Menge enthalten ist).
         hasToken: Prüft, ob der gegebene Schlüsseltoken in diesem Datenspeicher bereits
                   gespeichert ist.
         clear: Entfernt alle Tokens, die in diesem Tür-Datenspeicher gespeichert sind.
@@ -44,21 +58,27 @@ class DoorDataStorage:
     """
     __identifier = 1
 
-    def __init__(self, doorTokens=[]):
+    def __init__(self, doorTokens=None, tokenDatabase: TokenDatabase = None):
         """
         Konstruktor der Klasse :class:`~door.DoorDataStorage`.
 
         Erstellt und initialisiert einen Datenspeicher für eine bestimmte Tür. Dieser Datenspeicher speichert
-        den eindeutigen Tür-Identifikator und die Liste der mit dieser Tür assoziierten Schlüsseltokens.
+        den eindeutigen Tür-Identifikator und die Menge der mit dieser Tür assoziierten Schlüsseltokens.
 
-        @param doorTokens: Die Liste der mit dieser Tür bereits assoziierten Tokens.
+        @param doorTokens: Die mit dieser Tür bereits assoziierten Tokens.
                            Wird hierfür kein Argument übergeben, wird das entsprechende Attribut
-                           defaultmäßig mit einer neuen leeren Liste initialisiert.
-        @type doorTokens: list
+                           defaultmäßig mit einer leeren Menge initialisiert.
+        @type doorTokens: iterable
+        @param tokenDatabase: Die Datenbank der gültigen Tokens. Ist sie gesetzt, wird bei der Prüfung
+                              eines Tokens zusätzlich in ihr gesucht.
+        @type tokenDatabase: :class:`~token_database.TokenDatabase`
         """
         self.__doorIdentifier = Identifier(str(DoorDataStorage.__identifier))
         DoorDataStorage.__identifier += 1
-        self.__doorTokens = doorTokens
+        self.__doorTokens = frozenset(doorTokens) if doorTokens is not None else frozenset()
+        # Serialisiert nur die schreibenden Zugriffe, lesende Zugriffe verwenden die aktuelle Momentaufnahme
+        self.__writeLock = threading.Lock()
+        self.__tokenDatabase = tokenDatabase
 
     @property
     def doorIdentifier(self):
@@ -76,62 +96,115 @@ class DoorDataStorage:
         """
         Get-Methode für die mit dieser Tür assoziierten Schlüsseltokens.
 
-        Diese Methode gibt eine unveränderliche Referenz (Tupel) auf die Liste der in diesem
-        DoorDataStorage-Objekt gespeicherten Tokens.
+        Diese Methode gibt die aktuelle, unveränderliche Momentaufnahme (frozenset) der in diesem
+        DoorDataStorage-Objekt gespeicherten Tokens zurück. Spätere Änderungen wirken sich nicht auf sie aus.
 
         @return: Die Schlüsseltokens der Tür, deren Daten in diesem Datenspeicher gespeichert sind.
-        @rtype: tuple
+        @rtype: frozenset
         """
-        return tuple(self.__doorTokens)
+        return self.__doorTokens
 
     @doorTokens.setter
-    def doorTokens(self, doorTokens: list):
+    def doorTokens(self, doorTokens):
         """
         Set-Methode für die Schlüsseltokens, die zum Datenspeicher dieser Tür hinzugefügt
         werden sollen.
 
         @param doorTokens: Die Schlüsseltokens, die mit dieser Tür assoziiert werden sollen.
-        @type doorTokens: list
+        @type doorTokens: iterable
+        """
+        self.replaceTokens(doorTokens)
+
+    def replaceTokens(self, doorTokens):
+        """
+        Ersetzt alle mit dieser Tür assoziierten Schlüsseltokens in einem Schritt.
+
+        Die neue Momentaufnahme wird vollständig aufgebaut, bevor sie veröffentlicht wird.
+
+        @param doorTokens: Die Schlüsseltokens, die künftig mit dieser Tür assoziiert sein sollen.
+        @type doorTokens: iterable
+        """
+        snapshot = frozenset(doorTokens)
+        with self.__writeLock:
+            self.__doorTokens = snapshot
+
+    @property
+    def tokenDatabase(self):
+        """
+        Get-Methode für die Token-Datenbank dieser Tür.
+
+        @return: Die Token-Datenbank oder `None`, wenn die Tür nur die Menge ihrer Tokens verwendet.
+        @rtype: :class:`~token_database.TokenDatabase`
         """
-        self.__doorTokens = list(doorTokens)
+        return self.__tokenDatabase
+
+    @tokenDatabase.setter
+    def tokenDatabase(self, tokenDatabase: TokenDatabase):
+        """
+        Set-Methode für die Token-Datenbank dieser Tür.
+
+        Die alte Datenbank wird nicht explizit geschlossen, da ein gleichzeitig laufender Lesevorgang
+        sie noch verwenden kann. Sie wird freigegeben, sobald keine Referenz mehr auf sie existiert.
+
+        @param tokenDatabase: Die neue Token-Datenbank.
+        @type tokenDatabase: :class:`~token_database.TokenDatabase`
+        """
+        self.__tokenDatabase = tokenDatabase
+
+    def applyChanges(self, addedTokens, removedTokens):
+        """
+        Fügt die gegebenen Tokens hinzu und entfernt die gegebenen Tokens in einem Schritt.
+
+        Wie bei :meth:`replaceTokens` wird die neue Momentaufnahme vollständig aufgebaut, bevor sie
+        veröffentlicht wird. Ist ein Token in beiden Mengen enthalten, ist er anschließend enthalten.
+
+        @param addedTokens: Die Schlüsseltokens, die hinzugefügt werden sollen.
+        @type addedTokens: iterable
+        @param removedTokens: Die Schlüsseltokens, die entfernt werden sollen.
+        @type removedTokens: iterable
+        """
+        added = frozenset(addedTokens)
+        removed = frozenset(removedTokens)
+        with self.__writeLock:
+            self.__doorTokens = (self.__doorTokens - removed) | added
 
     def addToken(self, token: Token):
         """
         Fügt einen Schlüsseltoken zum Datenspeicher dieser Tür hinzu.
 
-        Ist der als Parameter übergebene Token bereits in der Liste der mit dieser Tür assoziierten Tokens enthalten,
+        Ist der als Parameter übergebene Token bereits in der Menge der mit dieser Tür assoziierten Tokens enthalten,
         wird er nicht hinzugefügt und es wird `False` zurückgegeben; andernfalls wird `True` zurückgegeben.
 
         @param token: Der Schlüsseltoken, der zu dieser Tür hinzugefügt werden soll.
         @type token: :class:`~token.Token`
         @return: `True`, wenn der als Parameter übergebene Token nicht bereits mit der Tür assoziiert ist
-                 und somit erfolgreich zur Token-Liste hinzugefügt wurde; andernfalls `False`.
+                 und somit erfolgreich zur Token-Menge hinzugefügt wurde; andernfalls `False`.
         @rtype: bool
         """
-        if not self.__doorTokens.__contains__(token):
-            self.__doorTokens.append(token)
+        with self.__writeLock:
+            if token in self.__doorTokens:
+                return False
+            self.__doorTokens = self.__doorTokens | {token}
             return True
-        else:
-            return False
 
     def deleteToken(self, token: Token):
         """
         Entfernt einen Schlüsseltoken aus dem Datenspeicher dieser Tür.
 
-        Ist der als Parameter übergebene Token nicht in der Liste der mit dieser Tür assoziierten Tokens enthalten,
-        wird die Token-Liste nicht verändert und es wird `False` zurückgegeben; andernfalls wird `True` zurückgegeben.
+        Ist der als Parameter übergebene Token nicht in der Menge der mit dieser Tür assoziierten Tokens enthalten,
+        wird die Token-Menge nicht verändert und es wird `False` zurückgegeben; andernfalls wird `True` zurückgegeben.
 
-        @param token: Der Schlüsseltoken, der aus der Liste der mit dieser Tür assoziierten Tokens entfernt werden soll.
+        @param token: Der Schlüsseltoken, der aus der Menge der mit dieser Tür assoziierten Tokens entfernt werden soll.
         @type token: :class:`~token.Token`
         @return: `True`, wenn der als Parameter übergebene Token bereits mit der Tür assoziiert war
-                 und somit erfolgreich aus der Token-Liste entfernt wurde; andernfalls `False`.
+                 und somit erfolgreich aus der Token-Menge entfernt wurde; andernfalls `False`.
         @rtype: bool
         """
-        if self.__doorTokens.__contains__(token):
-            self.__doorTokens.remove(token)
+        with self.__writeLock:
+            if token not in self.__doorTokens:
+                return False
+            self.__doorTokens = self.__doorTokens - {token}
             return True
-        else:
-            return False
 
     def hasToken(self, keyToken: Token):
         """
@@ -145,13 +218,16 @@ class DoorDataStorage:
                  ist, andernfalls `False`.
         @rtype: bool
         """
-        return self.__doorTokens.__contains__(keyToken)
+        tokenDatabase = self.__tokenDatabase
+        if tokenDatabase is not None and tokenDatabase.hasToken(keyToken):
+            return True
+        return keyToken in self.__doorTokens
 
     def clear(self):
         """
         Entfernt alle Tokens, die in diesem Datenspeicher gespeichert sind.
         """
-        self.__doorTokens.clear()
+        self.replaceTokens(())
 
     def __repr__(self):
         """
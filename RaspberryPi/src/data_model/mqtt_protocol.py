@@ -1,3 +1,8 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import paho.mqtt.client as mqtt
 from RaspberryPi.src.data_model.configuration import MQTTProtocolConfiguration
 
@@ -15,12 +20,21 @@ Classes:
                 (sogenannten "Broker") senden bzw. Signale von anderen MQTT-Clients empfangen kann. 
     MQTTPublisher: Repräsentiert einen MQTT-Client, der über den Broker Nachrichten 
                    zu einem bestimmten Topic an alle MQTT-Clients senden kann, die dieses Topic abonniert haben.
+    PersistentMQTTPublisher: Repräsentiert einen dauerhaft verbundenen MQTT-Publisher, der je Broker nur
+                             einmal erzeugt wird, sich selbstständig wieder verbindet und die Zustellung von
+                             Nachrichten bestätigt bekommt.
     MQTTSubscriber: Repräsentiert einen MQTT-Client, der ein (oder mehrere) Topics abonnieren kann 
                     und dann automatisch vom Server (Broker) benachrichtigt wird, sobald ein MQTT-Publisher
                     eine Nachricht zu einem dieser Topics publiziert hat. 
+    TopicTrie: Ordnet Topic-Filter mit den Platzhaltern "+" und "#" in einem Präfixbaum den Handlern zu.
+    MQTTSession: Repräsentiert die einzige, gemeinsam genutzte MQTT-Verbindung eines Prozesses, über die
+                 publiziert und beliebig viele Topic-Filter mit eigenen Handlern abonniert werden.
 
 @author Ahmad Eynawi
 @version 16.02.2022
+
+@author Lukas Wittenzellner
+@version 1.3
 """
 
 
@@ -48,7 +62,8 @@ class MQTTClient:
         __init__: Konstruktor der Klasse :class:`~mqtt_protocol.MQTTClient`
     """
 
-    def __init__(self, mqttConfig: MQTTProtocolConfiguration, on_connect, on_message=None):
+    def __init__(self, mqttConfig: MQTTProtocolConfiguration, on_connect, on_message=None,
+                 connectAsynchronously=False):
         """
         Konstruktor der Klasse :class:`~mqtt_protocol.MQTTClient`.
 
@@ -61,6 +76,10 @@ class MQTTClient:
                            der Client sich nach einem Verbindungsaufbauwunsch erfolgreich mit dem Server (Broker)
                            verbinden konnte.
         @type on_connect: on_connect(client, userdata, flags, resultCode) -> None
+        @param connectAsynchronously: Wenn auf `True` gesetzt, wird die Verbindung erst von der Netzwerkschleife
+                                      aufgebaut, sodass der Konstruktor auch bei nicht erreichbarem Broker
+                                      nicht blockiert.
+        @type connectAsynchronously: bool
         """
         self._mqttConfig = mqttConfig
 
@@ -69,8 +88,11 @@ class MQTTClient:
         self._client.on_connect = on_connect
         self._client.on_message = on_message
         self._client.username_pw_set(mqttConfig.username, mqttConfig.password)
-        self._client.connect(mqttConfig.broker, mqttConfig.port,
-                             mqttConfig.keepalive)
+        if connectAsynchronously:
+            self._client.connect_async(mqttConfig.broker, mqttConfig.port, mqttConfig.keepalive)
+        else:
+            self._client.connect(mqttConfig.broker, mqttConfig.port,
+                                 mqttConfig.keepalive)
 
     def run(self):
         """
@@ -153,6 +175,238 @@ class MQTTPublisher(MQTTClient):
         self._client.publish(topic, payload=payload, qos=qualityOfService, retain=retainMessage)
 
 
+class PersistentMQTTPublisher(MQTTPublisher):
+    """
+    Diese Klasse repräsentiert einen dauerhaft verbundenen MQTT-Publisher.
+
+    Für jeden Broker existiert genau eine Instanz, die über get_instance geteilt wird. Die Netzwerkschleife
+    läuft mit loop_start in einem eigenen Thread, sodass Nachrichten sofort gesendet und Bestätigungen
+    empfangen werden. Bei einer Verbindungsunterbrechung verbindet sich der Client mit wachsender Wartezeit
+    selbstständig wieder; Nachrichten mit der Dienstgüte 1 werden währenddessen zwischengespeichert und nach
+    dem Wiederverbinden gesendet. Für jede Nachricht wird die Zeit vom Publizieren bis zur Bestätigung (PUBACK)
+    durch den Broker gemessen.
+
+    Methods:
+        get_instance: Gibt die geteilte Instanz für einen Broker zurück.
+        publish: Veröffentlicht eine Nachricht und gibt ihre Nachrichten-ID zurück.
+        waitForPublish: Wartet auf die Bestätigung einer Nachricht und gibt die Latenz zurück.
+        isConnected: Gibt zurück, ob der Client gerade mit dem Broker verbunden ist.
+        statistics: Gibt die Anzahl gesendeter und bestätigter Nachrichten und die Latenzen zurück.
+        stop: Beendet die Netzwerkschleife und trennt die Verbindung.
+        __init__: Konstruktor der Klasse :class:`~mqtt_protocol.PersistentMQTTPublisher`
+    """
+
+    __instances = dict()
+    __instancesLock = threading.Lock()
+
+    def __init__(self, mqttConfig: MQTTProtocolConfiguration, on_connect=None):
+        """
+        Konstruktor der Klasse :class:`~mqtt_protocol.PersistentMQTTPublisher`.
+
+        Erstellt einen MQTT-Publisher, der sich im Hintergrund mit dem Broker verbindet und die
+        Netzwerkschleife in einem eigenen Thread startet.
+
+        @param mqttConfig: Die Konfigurationsdaten des MQTT-Protokolls für diesen MQTT-Publisher.
+        @type mqttConfig: :class:`~configuration.MQTTProtocolConfiguration`
+        @param on_connect: Diese Methode wird nach jedem (Wieder-)Verbindungsaufbau mit dem Broker aufgerufen.
+        @type on_connect: (client, userdata, flags, resultCode) -> None
+        """
+        self.__userOnConnect = on_connect
+        self.__lock = threading.Condition()
+        self.__connected = False
+        # Nachrichten-ID -> Zeitpunkt des Publizierens der noch nicht bestätigten Nachrichten
+        self.__pending = dict()
+        # Nachrichten-ID -> Latenz in Sekunden der bestätigten Nachrichten, bis sie abgeholt wurden
+        self.__confirmed = dict()
+        # Nachrichten-ID -> Zeitpunkt einer Bestätigung, die vor der Rückkehr von publish eingetroffen ist
+        self.__early = dict()
+        # Nachrichten-ID -> Zeitpunkt des Publizierens der Nachrichten, auf die waitForPublish nicht mehr wartet
+        self.__abandoned = dict()
+        self.__published = 0
+        self.__confirmedCount = 0
+        self.__latencySum = 0.0
+        self.__latencyMax = 0.0
+        self.__lastLatency = None
+        MQTTClient.__init__(self, mqttConfig, self.__on_connect, None, True)
+        self._client.on_disconnect = self.__on_disconnect
+        self._client.on_publish = self.__on_publish
+        self._client.max_queued_messages_set(mqttConfig.maxQueuedMessages)
+        self._client.reconnect_delay_set(mqttConfig.reconnectMinDelay, mqttConfig.reconnectMaxDelay)
+        self._client.loop_start()
+
+    @classmethod
+    def get_instance(cls, mqttConfig: MQTTProtocolConfiguration, on_connect=None):
+        """
+        Gibt die geteilte Instanz für den Broker der Konfiguration zurück und erzeugt sie bei Bedarf.
+
+        Je Broker (Adresse und Port) wird genau ein Client erzeugt. Wurde für den Broker bereits eine Unterklasse
+        wie :class:`~mqtt_protocol.MQTTSession` erzeugt, wird diese auch für Aufrufe über diese Klasse
+        zurückgegeben.
+
+        @param mqttConfig: Die Konfigurationsdaten des MQTT-Protokolls.
+        @type mqttConfig: :class:`~configuration.MQTTProtocolConfiguration`
+        @param on_connect: Diese Methode wird nach jedem (Wieder-)Verbindungsaufbau aufgerufen. Sie wird nur
+                           beim Erzeugen der Instanz übernommen.
+        @type on_connect: (client, userdata, flags, resultCode) -> None
+        @return: Der dauerhaft verbundene MQTT-Publisher (bzw. die Instanz der Unterklasse) für diesen Broker.
+        @rtype: :class:`~mqtt_protocol.PersistentMQTTPublisher`
+        @raise ValueError: Wenn für den Broker bereits eine Instanz erzeugt wurde, die keine Instanz dieser
+                           Klasse ist. Ein zweiter Client würde die Verbindung des ersten verdrängen.
+        """
+        key = (mqttConfig.broker, mqttConfig.port)
+        with PersistentMQTTPublisher.__instancesLock:
+            instance = PersistentMQTTPublisher.__instances.get(key)
+            if instance is None:
+                instance = cls(mqttConfig, on_connect)
+                PersistentMQTTPublisher.__instances[key] = instance
+            elif not isinstance(instance, cls):
+                raise ValueError("Für den Broker " + str(mqttConfig.broker) + " besteht bereits eine Verbindung vom "
+                                 "Typ " + type(instance).__name__ + ", nicht vom Typ " + cls.__name__)
+            return instance
+
+    def __on_connect(self, client, userdata, flags, resultCode):
+        with self.__lock:
+            self.__connected = resultCode == 0
+        self._onConnected(resultCode)
+        if self.__userOnConnect is not None:
+            self.__userOnConnect(client, userdata, flags, resultCode)
+
+    def _onConnected(self, resultCode):
+        # Wird nach jedem (Wieder-)Verbindungsaufbau aus der Netzwerkschleife aufgerufen, z.B. für Abonnements
+        pass
+
+    def __on_disconnect(self, client, userdata, resultCode):
+        with self.__lock:
+            self.__connected = False
+
+    def __on_publish(self, client, userdata, mid):
+        # Wird von der Netzwerkschleife nach dem PUBACK aufgerufen, bei Dienstgüte 0 direkt nach dem Senden
+        now = time.monotonic()
+        with self.__lock:
+            start = self.__pending.pop(mid, None)
+            if start is not None:
+                self.__confirm(mid, now - start)
+            elif mid in self.__abandoned:
+                # Die Bestätigung kam nach dem Ablauf von waitForPublish und wird nur noch gezählt
+                self.__count(now - self.__abandoned.pop(mid))
+            else:
+                self.__early[mid] = now
+
+    def __confirm(self, mid: int, latency: float):
+        # Muss mit gehaltenem Lock aufgerufen werden
+        self.__confirmed[mid] = latency
+        self.__count(latency)
+        self.__lock.notify_all()
+
+    def __count(self, latency: float):
+        # Muss mit gehaltenem Lock aufgerufen werden
+        self.__confirmedCount += 1
+        self.__latencySum += latency
+        self.__latencyMax = max(self.__latencyMax, latency)
+        self.__lastLatency = latency
+
+    def publish(self, topic: str, payload: str, qualityOfService=1, retainMessage=False):
+        """
+        Veröffentlicht eine Nachricht vom MQTT-Publisher zu einem Topic, ohne auf den Broker zu warten.
+
+        Besteht gerade keine Verbindung, wird die Nachricht zwischengespeichert und nach dem
+        Wiederverbinden gesendet.
+
+        @param topic: Das Thema, zu dem die Nachricht veröffentlicht werden soll.
+        @type topic: str
+        @param payload: Die tatsächlich zu sendende Nachricht.
+        @type payload: str
+        @param qualityOfService: Das zu verwendende Dienstgüteniveau, standardmäßig 1, damit der Broker
+                                 den Empfang bestätigt.
+        @type qualityOfService: int
+        @param retainMessage: Wenn auf `True` gesetzt, wird die Nachricht als "letzte bekannte gute/beibehaltene"
+                              Nachricht für das Topic festgelegt.
+        @type retainMessage: bool
+        @return: Die Nachrichten-ID, mit der auf die Bestätigung gewartet werden kann, oder None, wenn die
+                 Nachricht nicht angenommen wurde (z.B. weil der Zwischenspeicher voll ist).
+        @rtype: int
+        """
+        # Der eigene Lock darf hier nicht gehalten werden, da die Netzwerkschleife on_publish mit gehaltenen
+        # Locks von paho aufruft. Eine Bestätigung vor der Rückkehr von publish wird in __early vermerkt.
+        start = time.monotonic()
+        info = self._client.publish(topic, payload=payload, qos=qualityOfService, retain=retainMessage)
+        if info.rc not in (mqtt.MQTT_ERR_SUCCESS, mqtt.MQTT_ERR_NO_CONN):
+            return None
+        with self.__lock:
+            self.__published += 1
+            # paho vergibt eine Nachrichten-ID erst wieder, wenn die alte Nachricht abgeschlossen ist
+            self.__abandoned.pop(info.mid, None)
+            if info.mid in self.__early:
+                self.__confirm(info.mid, self.__early.pop(info.mid) - start)
+            else:
+                self.__pending[info.mid] = start
+            return info.mid
+
+    def waitForPublish(self, mid: int, timeout: float = None):
+        """
+        Wartet auf die Bestätigung einer Nachricht durch den Broker.
+
+        @param mid: Die Nachrichten-ID aus publish.
+        @type mid: int
+        @param timeout: Die maximale Wartezeit in Sekunden. Ohne Angabe wird die publishTimeout der
+                        Konfiguration verwendet.
+        @type timeout: float
+        @return: Die Zeit in Sekunden vom Publizieren bis zur Bestätigung oder None, wenn die Nachricht in
+                 der Wartezeit nicht bestätigt wurde. Sie bleibt dann zwischengespeichert und wird weiter
+                 zugestellt, ihre spätere Bestätigung wird aber nur noch in der Statistik gezählt.
+        @rtype: float
+        """
+        if timeout is None:
+            timeout = self._mqttConfig.publishTimeout
+        with self.__lock:
+            if not self.__lock.wait_for(lambda: mid in self.__confirmed or mid not in self.__pending, timeout):
+                # Ohne Wartenden würde eine späte Bestätigung für immer in __confirmed liegen bleiben
+                self.__abandoned[mid] = self.__pending.pop(mid)
+                return None
+            return self.__confirmed.pop(mid, None)
+
+    def isConnected(self):
+        """
+        Gibt zurück, ob der Client gerade mit dem Broker verbunden ist.
+
+        @return: `True`, wenn eine Verbindung besteht, sonst `False`.
+        @rtype: bool
+        """
+        with self.__lock:
+            return self.__connected
+
+    def statistics(self):
+        """
+        Gibt die Anzahl gesendeter und bestätigter Nachrichten sowie die Latenzen bis zur Bestätigung zurück.
+
+        @return: Ein Dictionary mit den Schlüsseln published, confirmed, pending, last_latency_ms,
+                 avg_latency_ms und max_latency_ms.
+        @rtype: dict
+        """
+        with self.__lock:
+            confirmed = self.__confirmedCount
+            return {
+                "published": self.__published,
+                "confirmed": confirmed,
+                "pending": len(self.__pending) + len(self.__abandoned),
+                "last_latency_ms": None if self.__lastLatency is None else self.__lastLatency * 1000,
+                "avg_latency_ms": self.__latencySum / confirmed * 1000 if confirmed > 0 else None,
+                "max_latency_ms": self.__latencyMax * 1000,
+            }
+
+    def stop(self):
+        """
+        Beendet die Netzwerkschleife und trennt die Verbindung mit dem Broker. Ein späterer Aufruf von
+        get_instance erzeugt eine neue Instanz.
+        """
+        with PersistentMQTTPublisher.__instancesLock:
+            key = (self._mqttConfig.broker, self._mqttConfig.port)
+            if PersistentMQTTPublisher.__instances.get(key) is self:
+                del PersistentMQTTPublisher.__instances[key]
+        self._client.disconnect()
+        self._client.loop_stop()
+
+
 class MQTTSubscriber(MQTTClient):
     """
     Diese Klasse repräsentiert einen MQTT-Subscriber.
@@ -209,3 +463,273 @@ class MQTTSubscriber(MQTTClient):
         @type topic: str
         """
         self._client.subscribe(topic)
+
+
+class TopicTrie:
+    """
+    Diese Klasse ordnet Topic-Filter in einem Präfixbaum den Handlern zu.
+
+    Jede Ebene eines Topics (getrennt durch "/") ist ein Knoten des Baums. Der Platzhalter "+" passt auf genau
+    eine Ebene, "#" auf alle restlichen Ebenen einschließlich der übergeordneten. Topics, die mit "$" beginnen,
+    werden wie im MQTT-Standard nicht von Platzhaltern auf der ersten Ebene erfasst. Der Aufwand einer Suche
+    hängt damit von der Tiefe des Topics ab und nicht von der Anzahl der abonnierten Filter.
+
+    Methods:
+        add: Ordnet einem Topic-Filter einen Handler zu.
+        remove: Entfernt einen Handler von einem Topic-Filter.
+        match: Gibt alle Handler zurück, deren Filter auf ein Topic passen.
+        filters: Gibt alle Topic-Filter zurück, denen Handler zugeordnet sind.
+    """
+    SINGLE_LEVEL_WILDCARD = "+"
+    MULTI_LEVEL_WILDCARD = "#"
+    LEVEL_SEPARATOR = "/"
+
+    def __init__(self):
+        """
+        Konstruktor der Klasse :class:`~mqtt_protocol.TopicTrie`.
+        """
+        # Ein Knoten ist ein Tupel aus dem Dictionary der Kindknoten und der Liste seiner Handler
+        self.__root = (dict(), [])
+        self.__filters = dict()
+
+    def add(self, topicFilter: str, handler):
+        """
+        Ordnet einem Topic-Filter einen Handler zu.
+
+        @param topicFilter: Der Topic-Filter, z.B. "shellies/+/input_event/#".
+        @type topicFilter: str
+        @param handler: Der Handler, der für passende Topics zurückgegeben wird.
+        @type handler: object
+        @raise ValueError: Wenn "#" nicht auf der letzten Ebene steht oder ein Platzhalter nicht allein steht.
+        """
+        levels = topicFilter.split(self.LEVEL_SEPARATOR)
+        for index, level in enumerate(levels):
+            if (self.MULTI_LEVEL_WILDCARD in level and (level != self.MULTI_LEVEL_WILDCARD
+                                                         or index != len(levels) - 1)) \
+                    or (self.SINGLE_LEVEL_WILDCARD in level and level != self.SINGLE_LEVEL_WILDCARD):
+                raise ValueError("Ungültiger Topic-Filter: " + topicFilter)
+        node = self.__root
+        for level in levels:
+            node = node[0].setdefault(level, (dict(), []))
+        node[1].append(handler)
+        self.__filters[topicFilter] = self.__filters.get(topicFilter, 0) + 1
+
+    def remove(self, topicFilter: str, handler) -> bool:
+        """
+        Entfernt einen Handler von einem Topic-Filter.
+
+        @param topicFilter: Der Topic-Filter.
+        @type topicFilter: str
+        @param handler: Der zu entfernende Handler.
+        @type handler: object
+        @return: True Wenn dem Filter danach kein Handler mehr zugeordnet ist, anderenfalls False.
+        @rtype: bool
+        """
+        node = self.__root
+        for level in topicFilter.split(self.LEVEL_SEPARATOR):
+            node = node[0].get(level)
+            if node is None:
+                return False
+        if handler not in node[1]:
+            return False
+        node[1].remove(handler)
+        self.__filters[topicFilter] -= 1
+        if self.__filters[topicFilter] == 0:
+            del self.__filters[topicFilter]
+            return True
+        return False
+
+    def match(self, topic: str) -> list:
+        """
+        Gibt alle Handler zurück, deren Filter auf das Topic passen.
+
+        @param topic: Das Topic einer empfangenen Nachricht.
+        @type topic: str
+        @return: Die passenden Handler.
+        @rtype: list
+        """
+        levels = topic.split(self.LEVEL_SEPARATOR)
+        handlers = []
+        self.__match(self.__root, levels, 0, topic.startswith("$"), handlers)
+        return handlers
+
+    def __match(self, node, levels, index, system, handlers):
+        children = node[0]
+        wildcards = not (system and index == 0)
+        if wildcards and self.MULTI_LEVEL_WILDCARD in children:
+            handlers.extend(children[self.MULTI_LEVEL_WILDCARD][1])
+        if index == len(levels):
+            handlers.extend(node[1])
+            return
+        child = children.get(levels[index])
+        if child is not None:
+            self.__match(child, levels, index + 1, system, handlers)
+        if wildcards and self.SINGLE_LEVEL_WILDCARD in children:
+            self.__match(children[self.SINGLE_LEVEL_WILDCARD], levels, index + 1, system, handlers)
+
+    def filters(self) -> list:
+        """
+        Gibt alle Topic-Filter zurück, denen Handler zugeordnet sind.
+
+        @return: Die Topic-Filter.
+        @rtype: list
+        """
+        return list(self.__filters)
+
+
+class MQTTSession(PersistentMQTTPublisher):
+    """
+    Diese Klasse repräsentiert die einzige, gemeinsam genutzte MQTT-Verbindung eines Prozesses.
+
+    Alle Rollen eines Prozesses (z.B. der Beobachter des Türöffnertasters und der Benachrichtiger der
+    Türklingel) publizieren und abonnieren über dieselbe Verbindung. Ein weiteres Gerät kostet damit nur ein
+    Abonnement und keine weitere Verbindung. Empfangene Nachrichten werden über einen
+    :class:`~mqtt_protocol.TopicTrie` den Handlern zugeordnet, bei Bedarf als JSON dekodiert und in einem
+    eigenen Pool von Threads verarbeitet, sodass die Netzwerkschleife nie durch einen Handler blockiert wird.
+    Nach einem Wiederverbinden werden alle Topic-Filter erneut abonniert.
+
+    Methods:
+        subscribe: Abonniert einen Topic-Filter mit einem Handler.
+        unsubscribe: Entfernt einen Handler von einem Topic-Filter.
+        decodeJson: Dekodiert eine JSON-Nachricht zu einem Dictionary.
+        __init__: Konstruktor der Klasse :class:`~mqtt_protocol.MQTTSession`
+    """
+    PAYLOAD_JSON = "json"
+    PAYLOAD_TEXT = "text"
+    PAYLOAD_BYTES = "bytes"
+
+    def __init__(self, mqttConfig: MQTTProtocolConfiguration, on_connect=None):
+        """
+        Konstruktor der Klasse :class:`~mqtt_protocol.MQTTSession`.
+
+        @param mqttConfig: Die Konfigurationsdaten des MQTT-Protokolls. Topic und Nachricht werden nicht verwendet.
+        @type mqttConfig: :class:`~configuration.MQTTProtocolConfiguration`
+        @param on_connect: Diese Methode wird nach jedem (Wieder-)Verbindungsaufbau mit dem Broker aufgerufen.
+        @type on_connect: (client, userdata, flags, resultCode) -> None
+        """
+        self.__subscriptionsLock = threading.Lock()
+        self.__trie = TopicTrie()
+        self.__executor = ThreadPoolExecutor(max_workers=mqttConfig.handlerWorkers,
+                                             thread_name_prefix="MQTTSession")
+        super().__init__(mqttConfig, on_connect)
+        self._client.on_message = self.__on_message
+
+    @classmethod
+    def get_instance(cls, mqttConfig: MQTTProtocolConfiguration = None, on_connect=None):
+        """
+        Gibt die Sitzung für den Broker der Konfiguration zurück und erzeugt sie bei Bedarf.
+
+        @param mqttConfig: Die Konfigurationsdaten des MQTT-Protokolls. Ohne Angabe werden die Standardwerte
+                           der Klasse :class:`~configuration.MQTTProtocolConfiguration` verwendet.
+        @type mqttConfig: :class:`~configuration.MQTTProtocolConfiguration`
+        @param on_connect: Diese Methode wird nach jedem (Wieder-)Verbindungsaufbau aufgerufen. Sie wird nur
+                           beim Erzeugen der Sitzung übernommen.
+        @type on_connect: (client, userdata, flags, resultCode) -> None
+        @return: Die Sitzung für diesen Broker.
+        @rtype: :class:`~mqtt_protocol.MQTTSession`
+        """
+        if mqttConfig is None:
+            mqttConfig = MQTTProtocolConfiguration(None, None)
+        return super().get_instance(mqttConfig, on_connect)
+
+    def _onConnected(self, resultCode):
+        if resultCode != 0:
+            return
+        with self.__subscriptionsLock:
+            filters = self.__trie.filters()
+        if len(filters) > 0:
+            self._client.subscribe([(topicFilter, 1) for topicFilter in filters])
+
+    def subscribe(self, topicFilter: str, handler, payloadFormat: str = PAYLOAD_TEXT, qualityOfService: int = 1):
+        """
+        Abonniert einen Topic-Filter mit einem Handler. Ist der Filter bereits abonniert, wird nur der Handler
+        hinzugefügt.
+
+        @param topicFilter: Der Topic-Filter, z.B. "shellies/+/input_event/0".
+        @type topicFilter: str
+        @param handler: Die Funktion, die das Topic und die dekodierte Nachricht erhält. Bei "json" ist die
+                        Nachricht ein Dictionary; Nachrichten, die kein gültiges JSON-Objekt sind, werden verworfen.
+        @type handler: (topic, payload) -> None
+        @param payloadFormat: Das Format der Nachricht: "json", "text" oder "bytes".
+        @type payloadFormat: str
+        @param qualityOfService: Das Dienstgüteniveau des Abonnements.
+        @type qualityOfService: int
+        @raise ValueError: Wenn der Topic-Filter oder das Format ungültig ist.
+        """
+        if payloadFormat not in (self.PAYLOAD_JSON, self.PAYLOAD_TEXT, self.PAYLOAD_BYTES):
+            raise ValueError("Ungültiges Format der Nachricht: " + str(payloadFormat))
+        with self.__subscriptionsLock:
+            new = topicFilter not in self.__trie.filters()
+            self.__trie.add(topicFilter, (handler, payloadFormat))
+        if new:
+            self._client.subscribe(topicFilter, qualityOfService)
+
+    def unsubscribe(self, topicFilter: str, handler, payloadFormat: str = PAYLOAD_TEXT):
+        """
+        Entfernt einen Handler von einem Topic-Filter. Ist dem Filter danach kein Handler mehr zugeordnet,
+        wird er beim Broker abbestellt.
+
+        @param topicFilter: Der Topic-Filter.
+        @type topicFilter: str
+        @param handler: Der Handler aus subscribe.
+        @type handler: (topic, payload) -> None
+        @param payloadFormat: Das Format aus subscribe.
+        @type payloadFormat: str
+        """
+        with self.__subscriptionsLock:
+            last = self.__trie.remove(topicFilter, (handler, payloadFormat))
+        if last:
+            self._client.unsubscribe(topicFilter)
+
+    @staticmethod
+    def decodeJson(payload: bytes):
+        """
+        Dekodiert eine JSON-Nachricht zu einem Dictionary.
+
+        Anders als ast.literal_eval wertet diese Methode keine Python-Ausdrücke aus. Nachrichten, die nicht mit
+        "{" beginnen, werden ohne Parsen verworfen.
+
+        @param payload: Die empfangene Nachricht.
+        @type payload: bytes
+        @return: Das Dictionary oder None, wenn die Nachricht kein gültiges JSON-Objekt ist.
+        @rtype: dict
+        """
+        payload = payload.strip()
+        if not payload.startswith(b"{"):
+            return None
+        try:
+            decoded = json.loads(payload)
+        except ValueError:
+            return None
+        return decoded if isinstance(decoded, dict) else None
+
+    def __on_message(self, client, userdata, message):
+        # Wird in der Netzwerkschleife aufgerufen und gibt die Nachricht nur an den Pool weiter
+        with self.__subscriptionsLock:
+            handlers = self.__trie.match(message.topic)
+        if len(handlers) == 0:
+            return
+        decoded = dict()
+        for handler, payloadFormat in handlers:
+            if payloadFormat not in decoded:
+                decoded[payloadFormat] = self.__decode(message.payload, payloadFormat)
+            payload = decoded[payloadFormat]
+            if payload is not None:
+                self.__executor.submit(handler, message.topic, payload)
+
+    def __decode(self, payload: bytes, payloadFormat: str):
+        if payloadFormat == self.PAYLOAD_JSON:
+            return self.decodeJson(payload)
+        if payloadFormat == self.PAYLOAD_TEXT:
+            try:
+                return payload.decode()
+            except UnicodeDecodeError:
+                return None
+        return payload
+
+    def stop(self):
+        """
+        Beendet die Netzwerkschleife, trennt die Verbindung und beendet den Pool der Handler.
+        """
+        super().stop()
+        self.__executor.shutdown(wait=False)
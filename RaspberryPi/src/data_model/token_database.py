@@ -0,0 +1,267 @@
+import mmap
+import os
+import struct
+from bisect import bisect_left
+
+from RaspberryPi.src.data_model.key_token import Token
+
+"""
+Dieses Modul kapselt die kompakte, binäre Token-Datenbank, gegen die die Tür Schlüsseltokens validiert.
+
+Die Datenbank besteht aus einem kleinen Header (Kennung, Formatversion, Anzahl der Einträge), gefolgt von
+den sortierten, rohen 32-Byte SHA-256-Digests aller gültigen Tokens. Die Datei wird per mmap eingeblendet
+und mit binärer Suche durchsucht, sodass der Speicherbedarf nahe an der Dateigröße liegt und beim Start
+nichts geparst werden muss.
+
+Classes:
+    TokenDatabase: Repräsentiert eine per mmap eingeblendete Token-Datenbank.
+
+@author Ahmad Eynawi
+@version 1.0
+
+@author Lukas Wittenzellner
+@version 1.1
+"""
+
+
+class _DigestView:
+    """
+    Stellt die Digests einer eingeblendeten Datenbank als Sequenz dar, damit sie mit :func:`bisect.bisect_left`
+    durchsucht werden kann, ohne sie in Python-Objekte zu kopieren.
+    """
+
+    def __init__(self, buffer, count: int):
+        self.__buffer = buffer
+        self.__count = count
+
+    def __len__(self):
+        return self.__count
+
+    def __getitem__(self, index: int):
+        start = TokenDatabase.HEADER.size + index * TokenDatabase.DIGEST_SIZE
+        return self.__buffer[start:start + TokenDatabase.DIGEST_SIZE]
+
+
+class TokenDatabase:
+    """
+    Diese Klasse repräsentiert eine Token-Datenbank, die als sortiertes Feld von SHA-256-Digests
+    auf dem Datenträger liegt und per mmap eingeblendet wird.
+
+    Existiert die Datei (noch) nicht, ist die Datenbank leer.
+
+    Attributes:
+        path (str): Der Pfad zur Datei der Datenbank.
+
+    Methods:
+        path (Getter): Gibt den Pfad zur Datei der Datenbank zurück.
+        write: Schreibt eine neue Datenbank atomar an den gegebenen Pfad.
+        merge: Schreibt die Datenbank mit hinzugefügten und entfernten Tokens atomar neu.
+        hasDigest: Prüft, ob ein roher Digest in der Datenbank enthalten ist.
+        hasToken: Prüft, ob ein Schlüsseltoken in der Datenbank enthalten ist.
+        tokens: Gibt alle gespeicherten Tokens als hexadezimale Strings zurück.
+        close: Gibt die eingeblendete Datei frei.
+        __init__: Konstruktor der Klasse :class:`~token_database.TokenDatabase`
+        __len__: Gibt die Anzahl der gespeicherten Tokens zurück.
+    """
+    MAGIC = b"PSETOKDB"
+    VERSION = 1
+    DIGEST_SIZE = 32
+    HEADER = struct.Struct("<8sII")
+
+    def __init__(self, path: str):
+        """
+        Konstruktor der Klasse :class:`~token_database.TokenDatabase`.
+
+        Blendet die Datei unter dem gegebenen Pfad ein und prüft ihren Header.
+
+        @param path: Der Pfad zur Datei der Datenbank.
+        @type path: str
+        @raise ValueError: Wenn die Datei keine gültige Token-Datenbank ist.
+        """
+        self.__path = path
+        self.__mmap = None
+        self.__count = 0
+        try:
+            with open(path, "rb") as file:
+                if os.fstat(file.fileno()).st_size == 0:
+                    return
+                self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return
+        if len(self.__mmap) < TokenDatabase.HEADER.size:
+            raise ValueError("Die Datei " + path + " ist keine gültige Token-Datenbank")
+        magic, version, count = TokenDatabase.HEADER.unpack_from(self.__mmap, 0)
+        if magic != TokenDatabase.MAGIC or version != TokenDatabase.VERSION \
+                or len(self.__mmap) != TokenDatabase.HEADER.size + count * TokenDatabase.DIGEST_SIZE:
+            self.__mmap.close()
+            raise ValueError("Die Datei " + path + " ist keine gültige Token-Datenbank")
+        self.__count = count
+        self.__digests = _DigestView(self.__mmap, count)
+
+    @property
+    def path(self):
+        """
+        Get-Methode für den Pfad zur Datei der Datenbank.
+
+        @return: Den Pfad zur Datei der Datenbank.
+        @rtype: str
+        """
+        return self.__path
+
+    @staticmethod
+    def write(path: str, tokens) -> int:
+        """
+        Schreibt eine neue Datenbank mit den gegebenen Tokens an den gegebenen Pfad.
+
+        Die Datei wird zuerst unter einem temporären Namen geschrieben und ersetzt dann durch Umbenennen die alte
+        Datei. Anschließend wird das Verzeichnis gesichert, damit das Umbenennen einen Stromausfall übersteht.
+        Bereits eingeblendete Datenbanken lesen so weiter die alte Datei, bis sie neu geöffnet werden.
+        Tokens, die kein hexadezimaler SHA-256-Digest sind, werden übersprungen.
+
+        @param path: Der Pfad, unter dem die Datenbank gespeichert werden soll.
+        @type path: str
+        @param tokens: Die gültigen Tokens als hexadezimale Strings.
+        @type tokens: iterable von str
+        @return: Die Anzahl der gespeicherten Tokens.
+        @rtype: int
+        """
+        digests = set()
+        for token in tokens:
+            digest = TokenDatabase.__to_digest(token)
+            if digest is not None:
+                digests.add(digest)
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(TokenDatabase.HEADER.pack(TokenDatabase.MAGIC, TokenDatabase.VERSION, len(digests)))
+            file.write(b"".join(sorted(digests)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+        TokenDatabase.__fsync_directory(path)
+        return len(digests)
+
+    def merge(self, addedTokens, removedTokens) -> int:
+        """
+        Schreibt die Datenbank mit den hinzugefügten und ohne die entfernten Tokens an ihren Pfad.
+
+        Die bereits sortierten Digests der eingeblendeten Datei werden nicht in Python-Objekte umgewandelt, sondern
+        zwischen den Positionen der Änderungen blockweise in die temporäre Datei kopiert. Der Aufwand in Python
+        wächst daher nur mit der Anzahl der Änderungen. Wie bei write wird die alte Datei durch Umbenennen ersetzt,
+        diese Instanz liest weiter die alte Datei. Ein Token, der in beiden Mengen enthalten ist, bleibt erhalten.
+
+        @param addedTokens: Die hinzugefügten Tokens als hexadezimale Strings.
+        @type addedTokens: iterable von str
+        @param removedTokens: Die entfernten Tokens als hexadezimale Strings.
+        @type removedTokens: iterable von str
+        @return: Die Anzahl der gespeicherten Tokens.
+        @rtype: int
+        """
+        # Digest -> True für hinzugefügte, False für entfernte Tokens
+        changes = dict()
+        for token, keep in [(token, False) for token in removedTokens] + [(token, True) for token in addedTokens]:
+            digest = TokenDatabase.__to_digest(token)
+            if digest is not None:
+                changes[digest] = keep
+        temp_path = self.__path + ".tmp"
+        count = 0
+        position = 0
+        with open(temp_path, "wb") as file:
+            # Die Anzahl steht erst am Ende fest und wird dann in den Header geschrieben
+            file.write(TokenDatabase.HEADER.pack(TokenDatabase.MAGIC, TokenDatabase.VERSION, 0))
+            for digest, keep in sorted(changes.items()):
+                index = bisect_left(self.__digests, digest, position) if self.__count > 0 else 0
+                self.__copy(file, position, index)
+                count += index - position
+                if index < self.__count and self.__digests[index] == digest:
+                    index += 1
+                if keep:
+                    file.write(digest)
+                    count += 1
+                position = index
+            self.__copy(file, position, self.__count)
+            count += self.__count - position
+            file.seek(0)
+            file.write(TokenDatabase.HEADER.pack(TokenDatabase.MAGIC, TokenDatabase.VERSION, count))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.__path)
+        TokenDatabase.__fsync_directory(self.__path)
+        return count
+
+    def __copy(self, file, start: int, end: int):
+        # Kopiert die Digests von start bis ausschließlich end ohne Zwischenkopie in die Datei
+        if start >= end:
+            return
+        offset = TokenDatabase.HEADER.size
+        with memoryview(self.__mmap) as view:
+            file.write(view[offset + start * TokenDatabase.DIGEST_SIZE:offset + end * TokenDatabase.DIGEST_SIZE])
+
+    @staticmethod
+    def __fsync_directory(path: str):
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+    @staticmethod
+    def __to_digest(token: str):
+        try:
+            digest = bytes.fromhex(token)
+        except ValueError:
+            return None
+        return digest if len(digest) == TokenDatabase.DIGEST_SIZE else None
+
+    def hasDigest(self, digest: bytes):
+        """
+        Gibt `True` zurück, wenn der gegebene rohe Digest in der Datenbank enthalten ist.
+
+        @param digest: Der 32 Byte lange SHA-256-Digest.
+        @type digest: bytes
+        @return: `True`, wenn der Digest enthalten ist, andernfalls `False`.
+        @rtype: bool
+        """
+        if self.__count == 0:
+            return False
+        index = bisect_left(self.__digests, digest)
+        return index < self.__count and self.__digests[index] == digest
+
+    def hasToken(self, keyToken: Token):
+        """
+        Gibt `True` zurück, wenn der gegebene Schlüsseltoken in der Datenbank enthalten ist.
+
+        @param keyToken: Der Schlüsseltoken, dessen Identifikator ein hexadezimaler SHA-256-Digest ist.
+        @type keyToken: :class:`~key_token.Token`
+        @return: `True`, wenn der Token enthalten ist, andernfalls `False`.
+        @rtype: bool
+        """
+        digest = TokenDatabase.__to_digest(str(keyToken.identifier))
+        return digest is not None and self.hasDigest(digest)
+
+    def tokens(self):
+        """
+        Gibt alle in der Datenbank gespeicherten Tokens in sortierter Reihenfolge zurück.
+
+        @return: Die Tokens als hexadezimale Strings.
+        @rtype: generator von str
+        """
+        for index in range(self.__count):
+            yield self.__digests[index].hex()
+
+    def close(self):
+        """
+        Gibt die eingeblendete Datei frei. Danach ist die Datenbank leer.
+        """
+        self.__count = 0
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+
+    def __len__(self):
+        """
+        Gibt die Anzahl der in der Datenbank gespeicherten Tokens zurück.
+
+        @return: Die Anzahl der gespeicherten Tokens.
+        @rtype: int
+        """
+        return self.__count
@@ -6,6 +6,7 @@ Modules:
     BellPushHandler: Die Klassen in diesem Paket dienen der Weiterleitung des Signals,
         sobald ein Nutzer den Klingeltaster betätigt.
         Das Signal wird an verbundene Soft- und Hardware weitergeleitet.
+    AppServer: Dieses Modul nimmt die TLS-Verbindungen der AdminApp entgegen und beantwortet deren Anfragen.
 
 
 @author Fabian Schiekel
@@ -0,0 +1,492 @@
+"""
+Dieses Modul enthält den Server, über den die AdminApp per TLS Anfragen an den Raspberry Pi stellt.
+Der Server läuft in einer einzigen asyncio-Ereignisschleife. Die Anzahl gleichzeitiger Verbindungen ist begrenzt,
+überzählige Verbindungen werden noch vor dem TLS-Handshake geschlossen. Verbindungen ohne Anfrage werden nach einer
+festen Zeit geschlossen. Die blockierenden Anfragen an den Adapter werden in einem Pool mit fester Anzahl an Threads
+bearbeitet, sodass auch viele Verbindungen nicht mit dem Einlesen der Tokens konkurrieren.
+Das bisherige zeilenbasierte Protokoll bleibt erhalten. Daneben können Anfragen mit vorangestellter Länge übertragen
+werden, sodass auch mehrzeilige Anfragen wie eine Sammlung von Änderungen möglich sind.
+Eine Verbindung der App bleibt für beliebig viele Anfragen bestehen. Klienten, die sich erneut verbinden, können
+ihre TLS-Sitzung über ein Ticket oder die Sitzungs-ID fortsetzen und sparen so den vollständigen Handshake. Ist die
+maximale Anzahl an Verbindungen erreicht, wird die am längsten ruhende Verbindung für die neue geschlossen.
+Der TLS-Handshake wird über loop.start_tls gestartet, der Server läuft daher ab Python 3.9.
+Classes:
+    AppSession: Hält den Zustand einer einzelnen Verbindung, z.B. den angemeldeten Admin.
+    AppConnectionProtocol: Hält eine neue Verbindung bis zum TLS-Handshake an und stellt danach Streams bereit.
+    AppServerMetrics: Sammelt Messwerte über die Verbindungen, TLS-Handshakes und Anfragen des Servers.
+    AppServer: Nimmt die Verbindungen der App entgegen und beantwortet deren Anfragen.
+@author Lukas Wittenzellner
+@version 1.4
+"""
+import asyncio
+import socket
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from RaspberryPi.src.data_model.configuration import PiConfiguration
+from RaspberryPi.src.door_controller.entities.log import LogError, LogInfo
+
+
+class AppServerMetrics:
+    """
+    Sammelt Messwerte über die Verbindungen, TLS-Handshakes und Anfragen des Servers.
+    Zähler werden über ihren Namen, Zeitmessungen über den Namen der gemessenen Phase angesprochen.
+    Methods:
+        count: Erhöht einen Zähler um eins.
+        observe: Nimmt eine gemessene Dauer einer Phase auf.
+        connection_opened: Vermerkt eine neu geöffnete Verbindung.
+        connection_closed: Vermerkt eine geschlossene Verbindung.
+        snapshot: Gibt den aktuellen Stand aller Messwerte zurück.
+    """
+    def __init__(self):
+        """
+        Konstruktor für eine AppServerMetrics Instanz.
+        """
+        self.__lock = threading.Lock()
+        self.__counters = dict()
+        # Phase -> [Anzahl, Summe, Maximum] der gemessenen Dauern in Sekunden
+        self.__timings = dict()
+        self.__active = 0
+
+    def count(self, name: str):
+        """
+        Erhöht einen Zähler um eins.
+        :param name: Ist der Name des Zählers.
+        :type name: str
+        """
+        with self.__lock:
+            self.__counters[name] = self.__counters.get(name, 0) + 1
+
+    def observe(self, name: str, seconds: float):
+        """
+        Nimmt eine gemessene Dauer einer Phase auf.
+        :param name: Ist der Name der Phase, z.B. handshake oder request.
+        :type name: str
+        :param seconds: Ist die gemessene Dauer in Sekunden.
+        :type seconds: float
+        """
+        with self.__lock:
+            timing = self.__timings.setdefault(name, [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+    def connection_opened(self):
+        """
+        Vermerkt eine neu geöffnete Verbindung.
+        """
+        with self.__lock:
+            self.__active += 1
+            self.__counters["connections_accepted"] = self.__counters.get("connections_accepted", 0) + 1
+
+    def connection_closed(self):
+        """
+        Vermerkt eine geschlossene Verbindung.
+        """
+        with self.__lock:
+            self.__active -= 1
+
+    def snapshot(self) -> dict:
+        """
+        Gibt den aktuellen Stand aller Messwerte zurück. Für jede Phase sind die Anzahl sowie die durchschnittliche
+        und die maximale Dauer in Millisekunden enthalten. Zusätzlich ist der Anteil der fortgesetzten an allen
+        erfolgreichen TLS-Handshakes enthalten.
+        :return: Die Messwerte nach ihrem Namen.
+        :rtype: dict
+        """
+        with self.__lock:
+            result = dict(self.__counters)
+            result["connections_active"] = self.__active
+            resumed = self.__counters.get("handshakes_resumed", 0)
+            handshakes = resumed + self.__counters.get("handshakes_full", 0)
+            result["handshake_resumption_ratio"] = round(resumed / handshakes, 3) if handshakes else 0.0
+            for name, (count, total, maximum) in self.__timings.items():
+                result[name + "_count"] = count
+                result[name + "_avg_ms"] = round(total / count * 1000, 3)
+                result[name + "_max_ms"] = round(maximum * 1000, 3)
+            return result
+
+
+class AppSession:
+    """
+    Hält den Zustand einer einzelnen Verbindung der App. Nach einer Anmeldung sind hier der Admin und sein Passwort
+    gespeichert, sodass folgende Anfragen sie nicht erneut enthalten müssen.
+    Methods:
+        admin: Gibt den angemeldeten Admin zurück.
+        password: Gibt das Passwort des angemeldeten Admins zurück.
+        is_logged_in: Gibt zurück, ob ein Admin angemeldet ist.
+        login: Meldet einen Admin für die Verbindung an.
+    """
+    def __init__(self):
+        """
+        Konstruktor für eine AppSession Instanz.
+        """
+        self.__admin = None
+        self.__password = None
+
+    @property
+    def admin(self):
+        """
+        Gibt den angemeldeten Admin zurück.
+        :return: Den angemeldeten Admin oder None.
+        :rtype: UnauthenticatedUser
+        """
+        return self.__admin
+
+    @property
+    def password(self):
+        """
+        Gibt das Passwort des angemeldeten Admins zurück.
+        :return: Das Passwort oder None.
+        :rtype: Password
+        """
+        return self.__password
+
+    def is_logged_in(self) -> bool:
+        """
+        Gibt zurück, ob für die Verbindung ein Admin angemeldet ist.
+        :return: True, wenn ein Admin angemeldet ist, anderenfalls False.
+        :rtype: bool
+        """
+        return self.__admin is not None
+
+    def login(self, admin, password):
+        """
+        Meldet einen bereits überprüften Admin für die Verbindung an.
+        :param admin: Ist der angemeldete Admin.
+        :type admin: UnauthenticatedUser
+        :param password: Ist das Passwort des Admins.
+        :type password: Password
+        """
+        self.__admin = admin
+        self.__password = password
+
+
+class AppConnectionProtocol(asyncio.StreamReaderProtocol):
+    """
+    Hält eine neue Verbindung bis zum TLS-Handshake an und stellt danach einen StreamReader und StreamWriter bereit.
+    Das Lesen wird schon beim Verbindungsaufbau pausiert, damit der ClientHello nicht vor dem Handshake im
+    StreamReader landet.
+    Methods:
+        connection_made: Pausiert das Lesen und meldet die unverschlüsselte Verbindung.
+        open_streams: Gibt nach dem TLS-Handshake den StreamReader und StreamWriter zurück.
+    """
+    def __init__(self, limit: int, on_connection):
+        """
+        Konstruktor für eine AppConnectionProtocol Instanz.
+        :param limit: Ist die Puffergröße des StreamReaders.
+        :type limit: int
+        :param on_connection: Ist die Funktion, die das Protokoll und den unverschlüsselten Transport erhält.
+        :type on_connection: callable
+        """
+        self.__reader = asyncio.StreamReader(limit=limit)
+        super().__init__(self.__reader)
+        self.__on_connection = on_connection
+
+    def connection_made(self, transport):
+        """
+        Pausiert das Lesen und meldet die unverschlüsselte Verbindung. Der StreamReader erhält den Transport erst
+        in open_streams.
+        :param transport: Ist der unverschlüsselte Transport der Verbindung.
+        :type transport: asyncio.Transport
+        """
+        transport.pause_reading()
+        self.__on_connection(self, transport)
+
+    def open_streams(self, transport):
+        """
+        Gibt nach dem TLS-Handshake den StreamReader und StreamWriter zurück.
+        :param transport: Ist der von loop.start_tls zurückgegebene Transport.
+        :type transport: asyncio.Transport
+        :return: Den StreamReader und StreamWriter der verschlüsselten Verbindung.
+        :rtype: tuple
+        """
+        super().connection_made(transport)
+        return self.__reader, asyncio.StreamWriter(transport, self, self.__reader, asyncio.get_running_loop())
+
+
+class AppServer:
+    """
+    Nimmt die TLS-Verbindungen der App entgegen und beantwortet deren Anfragen.
+    Jede Anfrage wird zusammen mit der AppSession der Verbindung an eine Funktion übergeben, die in einem Pool von
+    Threads ausgeführt wird und die Antwort als String zurückgibt.
+    Beginnt eine Verbindung mit einem Nullbyte, werden alle Anfragen und Antworten mit einer vorangestellten Länge
+    von vier Byte (Big Endian) übertragen und dürfen Zeilenumbrüche enthalten. Anderenfalls ist jede Zeile eine
+    Anfrage, wie von der bisherigen App erwartet.
+    Eine leere Anfrage und das Kommando zur Prüfung der Verbindung werden direkt beantwortet, ohne einen Thread des
+    Pools zu belegen.
+    Methods:
+        port: Gibt den Port zurück, an dem der Server auf Verbindungen wartet.
+        metrics: Gibt die Messwerte des Servers zurück.
+        serve_forever: Führt den Server im aufrufenden Thread aus, bis er gestoppt wird.
+        start: Startet den Server in einem eigenen Thread.
+        stop: Stoppt den Server.
+    """
+    FRAME_MARKER = b"\x00"
+    FRAME_HEADER_SIZE = 4
+
+    def __init__(self, request_handler, ssl_context: ssl.SSLContext = None, port: int = None,
+                 pi_conf: PiConfiguration = None):
+        """
+        Konstruktor für eine AppServer Instanz.
+        :param request_handler: Ist die Funktion, die eine Anfrage als String und die AppSession der Verbindung
+            erhält und die Antwort zurückgibt.
+        :type request_handler: callable
+        :param ssl_context: Ist der TLS-Kontext des Servers. Ohne Angabe wird er aus dem Zertifikat und dem
+            Schlüssel der PiConfiguration erzeugt.
+        :type ssl_context: ssl.SSLContext
+        :param port: Ist der Port des Servers. Ohne Angabe wird der Port aus der PiConfiguration verwendet.
+        :type port: int
+        :param pi_conf: Ist die Konfiguration des Servers.
+        :type pi_conf: PiConfiguration
+        """
+        self.__pi_conf = pi_conf if pi_conf is not None else PiConfiguration()
+        self.__request_handler = request_handler
+        self.__ssl_context = ssl_context
+        self.__port = port if port is not None else self.__pi_conf.app_socket_port
+        self.__metrics = AppServerMetrics()
+        self.__active = 0
+        # Writer der Verbindungen, die auf eine Anfrage warten -> Zeitpunkt, seit dem sie warten
+        self.__idle = dict()
+        # Referenzen auf die laufenden Verbindungen, damit ihre Tasks nicht vorzeitig freigegeben werden
+        self.__connections = set()
+        self.__loop = None
+        self.__stopped = None
+        self.__started = threading.Event()
+        self.__thread = None
+        self.__error = None
+
+    @property
+    def port(self) -> int:
+        """
+        Gibt den Port zurück, an dem der Server auf Verbindungen wartet. Nach dem Start ist das auch bei Port 0
+        der tatsächlich vergebene Port.
+        :return: Den Port des Servers.
+        :rtype: int
+        """
+        return self.__port
+
+    @property
+    def metrics(self) -> AppServerMetrics:
+        """
+        Gibt die Messwerte des Servers zurück.
+        :return: Die Messwerte des Servers.
+        :rtype: AppServerMetrics
+        """
+        return self.__metrics
+
+    def serve_forever(self):
+        """
+        Führt den Server im aufrufenden Thread aus, bis er gestoppt wird.
+        """
+        try:
+            asyncio.run(self.__serve())
+        except BaseException as error:
+            self.__error = error
+            raise
+        finally:
+            self.__started.set()
+
+    def start(self):
+        """
+        Startet den Server in einem eigenen Thread und kehrt zurück, sobald er Verbindungen entgegennimmt.
+        """
+        self.__thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.__thread.start()
+        self.__started.wait()
+        if self.__error is not None:
+            raise self.__error
+
+    def stop(self):
+        """
+        Stoppt den Server. Bereits angenommene Verbindungen werden geschlossen.
+        """
+        if self.__loop is not None and self.__stopped is not None:
+            self.__loop.call_soon_threadsafe(self.__stopped.set)
+        if self.__thread is not None:
+            self.__thread.join()
+
+    def __create_ssl_context(self) -> ssl.SSLContext:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.__pi_conf.path_pem, self.__pi_conf.path_key)
+        return context
+
+    def __tune_ssl_context(self, context: ssl.SSLContext):
+        # Sitzungs-IDs (TLS 1.2) speichert OpenSSL bereits im Kontext, Tickets (TLS 1.3) müssen erlaubt sein
+        context.options &= ~ssl.OP_NO_TICKET
+        if context.protocol == ssl.PROTOCOL_TLS_SERVER:
+            context.num_tickets = self.__pi_conf.app_tls_session_tickets
+
+    async def __serve(self):
+        if self.__ssl_context is None:
+            self.__ssl_context = self.__create_ssl_context()
+        self.__tune_ssl_context(self.__ssl_context)
+        self.__loop = asyncio.get_running_loop()
+        self.__stopped = asyncio.Event()
+        executor = ThreadPoolExecutor(max_workers=self.__pi_conf.app_executor_workers,
+                                      thread_name_prefix="AppRequest")
+        # Der TLS-Handshake wird erst in __handle ausgeführt, damit überzählige Verbindungen ihn nicht auslösen
+        # Wie bisher ein IPv6-Socket, der auch Verbindungen über IPv4 annimmt
+        server_socket = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server_socket.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_V6ONLY, 0)
+        server_socket.bind(("", self.__port))
+        server = await self.__loop.create_server(
+            lambda: AppConnectionProtocol(self.__pi_conf.app_socket_buf_size,
+                                          lambda protocol, transport: self.__accept(protocol, transport, executor)),
+            sock=server_socket)
+        self.__port = server_socket.getsockname()[1]
+        reporter = None
+        if self.__pi_conf.app_metrics_interval > 0:
+            reporter = asyncio.create_task(self.__report_metrics())
+        self.__started.set()
+        try:
+            async with server:
+                await self.__stopped.wait()
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __report_metrics(self):
+        while True:
+            await asyncio.sleep(self.__pi_conf.app_metrics_interval)
+            LogInfo.get_instance().send_log_msg("Messwerte des App-Servers: " + str(self.__metrics.snapshot()))
+
+    def __accept(self, protocol: AppConnectionProtocol, transport, executor):
+        if self.__active >= self.__pi_conf.app_max_connections and not self.__evict_idle_connection():
+            self.__metrics.count("connections_rejected")
+            transport.abort()
+            return
+        # Der Platz wird sofort belegt, da sonst alle in derselben Iteration angenommenen Verbindungen die
+        # Prüfung bestehen, bevor ihre Tasks laufen
+        self.__active += 1
+        self.__metrics.connection_opened()
+        task = self.__loop.create_task(self.__handle(protocol, transport, executor))
+        self.__connections.add(task)
+        task.add_done_callback(self.__connections.discard)
+
+    async def __handle(self, protocol: AppConnectionProtocol, transport, executor):
+        writer = None
+        try:
+            sock = transport.get_extra_info("socket")
+            if sock is not None:
+                # Vom Klienten unbemerkt getrennte Verbindungen erkennt das Betriebssystem
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            start = time.monotonic()
+            try:
+                tls_transport = await self.__loop.start_tls(
+                    transport, protocol, self.__ssl_context, server_side=True,
+                    ssl_handshake_timeout=self.__pi_conf.app_handshake_timeout)
+            except (ssl.SSLError, OSError, asyncio.TimeoutError):
+                # Verifikation des Zertifikats fehlgeschlagen oder Klient nicht mehr erreichbar
+                self.__metrics.count("handshakes_failed")
+                transport.abort()
+                return
+            self.__metrics.observe("handshake", time.monotonic() - start)
+            reader, writer = protocol.open_streams(tls_transport)
+            ssl_object = writer.get_extra_info("ssl_object")
+            if ssl_object is not None and ssl_object.session_reused:
+                self.__metrics.count("handshakes_resumed")
+            else:
+                self.__metrics.count("handshakes_full")
+            await self.__communicate(reader, writer, executor)
+        finally:
+            self.__idle.pop(writer, None)
+            self.__active -= 1
+            self.__metrics.connection_closed()
+            if writer is None:
+                return
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ssl.SSLError, OSError):
+                pass
+
+    def __evict_idle_connection(self) -> bool:
+        # Schließt die am längsten ruhende Verbindung, falls sie lange genug ohne Anfrage ist
+        if not self.__idle:
+            return False
+        writer, since = min(self.__idle.items(), key=lambda item: item[1])
+        if time.monotonic() - since < self.__pi_conf.app_evict_idle_after:
+            return False
+        del self.__idle[writer]
+        self.__metrics.count("connections_evicted")
+        # Die Verbindung zählt erst nicht mehr, wenn ihr __handle beendet ist, bis dahin ist eine mehr erlaubt
+        writer.transport.abort()
+        return True
+
+    async def __read_request(self, reader: asyncio.StreamReader, framed: bool, pending: bytes):
+        # Liest eine Anfrage als Zeile oder mit vorangestellter Länge, pending sind bereits gelesene Byte
+        if framed:
+            header = pending + await reader.readexactly(self.FRAME_HEADER_SIZE - len(pending))
+            length = int.from_bytes(header, "big")
+            if length > self.__pi_conf.app_frame_max_size:
+                raise ValueError("Die Anfrage ist zu lang")
+            return await reader.readexactly(length)
+        if pending.endswith(b"\n"):
+            return pending
+        return pending + await reader.readline()
+
+    async def __communicate(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, executor):
+        encoding = self.__pi_conf.app_encoding
+        session = AppSession()
+        framed = None
+        pending = b""
+        while True:
+            self.__idle[writer] = time.monotonic()
+            try:
+                if framed is None:
+                    # Das erste Byte entscheidet über das Protokoll der gesamten Verbindung
+                    pending = await asyncio.wait_for(reader.readexactly(1), self.__pi_conf.app_idle_timeout)
+                    framed = pending == self.FRAME_MARKER
+                data = await asyncio.wait_for(self.__read_request(reader, framed, pending),
+                                              self.__pi_conf.app_idle_timeout)
+                pending = b""
+            except asyncio.TimeoutError:
+                self.__metrics.count("connections_timed_out")
+                return
+            except asyncio.IncompleteReadError:
+                # Klient schließt Verbindung
+                return
+            except ValueError:
+                # Die Anfrage ist länger als die erlaubte Puffergröße
+                self.__metrics.count("requests_too_long")
+                return
+            except (ssl.SSLError, OSError):
+                # Klient nicht mehr erreichbar
+                return
+            finally:
+                self.__idle.pop(writer, None)
+            if not data and not framed:
+                # Klient schließt Verbindung
+                return
+            start = time.monotonic()
+            request = data.decode(encoding, errors="replace")
+            if not framed:
+                request = request.rstrip("\r\n")
+            if request == "" or request == self.__pi_conf.command_ping:
+                # Prüfung der Verbindung, die bisherige App sendet dafür eine leere Zeile
+                self.__metrics.count("heartbeats")
+                response = self.__pi_conf.app_response_pong if request else ""
+            else:
+                try:
+                    response = await self.__loop.run_in_executor(executor, self.__request_handler, request,
+                                                                 session)
+                except Exception as error:
+                    LogError.get_instance().send_log_msg("Fehler bei der Bearbeitung einer Anfrage der App: "
+                                                         + repr(error))
+                    response = ""
+            self.__metrics.observe("request", time.monotonic() - start)
+            payload = response.encode(encoding)
+            if framed:
+                payload = len(payload).to_bytes(self.FRAME_HEADER_SIZE, "big") + payload
+            else:
+                payload += b"\n"
+            try:
+                writer.write(payload)
+                await writer.drain()
+            except (ssl.SSLError, OSError):
+                return
@@ -1,9 +1,12 @@
 import threading
+import time
 import requests
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import urllib.error
-from RaspberryPi.src.data_model.mqtt_protocol import MQTTPublisher
-from RaspberryPi.src.data_model.configuration import MQTTProtocolConfiguration
+from RaspberryPi.src.data_model.mqtt_protocol import MQTTSession
+from RaspberryPi.src.data_model.configuration import MQTTProtocolConfiguration, PiConfiguration
 from RaspberryPi.src.door_controller.entities.log import LogInfo
 
 from RaspberryPi.src.door_controller.entities.bot import Bot
@@ -15,6 +18,8 @@ from RaspberryPi.src.door_controller.entities.doorbell import Doorbell
 """
 Die Klassen in diesem Paket dienen der Weiterleitung des Signals, sobald ein Nutzer den Klingeltaster betätigt.
 Das Signal wird an verbundene Soft- und Hardware weitergeleitet.
+Die Observer werden in einem dauerhaft laufenden Pool mit fester Anzahl an Threads benachrichtigt, sodass das
+Betätigen des Klingeltasters nicht auf langsame Observer wie den Bot oder die Kamera warten muss.
 
 Classes:
     BellEventObserver: Die abstrakte Observer-Oberklasse des Observer-Design-Patterns.
@@ -32,9 +37,25 @@ Classes:
 
 @author Ahmad Eynawi
 @version 16.02.2022
+
+@author Lukas Wittenzellner
+@version 1.5
 """
 
 
+class _ObserverJob:
+    """
+    Hält die Benachrichtigung eines Observers im Pool und die Zeitpunkte, zu denen sie übergeben und begonnen wurde.
+    """
+
+    def __init__(self, observer):
+        self.observer = observer
+        self.submit_time = time.monotonic()
+        self.started = threading.Event()
+        self.start_time = None
+        self.future = None
+
+
 class BellEventObserver(ABC):
     """
     Diese abstrakte Klasse bildet mit der abstrakten Klasse BellEventSubject das Observer-Design-Pattern.
@@ -69,19 +90,28 @@ class BellEventSubject(ABC):
     Methods:
         addObserver: Fügt einen Observer dem Datenspeicher der registrierten Observer hinzu.
         deleteObserver: Löscht einen Observer aus dem Datenspeicher der registrierten Observer.
-        notifyObserver: Benachrichtigt alle registrierten Observer über eine Zustandsänderung des Subjektes.
+        notifyObservers: Übergibt die Benachrichtigung aller Observer dem Pool und kehrt sofort zurück.
+        shutdown: Beendet den Pool, in dem die Observer benachrichtigt werden.
         setState (abstract): Mit dieser Methode kann eine Zustandsänderung des Subjektes signalisiert werden.
 
     """
 
-    def __init__(self):
+    def __init__(self, pi_conf: PiConfiguration = None):
         """
         Konstruktor der Klasse :class`~BellPushHandler.BellEventSubjekt`.
 
         Erstellt und initialisiert einen Datenspeicher für die verbundenen Observer für dieses Subjekt.
         Dieser Datenspeicher speichert die mit dem Subjekt verbundenen Observer.
+
+        @param pi_conf: Die Konfiguration mit der Anzahl der Threads und der Zeit, nach der ein Observer als
+                        fehlgeschlagen gilt. Ohne Angabe wird die Standardkonfiguration verwendet.
+        @type pi_conf: :class:`~configuration.PiConfiguration`
         """
         self.registered_observers = []
+        self.__pi_conf = pi_conf if pi_conf is not None else PiConfiguration()
+        # Der Pool wird erst bei der ersten Benachrichtigung erzeugt und bleibt danach bestehen
+        self.__executor = None
+        self.__executor_lock = threading.Lock()
 
     def addObserver(self, observer: BellEventObserver):
         """
@@ -113,39 +143,105 @@ class BellEventSubject(ABC):
         else:
             return 0
 
-    def notifyObservers(self) -> int:
-        """
-        Benachrichtigt alle bei dem Subjekt registrierten Observer über eine Zustandsänderung des Subjektes.
+    def __get_executor(self) -> ThreadPoolExecutor:
+        with self.__executor_lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(max_workers=self.__pi_conf.bell_observer_workers,
+                                                     thread_name_prefix="BellObserver")
+            return self.__executor
 
-        @return: 1 Wenn alle registrierten Observer benachrichtigt werden konnten.
-                -1 Wenn nicht alle registrierten Observer benachrichtigt werden konnten.
-        @rtype: int
-        """
-        __threads = []
-        __ret = 1
-
-        class Thread(threading.Thread):
-            def __init__(self, observer, ret: int):
-                threading.Thread.__init__(self)
-                self.daemon = True
-                self.observer = observer
-                self.ret = ret
-
-            def run(self):
-                resp = self.observer.update()
-                if resp < 0:
-                    self.ret = -1
+    @staticmethod
+    def __update(observer: BellEventObserver) -> int:
+        # Observer ohne Rückgabewert (z.B. die Türklingel) gelten als erfolgreich
+        try:
+            resp = observer.update()
+        except Exception as e:
+            LogError.get_instance().send_log_msg("Der Observer " + type(observer).__name__
+                                                 + " ist fehlgeschlagen: " + e.__repr__())
+            return -1
+        return -1 if resp is not None and resp < 0 else 1
 
-        for ele in self.registered_observers:
-            thread = Thread(ele, __ret)
-            __threads.append(thread)
-            thread.start()
+    def __run(self, job: "_ObserverJob") -> int:
+        # Die Zeit eines Observers beginnt erst, wenn ein Thread des Pools mit ihm beginnt
+        job.start_time = time.monotonic()
+        job.started.set()
+        return self.__update(job.observer)
 
-        for a in list(range(len(self.registered_observers))):
-            thread = __threads[a]
-            thread.join()
+    def notifyObservers(self) -> Future:
+        """
+        Benachrichtigt alle bei dem Subjekt registrierten Observer über eine Zustandsänderung des Subjektes.
+        Die Benachrichtigungen werden dem Pool übergeben, die Methode kehrt sofort zurück.
+        Jeder Observer hat ab seinem Start die Zeit aus der Konfiguration. Ein Observer, der bis dahin nicht fertig
+        ist oder der in dieser Zeit nicht gestartet wurde, gilt als fehlgeschlagen, wird geloggt und nicht weiter
+        abgewartet. Hängt ein Observer, wird der Pool für weitere Benachrichtigungen ersetzt, damit hängende
+        Observer die Threads nicht dauerhaft belegen.
+
+        @return: Ein Future, das 1 liefert, wenn alle Observer benachrichtigt werden konnten, anderenfalls -1.
+        @rtype: :class:`~concurrent.futures.Future`
+        """
+        result = Future()
+        observers = list(self.registered_observers)
+        if len(observers) == 0:
+            result.set_result(1)
+            return result
+        executor = self.__get_executor()
+        jobs = list()
+        for observer in observers:
+            job = _ObserverJob(observer)
+            job.future = executor.submit(self.__run, job)
+            jobs.append(job)
+        supervisor = threading.Thread(target=self.__supervise, args=(executor, jobs, result),
+                                      name="BellObserverSupervisor", daemon=True)
+        supervisor.start()
+        return result
+
+    def __supervise(self, executor: ThreadPoolExecutor, jobs: list, result: Future):
+        timeout = self.__pi_conf.bell_observer_timeout
+        ret = 1
+        hung = False
+        for job in jobs:
+            if not job.started.wait(max(0.0, job.submit_time + timeout - time.monotonic())) and job.future.cancel():
+                self.__log_abandoned(job, "wurde nicht gestartet")
+                ret = -1
+                continue
+            # Konnte der Future nicht abgebrochen werden, hat der Pool bereits mit dem Observer begonnen
+            job.started.wait()
+            try:
+                if job.future.result(max(0.0, job.start_time + timeout - time.monotonic())) < 0:
+                    ret = -1
+            except FutureTimeoutError:
+                self.__log_abandoned(job, "ist nicht fertig")
+                ret = -1
+                hung = True
+        if hung:
+            self.__retire_executor(executor)
+        result.set_result(ret)
+
+    def __log_abandoned(self, job: "_ObserverJob", reason: str):
+        LogError.get_instance().send_log_msg("Der Observer " + type(job.observer).__name__ + " " + reason
+                                             + " nach " + str(self.__pi_conf.bell_observer_timeout)
+                                             + " Sekunden und wird nicht weiter abgewartet.")
+
+    def __retire_executor(self, executor: ThreadPoolExecutor):
+        # Die hängenden Threads laufen im alten Pool weiter, neue Benachrichtigungen erhalten einen neuen Pool
+        with self.__executor_lock:
+            if self.__executor is executor:
+                self.__executor = None
+        executor.shutdown(wait=False)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Beendet den Pool, in dem die Observer benachrichtigt werden. Eine weitere Benachrichtigung erzeugt einen
+        neuen Pool.
 
-        return __ret
+        @param wait: Ob auf laufende Benachrichtigungen gewartet werden soll.
+        @type wait: bool
+        """
+        with self.__executor_lock:
+            executor = self.__executor
+            self.__executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
 
     @abstractmethod
     def setState(self):
@@ -166,18 +262,24 @@ class BellPushEventHandler(BellEventSubject):
         setState: Mit dieser Methode kann eine Zustandsänderung des Subjektes signalisiert werden,
             was für eine Benachrichtigung aller bei diesem Subjekt registrierten Observer sorgt.
     """
-    def setState(self) -> int:
+    def setState(self) -> Future:
         """
         Mit dieser Methode kann eine Zustandsänderung des Subjektes signalisiert werden,
         was für eine Benachrichtigung aller bei diesem Subjekt registrierten Observer sorgt.
-        @return: 1 Wenn alle bei dem Subjekt registrierten Observer benachrichtigt werden konnten.
-                -1 Wenn nicht alle registrierten Observer benachrichtigt werden konnten.
-        @rtype: int
+        Die Methode kehrt sofort zurück, das Ergebnis wird nach Abschluss aller Observer protokolliert.
+        @return: Ein Future, das 1 liefert, wenn alle bei dem Subjekt registrierten Observer benachrichtigt werden
+                 konnten, und -1, wenn nicht alle registrierten Observer benachrichtigt werden konnten.
+        @rtype: :class:`~concurrent.futures.Future`
         """
-        if self.notifyObservers() != 1:
-            return -1
-        else:
-            return 1
+        result = self.notifyObservers()
+        result.add_done_callback(self.__log_result)
+        return result
+
+    @staticmethod
+    def __log_result(result: Future):
+        if result.result() != 1:
+            LogError.get_instance().send_log_msg("Nicht alle Observer des Klingeltasters konnten benachrichtigt "
+                                                 "werden.")
 
 
 class BotNotifier(BellEventObserver):
@@ -232,27 +334,59 @@ class DoorbellNotifier(BellEventObserver):
     Diese Klasse ist dafür zuständig, die akustische Türklingel bei Betätigung
     des Klingeltasters zu benachrichtigen, damit die Klingel ein akustisches
     Signal abgibt.
+    Die Verbindung zum MQTT-Broker wird einmalig beim Erzeugen aufgebaut und über
+    die gemeinsame :class:`~mqtt_protocol.MQTTSession` des Prozesses gehalten,
+    sodass beim Klingeln kein neuer Verbindungsaufbau nötig ist.
 
     Methods:
         update: Benachrichtigt die akustische Klingel, sobald der Klingeltaster
                 betätigt wird.
+        __init__: Konstruktor der Klasse :class:`~bell_push_handler.DoorbellNotifier`
     """
-    def update(self):
+    def __init__(self, mqttConfig: MQTTProtocolConfiguration = None):
         """
-        Sendet bei Betätigung des Klingeltasters ein Signal über das MQTT-Protokoll
-        an die akustische Klingel, damit die Klingel ein akustisches Signal abgibt.
+        Konstruktor der Klasse :class:`~bell_push_handler.DoorbellNotifier`.
+
+        Baut im Hintergrund die dauerhafte Verbindung zum MQTT-Broker auf.
+
+        @param mqttConfig: Die Konfigurationsdaten des MQTT-Protokolls, standardmäßig mit dem Topic
+                           und der Nachricht der Klasse :class:`~doorbell.Doorbell`.
+        @type mqttConfig: :class:`~configuration.MQTTProtocolConfiguration`
         """
+        if mqttConfig is None:
+            mqttConfig = MQTTProtocolConfiguration(Doorbell.TOPIC, Doorbell.PAYLOAD)
+        self.__mqttConfig = mqttConfig
 
         def on_connect(client, userdata, flags, resultCode):
             LogInfo.get_instance().send_log_msg(f"Der Benachrichtiger der Türklingel hat sich mit dem MQTT-Broker mit "
                                                 f"Ergebniscode {resultCode} verbunden.")
 
-        mqttConfig = MQTTProtocolConfiguration(Doorbell.TOPIC, Doorbell.PAYLOAD)
-        doorbellMQTTPublisher = MQTTPublisher(mqttConfig, on_connect)
-        doorbellMQTTPublisher.publish(mqttConfig.topic, mqttConfig.payload)
+        self.__publisher = MQTTSession.get_instance(mqttConfig, on_connect)
+
+    def update(self) -> int:
+        """
+        Sendet bei Betätigung des Klingeltasters ein Signal über das MQTT-Protokoll
+        an die akustische Klingel, damit die Klingel ein akustisches Signal abgibt.
+        Die Nachricht wird mit der Dienstgüte 1 gesendet und auf die Bestätigung des Brokers gewartet.
+
+        @return: 1 Wenn der Broker die Nachricht bestätigt hat.
+                 -1 Wenn die Nachricht nicht angenommen oder in der Wartezeit nicht bestätigt wurde. Sie bleibt dann
+                 zwischengespeichert und wird nach dem Wiederverbinden gesendet.
+        @rtype: int
+        """
+        mqttConfig = self.__mqttConfig
+        mid = self.__publisher.publish(mqttConfig.topic, mqttConfig.payload)
+        latency = self.__publisher.waitForPublish(mid) if mid is not None else None
+        if latency is None:
+            LogError.get_instance().send_log_msg(f"Der Benachrichtiger der Türklingel konnte die Nachricht \""
+                                                 + mqttConfig.payload + "\" zum Thema \"" + mqttConfig.topic
+                                                 + "\" nicht zustellen.")
+            return -1
         LogInfo.get_instance().send_log_msg(f"Der Benachrichtiger der Türklingel hat die Nachricht \""
                                             + mqttConfig.payload + "\" zum Thema \"" +
-                                            mqttConfig.topic + "\" publiziert.")
+                                            mqttConfig.topic + "\" publiziert. Bestätigt nach "
+                                            + str(round(latency * 1000, 1)) + " ms.")
+        return 1
 
 
 class CameraNotifier(BellEventObserver):
@@ -296,3 +430,4 @@ class CameraNotifier(BellEventObserver):
                 return -1
         except requests.exceptions.ConnectionError as e:
             LogError.get_instance().send_log_msg("Die Kamera ist nicht verbunden! \n Fehlernachricht: " + e.__repr__())
+            return -1
@@ -8,6 +8,7 @@ Modules:
         Ein Beobachter kann über Neuigkeiten eines zu beobachtenden Subjekts informiert werden.
     Subject: Dieses Modul dient zur Umsetzung des Beobachter-Design-Patterns. Ein Subjekt ist eine Klasse,
         die von Beobachtern beobachtet werden kann.
+    TokenPipeline: Dieses Modul liest Tokens ununterbrochen ein und prüft sie in einem eigenen Thread.
     TokenUpdater: Dieses Modul ist Teil des Beobachter-Design-Patterns. Es implementiert einen konkreten Beobachter.
     TokenValidation: Dieses Modul ist für die Validierung von Tokens zuständig.
     UserListUpdatesNotifier: Ist Teil des Beobachter-Design-Patterns.
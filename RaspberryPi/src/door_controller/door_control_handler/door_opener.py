@@ -1,20 +1,23 @@
+import threading
 import time
 
 from RaspberryPi.src.door_controller.entities.log import LogInfo
-from gpiozero.pins.rpigpio import RPiGPIOFactory
 from gpiozero import LED
 from RaspberryPi.src.data_model.configuration import PiConfiguration
 """
 Dieses Modul kapselt die Klasse 'DoorOpener', die für die direkte Steuerung der Tür
 zuständig ist.
 
-Classes: 
-    DoorOpener: Repräsentiert ein Steuerungsmittel, mithilfe dessen Signale 
-                an das Türschloss der ferngesteuerten Tür zum Öffnen der Tür 
+Classes:
+    DoorOpener: Repräsentiert ein Steuerungsmittel, mithilfe dessen Signale
+                an das Türschloss der ferngesteuerten Tür zum Öffnen der Tür
                 gesendet werden können.
-                
+
 @author Ahmad Eynawi
 @version 19.02.2022
+
+@author Lukas Wittenzellner
+@version 1.1
 """
 
 
@@ -23,33 +26,143 @@ class DoorOpener:
      Repräsentiert ein Steuerungsmittel, mit dem Signale direkt an das Türschloss
      zum Öffnen der ferngesteuerten Tür gesendet werden können.
 
+     Der DoorOpener besitzt den Pin des Türschlosses für seine gesamte Lebensdauer. Anfragen zum Öffnen
+     kommen gleichzeitig vom NFC-Reader, dem Türöffnertaster, der Webseite und der App. Sie kehren sofort zurück,
+     das Schließen der Tür übernimmt ein Timer. Eine Anfrage, während die Tür geöffnet ist, verlängert die
+     Zeitspanne bis zum Schließen, anstatt das Schloss erneut anzusteuern.
+
      Methods:
          openDoor: Diese Methode sendet ein Signal zum Öffnen der Tür.
-         __init__: Der Default-Konstruktor der Klasse :class:`~door_opener.DoorOpener`.
+         isOpen: Gibt zurück, ob die Tür gerade geöffnet ist.
+         addListener: Registriert eine Funktion, die beim Öffnen und Schließen der Tür benachrichtigt wird.
+         waitUntilClosed: Wartet, bis die Tür wieder geschlossen ist.
+         close: Schließt die Tür und gibt den Pin frei.
+         __init__: Der Konstruktor der Klasse :class:`~door_opener.DoorOpener`.
      """
 
-    def __init__(self):
+    EVENT_OPENED = "opened"
+    EVENT_CLOSED = "closed"
+
+    def __init__(self, pin: int = None, openDuration: float = None, pin_factory=None):
         """
         Konstruktor der Klasse :class:`~door_opener.DoorOpener`.
 
-        Erstellt ein DoorOpener-Objekt (ohne Attribute), mit dem Signale an das Türschloss
+        Erstellt ein DoorOpener-Objekt, mit dem Signale an das Türschloss
         zum Öffnen der ferngesteuerten Tür gesendet werden können.
+
+        @param pin: Die Pinnummer des Türschlosses, standardmäßig die der grünen LED.
+        @type pin: int
+        @param openDuration: Die Zeitspanne in Sekunden, für die die Tür nach einer Anfrage geöffnet bleibt.
+        @type openDuration: float
+        @param pin_factory: Die Pin-Factory von gpiozero, z.B. MockFactory für Tests.
+        """
+        pi_conf = PiConfiguration()
+        self.__openDuration = openDuration if openDuration is not None else pi_conf.door_open_duration
+        self.__led = LED(pin=pin if pin is not None else pi_conf.pin_green, pin_factory=pin_factory)
+        self.__lock = threading.Lock()
+        self.__closed = threading.Event()
+        self.__closed.set()
+        self.__closeAt = None
+        self.__timer = None
+        self.__listeners = []
+        self.__released = False
+
+    def addListener(self, listener):
         """
-        pass
+        Registriert eine Funktion, die beim Öffnen und Schließen der Tür benachrichtigt wird.
+
+        @param listener: Die Funktion erhält das Ereignis ("opened" oder "closed") und den Zeitpunkt
+                         in Sekunden seit 1970.
+        @type listener: (event, timestamp) -> None
+        """
+        self.__listeners.append(listener)
 
     def openDoor(self) -> bool:
         """
         Diese Methode öffnet die ferngesteuerte Tür. Dies wird momentan durch das Einschalten einer (grünen)
-        LED simuliert.
+        LED simuliert. Die Methode kehrt sofort zurück. Ist die Tür bereits geöffnet, wird die Zeitspanne bis
+        zum Schließen verlängert.
 
         @return: `True`, falls die Tür geöffnet werden konnte.
                  `False`, falls die Tür nicht geöffnet werden konnte.
         @rtype: bool
         """
-        led = LED(pin=PiConfiguration().pin_green)
-        led.on()
-        LogInfo.get_instance().send_log_msg("Die Tür wurde geöffnet")
-        time.sleep(5)
-        led.off()
-        led.close()
+        with self.__lock:
+            if self.__released:
+                return False
+            self.__closeAt = time.monotonic() + self.__openDuration
+            if not self.__closed.is_set():
+                # Der laufende Timer liest die neue Zeitspanne beim Ablaufen
+                return True
+            self.__led.on()
+            self.__closed.clear()
+            self.__schedule(self.__openDuration)
+        self.__notify(DoorOpener.EVENT_OPENED, "Die Tür wurde geöffnet")
         return True
+
+    def __schedule(self, delay: float):
+        # Muss mit gehaltenem Lock aufgerufen werden
+        self.__timer = threading.Timer(delay, self.__expire)
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __expire(self):
+        with self.__lock:
+            if self.__timer is not threading.current_thread() or self.__closed.is_set():
+                return
+            remaining = self.__closeAt - time.monotonic()
+            if remaining > 0:
+                # Die Tür wurde während des Öffnens erneut angefragt
+                self.__schedule(remaining)
+                return
+            self.__shut()
+        self.__notify(DoorOpener.EVENT_CLOSED, "Die Tür wurde geschlossen")
+
+    def __shut(self):
+        # Muss mit gehaltenem Lock aufgerufen werden
+        self.__led.off()
+        self.__timer = None
+        self.__closed.set()
+
+    def __notify(self, event: str, message: str):
+        timestamp = time.time()
+        LogInfo.get_instance().send_log_msg(message + " (" + time.strftime("%Y-%m-%d %H:%M:%S",
+                                                                           time.localtime(timestamp)) + ")")
+        for listener in self.__listeners:
+            listener(event, timestamp)
+
+    def isOpen(self) -> bool:
+        """
+        Gibt zurück, ob die Tür gerade geöffnet ist.
+
+        @return: `True`, falls die Tür geöffnet ist, anderenfalls `False`.
+        @rtype: bool
+        """
+        return not self.__closed.is_set()
+
+    def waitUntilClosed(self, timeout: float = None) -> bool:
+        """
+        Wartet, bis die Tür wieder geschlossen ist.
+
+        @param timeout: Die maximale Wartezeit in Sekunden oder None für unbegrenztes Warten.
+        @type timeout: float
+        @return: `True`, falls die Tür geschlossen ist, `False` bei Ablauf der Wartezeit.
+        @rtype: bool
+        """
+        return self.__closed.wait(timeout)
+
+    def close(self):
+        """
+        Schließt die Tür sofort und gibt den Pin frei. Danach kann die Tür nicht mehr geöffnet werden.
+        """
+        with self.__lock:
+            if self.__released:
+                return
+            self.__released = True
+            wasOpen = not self.__closed.is_set()
+            if self.__timer is not None:
+                self.__timer.cancel()
+            self.__shut()
+            self.__led.close()
+        if wasOpen:
+            self.__notify(DoorOpener.EVENT_CLOSED, "Die Tür wurde geschlossen")
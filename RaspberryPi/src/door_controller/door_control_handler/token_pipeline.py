@@ -0,0 +1,148 @@
+import queue
+import threading
+import time
+
+from RaspberryPi.src.door_controller.entities.log import LogError
+
+"""
+Dieses Modul enthält die Pipeline, über die NFC-Tokens ununterbrochen eingelesen und geprüft werden.
+
+Ein einzelner, dauerhaft laufender Thread liest die Tokens und legt sie mit dem Zeitpunkt des Lesens in eine
+Warteschlange. Die Prüfung und das Öffnen der Tür laufen in einem eigenen Thread, sodass das Lesegerät sofort
+wieder für den nächsten Token bereit ist. Ein Token, der auf dem Lesegerät liegen bleibt, wird mehrfach gelesen.
+Solche Wiederholungen werden über eine kurzlebige Liste der zuletzt gelesenen Tokens verworfen.
+
+Classes:
+    TokenPipeline: Liest Tokens ununterbrochen ein und übergibt sie einem Handler in einem eigenen Thread.
+
+@author Lukas Wittenzellner
+@version 1.1
+"""
+
+
+class TokenPipeline:
+    """
+    Liest Tokens ununterbrochen ein und übergibt sie einem Handler in einem eigenen Thread.
+
+    Methods:
+        start: Startet die Threads zum Lesen und Prüfen der Tokens.
+        stop: Beendet das Prüfen der Tokens.
+        statistics: Gibt die Anzahl gelesener, verworfener und geprüfter Tokens zurück.
+        __init__: Konstruktor der Klasse :class:`~token_pipeline.TokenPipeline`
+    """
+    # Wartezeit nach einem fehlgeschlagenen Lesen, damit ein defektes Lesegerät das Log nicht flutet
+    READ_ERROR_DELAY = 1.0
+    # Zeitspanne, nach der die Prüfung ohne neuen Token prüft, ob sie beendet werden soll
+    STOP_CHECK_INTERVAL = 1.0
+    __STOP = object()
+
+    def __init__(self, reader, handle, duplicate_window: float, queue_size: int):
+        """
+        Konstruktor der Klasse :class:`~token_pipeline.TokenPipeline`.
+
+        @param reader: Das Lesegerät mit der blockierenden Methode readToken, die ein Hashobjekt zurückgibt.
+        @type reader: :class:`~nfc_reader.NFCReader`
+        @param handle: Die Funktion, die im Thread der Prüfung mit dem Hash des Tokens (hexadezimal) und dem
+                       Zeitpunkt des Lesens (time.monotonic) aufgerufen wird.
+        @type handle: (digest, timestamp) -> None
+        @param duplicate_window: Die Zeitspanne in Sekunden, in der ein erneut gelesener Token verworfen wird.
+        @type duplicate_window: float
+        @param queue_size: Die maximale Anzahl gelesener Tokens, die auf ihre Prüfung warten.
+        @type queue_size: int
+        """
+        self.__reader = reader
+        self.__handle = handle
+        self.__duplicate_window = duplicate_window
+        self.__queue = queue.Queue(maxsize=queue_size)
+        self.__recent = dict()
+        self.__stopped = threading.Event()
+        self.__lock = threading.Lock()
+        self.__read = 0
+        self.__duplicates = 0
+        self.__dropped = 0
+        self.__handled = 0
+        self.__reader_thread = threading.Thread(target=self.__read_loop, name="NFCReader", daemon=True)
+        self.__worker_thread = threading.Thread(target=self.__work_loop, name="TokenWorker", daemon=True)
+
+    def start(self):
+        """
+        Startet die Threads zum Lesen und Prüfen der Tokens.
+        """
+        self.__worker_thread.start()
+        self.__reader_thread.start()
+
+    def stop(self, timeout: float = None):
+        """
+        Beendet das Prüfen der Tokens, nachdem die bereits gelesenen Tokens geprüft wurden. Das Lesen endet, sobald
+        das blockierende Lesen des aktuellen Tokens zurückkehrt.
+
+        @param timeout: Die maximale Wartezeit in Sekunden auf das Ende der Prüfung.
+        @type timeout: float
+        """
+        self.__stopped.set()
+        try:
+            self.__queue.put_nowait(TokenPipeline.__STOP)
+        except queue.Full:
+            # Die Prüfung bemerkt das Ende über das gesetzte Event, sobald sie den nächsten Token abholt
+            pass
+        self.__worker_thread.join(timeout)
+
+    def __read_loop(self):
+        while not self.__stopped.is_set():
+            try:
+                digest = self.__reader.readToken().hexdigest()
+            except Exception as e:
+                LogError.get_instance().send_log_msg("Der Token konnte nicht gelesen werden: " + repr(e))
+                self.__stopped.wait(TokenPipeline.READ_ERROR_DELAY)
+                continue
+            timestamp = time.monotonic()
+            if self.__is_duplicate(digest, timestamp):
+                continue
+            try:
+                self.__queue.put_nowait((digest, timestamp))
+            except queue.Full:
+                with self.__lock:
+                    self.__dropped += 1
+
+    def __is_duplicate(self, digest: str, timestamp: float) -> bool:
+        with self.__lock:
+            self.__read += 1
+            # Abgelaufene Einträge werden entfernt, damit die Liste klein bleibt
+            for key in [key for key, seen in self.__recent.items() if timestamp - seen >= self.__duplicate_window]:
+                del self.__recent[key]
+            duplicate = digest in self.__recent
+            # Solange der Token auf dem Lesegerät liegt, wird die Zeitspanne verlängert
+            self.__recent[digest] = timestamp
+            if duplicate:
+                self.__duplicates += 1
+            return duplicate
+
+    def __work_loop(self):
+        while True:
+            try:
+                item = self.__queue.get(timeout=TokenPipeline.STOP_CHECK_INTERVAL)
+            except queue.Empty:
+                if self.__stopped.is_set():
+                    return
+                continue
+            if item is TokenPipeline.__STOP:
+                return
+            digest, timestamp = item
+            try:
+                self.__handle(digest, timestamp)
+            except Exception as e:
+                LogError.get_instance().send_log_msg("Der Token konnte nicht geprüft werden: " + repr(e))
+            with self.__lock:
+                self.__handled += 1
+
+    def statistics(self) -> dict:
+        """
+        Gibt die Anzahl gelesener, als Wiederholung verworfener, wegen voller Warteschlange verworfener
+        und geprüfter Tokens zurück.
+
+        @return: Die Zähler mit den Schlüsseln read, duplicates, dropped und handled.
+        @rtype: dict
+        """
+        with self.__lock:
+            return {"read": self.__read, "duplicates": self.__duplicates, "dropped": self.__dropped,
+                    "handled": self.__handled}
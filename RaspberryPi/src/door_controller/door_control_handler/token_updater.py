@@ -1,4 +1,7 @@
+import threading
+
 from RaspberryPi.src.data_model.door import DoorDataStorage
+from RaspberryPi.src.data_model.token_database import TokenDatabase
 from RaspberryPi.src.door_controller.door_control_handler.oberver import Observer
 from RaspberryPi.src.door_controller.server_adapter.server_adapter import ServerAdapter
 from RaspberryPi.src.data_model.configuration import PiConfiguration
@@ -11,7 +14,7 @@ Classes:
         Sie implementiert die abstrakte Klasse Observer und alle abstrakten Methoden dieser.
 
 @author Lukas Wittenzellner
-@version 1.0
+@version 1.2
 """
 
 
@@ -32,17 +35,45 @@ class TokenUpdater(Observer):
         """
         self.doorDataStorage = doorDataStorage
         self.serverAdapter = serverAdapter
+        # Aktualisierungen können gleichzeitig aus mehreren Threads angestoßen werden
+        self.__updateLock = threading.Lock()
+        # Stand der Datenquelle bei der letzten Aktualisierung
+        self.__version = None
 
     def update(self) -> None:
         """
-        Aktualisiert die Liste der Tokens der zugehörigen Tür
+        Aktualisiert die Liste der Tokens der zugehörigen Tür.
+        Vom Adapter werden nur die Änderungen seit der letzten Aktualisierung abgefragt und angewendet. Kann der
+        Adapter sie nicht liefern, werden alle Tokens der Tür ersetzt.
+        Verwendet die Tür eine Token-Datenbank, wird diese neu geschrieben und anschließend ausgetauscht.
         """
-        xor = set(self.doorDataStorage.doorTokens) ^ set(self.getValidTokens())
-        for x in xor:
-            if x in self.doorDataStorage.doorTokens:
-                self.doorDataStorage.deleteToken(x)
+        with self.__updateLock:
+            self.__update()
+
+    def __update(self):
+        admin = PiConfiguration().admin
+        changes = self.serverAdapter.get_token_changes_since(UnauthenticatedUser(admin.name, admin.identifier),
+                                                             admin.password, self.__version)
+        if changes.is_empty():
+            self.__version = changes.version
+            return
+        tokenDatabase = self.doorDataStorage.tokenDatabase
+        if tokenDatabase is not None:
+            # Die sortierte Datenbank kann nicht in-place geändert werden und wird daher neu geschrieben. Bei
+            # einzelnen Änderungen werden die vorhandenen Digests dabei nur blockweise kopiert.
+            if changes.full:
+                TokenDatabase.write(tokenDatabase.path, (str(token.identifier) for token in changes.added))
             else:
-                self.doorDataStorage.addToken(x)
+                tokenDatabase.merge((str(token.identifier) for token in changes.added),
+                                    (str(token.identifier) for token in changes.removed))
+            self.doorDataStorage.tokenDatabase = TokenDatabase(tokenDatabase.path)
+        elif changes.full:
+            # Die neue Menge wird vollständig aufgebaut und dann in einem Schritt veröffentlicht, damit eine
+            # gleichzeitige Validierung nie einen halb angewendeten Stand sieht
+            self.doorDataStorage.replaceTokens(changes.added)
+        else:
+            self.doorDataStorage.applyChanges(changes.added, changes.removed)
+        self.__version = changes.version
 
     def getValidTokens(self) -> list:
         """
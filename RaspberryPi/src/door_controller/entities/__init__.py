@@ -17,6 +17,15 @@ Modules:
             Türsteuerung.
     log: Die Klassen in diesem Modul repräsentieren Logs verschiedener Arten, in die
          z.B. Fehler- oder Benachrichtigungsnachrichten geschrieben werden können.
+    log_shipper: Dieses Modul enthält den Versand der Log-Nachrichten, der sie gebündelt in einem
+                 eigenen Thread an Slack sendet, ohne den Aufrufer warten zu lassen.
+    log_store: Dieses Modul enthält die lokale Ablage aller Log-Nachrichten in einem Ringpuffer mit
+               Indizes nach Logstufe und Zeit sowie rotierenden Segmentdateien.
+    timestamp_store: Dieses Modul enthält die begrenzte, gespeicherte Liste der Timestamps gesendeter
+                     Log-Nachrichten und das gleichzeitige, fortsetzbare Löschen dieser Nachrichten.
+    message_deletion_scheduler: Dieses Modul enthält einen Zeitplaner, der alle zukünftigen
+                                Löschungen von Bot-Nachrichten übernimmt und sie in einem Journal
+                                über einen Neustart hinweg speichert.
     doorbell: Dieses Modul kapselt Komponenten, die eine akustische Türklingel modellieren und
               auf die Betätigung des mit der Klingel übers WLAN verbundenen Klingeltasters
               mit einem akustischen Signal und entsprechenden Meldungen reagieren.
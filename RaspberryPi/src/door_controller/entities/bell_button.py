@@ -0,0 +1,67 @@
+"""
+Dieses Modul enthält den Klingeltaster der Türsteuerung.
+Der Taster wird nicht abgefragt, sondern meldet jede steigende Flanke über einen Rückruf von gpiozero. Die Flanken
+werden schon bei der Erkennung entprellt. Nach einem Klingelereignis werden weitere Betätigungen für die Dauer der
+Sperrzeit verworfen. Die Sperrzeit ist ein Zustand des Tasters und kein Warten, sodass andere Ereignisse in dieser
+Zeit weiter bearbeitet werden.
+Classes:
+    BellButton: Meldet die Betätigungen des Klingeltasters als Ereignis an eine Ereignisschleife.
+@author Lukas Wittenzellner
+@version 1.0
+"""
+import threading
+import time
+
+from gpiozero import Button
+
+
+class BellButton:
+    """
+    Meldet die Betätigungen des Klingeltasters als Ereignis an eine Ereignisschleife.
+    Methods:
+        suppressed: Gibt die Anzahl der während der Sperrzeit verworfenen Betätigungen zurück.
+        close: Gibt den Pin des Tasters frei.
+    """
+    EVENT = "bell"
+
+    def __init__(self, pin: int, post, cooldown: float, bounce_time: float = None, pin_factory=None):
+        """
+        Richtet den Klingeltaster ein.
+        @param pin: Die Pinnummer des Tasters.
+        @param post: Die Funktion, mit der das Ereignis gemeldet wird, z.B. EventLoop.post.
+                     Sie erhält den Namen des Ereignisses und den Zeitpunkt der Betätigung (time.monotonic).
+        @param cooldown: Die Sperrzeit in Sekunden nach einem Klingelereignis.
+        @param bounce_time: Die Entprellzeit in Sekunden oder None.
+        @param pin_factory: Die Pin-Factory von gpiozero, z.B. MockFactory für Tests.
+        """
+        self.__post = post
+        self.__cooldown = cooldown
+        self.__lock = threading.Lock()
+        self.__blocked_until = None
+        self.__suppressed = 0
+        self.__button = Button(pin, pull_up=False, bounce_time=bounce_time, pin_factory=pin_factory)
+        self.__button.when_pressed = self.__pressed
+
+    def __pressed(self):
+        # Wird im Thread von gpiozero aufgerufen und meldet das Ereignis nur weiter
+        now = time.monotonic()
+        with self.__lock:
+            if self.__blocked_until is not None and now < self.__blocked_until:
+                self.__suppressed += 1
+                return
+            self.__blocked_until = now + self.__cooldown
+        self.__post(BellButton.EVENT, now)
+
+    def suppressed(self) -> int:
+        """
+        Gibt die Anzahl der während der Sperrzeit verworfenen Betätigungen zurück.
+        @return: Die Anzahl der verworfenen Betätigungen.
+        """
+        with self.__lock:
+            return self.__suppressed
+
+    def close(self):
+        """
+        Gibt den Pin des Tasters frei.
+        """
+        self.__button.close()
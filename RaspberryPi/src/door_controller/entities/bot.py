@@ -1,10 +1,11 @@
+import hashlib
 import urllib.error
 from abc import ABC, abstractmethod
 from slack import WebClient
-import time
 from slack.errors import SlackApiError
 from RaspberryPi.src.data_model.configuration import BotConfiguration
 from RaspberryPi.src.data_model.key_token import BotIDToken, BotChannelToken
+from RaspberryPi.src.door_controller.entities.message_deletion_scheduler import MessageDeletionScheduler
 
 """
 Die Klasse in diesem Modul repräsentiert ein Bot-Objekt für eine ferngesteuerte Tür.
@@ -15,6 +16,9 @@ Classes:
 
 @author Fabian Schiekel
 @version 05.03.2022
+
+@author Lukas Wittenzellner
+@version 1.2
 """
 
 
@@ -64,8 +68,8 @@ class SlackBot(Bot):
     Repräsentiert ein Bot-Objekt für die gesteuerte Beobachtung einer ferngesteuerten Tür.
 
     Methods:
-        send_and_delete_message: Der Bot sendet die übergebene Nachricht und löscht diese nach einer definierten
-            Zeitspanne.
+        send_and_delete_message: Der Bot sendet die übergebene Nachricht und plant ihre Löschung nach einer
+            definierten Zeitspanne beim MessageDeletionScheduler.
         send_message: Sendet die angegebene Nachricht an den Channel, von dem der Bot die ID hat.
         delete_message: Löscht die Nachricht mit dem angegebenen Timestamp aus dem Channel, von dem der Bot die ID hat.
     """
@@ -91,25 +95,32 @@ class SlackBot(Bot):
         self.__client = WebClient(token=self.__slack_token.identifier.__repr__())
         self.__timestamp = '0'
         self.__client.auth_test()
+        # Im Journal der Löschungen steht nur dieser Schlüssel, nie der Token selbst
+        self.__owner = hashlib.sha256((self.__slack_token.identifier.__repr__() + ";"
+                                       + self.__channel_id.identifier.__repr__()).encode()).hexdigest()[:16]
+        MessageDeletionScheduler.get_instance().register_deleter(self.__owner,
+                                                                 lambda channel, ts: self.delete_message(ts))
 
     def send_and_delete_message(self, message: str) -> int:
         """
-        Der Bot sendet die übergebene Nachricht und löscht diese anschließend wieder.
+        Der Bot sendet die übergebene Nachricht und plant ihre Löschung nach der Zeitspanne bot_msg_visible.
+        Die Methode kehrt direkt nach dem Senden zurück, gelöscht wird die Nachricht vom MessageDeletionScheduler,
+        auch wenn das Programm zwischenzeitlich neu gestartet wird.
 
         @param message: Die Nachricht, welche der Bot senden soll.
         @type message: str
 
-        @return: 1 Wenn die Nachricht gesendet und wieder gelöscht werden konnte.
-                -1 Wenn die Nachricht nicht gesendet und/oder gelöscht werden konnte.
+        @return: 1 Wenn die Nachricht gesendet und ihre Löschung geplant werden konnte.
+                -1 Wenn die Nachricht nicht gesendet werden konnte.
         @raise: urllib.error: Wenn keine Verbindung zu dem Bot besteht.
         """
         if message == "":
             return 1
-        resp = float(self.send_message(message))
-        if resp > 0:
-            time.sleep(BotConfiguration().bot_msg_visible)
-            if self.delete_message(self.__timestamp):
-                return 1
+        ts = self.send_message(message)
+        if float(ts) > 0:
+            MessageDeletionScheduler.get_instance().schedule(self.__owner, self.__channel_id.identifier.__repr__(),
+                                                             ts, BotConfiguration().bot_msg_visible)
+            return 1
         return -1
 
     def send_message(self, message: str) -> str:
@@ -140,6 +151,8 @@ class SlackBot(Bot):
 
         @return: False Wenn die Nachricht nicht gelöscht werden konnte.
                  True  Wenn die Nachricht gelöscht werden konnte.
+        @raise: SlackApiError: Wenn Slack die Anfrage wegen zu vieler Anfragen ablehnt (Status 429). Die Wartezeit
+                steht im Header Retry-After der response.
         """
 
         if float(ts) > 0:
@@ -147,7 +160,10 @@ class SlackBot(Bot):
                 resp = self.__client.chat_delete(token=self.__slack_token,
                                                  channel=self.__channel_id.identifier.__repr__(), ts=ts)
                 return resp.data.get('ok')
-            except SlackApiError:
+            except SlackApiError as e:
+                if getattr(e.response, "status_code", None) == 429:
+                    # Der Aufrufer entscheidet, wann die Löschung wiederholt wird
+                    raise
                 return False
             except urllib.error.URLError:
                 return False
@@ -1,7 +1,7 @@
 from typing_extensions import Final
 
 from RaspberryPi.src.data_model.configuration import MQTTProtocolConfiguration
-from RaspberryPi.src.data_model.mqtt_protocol import MQTTSubscriber
+from RaspberryPi.src.data_model.mqtt_protocol import MQTTSession
 
 """
 Dieses Modul kapselt die Klasse "DoorOpenButtonObserver".
@@ -17,6 +17,9 @@ Classes:
                             
 @author Ahmad Eynawi
 @version 19.02.2022
+
+@author Lukas Wittenzellner
+@version 1.1
 """
 
 
@@ -25,21 +28,25 @@ class DoorOpenButtonObserver:
       Repräsentiert einen Benachrichtiger, der den Status des Türöffnertasters ständig beobachtet
       und bei Betätigung dieses Tasters ein Signal zum Öffnen der ferngesteuerten Tür sendet.
 
+      Der Benachrichtiger baut keine eigene Verbindung zum MQTT-Broker auf, sondern abonniert das Topic
+      des Türöffnertasters über die gemeinsame :class:`~mqtt_protocol.MQTTSession` des Prozesses.
+      Die Nachrichten des Tasters werden dort als JSON dekodiert und außerhalb der Netzwerkschleife verarbeitet.
+
       Attributes:
       mqttConfig (:class:`~configuration.MQTTProtocolConfiguration`):
-                  Die Konfigurationsdaten des MQTT-Protokolls für den in diesem
-                  DoorOpenButtonObserver-Objekt gespeicherten MQTT-Subscriber.
-      on_connect ((client, userdata, flags, resultCode) -> None):
-                  Diese Methode definiert die Aktionen, die der obengenannte Subscriber ausführt,
-                  wenn er eine CONNACK-Antwort (Verbindungsaufbau-Bestätigung) vom MQTT-Broker erhält.
-      on_message ((client, userdata, message) -> None):
-                  Diese Methode definiert die Aktionen, die der der obengenannte Subscriber ausführt,
-                  wenn er eine Nachricht zu einem der von ihm abonnierten Topics erhält.
+                  Die Konfigurationsdaten des MQTT-Protokolls mit dem Topic des Türöffnertasters
+                  und dem Ereignis, bei dem die Tür geöffnet wird.
+      on_push ((topic, inputDictionary) -> None):
+                  Diese Methode definiert die Aktionen, die ausgeführt werden, wenn der Türöffnertaster
+                  kurz betätigt wurde.
+      session (:class:`~mqtt_protocol.MQTTSession`):
+                  Die MQTT-Sitzung, über die das Topic des Türöffnertasters abonniert wird.
 
       Methods:
-          run: Startet den mit diesem Benachrichtiger verbundenen MQTT-Subscriber und reagiert
-               auf vordefinierte Nachrichten vom MQTT-Publisher, der mit dem Türöffnertaster
-               verbunden ist, mit dem Senden eines Signals für das Öffnen der ferngesteuerten Tür.
+          run: Abonniert das Topic des Türöffnertasters und reagiert ab dann auf vordefinierte Nachrichten
+               vom MQTT-Publisher, der mit dem Türöffnertaster verbunden ist, mit dem Senden eines Signals
+               für das Öffnen der ferngesteuerten Tür. Die Methode kehrt sofort zurück.
+          stop: Bestellt das Topic des Türöffnertasters wieder ab.
           __init__: Konstruktor der Klasse :class:`~Button.DoorOpenButtonObserver`
       """
 
@@ -47,29 +54,40 @@ class DoorOpenButtonObserver:
     DOOR_OPEN_BUTTON_INPUT_EVENT_IDENTIFIER: Final[str] = "event"
     DOOR_OPEN_BUTTON_SHORT_PUSH_EVENT: Final[str] = "S"
 
-    def __init__(self, mqttConfig: MQTTProtocolConfiguration, on_connect, on_message):
+    def __init__(self, mqttConfig: MQTTProtocolConfiguration, on_push, session: MQTTSession = None):
         """
         Konstruktor der Klasse :class:`~Button.DoorOpenButtonObserver`.
 
         Erstellt und initialisiert einen Benachrichtiger, der bei Betätigung des
         Türöffnertasters ein Signal an das Türschloss für das Öffnen der Tür sendet.
 
-        @param mqttConfig: Die Konfigurationsdaten des MQTT-Protokolls für den in diesem
-                           DoorOpenButtonObserver-Objekt gespeicherten MQTT-Subscriber.
+        @param mqttConfig: Die Konfigurationsdaten des MQTT-Protokolls mit dem Topic des Türöffnertasters
+                           und dem Ereignis, bei dem die Tür geöffnet wird.
         @type mqttConfig: :class:`~configuration.MQTTProtocolConfiguration`
-        @param on_connect: Diese Methode definiert die Aktionen, die der obengenannte Subscriber ausführt,
-                           wenn er eine CONNACK-Antwort (Verbindungsaufbau-Bestätigung) vom MQTT-Broker erhält.
-        @type on_connect: on_connect(client, userdata, flags, resultCode) -> None
-        @param on_message: Diese Methode definiert die Aktionen, die der der obengenannte Subscriber ausführt,
-                           wenn er eine Nachricht zu einem der von ihm abonnierten Topics erhält.
-        @type on_message: (client, userdata, message) -> None
+        @param on_push: Diese Methode definiert die Aktionen, die ausgeführt werden, wenn der Türöffnertaster
+                        kurz betätigt wurde. Sie erhält das Topic und die dekodierte Nachricht des Tasters.
+        @type on_push: (topic, inputDictionary) -> None
+        @param session: Die MQTT-Sitzung, standardmäßig die gemeinsame Sitzung für den Broker der Konfiguration.
+        @type session: :class:`~mqtt_protocol.MQTTSession`
         """
-        self.__doorOpenButtonMQTTSubscriber = MQTTSubscriber(mqttConfig, on_connect, on_message)
+        self.__mqttConfig = mqttConfig
+        self.__on_push = on_push
+        self.__session = session if session is not None else MQTTSession.get_instance(mqttConfig)
+
+    def __on_message(self, topic, inputDictionary):
+        if inputDictionary.get(DoorOpenButtonObserver.DOOR_OPEN_BUTTON_INPUT_EVENT_IDENTIFIER) == \
+                self.__mqttConfig.payload:
+            self.__on_push(topic, inputDictionary)
 
     def run(self):
         """
-        Startet den mit diesem Benachrichtiger verbundenen MQTT-Subscriber mit einer Endlosschleife,
-        in der auf das Eintreffen von Nachrichten zum vordefinierten Topic für das Öffnen der Tür
-        gewartet bzw. reagiert wird.
+        Abonniert das vordefinierte Topic für das Öffnen der Tür über die MQTT-Sitzung. Ab dann wird bei jeder
+        passenden Nachricht die Methode on_push aufgerufen. Die Methode kehrt sofort zurück.
+        """
+        self.__session.subscribe(self.__mqttConfig.topic, self.__on_message, MQTTSession.PAYLOAD_JSON)
+
+    def stop(self):
+        """
+        Bestellt das Topic des Türöffnertasters wieder ab.
         """
-        self.__doorOpenButtonMQTTSubscriber.run()
+        self.__session.unsubscribe(self.__mqttConfig.topic, self.__on_message, MQTTSession.PAYLOAD_JSON)
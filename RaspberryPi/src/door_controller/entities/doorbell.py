@@ -1,4 +1,5 @@
 import os
+import threading
 import pygame
 from typing_extensions import Final
 from RaspberryPi.src.exceptions.exception import FileFormatException, SemanticsException
@@ -25,6 +26,9 @@ Methods:
 
 @author Ahmad Eynawi
 @version 16.02.2022
+
+@author Lukas Wittenzellner
+@version 1.1
 """
 
 
@@ -36,11 +40,20 @@ class Doorbell:
     Klingeltasters abzugeben und auf diese Weise die Nutzer des Türsteuerungssystems
     zu benachrichtigen.
 
+    Der Mixer wird einmalig pro Prozess mit einem kleinen Puffer initialisiert und der Klingelton
+    bereits beim Erzeugen der Klingel dekodiert und im Speicher gehalten. Beim Klingeln wird er daher
+    ohne Lade- und Dekodierzeit sofort abgespielt. Das Ende des Klingeltons wird über einen Timer
+    signalisiert, sodass kein Prozessorkern durch aktives Warten belegt wird. Wird während des
+    Abspielens erneut geklingelt, entscheidet die Überlappungsstrategie: den Klingelton neu starten,
+    ihn nach dem aktuellen erneut abspielen oder das Klingeln ignorieren.
+
     Attributes:
         ringtonePath (str): Der Pfad zur Audiodatei, welche die Türklingel beim Aufruf
                          der sound-Methode abspielen soll.
         speakerVolume (float): Die Lautstärke, mit der die Türklingel den Klingelton
                              abspielen soll.
+        overlapPolicy (str): Die Strategie, wenn während des Abspielens erneut geklingelt wird:
+                             "restart", "queue" oder "ignore".
 
     Methods:
         ringtonePath (Getter): Get-Methode für den Pfad zur Tondatei, die von dieser Türklingel
@@ -51,7 +64,10 @@ class Doorbell:
                                 Klingelton abspielt.
         speakerVolume (Setter): Set-Methode für die Lautstärke, mit der die Türklingel den
                                 Klingelton abspielt.
-        sound: Spielt den in diesem Doorbell-Objekt gespeicherten Klingelton ab.
+        sound: Spielt den in diesem Doorbell-Objekt gespeicherten Klingelton ab, ohne auf sein Ende zu warten.
+        isPlaying: Gibt zurück, ob der Klingelton gerade abgespielt wird.
+        waitUntilFinished: Wartet, bis der Klingelton vollständig abgespielt wurde.
+        initMixer: Initialisiert den Mixer einmalig für den gesamten Prozess.
         validateRingtonePath: Stellt sicher, dass der gegebene Pfad zur Tondatei existiert
                            und die Endung ".wav" oder ".mp3" hat und wirft andernfalls
                            eine entsprechende Exception mit einer Fehlernachricht.
@@ -65,8 +81,17 @@ class Doorbell:
     RINGTONE_PATH: Final[str] = "/home/pi/Music/ringtones/bell_sms_wav.wav"
     TOPIC: Final[str] = "RaspberryPiZeroW/Doorbell"
     PAYLOAD: Final[str] = "sound"
+    OVERLAP_RESTART: Final[str] = "restart"
+    OVERLAP_QUEUE: Final[str] = "queue"
+    OVERLAP_IGNORE: Final[str] = "ignore"
+    # Ein kleiner Puffer verkürzt die Zeit bis zum ersten hörbaren Sample auf wenige Millisekunden
+    MIXER_FREQUENCY: Final[int] = 44100
+    MIXER_BUFFER_SIZE: Final[int] = 512
 
-    def __init__(self, ringtonePath=RINGTONE_PATH, speakerVolume=MAXIMUM_SPEAKER_VOLUME):
+    __mixerLock = threading.Lock()
+
+    def __init__(self, ringtonePath=RINGTONE_PATH, speakerVolume=MAXIMUM_SPEAKER_VOLUME,
+                 overlapPolicy=OVERLAP_RESTART):
         """
         Konstruktor der Klasse :class:`~Doorbell.Doorbell`.
 
@@ -81,6 +106,10 @@ class Doorbell:
                               Die Lautstärke darf nur Werte zwischen 0 (i.e. 0 %) und
                               1 (i.e. 100 %) annehmen.
         @type speakerVolume: float
+        @param overlapPolicy: Die Strategie, wenn während des Abspielens erneut geklingelt wird:
+                              "restart" startet den Klingelton neu, "queue" spielt ihn danach
+                              erneut ab und "ignore" ignoriert das Klingeln.
+        @type overlapPolicy: str
 
         @raise:
         FileNotFoundError: Wenn die Tondatei, auf die der gegebene Pfad verweisen soll,
@@ -89,12 +118,23 @@ class Doorbell:
         FileFormatException: Wenn die Tondatei, auf die der gegebene Pfad verweist,
                              nicht das WAV- oder das MP3-Format hat.
         SemanticsException: Wenn die als Parameter übergebene Lautstärke nicht aus dem
-                            Wertebereich [0, 1] ist.
+                            Wertebereich [0, 1] ist oder die Überlappungsstrategie unbekannt ist.
         """
         Doorbell.validateRingtonePath(ringtonePath)
         Doorbell.validateSpeakerVolume(speakerVolume)
+        if overlapPolicy not in (Doorbell.OVERLAP_RESTART, Doorbell.OVERLAP_QUEUE, Doorbell.OVERLAP_IGNORE):
+            raise SemanticsException("Unbekannte Strategie für überlappendes Klingeln: " + str(overlapPolicy))
         self.__ringtonePath = ringtonePath
         self.__speakerVolume = speakerVolume
+        self.__overlapPolicy = overlapPolicy
+        self.__lock = threading.Lock()
+        self.__finished = threading.Event()
+        self.__finished.set()
+        self.__timer = None
+        self.__channel = None
+        self.__queued = 0
+        Doorbell.initMixer()
+        self.__ringtone = pygame.mixer.Sound(ringtonePath)
 
     @property
     def ringtonePath(self):
@@ -124,7 +164,10 @@ class Doorbell:
                              nicht das WAV- oder das MP3-Format hat.
         """
         Doorbell.validateRingtonePath(ringtonePath)
-        self.__ringtonePath = ringtonePath
+        ringtone = pygame.mixer.Sound(ringtonePath)
+        with self.__lock:
+            self.__ringtonePath = ringtonePath
+            self.__ringtone = ringtone
 
     @property
     def speakerVolume(self):
@@ -157,18 +200,81 @@ class Doorbell:
         Doorbell.validateSpeakerVolume(speakerVolume)
         self.__speakerVolume = speakerVolume
 
+    @staticmethod
+    def initMixer():
+        """
+        Initialisiert den Mixer einmalig für den gesamten Prozess mit einem kleinen Puffer.
+        Weitere Aufrufe haben keine Wirkung.
+        """
+        with Doorbell.__mixerLock:
+            if pygame.mixer.get_init() is None:
+                pygame.mixer.pre_init(frequency=Doorbell.MIXER_FREQUENCY, buffer=Doorbell.MIXER_BUFFER_SIZE)
+                pygame.mixer.init()
+
     def sound(self):
         """
-        Spielt den in diesem Doorbell-Objekt gespeicherten Klingelton ab.
+        Spielt den in diesem Doorbell-Objekt gespeicherten Klingelton ab und kehrt sofort zurück.
+
+        Wird der Klingelton bereits abgespielt, wird er je nach Überlappungsstrategie neu gestartet,
+        nach dem aktuellen erneut abgespielt oder das Klingeln ignoriert.
+
+        @return: False, wenn das Klingeln ignoriert wurde, anderenfalls True.
+        @rtype: bool
+        """
+        with self.__lock:
+            if not self.__finished.is_set():
+                if self.__overlapPolicy == Doorbell.OVERLAP_IGNORE:
+                    return False
+                if self.__overlapPolicy == Doorbell.OVERLAP_QUEUE:
+                    self.__queued += 1
+                    return True
+                self.__timer.cancel()
+                if self.__channel is not None:
+                    self.__channel.stop()
+            self.__play()
+        return True
+
+    def __play(self):
+        # Muss mit gehaltenem Lock aufgerufen werden
+        self.__ringtone.set_volume(self.__speakerVolume)
+        self.__finished.clear()
+        self.__channel = self.__ringtone.play()
+        self.__timer = threading.Timer(self.__ringtone.get_length(), self.__on_end)
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __on_end(self):
+        with self.__lock:
+            # Ein neu gestarteter Klingelton hat einen eigenen Timer
+            if self.__timer is not threading.current_thread():
+                return
+            if self.__queued > 0:
+                self.__queued -= 1
+                self.__play()
+                return
+            self.__timer = None
+            self.__channel = None
+            self.__finished.set()
+
+    def isPlaying(self):
+        """
+        Gibt zurück, ob der Klingelton gerade abgespielt wird.
+
+        @return: True, wenn der Klingelton gerade abgespielt wird, anderenfalls False.
+        @rtype: bool
+        """
+        return not self.__finished.is_set()
+
+    def waitUntilFinished(self, timeout: float = None):
         """
-        pygame.mixer.init()
-        pygame.mixer_music.set_volume(self.__speakerVolume)
-        pygame.mixer.music.load(self.__ringtonePath)
-        pygame.mixer.music.play()
+        Wartet, bis der Klingelton (einschließlich erneut abzuspielender Klingeltöne) vollständig abgespielt wurde.
 
-        # Stellt sicher, dass die Tondatei vollständig abgespielt wird.
-        while pygame.mixer.music.get_busy():
-            continue
+        @param timeout: Die maximale Wartezeit in Sekunden oder None für unbegrenztes Warten.
+        @type timeout: float
+        @return: True, wenn der Klingelton vollständig abgespielt wurde, False bei Ablauf der Wartezeit.
+        @rtype: bool
+        """
+        return self.__finished.wait(timeout)
 
     @staticmethod
     def validateRingtonePath(path: str):
@@ -261,10 +367,12 @@ if __name__ == '__main__':
         LogInfo.get_instance().send_log_msg("Die Türklingel hat die Nachricht \"" + messageString +
                                             "\" zum Thema \"" + message.topic + "\" erhalten.")
         if messageString == Doorbell.PAYLOAD:
-            doorbell = Doorbell()
             doorbell.sound()
 
 
+    # Der Klingelton wird einmalig beim Start dekodiert, damit die Klingel beim Eintreffen der Nachricht
+    # sofort klingelt
+    doorbell = Doorbell()
     mqttConfig = MQTTProtocolConfiguration(Doorbell.TOPIC, Doorbell.PAYLOAD)
     doorbellMQTTSubscriber = MQTTSubscriber(mqttConfig, on_connect, on_message)
     doorbellMQTTSubscriber.run()
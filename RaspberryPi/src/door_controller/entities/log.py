@@ -1,10 +1,20 @@
+import os
+import sys
+import threading
 from abc import ABC, abstractmethod
-from RaspberryPi.src.data_model.configuration import BotConfiguration
+from RaspberryPi.src.data_model.configuration import BotConfiguration, PiConfiguration
 from RaspberryPi.src.door_controller.entities.bot import SlackBot, Bot
+from RaspberryPi.src.door_controller.entities.log_shipper import LogShipper
+from RaspberryPi.src.door_controller.entities.log_store import LogStore
+from RaspberryPi.src.door_controller.entities.timestamp_store import TimestampStore, ClearJob
 from RaspberryPi.src.exceptions.exception import LogException
 
 """
 Die Klassen in diesem Packet dienen zur Erstellung und Verwaltung von Log-Files für das Türsteuerungssystem.
+Log-Nachrichten werden nicht direkt gesendet, sondern vom :class:`~log_shipper.LogShipper` gebündelt im Hintergrund
+versendet. Zusätzlich wird jede Nachricht im lokalen :class:`~log_store.LogStore` gespeichert.
+Die Timestamps gesendeter Nachrichten werden je Log in einem :class:`~timestamp_store.TimestampStore` gespeichert,
+das Löschen des Verlaufs läuft als :class:`~timestamp_store.ClearJob` im Hintergrund.
 
 Classes:
     Log: Die abstrakte Klasse für Log Klassen.
@@ -14,6 +24,9 @@ Classes:
     
 @author Fabian Schiekel
 @version 1.0
+
+@author Lukas Wittenzellner
+@version 1.4
 """
 
 
@@ -23,20 +36,44 @@ class Log(ABC):
 
     Attributes:
         bot(SlackBot): Die Log-Bot Instanz, auf der die Aktionen ausgeführt werden sollen.
-        ts([str]): Die Liste, in der die Timestamps aller Log-Nachrichten gespeichert werden.
+        timestamps(TimestampStore): Die begrenzte, gespeicherte Liste der Timestamps der Nachrichten dieses Logs.
+        clear_job(ClearJob): Das laufende oder zuletzt gelaufene Löschen des Verlaufs.
+        shipper_key(int): Der Schlüssel, unter dem das Log beim LogShipper angemeldet ist.
+        LEVEL(str): Die Logstufe, unter der die Nachrichten im LogStore gespeichert werden.
     Methods:
         bot_conf: Die Getter Methode für die Bot-Configuration.
         get_instance(abstrakt): Diese Methode repräsentiert die get_instance Methode des Singleton Design-patterns.
-        send_log_msg: Diese Methode sendet die übergebene Nachricht mit dem gespeicherten Bot Objekt in das verbundene
-            Log.
-        clear_log_history: Löscht alle Log-Nachrichten, deren Timestamps in der Variable ts gespeichert sind.
+        send_log_msg: Diese Methode legt die übergebene Nachricht zum Senden mit dem gespeicherten Bot Objekt in das
+            verbundene Log in den Puffer des LogShippers.
+        clear_log_history: Startet das Löschen aller Log-Nachrichten, deren Timestamps gespeichert sind.
+        clear_progress: Gibt den Fortschritt des Löschens zurück.
     """
+    LEVEL = "log"
     __bot = None
-    __ts = []
     __bot_conf = BotConfiguration()
 
-    def __init__(self, bot: Bot):
+    def __init__(self, bot: Bot, priority: int = 0):
+        """
+        Konstruktor der Klasse Log. Meldet das Log beim LogShipper an und setzt ein vor dem letzten Beenden
+        unterbrochenes Löschen des Verlaufs fort.
+
+        @param bot: Der Bot, der die Log-Nachrichten sendet.
+        @type bot: Bot
+        @param priority: Die Priorität des Logs. Bei vollem Puffer werden Nachrichten mit niedriger Priorität
+                         zuerst verworfen.
+        @type priority: int
+        """
         self.__bot = bot
+        # Jedes Log merkt sich nur die Timestamps seiner eigenen Nachrichten
+        self.__timestamps = TimestampStore(os.path.join(PiConfiguration().path_log_timestamps, self.LEVEL + ".ts"),
+                                           self.__bot_conf.log_ts_capacity)
+        self.__clear_lock = threading.Lock()
+        self.__clear_job = None
+        self.__shipper_key = LogShipper.get_instance().register(self.__bot.send_message, self.__timestamps.add,
+                                                                priority)
+        upto = self.__timestamps.pending_clear()
+        if upto is not None:
+            self.__start_clear(upto)
 
     @property
     def bot_conf(self):
@@ -51,45 +88,74 @@ class Log(ABC):
     def get_instance(self):
         pass
 
-    def send_log_msg(self, msg: str) -> bool:
+    def send_log_msg(self, msg: str, source: str = None) -> bool:
         """
         Sendet die Übergebene Nachricht an das Log. (Hier an einen Slack Bot.)
+        Die Nachricht wird nur in den Puffer des LogShippers gelegt, die Methode wartet also nie auf Slack. Ist keine
+        Verbindung zum Log vorhanden, wird die Nachricht wie bisher ohne Reaktion verworfen. Im lokalen LogStore
+        wird die Nachricht in jedem Fall gespeichert.
 
         @param msg: Die Log-Nachricht die gesendet werden soll.
         @param msg: str
+        @param source: Das Modul, das die Nachricht schreibt. Ohne Angabe wird das Modul des Aufrufers verwendet.
+        @type source: str
 
-        @return: True Wenn die Log Nachricht gesendet werden konnte.
-                 False Wenn die Log Nachricht nicht gesendet werden konnte.
+        @return: True Wenn die Log Nachricht in den Puffer gelegt werden konnte.
+                 False Wenn die Log Nachricht wegen eines vollen Puffers verworfen wurde.
         @rtype: bool
-        @raise LogException: Wenn die Log-Nachricht nicht gesendet werden konnte.
         """
-        ts = self.__bot.send_message(msg)
-        if abs(float(ts)) - 1 < float(0.01):
-            # Keine Verbindung zum Log vorhanden, Fehlerbehandlung besteht aus keiner Reaktion.
-            return True
-        if float(ts) > 0:
-            self.__ts.append(ts)
-            return True
-        else:
-            raise LogException("Die Log-Nachricht konnte nicht gesendet werden!")
+        if source is None:
+            source = sys._getframe(1).f_globals.get("__name__", "")
+        LogStore.get_instance().append(self.LEVEL, msg, source)
+        return LogShipper.get_instance().enqueue(self.__shipper_key, msg)
 
-    def clear_log_history(self) -> bool:
+    def clear_log_history(self, wait: bool = False) -> bool:
         """
-        Löscht alle Log-Nachtrichten, welche seid dem letzten Neustart geschrieben worden.
-
-        @return: True Wenn die Log Nachrichten gelöscht werden konnte.
-                 False Wenn die Log Nachrichten nicht gelöscht werden konnte.
+        Löscht alle Log-Nachtrichten, deren Timestamps gespeichert sind, auch die vor dem letzten Neustart.
+        Das Löschen läuft im Hintergrund und stellt die Anfragen nacheinander mit der Rate log_delete_rate. Der
+        Fortschritt wird im LogStore gespeichert und kann mit clear_progress abgefragt werden. Ein durch einen Neustart
+        unterbrochenes Löschen wird fortgesetzt. Läuft bereits ein Löschen, wird kein neues gestartet.
+
+        @param wait: Ob auf das Ende des Löschens gewartet werden soll.
+        @type wait: bool
+        @return: True Wenn das Löschen gestartet wurde oder bereits läuft.
         @rtype: bool
         @raise LogException: Log konnte nicht gelöscht werden.
         """
-        if len(self.__ts) == 0:
-            raise LogException("Nichts zum Löschen vorhanden!")
-
-        for ts in self.__ts:
-            resp = self.__bot.delete_message(ts)
-        self.__ts.clear()
+        with self.__clear_lock:
+            running = self.__clear_job is not None and self.__clear_job.running()
+            if not running:
+                if len(self.__timestamps) == 0:
+                    raise LogException("Nichts zum Löschen vorhanden!")
+                self.__start_clear(self.__timestamps.begin_clear())
+            job = self.__clear_job
+        if wait:
+            job.wait()
         return True
 
+    def __start_clear(self, upto: int):
+        conf = self.__bot_conf
+        self.__clear_job = ClearJob(self.__timestamps, self.__bot.delete_message, upto, conf.log_delete_rate,
+                                    conf.log_clear_batch_size, self.__report_progress)
+        self.__clear_job.start()
+
+    def __report_progress(self, deleted: int, failed: int, total: int):
+        # Der Fortschritt wird nur lokal gespeichert, damit das Löschen keine neuen Nachrichten im Log erzeugt
+        LogStore.get_instance().append("info", "Löschen des Logs " + self.LEVEL + ": " + str(deleted) + " von "
+                                       + str(total) + " Nachrichten gelöscht, " + str(failed) + " fehlgeschlagen",
+                                       __name__)
+
+    def clear_progress(self):
+        """
+        Gibt den Fortschritt des laufenden oder zuletzt gelaufenen Löschens zurück.
+
+        @return: Die Anzahl gelöschter, fehlgeschlagener und aller zu löschenden Nachrichten oder None, wenn noch
+                 kein Löschen gestartet wurde.
+        @rtype: tuple
+        """
+        job = self.__clear_job
+        return job.progress() if job is not None else None
+
 
 class LogInfo(Log):
     """
@@ -98,15 +164,19 @@ class LogInfo(Log):
 
     Attributes:
         instance: Die Instance des LogInfo Objekts.
+        PRIORITY: Die niedrigste Priorität beim Verwerfen von Nachrichten im LogShipper.
+        LEVEL: Die Logstufe im LogStore.
 
     Methods:
         get_instance: Implementiert die abstrakte get_instance Methode der Oberklasse.
             Gibt das in instance gespeicherte Log-Objekt zurück oder erzeugt ein neues.
     """
+    PRIORITY = 0
+    LEVEL = "info"
     __instance = None
 
     def __init__(self):
-        super().__init__(SlackBot(self.bot_conf.bot_log_token, self.bot_conf.bot_inf_id))
+        super().__init__(SlackBot(self.bot_conf.bot_log_token, self.bot_conf.bot_inf_id), self.PRIORITY)
 
     @classmethod
     def get_instance(cls):
@@ -128,15 +198,19 @@ class LogError(Log):
 
     Attributes:
         instance: Die Instance des LogError Objekts.
+        PRIORITY: Die mittlere Priorität beim Verwerfen von Nachrichten im LogShipper.
+        LEVEL: Die Logstufe im LogStore.
 
     Methods:
         get_instance: Implementiert die abstrakte get_instance Methode der Oberklasse.
             Gibt das in instance gespeicherte Log-Objekt zurück oder erzeugt ein neues.
     """
+    PRIORITY = 1
+    LEVEL = "error"
     __instance = None
 
     def __init__(self):
-        super().__init__(SlackBot(self.bot_conf.bot_log_token, self.bot_conf.bot_err_id))
+        super().__init__(SlackBot(self.bot_conf.bot_log_token, self.bot_conf.bot_err_id), self.PRIORITY)
 
     @classmethod
     def get_instance(cls):
@@ -158,15 +232,19 @@ class LogFatal(Log):
 
     Attributes:
         instance: Die Instance des LogFatal Objekts.
+        PRIORITY: Die höchste Priorität beim Verwerfen von Nachrichten im LogShipper.
+        LEVEL: Die Logstufe im LogStore.
 
     Methods:
         get_instance: Implementiert die abstrakte get_instance Methode der Oberklasse.
             Gibt das in instance gespeicherte Log-Objekt zurück oder erzeugt ein neues.
     """
+    PRIORITY = 2
+    LEVEL = "fatal"
     __instance = None
 
     def __init__(self):
-        super().__init__(SlackBot(self.bot_conf.bot_log_token, self.bot_conf.bot_fat_id))
+        super().__init__(SlackBot(self.bot_conf.bot_log_token, self.bot_conf.bot_fat_id), self.PRIORITY)
 
     @classmethod
     def get_instance(cls):
@@ -0,0 +1,302 @@
+import atexit
+import sys
+import threading
+import time
+
+from RaspberryPi.src.data_model.configuration import BotConfiguration
+
+"""
+Dieses Modul enthält den Versand der Log-Nachrichten im Hintergrund.
+Eine Log-Nachricht wird beim Aufruf nur in einen begrenzten Puffer im Arbeitsspeicher gelegt, sodass z.B. das
+Öffnen der Tür nie auf die Verbindung zu Slack warten muss. Ein einziger Thread fasst alle Nachrichten eines Logs,
+die innerhalb eines Intervalls eintreffen, zu einer Nachricht zusammen und hält dabei einen Mindestabstand zwischen
+zwei Nachrichten ein.
+
+Classes:
+    LogShipper: Sammelt die Log-Nachrichten aller Logs und versendet sie gebündelt in einem eigenen Thread.
+
+@author Lukas Wittenzellner
+@version 1.1
+"""
+
+
+class LogShipper:
+    """
+    Sammelt die Log-Nachrichten aller Logs und versendet sie gebündelt in einem eigenen Thread.
+    Jedes Log meldet sich mit einer Funktion zum Senden, einer Funktion für den Timestamp gesendeter Nachrichten
+    und einer Priorität an. Ist der Puffer voll, wird die älteste Nachricht des Logs mit der niedrigsten Priorität
+    verworfen, die nicht wichtiger als die neue Nachricht ist. Gibt es keine solche, wird die neue Nachricht
+    verworfen. Die Anzahl verworfener Nachrichten wird mit der nächsten Nachricht des betroffenen Logs gemeldet.
+    Lehnt Slack eine Nachricht wegen zu vieler Anfragen ab, wird die angegebene Zeit abgewartet. Nach einem
+    vorübergehenden Fehler (Verbindung, Zeitüberschreitung, Serverfehler) wird mit exponentiell wachsendem Abstand
+    wiederholt. Alle anderen Fehler verwerfen die Nachricht sofort, sie werden auf stderr ausgegeben.
+
+    Methods:
+        get_instance: Gibt die geteilte Instanz zurück.
+        register: Meldet ein Log an.
+        enqueue: Legt eine Nachricht eines Logs in den Puffer.
+        flush: Wartet, bis alle Nachrichten im Puffer versendet wurden.
+        stop: Versendet die restlichen Nachrichten und beendet den Thread.
+    """
+    SEPARATOR = "\n"
+    MAX_ATTEMPTS = 3
+
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self, bot_conf: BotConfiguration = None):
+        """
+        Konstruktor der Klasse :class:`~log_shipper.LogShipper`.
+
+        @param bot_conf: Die Konfiguration mit der Größe des Puffers, dem Intervall und dem Mindestabstand.
+        @type bot_conf: :class:`~configuration.BotConfiguration`
+        """
+        self.__bot_conf = bot_conf if bot_conf is not None else BotConfiguration()
+        self.__condition = threading.Condition()
+        # Schlüssel -> (Funktion zum Senden, Funktion für den Timestamp, Priorität)
+        self.__logs = dict()
+        # Schlüssel -> Liste der noch nicht versendeten Nachrichten, die älteste zuerst
+        self.__messages = dict()
+        # Schlüssel -> Anzahl der seit der letzten Nachricht verworfenen Nachrichten
+        self.__dropped = dict()
+        self.__size = 0
+        # Zeitpunkt der ersten Nachricht im Puffer, ab dem das Intervall läuft
+        self.__first = None
+        self.__sending = False
+        self.__flush_requested = False
+        self.__last_post = 0.0
+        self.__stopped = False
+        self.__thread = None
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Gibt die geteilte Instanz zurück und erzeugt sie bei Bedarf. Beim Beenden des Programms werden die
+        restlichen Nachrichten noch versendet.
+
+        @return: Die geteilte Instanz.
+        @rtype: :class:`~log_shipper.LogShipper`
+        """
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                cls.__instance = LogShipper()
+                atexit.register(cls.__instance.stop)
+            return cls.__instance
+
+    def register(self, send, on_sent, priority: int) -> int:
+        """
+        Meldet ein Log an.
+
+        @param send: Die Funktion, die eine Nachricht sendet und ihren Timestamp als String zurückgibt.
+        @type send: Callable
+        @param on_sent: Die Funktion, die den Timestamp jeder gesendeten Nachricht erhält.
+        @type on_sent: Callable
+        @param priority: Die Priorität des Logs, Nachrichten mit höherer Priorität werden zuletzt verworfen.
+        @type priority: int
+        @return: Der Schlüssel, unter dem das Log Nachrichten in den Puffer legt.
+        @rtype: int
+        """
+        with self.__condition:
+            key = len(self.__logs)
+            self.__logs[key] = (send, on_sent, priority)
+            self.__messages[key] = []
+            self.__dropped[key] = 0
+            return key
+
+    def enqueue(self, key: int, msg: str) -> bool:
+        """
+        Legt eine Nachricht eines Logs in den Puffer und kehrt sofort zurück.
+
+        @param key: Der Schlüssel des Logs aus register.
+        @type key: int
+        @param msg: Die Nachricht.
+        @type msg: str
+        @return: True Wenn die Nachricht in den Puffer gelegt wurde.
+                 False Wenn die Nachricht verworfen wurde.
+        @rtype: bool
+        """
+        with self.__condition:
+            if self.__size >= self.__bot_conf.log_queue_size and not self.__evict(self.__logs[key][2]):
+                self.__dropped[key] += 1
+                return False
+            self.__messages[key].append(msg)
+            self.__size += 1
+            if self.__first is None:
+                self.__first = time.monotonic()
+            if self.__thread is None and not self.__stopped:
+                self.__thread = threading.Thread(target=self.__run, daemon=True, name="LogShipper")
+                self.__thread.start()
+            self.__condition.notify_all()
+            return True
+
+    def __evict(self, priority: int) -> bool:
+        # Muss mit gehaltenem Lock aufgerufen werden. Verwirft die älteste Nachricht der niedrigsten Priorität.
+        candidates = [key for key, messages in self.__messages.items()
+                      if len(messages) > 0 and self.__logs[key][2] <= priority]
+        if len(candidates) == 0:
+            return False
+        key = min(candidates, key=lambda candidate: self.__logs[candidate][2])
+        self.__messages[key].pop(0)
+        self.__dropped[key] += 1
+        self.__size -= 1
+        return True
+
+    def flush(self, timeout: float = None) -> bool:
+        """
+        Versendet alle Nachrichten im Puffer ohne das Intervall abzuwarten und wartet darauf.
+
+        @param timeout: Die maximale Wartezeit in Sekunden, ohne Angabe wird unbegrenzt gewartet.
+        @type timeout: float
+        @return: True Wenn alle Nachrichten versendet wurden, anderenfalls False.
+        @rtype: bool
+        """
+        with self.__condition:
+            self.__flush_requested = True
+            self.__condition.notify_all()
+            return self.__condition.wait_for(lambda: self.__is_idle() or self.__thread is None, timeout)
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Versendet die restlichen Nachrichten und beendet den Thread.
+
+        @param timeout: Die maximale Wartezeit in Sekunden.
+        @type timeout: float
+        """
+        self.flush(timeout)
+        with self.__condition:
+            self.__stopped = True
+            thread = self.__thread
+            self.__condition.notify_all()
+        if thread is not None:
+            thread.join(timeout)
+
+    def __is_idle(self) -> bool:
+        return self.__size == 0 and not self.__sending and not any(self.__dropped.values())
+
+    def __take(self) -> list:
+        # Wartet mit gehaltenem Lock das Intervall ab und entnimmt dann alle Nachrichten
+        while not self.__stopped:
+            if self.__size == 0 and not any(self.__dropped.values()):
+                self.__flush_requested = False
+                self.__condition.wait()
+                continue
+            if self.__first is None:
+                self.__first = time.monotonic()
+            wait = self.__first + self.__bot_conf.log_ship_interval - time.monotonic()
+            if wait > 0 and not self.__flush_requested:
+                self.__condition.wait(wait)
+                continue
+            break
+        batches = []
+        for key, messages in self.__messages.items():
+            if len(messages) == 0 and self.__dropped[key] == 0:
+                continue
+            messages = list(messages)
+            if self.__dropped[key] > 0:
+                messages.append(str(self.__dropped[key]) + " Log-Nachrichten wurden verworfen.")
+            batches.append((key, messages))
+            self.__messages[key].clear()
+            self.__dropped[key] = 0
+        self.__size = 0
+        self.__first = None
+        self.__sending = len(batches) > 0
+        return batches
+
+    def __chunks(self, messages: list) -> list:
+        # Fasst die Nachrichten zu möglichst wenigen Nachrichten der erlaubten Länge zusammen
+        limit = self.__bot_conf.log_max_post_length
+        chunks = []
+        current = ""
+        for msg in messages:
+            while len(msg) > limit:
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(msg[:limit])
+                msg = msg[limit:]
+            if current and len(current) + len(self.SEPARATOR) + len(msg) > limit:
+                chunks.append(current)
+                current = ""
+            current = current + self.SEPARATOR + msg if current else msg
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def __post(self, send, text: str):
+        # Hält den Mindestabstand ein. Wiederholt werden nur Ablehnungen wegen zu vieler Anfragen (nach der von Slack
+        # angegebenen Zeit) und vorübergehende Fehler (mit exponentiell wachsendem Abstand).
+        for attempt in range(self.MAX_ATTEMPTS):
+            wait = self.__last_post + self.__bot_conf.log_min_post_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.__last_post = time.monotonic()
+            try:
+                ts = send(text)
+            except Exception as e:
+                delay = self.__retry_delay(e, attempt)
+                if delay is None:
+                    self.__report("Die Log-Nachricht wurde abgelehnt und verworfen: " + repr(e))
+                    return None
+            else:
+                if not self.__is_unsent(ts):
+                    return ts
+                # Der Bot meldet einen Verbindungsfehler mit einem negativen Timestamp
+                delay = self.__backoff(attempt)
+            if attempt + 1 < self.MAX_ATTEMPTS:
+                time.sleep(delay)
+        self.__report("Die Log-Nachricht konnte nach " + str(self.MAX_ATTEMPTS) + " Versuchen nicht gesendet werden "
+                      "und wurde verworfen.")
+        return None
+
+    def __backoff(self, attempt: int) -> float:
+        return self.__bot_conf.log_retry_backoff * 2 ** attempt
+
+    def __retry_delay(self, error: Exception, attempt: int):
+        # Gibt die Wartezeit bis zur Wiederholung zurück oder None, wenn der Fehler nicht vorübergehend ist
+        response = getattr(error, "response", None)
+        status = getattr(response, "status_code", None)
+        headers = getattr(response, "headers", None) or {}
+        retry_after = headers.get("Retry-After")
+        if status == 429 or retry_after is not None:
+            try:
+                return float(retry_after)
+            except (TypeError, ValueError):
+                return self.__backoff(attempt)
+        if isinstance(error, OSError) or (isinstance(status, int) and status >= 500):
+            # Verbindungsfehler, Zeitüberschreitungen und Serverfehler
+            return self.__backoff(attempt)
+        return None
+
+    @staticmethod
+    def __is_unsent(ts) -> bool:
+        try:
+            return ts is not None and float(ts) < 0
+        except (TypeError, ValueError):
+            return False
+
+    @staticmethod
+    def __report(msg: str):
+        # Nicht über die Logs, da deren Nachrichten wieder über diesen Thread versendet würden
+        print("LogShipper: " + msg, file=sys.stderr)
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                if self.__stopped and self.__size == 0:
+                    self.__thread = None
+                    self.__condition.notify_all()
+                    return
+                batches = self.__take()
+                logs = dict(self.__logs)
+            for key, messages in batches:
+                send, on_sent, _ = logs[key]
+                for text in self.__chunks(messages):
+                    ts = self.__post(send, text)
+                    try:
+                        if ts is not None and float(ts) > 1:
+                            on_sent(ts)
+                    except ValueError:
+                        pass
+            with self.__condition:
+                self.__sending = False
+                self.__condition.notify_all()
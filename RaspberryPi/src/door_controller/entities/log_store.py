@@ -0,0 +1,387 @@
+import os
+import sys
+import threading
+import time
+
+from RaspberryPi.src.data_model.configuration import PiConfiguration
+
+"""
+Dieses Modul enthält die lokale Ablage aller Log-Nachrichten.
+Die neuesten Log-Einträge liegen in einem Ringpuffer fester Größe im Arbeitsspeicher und sind nach Logstufe und
+Zeit indiziert, sodass z.B. alle Einträge der Stufe info zwischen 03:00 und 03:30 ohne Slack abgefragt werden können.
+Jeder Eintrag wird zusätzlich in rotierende Segmentdateien geschrieben, aus denen ältere Einträge gelesen werden, die
+nicht mehr im Ringpuffer liegen.
+
+Classes:
+    LogRecord: Ein einzelner Log-Eintrag.
+    LogStore: Der Ringpuffer der Log-Einträge mit Indizes nach Logstufe und Zeit.
+
+@author Lukas Wittenzellner
+@version 1.0
+"""
+
+
+class LogRecord:
+    """
+    Ein einzelner Log-Eintrag.
+
+    Attributes:
+        seq(int): Die fortlaufende Nummer des Eintrags.
+        level(str): Die Logstufe, z.B. info, error oder fatal.
+        source(str): Das Modul, das den Eintrag geschrieben hat.
+        monotonic(float): Die monotone Zeit beim Schreiben, unabhängig von Änderungen der Uhrzeit.
+        wall(float): Die Uhrzeit beim Schreiben in Sekunden seit 1970.
+        message(str): Die Log-Nachricht.
+    Methods:
+        format: Gibt den Eintrag als lesbare Zeile zurück.
+        to_line: Gibt den Eintrag als Zeile einer Segmentdatei zurück.
+        parse: Liest einen Eintrag aus einer Zeile einer Segmentdatei.
+    """
+    __slots__ = ("seq", "level", "source", "monotonic", "wall", "message")
+
+    def __init__(self, seq: int, level: str, source: str, monotonic: float, wall: float, message: str):
+        self.seq = seq
+        self.level = level
+        self.source = source
+        self.monotonic = monotonic
+        self.wall = wall
+        self.message = message
+
+    def format(self) -> str:
+        """
+        Gibt den Eintrag als lesbare Zeile zurück.
+
+        @return: Die Zeile mit Uhrzeit, Logstufe, Modul und Nachricht.
+        @rtype: str
+        """
+        wall = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.wall))
+        return wall + " [" + self.level + "] " + self.source + ": " + self.message.replace("\n", " ")
+
+    def to_line(self) -> str:
+        """
+        Gibt den Eintrag als Zeile einer Segmentdatei zurück. Zeilenumbrüche der Nachricht werden maskiert.
+
+        @return: Die Zeile inklusive Zeilenumbruch.
+        @rtype: str
+        """
+        message = self.message.replace("\\", "\\\\").replace("\n", "\\n")
+        return ";".join((str(self.seq), self.level, self.source, repr(self.monotonic), repr(self.wall),
+                         message)) + "\n"
+
+    @staticmethod
+    def parse(line: str):
+        """
+        Liest einen Eintrag aus einer Zeile einer Segmentdatei.
+
+        @param line: Die Zeile ohne Zeilenumbruch.
+        @type line: str
+        @return: Den Eintrag oder None, wenn die Zeile nicht dem erwarteten Format entspricht.
+        @rtype: LogRecord
+        """
+        entry = line.split(";", 5)
+        if len(entry) != 6:
+            return None
+        try:
+            seq, monotonic, wall = int(entry[0]), float(entry[3]), float(entry[4])
+        except ValueError:
+            return None
+        message = entry[5].replace("\\\\", "\0").replace("\\n", "\n").replace("\0", "\\")
+        return LogRecord(seq, entry[1], entry[2], monotonic, wall, message)
+
+
+class LogStore:
+    """
+    Der Ringpuffer der Log-Einträge mit Indizes nach Logstufe und Zeit.
+    Der Ringpuffer belegt unabhängig von der Laufzeit immer gleich viel Speicher. Da die Einträge in der Reihenfolge
+    ihrer Nummer im Ringpuffer liegen, ist der Index nach Zeit eine binäre Suche über den Ringpuffer. Der Index je
+    Logstufe ist eine sortierte Liste der Nummern, deren ältester Teil beim Überschreiben verworfen wird.
+    Für die Zeitsuche wird eine nie kleiner werdende Uhrzeit verwendet, damit ein Zurückstellen der Uhr die Sortierung
+    nicht zerstört.
+
+    Methods:
+        get_instance: Gibt die geteilte Instanz zurück.
+        append: Speichert einen neuen Log-Eintrag.
+        query: Gibt die Log-Einträge zurück, die den Filtern entsprechen.
+        build_query: Erzeugt den Befehl für eine Abfrage über den Socket des Hauptprogramms.
+        answer_query: Beantwortet einen Befehl aus build_query.
+        close: Schließt die aktuelle Segmentdatei.
+    """
+    COMMAND_QUERY = "query"
+    SEGMENT_PREFIX = "segment-"
+    SEGMENT_SUFFIX = ".log"
+
+    __instance = None
+    __instance_lock = threading.Lock()
+
+    def __init__(self, directory: str = None, capacity: int = 5000, segment_size: int = 1000000,
+                 segment_count: int = 5):
+        """
+        Konstruktor der Klasse :class:`~log_store.LogStore`.
+
+        @param directory: Das Verzeichnis der Segmentdateien. Ohne Angabe werden keine Segmentdateien geschrieben.
+        @type directory: str
+        @param capacity: Die Anzahl der Einträge im Ringpuffer.
+        @type capacity: int
+        @param segment_size: Die Größe in Bytes, ab der eine neue Segmentdatei begonnen wird.
+        @type segment_size: int
+        @param segment_count: Die Anzahl der Segmentdateien, die aufbewahrt werden.
+        @type segment_count: int
+        """
+        self.__capacity = capacity
+        self.__directory = directory
+        self.__segment_size = segment_size
+        self.__segment_count = segment_count
+        self.__lock = threading.Lock()
+        self.__ring = [None] * capacity
+        # Nie kleiner werdende Uhrzeit je Platz im Ringpuffer, nach der die Zeitsuche sortiert ist
+        self.__keys = [0.0] * capacity
+        self.__next_seq = 0
+        # Die erste Nummer dieses Programmlaufs, ältere Einträge liegen nur in den Segmentdateien
+        self.__start_seq = 0
+        self.__last_key = 0.0
+        # Logstufe -> [Startposition, Liste der Nummern], die Liste wird erst ab der Hälfte gekürzt
+        self.__levels = dict()
+        self.__segment = None
+        self.__segment_bytes = 0
+        self.__segments = []
+        if directory is not None:
+            self.__open_directory()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        Gibt die geteilte Instanz zurück und erzeugt sie bei Bedarf mit den Werten der PiConfiguration.
+
+        @return: Die geteilte Instanz.
+        @rtype: :class:`~log_store.LogStore`
+        """
+        with cls.__instance_lock:
+            if cls.__instance is None:
+                pi_conf = PiConfiguration()
+                cls.__instance = LogStore(pi_conf.path_log_segments, pi_conf.log_store_capacity,
+                                          pi_conf.log_segment_size, pi_conf.log_segment_count)
+            return cls.__instance
+
+    def __open_directory(self):
+        try:
+            os.makedirs(self.__directory, exist_ok=True)
+            names = os.listdir(self.__directory)
+        except OSError:
+            self.__directory = None
+            return
+        numbers = []
+        for name in names:
+            if name.startswith(self.SEGMENT_PREFIX) and name.endswith(self.SEGMENT_SUFFIX):
+                try:
+                    numbers.append(int(name[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        self.__segments = sorted(numbers)
+        # Die Nummerierung wird nach einem Neustart hinter dem letzten gespeicherten Eintrag fortgesetzt
+        for number in reversed(self.__segments):
+            records = self.__read_segment(number)
+            if len(records) > 0:
+                self.__next_seq = records[-1].seq + 1
+                break
+        self.__start_seq = self.__next_seq
+        self.__rotate()
+
+    def __segment_path(self, number: int) -> str:
+        return os.path.join(self.__directory, self.SEGMENT_PREFIX + str(number) + self.SEGMENT_SUFFIX)
+
+    def __rotate(self):
+        # Muss mit gehaltenem Lock aufgerufen werden
+        if self.__segment is not None:
+            self.__segment.close()
+        number = self.__segments[-1] + 1 if len(self.__segments) > 0 else 0
+        try:
+            self.__segment = open(self.__segment_path(number), "a")
+        except OSError:
+            self.__segment = None
+            return
+        self.__segments.append(number)
+        self.__segment_bytes = 0
+        while len(self.__segments) > self.__segment_count:
+            try:
+                os.remove(self.__segment_path(self.__segments.pop(0)))
+            except OSError:
+                pass
+
+    def __read_segment(self, number: int) -> list:
+        try:
+            with open(self.__segment_path(number), "r") as f:
+                content = f.read()
+        except OSError:
+            return []
+        # Die letzte Zeile ist nur dann vollständig, wenn die Datei mit einem Zeilenumbruch endet
+        records = (LogRecord.parse(line) for line in content.split("\n")[:-1])
+        return [record for record in records if record is not None]
+
+    def append(self, level: str, message: str, source: str = None) -> LogRecord:
+        """
+        Speichert einen neuen Log-Eintrag. Ist der Ringpuffer voll, wird der älteste Eintrag überschrieben.
+
+        @param level: Die Logstufe, z.B. info, error oder fatal.
+        @type level: str
+        @param message: Die Log-Nachricht.
+        @type message: str
+        @param source: Das Modul, das den Eintrag schreibt. Ohne Angabe wird das Modul des Aufrufers verwendet.
+        @type source: str
+        @return: Den gespeicherten Eintrag.
+        @rtype: :class:`~log_store.LogRecord`
+        """
+        if source is None:
+            source = sys._getframe(1).f_globals.get("__name__", "")
+        monotonic, wall = time.monotonic(), time.time()
+        with self.__lock:
+            record = LogRecord(self.__next_seq, level, source.replace(";", ","), monotonic, wall, message)
+            self.__next_seq += 1
+            slot = record.seq % self.__capacity
+            evicted = self.__ring[slot]
+            if evicted is not None:
+                self.__evict(evicted)
+            self.__last_key = max(self.__last_key, wall)
+            self.__ring[slot] = record
+            self.__keys[slot] = self.__last_key
+            self.__levels.setdefault(level, [0, []])[1].append(record.seq)
+            if self.__segment is not None:
+                self.__spill(record)
+            return record
+
+    def __evict(self, record: LogRecord):
+        # Muss mit gehaltenem Lock aufgerufen werden, der Eintrag ist immer der älteste seiner Logstufe
+        index = self.__levels[record.level]
+        index[0] += 1
+        if index[0] > len(index[1]) // 2:
+            del index[1][:index[0]]
+            index[0] = 0
+
+    def __spill(self, record: LogRecord):
+        # Muss mit gehaltenem Lock aufgerufen werden
+        line = record.to_line()
+        try:
+            self.__segment.write(line)
+            self.__segment.flush()
+        except OSError:
+            return
+        self.__segment_bytes += len(line.encode())
+        if self.__segment_bytes >= self.__segment_size:
+            self.__rotate()
+
+    def __first_seq(self) -> int:
+        return max(self.__start_seq, self.__next_seq - self.__capacity)
+
+    def __bisect(self, seqs, lo: int, hi: int, key: float) -> int:
+        # Gibt die erste Position in seqs[lo:hi] zurück, deren Eintrag nicht vor key liegt
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.__keys[seqs[mid] % self.__capacity] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def query(self, level: str = None, since: float = None, until: float = None, limit: int = 100,
+              source: str = None) -> list:
+        """
+        Gibt die Log-Einträge zurück, die den Filtern entsprechen. Liegt since vor dem ältesten Eintrag im
+        Ringpuffer, werden zusätzlich die Segmentdateien durchsucht.
+
+        @param level: Die Logstufe. Ohne Angabe werden alle Logstufen zurückgegeben.
+        @type level: str
+        @param since: Die früheste Uhrzeit in Sekunden seit 1970.
+        @type since: float
+        @param until: Die späteste Uhrzeit in Sekunden seit 1970.
+        @type until: float
+        @param limit: Die maximale Anzahl an Einträgen. Es werden die neuesten passenden Einträge zurückgegeben.
+        @type limit: int
+        @param source: Das Modul, das die Einträge geschrieben hat.
+        @type source: str
+        @return: Die Einträge, der älteste zuerst.
+        @rtype: list
+        """
+        with self.__lock:
+            first_seq = self.__first_seq()
+            if level is None:
+                seqs = range(first_seq, self.__next_seq)
+                lo = 0
+            else:
+                start, seqs = self.__levels.get(level, [0, []])
+                lo = start
+            hi = len(seqs)
+            if since is not None:
+                lo = self.__bisect(seqs, lo, hi, since)
+            if until is not None:
+                hi = self.__bisect(seqs, lo, hi, until + 1e-6)
+            records = [self.__ring[seq % self.__capacity] for seq in seqs[lo:hi]]
+            oldest_key = self.__keys[first_seq % self.__capacity] if self.__next_seq > first_seq else None
+        if source is not None:
+            records = [record for record in records if record.source == source]
+        if len(records) < limit and since is not None and (oldest_key is None or since < oldest_key):
+            records = self.__query_segments(level, since, until, source, first_seq) + records
+        return records[-limit:] if limit > 0 else []
+
+    def __query_segments(self, level, since, until, source, first_seq) -> list:
+        # Liest die Einträge, die nicht mehr im Ringpuffer liegen, aus den Segmentdateien
+        records = []
+        for number in self.__segments_snapshot():
+            for record in self.__read_segment(number):
+                if record.seq >= first_seq:
+                    continue
+                if (level is not None and record.level != level) or (source is not None and record.source != source):
+                    continue
+                if record.wall < since or (until is not None and record.wall > until):
+                    continue
+                records.append(record)
+        return records
+
+    def __segments_snapshot(self) -> list:
+        with self.__lock:
+            return list(self.__segments) if self.__directory is not None else []
+
+    @classmethod
+    def build_query(cls, level: str = None, since: float = None, until: float = None, limit: int = 100) -> str:
+        """
+        Erzeugt den Befehl für eine Abfrage über den Socket des Hauptprogramms, z.B. von der Webseite.
+
+        @param level: Die Logstufe oder None für alle Logstufen.
+        @type level: str
+        @param since: Die früheste Uhrzeit in Sekunden seit 1970 oder None.
+        @type since: float
+        @param until: Die späteste Uhrzeit in Sekunden seit 1970 oder None.
+        @type until: float
+        @param limit: Die maximale Anzahl an Einträgen.
+        @type limit: int
+        @return: Der Befehl im Format "query;Logstufe;von;bis;Anzahl", fehlende Filter bleiben leer.
+        @rtype: str
+        """
+        fields = (level, since, until, limit)
+        return ";".join([cls.COMMAND_QUERY] + ["" if field is None else str(field) for field in fields])
+
+    def answer_query(self, command: str) -> str:
+        """
+        Beantwortet einen Befehl aus build_query.
+
+        @param command: Der empfangene Befehl.
+        @type command: str
+        @return: Die passenden Einträge als lesbare Zeilen, der älteste zuerst.
+        @rtype: str
+        @raise ValueError: Wenn der Befehl nicht dem erwarteten Format entspricht.
+        """
+        fields = command.split(";")
+        if len(fields) != 5 or fields[0] != self.COMMAND_QUERY:
+            raise ValueError("Ungültige Abfrage: " + command)
+        level = fields[1] if fields[1] != "" else None
+        since = float(fields[2]) if fields[2] != "" else None
+        until = float(fields[3]) if fields[3] != "" else None
+        limit = int(fields[4]) if fields[4] != "" else 100
+        return "\n".join(record.format() for record in self.query(level, since, until, limit))
+
+    def close(self):
+        """
+        Schließt die aktuelle Segmentdatei. Weitere Einträge werden nur noch im Ringpuffer gespeichert.
+        """
+        with self.__lock:
+            if self.__segment is not None:
+                self.__segment.close()
+                self.__segment = None
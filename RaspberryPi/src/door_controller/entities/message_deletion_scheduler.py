@@ -0,0 +1,277 @@
+import heapq
+import os
+import threading
+import time
+
+from RaspberryPi.src.data_model.configuration import BotConfiguration, PiConfiguration
+
+"""
+Dieses Modul enthält einen Zeitplaner, der alle zukünftigen Löschungen von Bot-Nachrichten übernimmt.
+Statt für jede Nachricht einen Thread bis zur Löschung schlafen zu lassen, liegen alle ausstehenden Löschungen in
+einem Heap nach ihrem Fälligkeitszeitpunkt und werden von einem einzigen Thread ausgeführt.
+Jede Löschung wird als Zeile in einem Journal gespeichert, sodass sie auch nach einem Neustart des Programms
+ausgeführt wird. Das Journal enthält nur Kanal, Timestamp und Fälligkeit sowie einen Schlüssel des Bots, niemals
+dessen Token.
+
+Classes:
+    MessageDeletionScheduler: Führt die Löschungen von Bot-Nachrichten zu ihrem Fälligkeitszeitpunkt aus.
+
+@author Lukas Wittenzellner
+@version 1.1
+"""
+
+
+class MessageDeletionScheduler:
+    """
+    Führt die Löschungen von Bot-Nachrichten zu ihrem Fälligkeitszeitpunkt aus.
+    Ein Bot meldet sich mit einem Schlüssel und einer Funktion zum Löschen an. Löschungen, deren Bot noch nicht
+    angemeldet ist (z.B. direkt nach einem Neustart), werden ausgeführt, sobald er sich anmeldet.
+    Alle Löschungen, die innerhalb der Zeitspanne bot_delete_batch_window fällig werden, werden gemeinsam
+    ausgeführt und mit einem einzigen Schreibzugriff im Journal als erledigt vermerkt.
+    Für jeden Pfad des Journals existiert genau eine Instanz, die über get_instance geteilt wird.
+
+    Methods:
+        get_instance: Gibt die geteilte Instanz für einen Pfad zurück.
+        register_deleter: Meldet die Funktion eines Bots zum Löschen seiner Nachrichten an.
+        schedule: Plant die Löschung einer Nachricht.
+        pending: Gibt alle ausstehenden Löschungen zurück.
+        stop: Beendet den Thread des Zeitplaners.
+    """
+    OPERATION_ADD = "add"
+    OPERATION_DONE = "done"
+
+    __instances = dict()
+    __instances_lock = threading.Lock()
+
+    def __init__(self, journal_path: str, bot_conf: BotConfiguration = None, compaction_threshold: int = 100):
+        """
+        Konstruktor der Klasse :class:`~message_deletion_scheduler.MessageDeletionScheduler`.
+
+        Liest die noch ausstehenden Löschungen aus dem Journal ein.
+
+        @param journal_path: Der Pfad zum Journal der ausstehenden Löschungen.
+        @type journal_path: str
+        @param bot_conf: Die Konfiguration mit der Zeitspanne für gemeinsame Löschungen und den Wiederholungen.
+        @type bot_conf: :class:`~configuration.BotConfiguration`
+        @param compaction_threshold: Die Anzahl erledigter Einträge im Journal, ab der es neu geschrieben wird.
+        @type compaction_threshold: int
+        """
+        self.__journal_path = journal_path
+        self.__bot_conf = bot_conf if bot_conf is not None else BotConfiguration()
+        self.__compaction_threshold = compaction_threshold
+        self.__condition = threading.Condition()
+        # (Fälligkeit, Schlüssel des Bots, Kanal, Timestamp), die früheste Löschung zuerst
+        self.__heap = []
+        # (Schlüssel des Bots, Kanal, Timestamp) -> Fälligkeit aller ausstehenden Löschungen
+        self.__pending = dict()
+        # (Schlüssel des Bots, Kanal, Timestamp) -> Anzahl fehlgeschlagener Versuche
+        self.__attempts = dict()
+        # Schlüssel des Bots -> Liste der Löschungen, deren Bot noch nicht angemeldet ist
+        self.__waiting = dict()
+        self.__deleters = dict()
+        self.__done_records = 0
+        self.__thread = None
+        self.__stopped = False
+        self.__replay_journal()
+
+    @classmethod
+    def get_instance(cls, journal_path: str = None):
+        """
+        Gibt die geteilte Instanz für den angegebenen Pfad zurück und erzeugt sie bei Bedarf.
+
+        @param journal_path: Der Pfad zum Journal. Ohne Angabe wird der Pfad aus der PiConfiguration verwendet.
+        @type journal_path: str
+        @return: Die Instanz für diesen Pfad.
+        @rtype: :class:`~message_deletion_scheduler.MessageDeletionScheduler`
+        """
+        if journal_path is None:
+            journal_path = PiConfiguration().path_bot_deletion_journal
+        with cls.__instances_lock:
+            if journal_path not in cls.__instances:
+                cls.__instances[journal_path] = MessageDeletionScheduler(journal_path)
+            return cls.__instances[journal_path]
+
+    def __replay_journal(self):
+        try:
+            with open(self.__journal_path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return
+        if not content.endswith(b"\n") and len(content) > 0:
+            # Eine beim Absturz unvollständig geschriebene letzte Zeile wird entfernt, da die nächste Löschung
+            # sonst an sie angehängt und beim nächsten Neustart mit ihr verworfen würde
+            try:
+                with open(self.__journal_path, "r+b") as f:
+                    f.truncate(content.rfind(b"\n") + 1)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError:
+                pass
+        # Die letzte Zeile ist nur dann vollständig, wenn die Datei mit einem Zeilenumbruch endet
+        for line in content.decode(errors="replace").split("\n")[:-1]:
+            entry = line.split(";")
+            if len(entry) == 5 and entry[0] == self.OPERATION_ADD:
+                try:
+                    self.__pending[(entry[1], entry[2], entry[3])] = float(entry[4])
+                except ValueError:
+                    continue
+            elif len(entry) == 4 and entry[0] == self.OPERATION_DONE:
+                self.__pending.pop((entry[1], entry[2], entry[3]), None)
+                self.__done_records += 1
+        for (owner, channel, ts), due in self.__pending.items():
+            self.__waiting.setdefault(owner, []).append((due, owner, channel, ts))
+
+    def __append_journal(self, lines: list) -> bool:
+        # Muss mit gehaltenem Lock aufgerufen werden, schreibt alle Zeilen mit genau einem fsync
+        try:
+            with open(self.__journal_path, "a") as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            # Die Löschungen bleiben im Speicher geplant, überstehen aber keinen Neustart
+            return False
+        return True
+
+    def __compact(self):
+        # Muss mit gehaltenem Lock aufgerufen werden, schreibt nur noch die ausstehenden Löschungen
+        lines = [";".join((self.OPERATION_ADD, owner, channel, ts, repr(due))) + "\n"
+                 for (owner, channel, ts), due in self.__pending.items()]
+        temp_path = self.__journal_path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                f.write("".join(lines))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.__journal_path)
+        except OSError:
+            return
+        self.__done_records = 0
+
+    def __ensure_started(self):
+        # Muss mit gehaltenem Lock aufgerufen werden
+        if self.__thread is None and not self.__stopped:
+            self.__thread = threading.Thread(target=self.__run, daemon=True, name="MessageDeletionScheduler")
+            self.__thread.start()
+
+    def register_deleter(self, owner: str, deleter):
+        """
+        Meldet die Funktion eines Bots zum Löschen seiner Nachrichten an. Bereits geplante Löschungen dieses Bots,
+        z.B. aus dem Journal nach einem Neustart, werden damit ausführbar.
+
+        @param owner: Der Schlüssel des Bots, unter dem seine Löschungen geplant werden.
+        @type owner: str
+        @param deleter: Die Funktion, die Kanal und Timestamp einer Nachricht erhält, sie löscht und bei Erfolg
+                        True zurückgibt.
+        @type deleter: Callable
+        """
+        with self.__condition:
+            self.__deleters[owner] = deleter
+            for entry in self.__waiting.pop(owner, []):
+                heapq.heappush(self.__heap, entry)
+            self.__ensure_started()
+            self.__condition.notify()
+
+    def schedule(self, owner: str, channel: str, ts: str, delay: float) -> bool:
+        """
+        Plant die Löschung einer Nachricht nach der angegebenen Zeit und speichert sie im Journal.
+
+        @param owner: Der Schlüssel des Bots, der die Nachricht gesendet hat.
+        @type owner: str
+        @param channel: Der Kanal der Nachricht.
+        @type channel: str
+        @param ts: Der Timestamp der Nachricht.
+        @type ts: str
+        @param delay: Die Zeit in Sekunden, nach der die Nachricht gelöscht werden soll.
+        @type delay: float
+        @return: True Wenn die Löschung im Journal gespeichert wurde.
+                 False Wenn die Löschung nur im Speicher geplant ist und keinen Neustart übersteht.
+        @rtype: bool
+        """
+        due = time.time() + delay
+        with self.__condition:
+            self.__pending[(owner, channel, ts)] = due
+            persisted = self.__append_journal([";".join((self.OPERATION_ADD, owner, channel, ts, repr(due))) + "\n"])
+            if owner in self.__deleters:
+                heapq.heappush(self.__heap, (due, owner, channel, ts))
+            else:
+                self.__waiting.setdefault(owner, []).append((due, owner, channel, ts))
+            self.__ensure_started()
+            self.__condition.notify()
+        return persisted
+
+    def pending(self) -> list:
+        """
+        Gibt alle ausstehenden Löschungen zurück.
+
+        @return: Die Löschungen als Tupel (Fälligkeit, Schlüssel des Bots, Kanal, Timestamp), die früheste zuerst.
+        @rtype: list
+        """
+        with self.__condition:
+            return sorted((due, owner, channel, ts) for (owner, channel, ts), due in self.__pending.items())
+
+    def stop(self):
+        """
+        Beendet den Thread des Zeitplaners. Ausstehende Löschungen bleiben im Journal erhalten.
+        """
+        with self.__condition:
+            self.__stopped = True
+            thread = self.__thread
+            self.__condition.notify()
+        if thread is not None:
+            thread.join()
+
+    def __take_batch(self) -> list:
+        # Wartet mit gehaltenem Lock auf die nächste fällige Löschung und gibt alle gemeinsam fälligen zurück
+        while not self.__stopped:
+            if len(self.__heap) == 0:
+                self.__condition.wait()
+                continue
+            wait = self.__heap[0][0] - time.time()
+            if wait > 0:
+                self.__condition.wait(wait)
+                continue
+            limit = time.time() + self.__bot_conf.bot_delete_batch_window
+            batch = []
+            while len(self.__heap) > 0 and self.__heap[0][0] <= limit:
+                batch.append(heapq.heappop(self.__heap))
+            return batch
+        return []
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                batch = self.__take_batch()
+                if self.__stopped:
+                    return
+                deleters = dict(self.__deleters)
+            results = []
+            for due, owner, channel, ts in batch:
+                try:
+                    deleted = bool(deleters[owner](channel, ts))
+                except Exception:
+                    deleted = False
+                results.append((due, owner, channel, ts, deleted))
+            self.__finish(results)
+
+    def __finish(self, results: list):
+        with self.__condition:
+            lines = []
+            for due, owner, channel, ts, deleted in results:
+                key = (owner, channel, ts)
+                attempts = self.__attempts.get(key, 0) + 1
+                if not deleted and attempts < self.__bot_conf.bot_delete_max_attempts:
+                    # Die Löschung bleibt im Journal ausstehend und wird später erneut versucht
+                    self.__attempts[key] = attempts
+                    heapq.heappush(self.__heap,
+                                   (time.time() + self.__bot_conf.bot_delete_retry_delay, owner, channel, ts))
+                    continue
+                self.__attempts.pop(key, None)
+                self.__pending.pop(key, None)
+                lines.append(";".join((self.OPERATION_DONE, owner, channel, ts)) + "\n")
+            if len(lines) == 0:
+                return
+            if self.__append_journal(lines):
+                self.__done_records += len(lines)
+            if self.__done_records >= self.__compaction_threshold:
+                self.__compact()
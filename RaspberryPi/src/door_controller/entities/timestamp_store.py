@@ -0,0 +1,358 @@
+import array
+import os
+import threading
+import time
+
+"""
+Dieses Modul enthält die Ablage der Timestamps gesendeter Log-Nachrichten und das Löschen dieser Nachrichten.
+Die Timestamps eines Logs liegen als ganze Mikrosekunden in einem Array fester Maximalgröße und werden in einer
+Binärdatei gespeichert, sodass sie auch nach einem Neustart noch gelöscht werden können. Das Löschen läuft in einem
+eigenen Thread mit begrenzter Rate und wird nach einem Neustart an der Stelle fortgesetzt, an der es unterbrochen
+wurde.
+
+Classes:
+    TimestampStore: Die begrenzte, gespeicherte Liste der Timestamps eines Logs.
+    ClearJob: Löscht alle Nachrichten eines TimestampStore in Stapeln mit begrenzter Rate.
+
+@author Lukas Wittenzellner
+@version 1.2
+"""
+
+
+class TimestampStore:
+    """
+    Die begrenzte, gespeicherte Liste der Timestamps eines Logs.
+    Ein Slack Timestamp wie "1646478123.123456" wird als ganze Zahl in Mikrosekunden gespeichert, also mit 8 Byte je
+    Nachricht. Ist die maximale Anzahl erreicht, wird der älteste Timestamp verworfen. Neue Timestamps werden an die
+    Datei angehängt, entfernte Timestamps werden durch Neuschreiben der Datei gespeichert.
+    Ein begonnenes Löschen wird mit dem neuesten zu löschenden Timestamp in einer zweiten Datei vermerkt.
+
+    Methods:
+        add: Fügt den Timestamp einer gesendeten Nachricht hinzu.
+        snapshot: Gibt die gespeicherten Timestamps zurück.
+        remove: Entfernt Timestamps, z.B. nach dem Löschen der Nachrichten.
+        begin_clear: Vermerkt den Beginn eines Löschens aller bisher gespeicherten Timestamps.
+        pending_clear: Gibt den neuesten Timestamp eines unterbrochenen Löschens zurück.
+        end_clear: Entfernt den Vermerk des Löschens.
+    """
+    CLEAR_SUFFIX = ".clear"
+    MICROSECONDS = 1000000
+
+    def __init__(self, path: str, capacity: int = 10000):
+        """
+        Konstruktor der Klasse :class:`~timestamp_store.TimestampStore`.
+
+        Liest die gespeicherten Timestamps aus der Datei ein.
+
+        @param path: Der Pfad zur Datei der Timestamps. Ohne Angabe werden die Timestamps nicht gespeichert.
+        @type path: str
+        @param capacity: Die maximale Anzahl an Timestamps.
+        @type capacity: int
+        """
+        self.__path = path
+        self.__capacity = capacity
+        self.__lock = threading.Lock()
+        self.__values = array.array("q")
+        # Anzahl der Einträge in der Datei, ab der doppelten Maximalgröße wird die Datei neu geschrieben
+        self.__records = 0
+        if path is not None:
+            self.__load()
+
+    @classmethod
+    def to_int(cls, ts: str) -> int:
+        """
+        Wandelt einen Slack Timestamp ohne Rundungsfehler in ganze Mikrosekunden um.
+
+        @param ts: Der Timestamp, z.B. "1646478123.123456".
+        @type ts: str
+        @return: Der Timestamp in Mikrosekunden.
+        @rtype: int
+        @raise ValueError: Wenn der Timestamp keine Zahl ist.
+        """
+        seconds, _, fraction = ts.strip().partition(".")
+        return int(seconds) * cls.MICROSECONDS + int((fraction + "000000")[:6])
+
+    @classmethod
+    def to_str(cls, value: int) -> str:
+        """
+        Wandelt ganze Mikrosekunden zurück in einen Slack Timestamp um.
+
+        @param value: Der Timestamp in Mikrosekunden.
+        @type value: int
+        @return: Der Timestamp, z.B. "1646478123.123456".
+        @rtype: str
+        """
+        return str(value // cls.MICROSECONDS) + "." + str(value % cls.MICROSECONDS).zfill(6)
+
+    def __load(self):
+        try:
+            os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+            with open(self.__path, "rb") as f:
+                content = f.read()
+        except OSError:
+            return
+        # Ein unvollständig geschriebener letzter Eintrag wird verworfen. Er wird auch aus der Datei entfernt, da
+        # sonst alle folgenden Einträge um seine Länge verschoben angehängt würden.
+        usable = len(content) - len(content) % self.__values.itemsize
+        if usable != len(content):
+            try:
+                os.truncate(self.__path, usable)
+            except OSError:
+                pass
+        self.__values.frombytes(content[:usable])
+        self.__records = len(self.__values)
+        if len(self.__values) > self.__capacity:
+            del self.__values[:len(self.__values) - self.__capacity]
+
+    def __rewrite(self):
+        # Muss mit gehaltenem Lock aufgerufen werden
+        if self.__path is None:
+            return
+        temp_path = self.__path + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(self.__values.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.__path)
+        except OSError:
+            return
+        self.__records = len(self.__values)
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__values)
+
+    def add(self, ts: str):
+        """
+        Fügt den Timestamp einer gesendeten Nachricht hinzu. Ist die maximale Anzahl erreicht, wird der älteste
+        Timestamp verworfen.
+
+        @param ts: Der Timestamp der Nachricht.
+        @type ts: str
+        """
+        value = self.to_int(ts)
+        with self.__lock:
+            self.__values.append(value)
+            if len(self.__values) > self.__capacity:
+                del self.__values[0]
+            if self.__path is None:
+                return
+            if self.__records + 1 >= 2 * self.__capacity:
+                self.__rewrite()
+                return
+            try:
+                with open(self.__path, "ab") as f:
+                    f.write(array.array("q", [value]).tobytes())
+            except OSError:
+                return
+            self.__records += 1
+
+    def snapshot(self, upto: int = None) -> list:
+        """
+        Gibt die gespeicherten Timestamps zurück.
+
+        @param upto: Der neueste Timestamp in Mikrosekunden, der zurückgegeben wird. Ohne Angabe alle.
+        @type upto: int
+        @return: Die Timestamps als Strings, der älteste zuerst.
+        @rtype: list
+        """
+        with self.__lock:
+            values = list(self.__values)
+        return [self.to_str(value) for value in values if upto is None or value <= upto]
+
+    def remove(self, ts_list: list):
+        """
+        Entfernt Timestamps und schreibt die Datei neu.
+
+        @param ts_list: Die zu entfernenden Timestamps.
+        @type ts_list: list
+        """
+        removed = {self.to_int(ts) for ts in ts_list}
+        with self.__lock:
+            self.__values = array.array("q", (value for value in self.__values if value not in removed))
+            self.__rewrite()
+
+    def begin_clear(self) -> int:
+        """
+        Vermerkt den Beginn eines Löschens aller bisher gespeicherten Timestamps. Danach hinzugefügte Timestamps
+        werden von diesem Löschen nicht erfasst.
+
+        @return: Der neueste zu löschende Timestamp in Mikrosekunden.
+        @rtype: int
+        """
+        with self.__lock:
+            upto = max(self.__values) if len(self.__values) > 0 else 0
+            if self.__path is not None:
+                try:
+                    with open(self.__path + self.CLEAR_SUFFIX, "w") as f:
+                        f.write(str(upto))
+                except OSError:
+                    pass
+            return upto
+
+    def pending_clear(self):
+        """
+        Gibt den neuesten Timestamp eines unterbrochenen Löschens zurück.
+
+        @return: Der Timestamp in Mikrosekunden oder None, wenn kein Löschen unterbrochen wurde.
+        @rtype: int
+        """
+        if self.__path is None:
+            return None
+        try:
+            with open(self.__path + self.CLEAR_SUFFIX, "r") as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def end_clear(self):
+        """
+        Entfernt den Vermerk des Löschens.
+        """
+        if self.__path is None:
+            return
+        try:
+            os.remove(self.__path + self.CLEAR_SUFFIX)
+        except OSError:
+            pass
+
+
+class ClearJob:
+    """
+    Löscht alle Nachrichten eines TimestampStore bis zu einem Timestamp in Stapeln. Slack begrenzt die Löschungen
+    je App auf eine feste Rate, daher werden die Anfragen nacheinander mit dieser Rate gestellt; gleichzeitige Anfragen
+    würden nur abgelehnt. Lehnt Slack eine Anfrage trotzdem wegen zu vieler Anfragen ab, wird die mit Retry-After
+    angegebene Zeit abgewartet und die Löschung wiederholt. Nach einer anderweitig fehlgeschlagenen Anfrage wird die
+    nächste zusätzlich verzögert. Nach jedem Stapel werden die gelöschten Timestamps entfernt und der Fortschritt
+    gemeldet. Nicht gelöschte Timestamps bleiben für ein späteres Löschen erhalten.
+
+    Methods:
+        start: Startet das Löschen in einem eigenen Thread.
+        progress: Gibt den Fortschritt zurück.
+        wait: Wartet auf das Ende des Löschens.
+        running: Gibt zurück, ob das Löschen noch läuft.
+    """
+    # Maximale Anzahl an Wiederholungen einer Löschung nach Ablehnungen wegen zu vieler Anfragen
+    MAX_RATE_LIMIT_RETRIES = 5
+
+    def __init__(self, store: TimestampStore, delete, upto: int, rate: float = 0.8, batch_size: int = 50,
+                 on_progress=None):
+        """
+        Konstruktor der Klasse :class:`~timestamp_store.ClearJob`.
+
+        @param store: Die Timestamps, deren Nachrichten gelöscht werden.
+        @type store: :class:`~timestamp_store.TimestampStore`
+        @param delete: Die Funktion, die eine Nachricht anhand ihres Timestamps löscht und bei Erfolg True zurückgibt.
+                       Bei einer Ablehnung wegen zu vieler Anfragen wirft sie eine Ausnahme, deren response den
+                       Header Retry-After enthält.
+        @type delete: Callable
+        @param upto: Der neueste zu löschende Timestamp in Mikrosekunden.
+        @type upto: int
+        @param rate: Die maximale Anzahl an Anfragen pro Sekunde.
+        @type rate: float
+        @param batch_size: Die Anzahl an Nachrichten, nach denen der Fortschritt gespeichert wird.
+        @type batch_size: int
+        @param on_progress: Die Funktion, die nach jedem Stapel gelöschte, fehlgeschlagene und alle Nachrichten erhält.
+        @type on_progress: Callable
+        """
+        self.__store = store
+        self.__delete = delete
+        self.__upto = upto
+        self.__interval = 1.0 / rate if rate > 0 else 0.0
+        self.__batch_size = batch_size
+        self.__on_progress = on_progress
+        self.__next_slot = 0.0
+        self.__deleted = 0
+        self.__failed = 0
+        self.__total = 0
+        self.__done = threading.Event()
+        self.__thread = None
+
+    def start(self):
+        """
+        Startet das Löschen in einem eigenen Thread.
+        """
+        self.__thread = threading.Thread(target=self.__run, daemon=True, name="ClearJob")
+        self.__thread.start()
+
+    def progress(self) -> tuple:
+        """
+        Gibt den Fortschritt zurück.
+
+        @return: Die Anzahl gelöschter, fehlgeschlagener und aller zu löschenden Nachrichten.
+        @rtype: tuple
+        """
+        return self.__deleted, self.__failed, self.__total
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wartet auf das Ende des Löschens.
+
+        @param timeout: Die maximale Wartezeit in Sekunden, ohne Angabe wird unbegrenzt gewartet.
+        @type timeout: float
+        @return: True Wenn das Löschen beendet ist, anderenfalls False.
+        @rtype: bool
+        """
+        return self.__done.wait(timeout)
+
+    def running(self) -> bool:
+        """
+        Gibt zurück, ob das Löschen noch läuft.
+
+        @return: True Wenn das Löschen noch läuft, anderenfalls False.
+        @rtype: bool
+        """
+        return self.__thread is not None and not self.__done.is_set()
+
+    def __wait_for_slot(self):
+        # Wartet bis zum nächsten freien Zeitpunkt für eine Anfrage
+        now = time.monotonic()
+        slot = max(now, self.__next_slot)
+        self.__next_slot = slot + self.__interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    @staticmethod
+    def __retry_after(error: Exception):
+        # Gibt die von Slack verlangte Wartezeit zurück oder None, wenn die Anfrage nicht wegen der Rate abgelehnt wurde
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        if getattr(response, "status_code", None) != 429 and "Retry-After" not in headers:
+            return None
+        try:
+            return float(headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return 1.0
+
+    def __delete_one(self, ts: str) -> bool:
+        for _ in range(self.MAX_RATE_LIMIT_RETRIES + 1):
+            self.__wait_for_slot()
+            try:
+                if self.__delete(ts):
+                    return True
+            except Exception as e:
+                retry_after = self.__retry_after(e)
+                if retry_after is not None:
+                    # Auch die folgenden Anfragen warten, bis Slack wieder Anfragen annimmt
+                    self.__next_slot = max(self.__next_slot, time.monotonic() + retry_after)
+                    continue
+            self.__next_slot += self.__interval
+            return False
+        return False
+
+    def __run(self):
+        try:
+            pending = self.__store.snapshot(self.__upto)
+            self.__total = len(pending)
+            for start in range(0, len(pending), self.__batch_size):
+                batch = pending[start:start + self.__batch_size]
+                deleted = [ts for ts in batch if self.__delete_one(ts)]
+                self.__store.remove(deleted)
+                self.__deleted += len(deleted)
+                self.__failed += len(batch) - len(deleted)
+                if self.__on_progress is not None:
+                    self.__on_progress(self.__deleted, self.__failed, self.__total)
+            self.__store.end_clear()
+        finally:
+            self.__done.set()
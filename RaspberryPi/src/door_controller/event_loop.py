@@ -0,0 +1,86 @@
+"""
+Dieses Modul enthält die zentrale Ereignisschleife des Hauptprogramms.
+Flankengesteuerte Rückrufe (z.B. des Klingeltasters) und beendete Threads legen Ereignisse in eine gemeinsame
+Warteschlange. Die Ereignisschleife wartet blockierend auf das nächste Ereignis und ruft die dafür registrierten
+Handler auf. Im Leerlauf wird der Prozess daher nicht regelmäßig geweckt, und ein Ereignis wird ohne Abfrageintervall
+sofort bearbeitet.
+Classes:
+    EventLoop: Verteilt die Ereignisse aus einer gemeinsamen Warteschlange an die registrierten Handler.
+@author Lukas Wittenzellner
+@version 1.0
+"""
+import queue
+import threading
+
+from RaspberryPi.src.door_controller.entities.log import LogError
+
+
+class EventLoop:
+    """
+    Verteilt die Ereignisse aus einer gemeinsamen Warteschlange an die registrierten Handler.
+    Ereignisse dürfen aus beliebigen Threads gemeldet werden. Die Handler werden nacheinander im Thread der
+    Ereignisschleife ausgeführt und sollten daher nur kurz blockieren.
+    Methods:
+        register: Registriert einen Handler für ein Ereignis.
+        post: Meldet ein Ereignis.
+        post_later: Meldet ein Ereignis nach einer Wartezeit.
+        run: Bearbeitet die Ereignisse, bis die Schleife beendet wird.
+        stop: Beendet die Ereignisschleife.
+    """
+    __STOP = object()
+
+    def __init__(self):
+        """
+        Erzeugt eine Ereignisschleife ohne registrierte Handler.
+        """
+        self.__queue = queue.Queue()
+        self.__handlers = dict()
+
+    def register(self, event: str, handler):
+        """
+        Registriert einen Handler für ein Ereignis. Einem Ereignis können mehrere Handler zugeordnet werden.
+        @param event: Der Name des Ereignisses.
+        @param handler: Die Funktion, die beim Ereignis mit dessen Daten aufgerufen wird.
+        """
+        self.__handlers.setdefault(event, []).append(handler)
+
+    def post(self, event: str, data=None):
+        """
+        Meldet ein Ereignis. Die Methode blockiert nicht und darf aus jedem Thread aufgerufen werden.
+        @param event: Der Name des Ereignisses.
+        @param data: Die Daten, die an die Handler übergeben werden.
+        """
+        self.__queue.put((event, data))
+
+    def post_later(self, event: str, delay: float, data=None):
+        """
+        Meldet ein Ereignis nach einer Wartezeit, ohne die Ereignisschleife zu blockieren.
+        @param event: Der Name des Ereignisses.
+        @param delay: Die Wartezeit in Sekunden.
+        @param data: Die Daten, die an die Handler übergeben werden.
+        """
+        timer = threading.Timer(delay, self.post, args=(event, data))
+        timer.daemon = True
+        timer.start()
+
+    def run(self):
+        """
+        Bearbeitet die Ereignisse in der Reihenfolge ihres Eintreffens, bis stop aufgerufen wird.
+        Ein fehlerhafter Handler beendet die Schleife nicht, der Fehler wird geloggt.
+        """
+        while True:
+            event, data = self.__queue.get()
+            if event is EventLoop.__STOP:
+                return
+            for handler in self.__handlers.get(event, ()):
+                try:
+                    handler(data)
+                except Exception as e:
+                    LogError.get_instance().send_log_msg("Fehler bei der Bearbeitung des Ereignisses \"" + event
+                                                         + "\": " + repr(e))
+
+    def stop(self):
+        """
+        Beendet die Ereignisschleife, nachdem die bereits gemeldeten Ereignisse bearbeitet wurden.
+        """
+        self.__queue.put((EventLoop.__STOP, None))
@@ -4,7 +4,13 @@ Modules:
     server_adapter: Dieses Modul dient als Grundgerüst für alle Adapter Klassen.
         Es enthält alle für das Programm relevanten Klassen und Methoden, die ein Adapter implementieren muss.
     server_adapter_from_python_ldap: Dieses Modul deint als Schnittstelle zwischen Python Code und einem LDAP-Server.
-    server_adapter_from_python_filemanager: Dieses Modul.
+    server_adapter_from_python_filemanager: Dieses Modul dient als Adapter einer Textdatei als Datenbank für das
+        Verwalten von Nutzern und deren Tokens.
+    server_adapter_from_sqlite: Dieses Modul dient als Adapter einer SQLite-Datenbank für das Verwalten von Nutzern
+        und deren Tokens.
+    read_write_lock: Dieses Modul stellt ein faires Lese-Schreib-Lock bereit.
+    token_store: Dieses Modul hält den Inhalt der Textdatei der validen Tokens im Arbeitsspeicher vor.
+    password_hasher: Dieses Modul berechnet und überprüft gesalzene Hashes der Passwörter.
 @author Lukas Wittenzellner
 @version 1.0
 """
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Dieses Modul überwacht Dateien auf dem Datenträger und meldet Änderungen an ihnen.
+Unter Linux wird dafür inotify verwendet, sodass ohne Abfragen in festen Abständen innerhalb von Millisekunden
+auf eine Änderung reagiert werden kann. Steht inotify nicht zur Verfügung, wird ersatzweise der Fingerabdruck
+der Dateien (Änderungszeit, Größe und Inode) in einem festen Intervall verglichen.
+Classes:
+    FileWatcher: Überwacht eine Menge von Dateien und ruft nach einer Änderung, entprellt, eine Funktion auf.
+@author Lukas Wittenzellner
+@version 1.1
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+
+from RaspberryPi.src.door_controller.entities.log import LogError
+
+
+class FileWatcher:
+    """
+    Überwacht eine Menge von Dateien und ruft nach einer Änderung eine Funktion auf.
+    Überwacht werden die Verzeichnisse der Dateien, damit auch ein Ersetzen der Datei durch Umbenennen erkannt wird.
+    Mehrere Änderungen kurz hintereinander werden zu einem Aufruf zusammengefasst (Entprellung).
+    Methods:
+        start: Startet die Überwachung in einem Hintergrund-Thread.
+        stop: Beendet die Überwachung.
+    """
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_CLOEXEC = 0o2000000
+    __EVENT = struct.Struct("iIII")
+    # Zeitspanne, nach der geprüft wird, ob die Überwachung beendet werden soll
+    __STOP_CHECK_INTERVAL = 1.0
+
+    def __init__(self, paths: list, callback, debounce=0.2, poll_interval=1.0):
+        """
+        Konstruktor für eine FileWatcher Instanz.
+        :param paths: Sind die Pfade der Dateien, die überwacht werden sollen.
+        :type paths: list
+        :param callback: Ist die Funktion ohne Parameter, die nach einer Änderung aufgerufen wird.
+        :type callback: Callable
+        :param debounce: Ist die Zeit in Sekunden, die nach einer Änderung ohne weitere Änderung vergehen muss,
+            bevor die Funktion aufgerufen wird.
+        :type debounce: float
+        :param poll_interval: Ist das Intervall in Sekunden, falls inotify nicht zur Verfügung steht.
+        :type poll_interval: float
+        """
+        self.__paths = [os.path.abspath(path) for path in paths]
+        self.__names = {os.path.basename(path) for path in self.__paths}
+        self.__callback = callback
+        self.__debounce = debounce
+        self.__poll_interval = poll_interval
+        self.__stopped = threading.Event()
+        self.__thread = None
+
+    def start(self):
+        """
+        Startet die Überwachung in einem Hintergrund-Thread.
+        """
+        if self.__thread is not None:
+            return
+        inotify = self.__open_inotify()
+        target = self.__watch_inotify if inotify is not None else self.__watch_polling
+        args = (inotify,) if inotify is not None else ()
+        self.__thread = threading.Thread(target=target, args=args, daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Beendet die Überwachung. Ein bereits laufender Aufruf der Funktion wird noch beendet.
+        """
+        self.__stopped.set()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+
+    def __open_inotify(self):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            file_descriptor = libc.inotify_init1(self.IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if file_descriptor < 0:
+            return None
+        mask = self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+        for directory in {os.path.dirname(path) for path in self.__paths}:
+            if libc.inotify_add_watch(file_descriptor, directory.encode(), mask) < 0:
+                os.close(file_descriptor)
+                return None
+        return file_descriptor
+
+    def __read_relevant(self, file_descriptor: int) -> bool:
+        # Liest alle anstehenden Ereignisse und prüft, ob eine der überwachten Dateien betroffen ist
+        data = os.read(file_descriptor, 4096)
+        relevant = False
+        offset = 0
+        while offset + self.__EVENT.size <= len(data):
+            _, _, _, length = self.__EVENT.unpack_from(data, offset)
+            offset += self.__EVENT.size
+            name = data[offset:offset + length].split(b"\0", 1)[0].decode(errors="replace")
+            offset += length
+            relevant = relevant or name in self.__names
+        return relevant
+
+    def __watch_inotify(self, file_descriptor: int):
+        try:
+            while not self.__stopped.is_set():
+                readable, _, _ = select.select([file_descriptor], [], [], self.__STOP_CHECK_INTERVAL)
+                if not readable or not self.__read_relevant(file_descriptor):
+                    continue
+                # Entprellung: gewartet wird, bis für die Dauer von debounce keine weiteren Ereignisse eintreffen
+                while select.select([file_descriptor], [], [], self.__debounce)[0]:
+                    self.__read_relevant(file_descriptor)
+                self.__notify()
+        finally:
+            os.close(file_descriptor)
+
+    def __fingerprint(self):
+        fingerprint = list()
+        for path in self.__paths:
+            try:
+                stat = os.stat(path)
+                fingerprint.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+            except FileNotFoundError:
+                fingerprint.append(None)
+        return fingerprint
+
+    def __watch_polling(self):
+        last = self.__fingerprint()
+        while not self.__stopped.wait(self.__poll_interval):
+            current = self.__fingerprint()
+            if current != last:
+                last = current
+                self.__notify()
+
+    def __notify(self):
+        try:
+            self.__callback()
+        except Exception as e:
+            # Ein Fehler beim Aktualisieren darf die Überwachung nicht beenden
+            LogError.get_instance().send_log_msg("Fehler bei der Bearbeitung einer Dateiänderung: " + repr(e))
@@ -0,0 +1,123 @@
+"""
+Dieses Modul speichert Passwörter nicht mehr im Klartext, sondern als gesalzenen PBKDF2-Hash.
+Das Berechnen eines solchen Hashes ist absichtlich langsam. Damit nicht jede Anfrage einer Verbindung der App
+diese Zeit kostet, werden erfolgreiche Überprüfungen für kurze Zeit zwischengespeichert.
+Ein Hash hat das Format "pbkdf2-sha256.Iterationen.Salz.Hash", Salz und Hash hexadezimal. Er enthält damit keines
+der Trennzeichen der Textdatei der validen Tokens.
+Classes:
+    PasswordHasher: Berechnet und überprüft Hashes von Passwörtern und speichert erfolgreiche Überprüfungen zwischen.
+@author Lukas Wittenzellner
+@version 1.0
+"""
+import hashlib
+import hmac
+import os
+
+from RaspberryPi.src.door_controller.server_adapter.ttl_cache import TTLCache
+
+
+class PasswordHasher:
+    """
+    Berechnet und überprüft gesalzene PBKDF2-Hashes von Passwörtern.
+    Gespeicherte Passwörter, die noch im Klartext vorliegen, werden weiterhin akzeptiert, damit eine Datei auch vor
+    ihrer Umstellung oder mit von Hand ergänzten Zeilen nutzbar bleibt.
+    Erfolgreiche Überprüfungen werden unter dem Identifikator und einem schnellen Hash des übergebenen Passworts
+    zwischengespeichert, das Passwort selbst nie. Ein Eintrag gilt nur, solange sich das gespeicherte Passwort des
+    Nutzers nicht ändert.
+    Methods:
+        hash: Berechnet den gesalzenen Hash eines Passworts.
+        is_hashed: Überprüft, ob ein gespeichertes Passwort bereits ein Hash ist.
+        verify: Überprüft ein Passwort gegen das gespeicherte Passwort eines Nutzers.
+        invalidate: Verwirft die zwischengespeicherten Überprüfungen eines Nutzers.
+        clear: Verwirft alle zwischengespeicherten Überprüfungen.
+    """
+    PREFIX = "pbkdf2-sha256"
+    SEPARATOR = "."
+    SALT_SIZE = 16
+
+    def __init__(self, iterations: int = 100000, cache_ttl: float = 300.0, cache_size: int = 16):
+        """
+        Konstruktor für eine PasswordHasher Instanz.
+        :param iterations: Ist die Anzahl der Iterationen für neu berechnete Hashes.
+        :type iterations: int
+        :param cache_ttl: Ist die Zeit in Sekunden, für die eine erfolgreiche Überprüfung gültig bleibt.
+        :type cache_ttl: float
+        :param cache_size: Ist die maximale Anzahl zwischengespeicherter Überprüfungen.
+        :type cache_size: int
+        """
+        self.__iterations = iterations
+        # (Identifikator, SHA-256 des Passworts) -> gespeichertes Passwort, gegen das überprüft wurde
+        self.__cache = TTLCache(cache_ttl, cache_size)
+
+    def hash(self, password: str) -> str:
+        """
+        Berechnet den gesalzenen Hash eines Passworts mit einem neuen, zufälligen Salz.
+        :param password: Ist das Passwort im Klartext.
+        :type password: str
+        :return: Den Hash im Format "pbkdf2-sha256.Iterationen.Salz.Hash".
+        :rtype: str
+        """
+        salt = os.urandom(self.SALT_SIZE)
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, self.__iterations)
+        return self.SEPARATOR.join((self.PREFIX, str(self.__iterations), salt.hex(), digest.hex()))
+
+    @classmethod
+    def is_hashed(cls, stored: str) -> bool:
+        """
+        Überprüft, ob ein gespeichertes Passwort bereits ein Hash ist.
+        :param stored: Ist das gespeicherte Passwort.
+        :type stored: str
+        :return: True, wenn es ein Hash ist, anderenfalls False.
+        :rtype: bool
+        """
+        return stored.startswith(cls.PREFIX + cls.SEPARATOR)
+
+    @classmethod
+    def __matches(cls, password: str, stored: str) -> bool:
+        if not cls.is_hashed(stored):
+            return hmac.compare_digest(password.encode(), stored.encode())
+        parts = stored.split(cls.SEPARATOR)
+        if len(parts) != 4:
+            return False
+        try:
+            iterations = int(parts[1])
+            salt = bytes.fromhex(parts[2])
+            expected = bytes.fromhex(parts[3])
+        except ValueError:
+            return False
+        return hmac.compare_digest(hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations), expected)
+
+    def verify(self, identifier: str, password: str, stored: str) -> bool:
+        """
+        Überprüft ein Passwort gegen das gespeicherte Passwort eines Nutzers. Wurde dieselbe Kombination vor kurzem
+        bereits erfolgreich überprüft, wird der Hash nicht erneut berechnet.
+        :param identifier: Ist der Identifikator des Nutzers.
+        :type identifier: str
+        :param password: Ist das übergebene Passwort im Klartext.
+        :type password: str
+        :param stored: Ist das gespeicherte Passwort des Nutzers, als Hash oder im Klartext.
+        :type stored: str
+        :return: True, wenn das Passwort stimmt, anderenfalls False.
+        :rtype: bool
+        """
+        key = (identifier, hashlib.sha256(password.encode()).hexdigest())
+        if self.__cache.get(key) == stored:
+            return True
+        if not self.__matches(password, stored):
+            return False
+        self.__cache.put(key, stored)
+        return True
+
+    def invalidate(self, identifier: str):
+        """
+        Verwirft die zwischengespeicherten Überprüfungen eines Nutzers, z.B. weil sich sein Eintrag geändert hat.
+        :param identifier: Ist der Identifikator des Nutzers.
+        :type identifier: str
+        """
+        self.__cache.invalidate_where(lambda key: key[0] == identifier)
+
+    def clear(self):
+        """
+        Verwirft alle zwischengespeicherten Überprüfungen.
+        """
+        self.__cache.clear()
@@ -0,0 +1,108 @@
+"""
+Dieses Modul stellt ein faires Lese-Schreib-Lock bereit. Beliebig viele Leser dürfen gleichzeitig zugreifen,
+ein Schreiber nur allein. Wartende Threads werden in der Reihenfolge ihrer Ankunft bedient, sodass ein wartender
+Schreiber nicht durch ständig neu hinzukommende Leser ausgehungert wird.
+Classes:
+    ReadWriteLock: Faires Lese-Schreib-Lock mit einer Warteschlange in Ankunftsreihenfolge.
+@author Lukas Wittenzellner
+@version 1.0
+"""
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+
+class ReadWriteLock:
+    """
+    Faires Lese-Schreib-Lock mit einer Warteschlange in Ankunftsreihenfolge.
+    Ein Leser erhält das Lock sofort, solange kein Schreiber es hält und niemand wartet. Sonst reiht er sich ein.
+    Aufeinanderfolgende Leser am Anfang der Warteschlange erhalten das Lock gemeinsam.
+    Das Lock ist nicht reentrant.
+    Methods:
+        acquire_read: Erwirbt das Lock zum Lesen.
+        release_read: Gibt das zum Lesen erworbene Lock frei.
+        acquire_write: Erwirbt das Lock exklusiv zum Schreiben.
+        release_write: Gibt das zum Schreiben erworbene Lock frei.
+        read_locked: Kontextmanager, der das Lock zum Lesen hält.
+        write_locked: Kontextmanager, der das Lock zum Schreiben hält.
+    """
+    def __init__(self):
+        """
+        Konstruktor für eine ReadWriteLock Instanz.
+        """
+        self.__condition = threading.Condition(threading.Lock())
+        self.__readers = 0
+        self.__writer = False
+        # Wartende Threads als Liste [ist Schreiber], der am längsten wartende zuerst
+        self.__queue = deque()
+
+    def acquire_read(self):
+        """
+        Erwirbt das Lock zum Lesen und blockiert, solange ein Schreiber es hält oder vor dem Aufrufer wartet.
+        """
+        with self.__condition:
+            if not self.__writer and len(self.__queue) == 0:
+                self.__readers += 1
+                return
+            ticket = [False]
+            self.__queue.append(ticket)
+            self.__condition.wait_for(lambda: self.__queue[0] is ticket and not self.__writer)
+            self.__queue.popleft()
+            self.__readers += 1
+            # Ein direkt folgender Leser darf nun ebenfalls lesen
+            self.__condition.notify_all()
+
+    def release_read(self):
+        """
+        Gibt das zum Lesen erworbene Lock frei.
+        """
+        with self.__condition:
+            self.__readers -= 1
+            if self.__readers == 0:
+                self.__condition.notify_all()
+
+    def acquire_write(self):
+        """
+        Erwirbt das Lock exklusiv zum Schreiben und blockiert, bis alle Leser und Schreiber vor dem Aufrufer
+        fertig sind.
+        """
+        with self.__condition:
+            if not self.__writer and self.__readers == 0 and len(self.__queue) == 0:
+                self.__writer = True
+                return
+            ticket = [True]
+            self.__queue.append(ticket)
+            self.__condition.wait_for(lambda: self.__queue[0] is ticket and not self.__writer
+                                      and self.__readers == 0)
+            self.__queue.popleft()
+            self.__writer = True
+
+    def release_write(self):
+        """
+        Gibt das zum Schreiben erworbene Lock frei.
+        """
+        with self.__condition:
+            self.__writer = False
+            self.__condition.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        """
+        Kontextmanager, der das Lock für die Dauer des Blocks zum Lesen hält.
+        """
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        """
+        Kontextmanager, der das Lock für die Dauer des Blocks exklusiv zum Schreiben hält.
+        """
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
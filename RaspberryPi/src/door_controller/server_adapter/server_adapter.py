@@ -12,6 +12,7 @@ from abc import abstractmethod, ABC
 from RaspberryPi.src.data_model.user import UnauthenticatedUser, AuthenticatedUser
 from RaspberryPi.src.data_model.key_token import Token
 from RaspberryPi.src.data_model.password import Password
+from RaspberryPi.src.door_controller.server_adapter.token_changes import TokenChanges
 
 
 class ServerAdapter(ABC):
@@ -23,7 +24,17 @@ class ServerAdapter(ABC):
         delete_all_tokens_from_user: Löscht alle Tokens eines Nutzers.
         get_user: Gibt die Daten eines Nutzers zurück.
         get_all_valid_tokens: Gibt eine Liste aller validen Token zurück.
+        add_change_listener: Registriert eine Funktion, die bei einer Änderung der Tokens aufgerufen wird.
+        remove_change_listener: Entfernt eine registrierte Funktion wieder.
+        get_token_generation: Gibt eine Kennung des aktuellen Stands der Tokens zurück.
+        get_token_changes_since: Gibt die Änderungen an den validen Tokens seit einem bekannten Stand zurück.
+        authenticate: Überprüft Identifikator und Passwort eines Admins.
+        apply_token_operations: Führt mehrere Änderungen an Tokens gemeinsam aus.
     """
+    OPERATION_ADD_TOKEN = "addToken"
+    OPERATION_DELETE_TOKEN = "deleteToken"
+    OPERATION_DELETE_ALL = "deleteAll"
+
     @abstractmethod
     def add_token_to_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser,
                           token: Token):
@@ -98,3 +109,98 @@ class ServerAdapter(ABC):
         :rtype: Liste von Tokens.
         """
         pass
+
+    def add_change_listener(self, listener) -> bool:
+        """
+        Registriert eine Funktion, die aufgerufen wird, sobald sich die Tokens in der Datenquelle des Adapters
+        ändern. Adapter, deren Datenquelle Änderungen melden kann, überschreiben diese Methode.
+
+        :param listener: Ist die Funktion ohne Parameter, die aufgerufen werden soll.
+        :type listener: Callable.
+        :return: True, wenn der Adapter Änderungen meldet, anderenfalls False.
+        :rtype: bool.
+        """
+        return False
+
+    def remove_change_listener(self, listener):
+        """
+        Entfernt eine mit add_change_listener registrierte Funktion wieder.
+
+        :param listener: Ist die Funktion, die entfernt werden soll.
+        :type listener: Callable.
+        """
+        pass
+
+    def get_token_generation(self):
+        """
+        Gibt eine Kennung des aktuellen Stands der Tokens zurück, die sich bei jeder Änderung der Tokens ändert.
+        Solange sie gleich bleibt, müssen die Tokens nicht neu geladen werden.
+
+        :return: Die Kennung oder None, wenn der Adapter keine Kennung bereitstellt.
+        :rtype: int.
+        """
+        return None
+
+    def get_token_changes_since(self, admin: UnauthenticatedUser, password: Password, version) -> TokenChanges:
+        """
+        Gibt die Änderungen an den validen Tokens seit dem angegebenen Stand zurück.
+        Adapter, die keine Historie ihrer Änderungen führen, geben immer den vollständigen Stand zurück.
+
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Nutzers, der diese Operation durchführen möchte.
+        :type password: Password.
+        :param version: Ist der Stand aus der letzten Abfrage oder None, wenn noch kein Stand bekannt ist.
+        :return: Die Änderungen und den neuen Stand.
+        :rtype: TokenChanges.
+        """
+        generation = self.get_token_generation()
+        if generation is not None and generation == version:
+            return TokenChanges([], [], generation, False)
+        return TokenChanges(self.get_all_valid_tokens(admin, password), [], generation, True)
+
+    def authenticate(self, admin: UnauthenticatedUser, password: Password) -> bool:
+        """
+        Überprüft, ob ein Admin mit dem Identifikator und dem Passwort existiert.
+        Adapter, die ihre Nutzer direkt überprüfen können, überschreiben diese Methode.
+
+        :param admin: Ist der Nutzer, der angemeldet werden soll.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Nutzers.
+        :type password: Password.
+        :return: True, wenn Identifikator und Passwort übereinstimmen, anderenfalls False.
+        :rtype: bool.
+        """
+        return self.get_user(admin, password, admin) != ""
+
+    def apply_token_operations(self, admin: UnauthenticatedUser, password: Password, operations: list) -> list:
+        """
+        Führt mehrere Änderungen an Tokens gemeinsam aus. Der Admin wird nur einmal überprüft.
+        Adapter, die Änderungen gemeinsam speichern können, überschreiben diese Methode. Ohne Überschreibung werden
+        die Änderungen einzeln ausgeführt und jede ausgeführte Änderung als wirksam gewertet.
+
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Nutzers, der diese Operation durchführen möchte.
+        :type password: Password.
+        :param operations: Ist die Liste der Änderungen als Tupel (Operation, Nutzer, Token). Die Operation ist
+            OPERATION_ADD_TOKEN, OPERATION_DELETE_TOKEN oder OPERATION_DELETE_ALL, bei letzterer ist der Token None.
+        :type operations: list.
+        :return: Für jede Änderung True, wenn sie wirksam war, anderenfalls False.
+        :rtype: list.
+        """
+        if not self.authenticate(admin, password):
+            return [False] * len(operations)
+        results = list()
+        for operation, user, token in operations:
+            if operation == self.OPERATION_ADD_TOKEN and token is not None:
+                self.add_token_to_user(admin, password, user, token)
+            elif operation == self.OPERATION_DELETE_TOKEN and token is not None:
+                self.delete_token_from_user(admin, password, user, token)
+            elif operation == self.OPERATION_DELETE_ALL:
+                self.delete_all_tokens_from_user(admin, password, user)
+            else:
+                results.append(False)
+                continue
+            results.append(True)
+        return results
@@ -12,10 +12,18 @@ Methods:
     delete_all_tokens_from_user: Löscht alle Tokens eines Nutzers.
     get_user: Gibt die Daten eines Nutzers zurück.
     get_all_valid_tokens: Gibt eine Liste aller validen Token zurück.
+    add_change_listener: Registriert eine Funktion, die bei einer Änderung der Datei aufgerufen wird.
+    remove_change_listener: Entfernt eine registrierte Funktion wieder.
+    get_token_generation: Gibt die Generation des Inhalts der Datei zurück.
+    get_token_changes_since: Gibt die Änderungen an den validen Tokens seit einer Generation zurück.
+    authenticate: Überprüft Identifikator und Passwort eines Admins.
+    apply_token_operations: Führt mehrere Änderungen an Tokens mit einem einzigen Schreibzugriff aus.
 Attributes:
     self.__path: str: Ist der Pfad, unter dem die Datei zum Verwalten von Tokens existieren soll.
+    self.__store: TokenStore: Hält den Inhalt der Datei im Arbeitsspeicher vor, siehe Modul token_store.
+Die Passwörter der Datei werden beim Erzeugen des Adapters einmalig von Klartext auf gesalzene Hashes umgestellt.
 @author Lukas Wittenzellner
-@version 1.0
+@version 1.4
 """
 from RaspberryPi.src.data_model.key_token import AuthorizedNFCToken
 from RaspberryPi.src.data_model.key_token import Token
@@ -25,6 +33,9 @@ from RaspberryPi.src.door_controller.door_control_handler.user_list_updates_noti
 from RaspberryPi.src.data_model.user import UnauthenticatedUser
 from RaspberryPi.src.data_model.password import Password
 from RaspberryPi.src.door_controller.server_adapter.server_adapter import ServerAdapter
+from RaspberryPi.src.door_controller.server_adapter.password_hasher import PasswordHasher
+from RaspberryPi.src.door_controller.server_adapter.token_store import TokenStore
+from RaspberryPi.src.door_controller.server_adapter.token_changes import TokenChanges
 from RaspberryPi.src.door_controller.entities.log import LogError, LogInfo
 from RaspberryPi.src.data_model.configuration import PiConfiguration
 
@@ -39,6 +50,13 @@ class ServerAdapterFromPythonFilemanager(ServerAdapter):
     def __init__(self):
         self.__pi_conf = PiConfiguration()
         self.__path = self.__pi_conf.path_valid_tokens
+        self.__store = TokenStore.get_instance(self.__path, self.__pi_conf.path_valid_tokens_journal,
+                                               self.__pi_conf.journal_compaction_threshold,
+                                               self.__pi_conf.token_change_history,
+                                               PasswordHasher(self.__pi_conf.password_hash_iterations,
+                                                              self.__pi_conf.credential_cache_ttl,
+                                                              self.__pi_conf.credential_cache_size))
+        self.__migrate_passwords()
         self.userListUpdateNotifier = UserListUpdatesNotifier()
 
     def validate_file_path(self) -> bool:
@@ -67,20 +85,20 @@ class ServerAdapterFromPythonFilemanager(ServerAdapter):
                     self.__path)
             return False
 
-    def __authenticate(self, user: UnauthenticatedUser, password: Password) -> bool:
-        identifier = user.identifier.__repr__()
-
-        with open(self.__path, "r") as f:
-            lines = f.readlines()
-
-        for line in lines:
-            split_data = line.split(":")
-            user_data = split_data[0].split(";")
+    def __migrate_passwords(self):
+        # Stellt noch im Klartext gespeicherte Passwörter auf Hashes um, ist danach ohne Schreibzugriff
+        try:
+            migrated = self.__store.migrate_passwords()
+        except OSError as e:
+            LogError.get_instance().send_log_msg("Fehler beim Umstellen der Passwörter auf Hashes: " + str(e))
+            return
+        if migrated > 0:
+            LogInfo.get_instance().send_log_msg("Es wurden " + str(migrated) + " Passwörter in der Datei "
+                                                + self.__path + " auf Hashes umgestellt")
 
-            if (identifier == user_data[1]) & (password.password == user_data[2]):
-                f.close()
-                return True
-        f.close()
+    def __authenticate(self, user: UnauthenticatedUser, password: Password) -> bool:
+        if self.__store.authenticate(str(user.identifier), password.password):
+            return True
         LogError.get_instance().send_log_msg("Authentifizierung des Admins fehlgeschlagen!")
         return False
 
@@ -92,19 +110,7 @@ class ServerAdapterFromPythonFilemanager(ServerAdapter):
         :return: True, wenn der Token in der Datei bereits existiert, anderenfalls False.
         :rtype: bool.
         """
-
-        with open(self.__path, "r") as f:
-            lines = f.readlines()
-
-        for line in lines:
-            line_split = line.split(":")
-            tokens = line_split[1].split(";")
-            for token_temp in tokens:
-                if token_temp.strip() == str(token.identifier):
-                    f.close()
-                    return True
-        f.close()
-        return False
+        return self.__store.has_token(str(token.identifier))
 
     def add_token_to_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser,
                           user_token: Token):
@@ -125,46 +131,7 @@ class ServerAdapterFromPythonFilemanager(ServerAdapter):
         # Überprüft, ob der Token bereits existiert, um Doppelungen zu vermeiden
         if self.__check_token_exists(user_token):
             return
-        # Ist der eindeutige Identifikator des gesuchten Nutzers
-        identifier = str(user.identifier)
-
-        # Ist der Token, der neu hinzugefügt werden soll
-        new_token = str(user_token.identifier)
-
-        with open(self.__path, "r") as f:
-            lines = f.readlines()
-
-        file = open(self.__path, "r")
-        # Zählvariable der For-Schleife
-        i = 0
-        for token_str in file:
-            # Bereitet den String vor, indem unnötige Zeichen entfernt werden
-            token_str = token_str.strip()
-            token_str = token_str.split(":")
-            # Enthält nur die Nutzerdaten als Liste
-            user_data = token_str[0].split(";")
-
-            if user_data[1] == str(identifier):
-                # Datei wird zum Lesen geschlossen, damit sie zum neu beschreiben geöffnet werden kann
-                file.close()
-                file = open(self.__path, "w")
-                # Alle Nutzer und ihre Daten werden wieder unverändert hinzugefügt,
-                # außer derjenige, der den neuen Token bekommen soll
-                for j in range(len(lines)):
-                    if j != i:
-                        file.write(lines[j].strip() + "\n")
-                # Der Nutzer mit dem neuen Token wird anschließens noch verändert hinzugefügt
-                # Wenn der Nutzer noch keinen Token hatte:
-                if token_str[1] == "":
-                    file.write(lines[i].strip() + new_token)
-                # Wenn der Nutzer bereits mindestens einen Token hatte
-                else:
-                    file.write(lines[i].strip() + ";" + new_token)
-
-                file.close()
-                break
-            i = i + 1
-        file.close()
+        self.__store.add_token(str(user.identifier), str(user_token.identifier))
 
     def delete_token_from_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser,
                                token: Token):
@@ -179,70 +146,9 @@ class ServerAdapterFromPythonFilemanager(ServerAdapter):
         :param token: Ist der Token, der gelöscht werden soll.
         :type token: Token.
         """
-
         if not self.__authenticate(admin, password):
             return
-
-        identifier = str(user.identifier)
-        token_to_delete = str(token.identifier)
-
-        with open(self.__path, "r") as f:
-            lines = f.readlines()
-
-        file = open(self.__path, "r")
-
-        i = 0
-        for token_str in file:
-            token_str = token_str.strip()
-            token_str = token_str.split(":")
-            user_data_str = token_str[0]  # speichert den String der Nutzerdaten
-            top_list = token_str[1]  # speichert den String der Token
-            user_data = user_data_str.split(";")  # aufgetrennter string der nutzerdaten
-
-            # wenn in der Datei der identifier gleich der identifier des zu überprüfenden nutzers ist
-            if user_data[1] == identifier:
-
-                tokens = top_list.split(";")  # tokens ist nun Liste aller Tokens ohne ":" oder ";"
-                token_found = False
-
-                # speichert den neuen string der tokens
-                tokens_temp_str = ""
-                # schleife über alle tokens
-                for token_t in tokens:
-                    # alle tokens aus tokens werden einem neuen string hinzugefügt außer der zu löschende
-                    if token_t != token_to_delete:
-                        tokens_temp_str = token_t + ";" + tokens_temp_str
-                    else:
-                        token_found = True
-
-                # nur jetzt muss die Datei angepasst werden, wenn token_found = True
-                if token_found:
-                    file.close()
-                    # öffne file im schreibmodus => file ist nun leer
-                    file = open(self.__path, "w")
-                    for j in range(len(lines)):
-                        # schreibe alle linien wieder in die Datei zurück außer die zu ändernde
-                        if j != i:
-                            # da nicht jede Zeile ein \n haben muss aber haben kann:
-                            file.write(lines[j].strip() + file.newlines())
-
-                    # Fügt den String der Nutzerdaten wieder zusammen
-                    user_data_str = user_data_str + ":"
-
-                    # wenn der zu löschende token der einzige in der Datei war, ist dieses if wahr
-                    if tokens_temp_str == "":
-                        file.write(user_data_str + "")
-
-                    # ist nur wahr, wenn der Nutzer mindestens noch einen weiteren Token hatte.
-                    # dann hat der neue string ein noch fehlerhaftes ";" am ende, das gelöscht werden muss
-                    else:
-                        tokens_temp_str = tokens_temp_str[:len(tokens_temp_str) - 1]
-                        file.write(user_data_str + tokens_temp_str)
-
-                file.close()
-                break
-            i = i + 1
-        file.close()
+        self.__store.delete_token(str(user.identifier), str(token.identifier))
 
     def delete_all_tokens_from_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser):
         """
@@ -257,44 +163,7 @@ class ServerAdapterFromPythonFilemanager(ServerAdapter):
         """
         if not self.__authenticate(admin, password):
             return
-
-            # Überprüft, ob der admin autorisiert ist diese Operation auszuführen
-        if not self.__authenticate(admin, password):
-            return
-            # Ist der eindeutige Identifikator des gesuchten Nutzers
-        identifier = str(user.identifier)
-
-        with open(self.__path, "r") as f:
-            lines = f.readlines()
-
-        file = open(self.__path, "r")
-        # Zählvariable der For-Schleife
-        i = 0
-        for token_str in file:
-            # Bereitet den String vor, indem unnötige Zeichen entfernt werden
-            token_str = token_str.strip()
-            token_str = token_str.split(":")
-            # Speichert den String der Nutzerdaten
-            user_data_str = token_str[0]
-            # Aufgetrennter string der nutzerdaten
-            user_data = user_data_str.split(";")
-
-            # Wenn in der Datei der identifier gleich der identifier des zu überprüfenden nutzers ist
-            if user_data[1] == identifier:
-                file.close()
-                # Öffne Datei im schreibmodus => Datei ist nun leer
-                file = open(self.__path, "w")
-                for j in range(len(lines)):
-                    # Schreibe alle Daten wieder in die Datei zurück außer die zu ändernde
-                    if j != i:
-                        # Da nicht jede Zeile ein \n haben muss aber haben kann:
-                        file.write(lines[j].strip() + "\n")
-                # Schreibt den Nutzer, dessen Daten gelöscht wurden, wieder in die Datei
-                file.write(user_data_str + ":")
-                file.close()
-                break
-            i = i + 1
-        file.close()
+        self.__store.delete_all_tokens(str(user.identifier))
 
     def get_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser):
         """
@@ -310,22 +179,7 @@ class ServerAdapterFromPythonFilemanager(ServerAdapter):
         """
         if not self.__authenticate(admin, password):
             return ""
-
-        identifier = user.identifier.__repr__()
-
-        with open(self.__path, "r") as f:
-            lines = f.readlines()
-
-        for line in lines:
-            split = line.split(":")
-            user_data = split[0].split(";")
-
-            if user_data[1] == identifier:
-                ret = line.strip("\n")
-                f.close()
-                return ret
-
-        return ""
+        return self.__store.get_user_line(str(user.identifier))
 
     def get_all_valid_tokens(self, admin: UnauthenticatedUser, password: Password) -> list:
         """
@@ -341,18 +195,106 @@ class ServerAdapterFromPythonFilemanager(ServerAdapter):
 
         if not self.__authenticate(admin, password):
             return list()
+        return [AuthorizedNFCToken(Identifier(token)) for token in self.__store.get_all_tokens()]
+
+    def add_change_listener(self, listener) -> bool:
+        """
+        Registriert eine Funktion, die aufgerufen wird, sobald sich die Datei der validen Tokens oder ihr Journal
+        ändern. Die Dateien werden dafür über inotify überwacht.
+
+        :param listener: Ist die Funktion ohne Parameter, die aufgerufen werden soll.
+        :type listener: Callable.
+        :return: True, da dieser Adapter Änderungen meldet.
+        :rtype: bool.
+        """
+        self.__store.add_change_listener(listener, self.__pi_conf.token_watch_debounce)
+        return True
+
+    def remove_change_listener(self, listener):
+        """
+        Entfernt eine mit add_change_listener registrierte Funktion wieder.
+
+        :param listener: Ist die Funktion, die entfernt werden soll.
+        :type listener: Callable.
+        """
+        self.__store.remove_change_listener(listener)
+
+    def get_token_generation(self) -> int:
+        """
+        Gibt die Generation des Inhalts der Datei zurück. Sie ändert sich nur, wenn sich die Datei oder ihr Journal
+        geändert haben.
+
+        :return: Die aktuelle Generation.
+        :rtype: int.
+        """
+        return self.__store.generation()
+
+    def get_token_changes_since(self, admin: UnauthenticatedUser, password: Password, version) -> TokenChanges:
+        """
+        Gibt die Änderungen an den validen Tokens seit der angegebenen Generation zurück. Nur autorisierte Nutzer
+        dürfen diese Operation ausführen. Ist die Generation nicht mehr in der Historie des Speichers enthalten,
+        wird der vollständige Stand zurückgegeben.
 
-        with open(self.__path, "r") as f:
-            lines = f.readlines()
-        # Liste, in die alle gefundenen Token gespeichert werden sollen
-        token_list = list()
-        # Iteriert durch alle Nutzer
-        for line in lines:
-            line_split = line.split(":")
-            tokens_split = line_split[1].split(";")
-            # Geht alle Token eines Nutzers durch und speichert diese in der Liste
-            for tk in tokens_split:
-                tk = tk.strip()
-                if tk != "":
-                    token_list.append(AuthorizedNFCToken(Identifier(tk)))
-        return token_list
\ No newline at end of file
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :param version: Ist die Generation aus der letzten Abfrage oder None.
+        :type version: int
+        :return: Die Änderungen und die neue Generation.
+        :rtype: TokenChanges.
+        """
+        if not self.__authenticate(admin, password):
+            return TokenChanges(list(), list(), version, False)
+        changes = self.__store.changes_since(version)
+        if changes is None:
+            generation = self.__store.generation()
+            tokens = [AuthorizedNFCToken(Identifier(token)) for token in self.__store.get_all_tokens()]
+            return TokenChanges(tokens, list(), generation, True)
+        added, removed, generation = changes
+        return TokenChanges([AuthorizedNFCToken(Identifier(token)) for token in added],
+                            [AuthorizedNFCToken(Identifier(token)) for token in removed], generation, False)
+
+    def authenticate(self, admin: UnauthenticatedUser, password: Password) -> bool:
+        """
+        Überprüft, ob ein Admin mit dem Identifikator und dem Passwort in der Datei existiert.
+        :param admin: Ist der Nutzer, der angemeldet werden soll.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Nutzers.
+        :type password: Password.
+        :return: True, wenn Identifikator und Passwort übereinstimmen, anderenfalls False.
+        :rtype: bool.
+        """
+        return self.__authenticate(admin, password)
+
+    def apply_token_operations(self, admin: UnauthenticatedUser, password: Password, operations: list) -> list:
+        """
+        Führt mehrere Änderungen an Tokens gemeinsam aus. Alle Änderungen werden mit einem einzigen Schreibzugriff
+        an das Journal angehängt. Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :param operations: Ist die Liste der Änderungen als Tupel (Operation, Nutzer, Token).
+        :type operations: list.
+        :return: Für jede Änderung True, wenn sie wirksam war, anderenfalls False.
+        :rtype: list.
+        """
+        if not self.__authenticate(admin, password):
+            return [False] * len(operations)
+        store_operations = {self.OPERATION_ADD_TOKEN: TokenStore.OPERATION_ADD,
+                            self.OPERATION_DELETE_TOKEN: TokenStore.OPERATION_DELETE,
+                            self.OPERATION_DELETE_ALL: TokenStore.OPERATION_DELETE_ALL}
+        results = [False] * len(operations)
+        valid = list()
+        indices = list()
+        for index, (operation, user, token) in enumerate(operations):
+            if operation not in store_operations or (token is None) != (operation == self.OPERATION_DELETE_ALL):
+                continue
+            valid.append((store_operations[operation], str(user.identifier),
+                          None if token is None else str(token.identifier)))
+            indices.append(index)
+        # Ein bereits vergebener Token wird vom TokenStore abgelehnt
+        for index, result in zip(indices, self.__store.apply_operations(valid)):
+            results[index] = result
+        return results
@@ -1,46 +1,311 @@
 """
 Dieses Modul deint als Schnittstelle zwischen Python Code und einem LDAP-Server.
+Die Verbindung zum Server wird erst beim ersten Zugriff aufgebaut, sodass das Importieren des Moduls nichts kostet.
+Über die Strategie REUSABLE teilen sich alle Threads einen Pool von Verbindungen. Die Suche über alle Nutzer
+erfolgt seitenweise. Nutzer und erfolgreiche Anmeldungen werden für kurze Zeit zwischengespeichert.
+Welche LDAP-Attribute Identifikator, Name und Tokens eines Nutzers enthalten, wird über die LDAPConfiguration
+festgelegt.
 Classes:
     ServerAdapterFromPythonLDAP: Ist eine Adapter-Klasse als Schnittstelle zu einem LDAP-Server.
 @author Lukas Wittenzellner
-@version 1.0
+@version 1.2
 """
+import hashlib
+import threading
+from contextlib import nullcontext
 
-import sys
-sys.path.append('/home/pi/src-Building-Security-System')
+import ldap3
+from ldap3 import Server, Connection, MODIFY_ADD, MODIFY_DELETE, MODIFY_REPLACE
+from ldap3.core.exceptions import LDAPException, LDAPBindError
+from ldap3.utils.conv import escape_filter_chars
 
-from RaspberryPi.src.data_model.key_token import Token
-from ldap3 import Server, Connection, ALL
-from RaspberryPi.src.door_controller.server_adapter import server_adapter
-from RaspberryPi.src.exceptions.exception import NotImplementedException
+from RaspberryPi.src.data_model.configuration import LDAPConfiguration
+from RaspberryPi.src.data_model.identifier import Identifier
+from RaspberryPi.src.data_model.key_token import AuthorizedNFCToken, Token
+from RaspberryPi.src.data_model.password import Password
 from RaspberryPi.src.data_model.user import UnauthenticatedUser
+from RaspberryPi.src.door_controller.entities.log import LogError
+from RaspberryPi.src.door_controller.server_adapter.server_adapter import ServerAdapter
+from RaspberryPi.src.door_controller.server_adapter.ttl_cache import TTLCache
 
 
-USER_DN = "dc=example,dc=com"  # Ist der Suchzweig im LDAP
-SERVER_TOKEN_FILTER = "mail=*"  # Ist der Filter für das Finden von Tokens
-SERVER_IP_ADRESS = "ldap.forumsys.com"  # Ist die IP-Adresse bzw. der hostname des LDAP-Servers
+class ServerAdapterFromPythonLDAP(ServerAdapter):
+    """
+    Ist eine Adapter-Klasse als Schnittstelle zu einem LDAP-Server.
+    Sie implementiert alle abstrakten Methoden der Elternklasse ServerAdapter.
+    Ein Admin authentifiziert sich, indem mit seinem Eintrag und seinem Passwort eine Bindung zum Server aufgebaut
+    wird. Alle übrigen Operationen laufen über die Verbindung des Dienstkontos aus der LDAPConfiguration.
+    Methods:
+        get_connection: Gibt die Verbindung des Dienstkontos zurück und baut sie bei Bedarf auf.
+        add_token_to_user: Fügt einem Nutzer einen Token hinzu.
+        delete_token_from_user: Löscht einen Token von einem Nutzer.
+        delete_all_tokens_from_user: Löscht alle Tokens eines Nutzers.
+        get_user: Gibt die Daten eines Nutzers zurück.
+        get_all_valid_tokens: Gibt eine Liste aller validen Token zurück.
+        authenticate: Überprüft Identifikator und Passwort eines Admins.
+    """
+    # Platzhalter für das Passwort in der Rückgabe von get_user, das Passwort verlässt den LDAP-Server nie
+    PASSWORD_PLACEHOLDER = "*"
 
-ADMIN_NAME = ''  # Ist der Login-Name des Nutzers, über den die Verbindung zum Server aufgebaut werden soll
-ADMIN_PASSWORD = ''  # Ist des Login-Passwort des Nutzers, über den die Verbindung zum Server aufgebaut werden soll
+    def __init__(self, ldap_conf: LDAPConfiguration = None):
+        """
+        Konstruktor für eine ServerAdapterFromPythonLDAP Instanz. Es wird noch keine Verbindung aufgebaut.
+        :param ldap_conf: Ist die Konfiguration des LDAP-Servers. Ohne Angabe werden die Standardwerte verwendet.
+        :type ldap_conf: LDAPConfiguration
+        """
+        self.__ldap_conf = ldap_conf if ldap_conf is not None else LDAPConfiguration()
+        self.__server = None
+        self.__connection = None
+        self.__connection_lock = threading.Lock()
+        # Synchrone Strategien teilen ihr Ergebnis über die Verbindung und dürfen nur von einem Thread genutzt werden
+        self.__operation_lock = threading.RLock()
+        self.__user_cache = TTLCache(self.__ldap_conf.cache_ttl, self.__ldap_conf.cache_size)
+        self.__auth_cache = TTLCache(self.__ldap_conf.cache_ttl, self.__ldap_conf.cache_size)
 
-SERVER = Server(SERVER_IP_ADRESS, get_info=ALL)
-CONNECTION = Connection(SERVER, user=ADMIN_NAME, password=ADMIN_PASSWORD, auto_bind=True)
+    def get_connection(self) -> Connection:
+        """
+        Gibt die Verbindung des Dienstkontos zurück. Beim ersten Aufruf wird sie erzeugt, geöffnet und gebunden
+        wird sie aber erst mit der ersten Operation.
+        :return: Die Verbindung des Dienstkontos.
+        :rtype: Connection
+        """
+        with self.__connection_lock:
+            if self.__connection is None:
+                self.__server = Server(self.__ldap_conf.server_address, port=self.__ldap_conf.server_port,
+                                       use_ssl=self.__ldap_conf.use_ssl, get_info=ldap3.NONE,
+                                       connect_timeout=self.__ldap_conf.connect_timeout)
+                self.__connection = Connection(self.__server, user=self.__ldap_conf.bind_dn or None,
+                                               password=self.__ldap_conf.bind_password or None,
+                                               client_strategy=getattr(ldap3, self.__ldap_conf.client_strategy),
+                                               pool_name="DoorControl", pool_size=self.__ldap_conf.pool_size,
+                                               pool_lifetime=self.__ldap_conf.pool_lifetime,
+                                               raise_exceptions=False)
+            return self.__connection
 
+    def __bound_connection(self) -> Connection:
+        # Gibt die Verbindung zurück und bindet sie, falls sie noch nicht oder nicht mehr gebunden ist
+        connection = self.get_connection()
+        with self.__connection_lock:
+            if connection.closed or not connection.bound:
+                if not connection.bind():
+                    raise LDAPBindError("Bindung des Dienstkontos fehlgeschlagen: " + str(connection.result))
+        return connection
 
-class ServerAdapterFromPythonLDAP(server_adapter):
+    def __run(self, operation: str, *args, **kwargs):
+        # Führt eine Operation strategieunabhängig aus und gibt Ergebnis und Antwort des Servers zurück
+        connection = self.__bound_connection()
+        strategy = connection.strategy
+        if not strategy.sync:
+            message_id = getattr(connection, operation)(*args, **kwargs)
+            response, result = connection.get_response(message_id)
+            return result, response
+        with self.__operation_lock:
+            returned = getattr(connection, operation)(*args, **kwargs)
+            if getattr(strategy, "thread_safe", False):
+                _, result, response, _ = returned
+                return result, response
+            return connection.result, connection.response
 
-    def add_token_to_user(self, user: UnauthenticatedUser, token: Token):
-        raise NotImplementedException("LDAP-Methoden werden aktuell noch nicht unterstützt!")
+    def __search_user(self, identifier: str):
+        # Gibt (DN, Attribute) des Nutzers zurück oder None, wenn er nicht existiert
+        search_filter = "(&" + self.__ldap_conf.user_filter + "(" + self.__ldap_conf.attribute_identifier + "=" \
+                        + escape_filter_chars(identifier) + "))"
+        attributes = [self.__ldap_conf.attribute_identifier, self.__ldap_conf.attribute_first_name,
+                      self.__ldap_conf.attribute_last_name, self.__ldap_conf.attribute_tokens]
+        _, response = self.__run("search", self.__ldap_conf.search_base, search_filter, attributes=attributes,
+                                 size_limit=1)
+        for entry in response or []:
+            if entry.get("type") == "searchResEntry":
+                return entry["dn"], entry["attributes"]
+        return None
 
-    def delete_token_from_user(self, admin: UnauthenticatedUser, user: UnauthenticatedUser, token: Token):
-        raise NotImplementedException("LDAP-Methoden werden aktuell noch nicht unterstützt!")
+    def __authenticate(self, user: UnauthenticatedUser, password: Password) -> bool:
+        identifier = str(user.identifier)
+        # Zwischengespeichert wird nur ein Hash des Passworts
+        key = (identifier, hashlib.sha256(password.password.encode()).hexdigest())
+        if self.__auth_cache.get(key):
+            return True
+        try:
+            found = self.__search_user(identifier)
+            if found is not None and password.password != "":
+                strategy = ldap3.MOCK_SYNC if self.__ldap_conf.client_strategy.startswith("MOCK") else ldap3.SYNC
+                connection = Connection(self.get_connection().server, user=found[0], password=password.password,
+                                        client_strategy=strategy, read_only=True, raise_exceptions=False)
+                try:
+                    if connection.bind():
+                        self.__auth_cache.put(key, True)
+                        return True
+                finally:
+                    connection.unbind()
+        except LDAPException as e:
+            LogError.get_instance().send_log_msg("Fehler bei der Verbindung zum LDAP-Server: " + str(e))
+            return False
+        LogError.get_instance().send_log_msg("Authentifizierung des Admins fehlgeschlagen!")
+        return False
 
-    def delete_all_tokens_from_user(self, admin: UnauthenticatedUser, user: UnauthenticatedUser):
-        raise NotImplementedException("LDAP-Methoden werden aktuell noch nicht unterstützt!")
+    def __modify_tokens(self, user: UnauthenticatedUser, change) -> bool:
+        identifier = str(user.identifier)
+        try:
+            found = self.__search_user(identifier)
+            if found is None:
+                return False
+            result, _ = self.__run("modify", found[0], {self.__ldap_conf.attribute_tokens: [change]})
+        except LDAPException as e:
+            LogError.get_instance().send_log_msg("Fehler bei der Verbindung zum LDAP-Server: " + str(e))
+            return False
+        finally:
+            self.__user_cache.invalidate(identifier)
+        return result is not None and result.get("result") == 0
 
-    def get_user(self, admin: UnauthenticatedUser, user: UnauthenticatedUser):
-        raise NotImplementedException("LDAP-Methoden werden aktuell noch nicht unterstützt!")
+    def __token_exists(self, token: Token) -> bool:
+        search_filter = "(&" + self.__ldap_conf.user_filter + "(" + self.__ldap_conf.attribute_tokens + "=" \
+                        + escape_filter_chars(str(token.identifier)) + "))"
+        _, response = self.__run("search", self.__ldap_conf.search_base, search_filter,
+                                 attributes=[self.__ldap_conf.attribute_identifier], size_limit=1)
+        return any(entry.get("type") == "searchResEntry" for entry in response or [])
 
-    def get_all_valid_tokens(self, admin: UnauthenticatedUser):
-        raise NotImplementedException("LDAP-Methoden werden aktuell noch nicht unterstützt!")
+    def add_token_to_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser,
+                          token: Token):
+        """
+        Fügt einem Nutzer einen Token hinzu. Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :param user: Ist der Nutzer, dem ein Token hinzugefügt werden soll.
+        :type user: UnauthenticatedUser.
+        :param token: Ist der Token, der dem Nutzer hinzugefügt werden soll.
+        :type token: Token.
+        """
+        if not self.__authenticate(admin, password):
+            return
+        try:
+            # Überprüft, ob der Token bereits existiert, um Doppelungen zu vermeiden
+            if self.__token_exists(token):
+                return
+        except LDAPException as e:
+            LogError.get_instance().send_log_msg("Fehler bei der Verbindung zum LDAP-Server: " + str(e))
+            return
+        self.__modify_tokens(user, (MODIFY_ADD, [str(token.identifier)]))
+
+    def delete_token_from_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser,
+                               token: Token):
+        """
+        Löscht einen Token von einem Nutzer. Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :param user: Ist der Nutzer, von dem ein Token gelöscht werden soll.
+        :type user: UnauthenticatedUser.
+        :param token: Ist der Token, der gelöscht werden soll.
+        :type token: Token.
+        """
+        if not self.__authenticate(admin, password):
+            return
+        self.__modify_tokens(user, (MODIFY_DELETE, [str(token.identifier)]))
+
+    def delete_all_tokens_from_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser):
+        """
+        Löscht alle Tokens eines Nutzers. Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :param user: Ist der Nutzer, von dem alle Token gelöscht werden sollen.
+        :type user: UnauthenticatedUser.
+        """
+        if not self.__authenticate(admin, password):
+            return
+        self.__modify_tokens(user, (MODIFY_REPLACE, []))
+
+    def get_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser):
+        """
+        Gibt die Daten eines Nutzers zurück. Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        Das Format entspricht dem des ServerAdapterFromPythonFilemanager, anstelle des Passworts wird jedoch
+        ein Platzhalter zurückgegeben.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins.
+        :type password: Password.
+        :param user: Ist der Nutzer, dessen Daten zurückgegeben werden sollen.
+        :type user: UnauthenticatedUser.
+        :return: Den Nutzer und dessen Daten oder einen leeren String, wenn der Nutzer nicht existiert.
+        :rtype: str
+        """
+        if not self.__authenticate(admin, password):
+            return ""
+        identifier = str(user.identifier)
+        line = self.__user_cache.get(identifier)
+        if line is not None:
+            return line
+        try:
+            found = self.__search_user(identifier)
+        except LDAPException as e:
+            LogError.get_instance().send_log_msg("Fehler bei der Verbindung zum LDAP-Server: " + str(e))
+            return ""
+        if found is None:
+            return ""
+        attributes = found[1]
+        line = self.__first(attributes, self.__ldap_conf.attribute_last_name) + "," \
+            + self.__first(attributes, self.__ldap_conf.attribute_first_name) + ";" + identifier + ";" \
+            + self.PASSWORD_PLACEHOLDER + ":" + ";".join(self.__values(attributes, self.__ldap_conf.attribute_tokens))
+        self.__user_cache.put(identifier, line)
+        return line
+
+    def get_all_valid_tokens(self, admin: UnauthenticatedUser, password: Password) -> list:
+        """
+        Gibt eine Liste aller validen Token zurück. Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        Die Nutzer werden seitenweise abgefragt, damit auch große Verzeichnisse die Größenbeschränkung des Servers
+        nicht überschreiten.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :return: Liste aller validen Tokens.
+        :rtype: Liste von Tokens.
+        """
+        if not self.__authenticate(admin, password):
+            return list()
+        search_filter = "(&" + self.__ldap_conf.user_filter + "(" + self.__ldap_conf.attribute_tokens + "=*))"
+        tokens = list()
+        try:
+            connection = self.__bound_connection()
+            # Bei synchronen Strategien ist die Verbindung für die Dauer aller Seiten belegt
+            with self.__operation_lock if connection.strategy.sync else nullcontext():
+                entries = connection.extend.standard.paged_search(self.__ldap_conf.search_base, search_filter,
+                                                                  attributes=[self.__ldap_conf.attribute_tokens],
+                                                                  paged_size=self.__ldap_conf.page_size,
+                                                                  generator=True)
+                for entry in entries:
+                    if entry.get("type") == "searchResEntry":
+                        tokens.extend(self.__values(entry["attributes"], self.__ldap_conf.attribute_tokens))
+        except LDAPException as e:
+            LogError.get_instance().send_log_msg("Fehler bei der Verbindung zum LDAP-Server: " + str(e))
+            return list()
+        return [AuthorizedNFCToken(Identifier(token)) for token in tokens]
+
+    def authenticate(self, admin: UnauthenticatedUser, password: Password) -> bool:
+        """
+        Überprüft, ob sich ein Admin mit dem Identifikator und dem Passwort am LDAP-Server anmelden kann.
+        :param admin: Ist der Nutzer, der angemeldet werden soll.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Nutzers.
+        :type password: Password.
+        :return: True, wenn die Anmeldung erfolgreich ist, anderenfalls False.
+        :rtype: bool.
+        """
+        return self.__authenticate(admin, password)
+
+    @staticmethod
+    def __values(attributes: dict, name: str) -> list:
+        values = attributes.get(name, [])
+        if isinstance(values, (str, bytes)):
+            values = [values]
+        return [value.decode() if isinstance(value, bytes) else str(value) for value in values]
+
+    @staticmethod
+    def __first(attributes: dict, name: str) -> str:
+        values = ServerAdapterFromPythonLDAP.__values(attributes, name)
+        return values[0] if len(values) > 0 else ""
 
@@ -0,0 +1,387 @@
+"""
+Dieses Modul dient als Adapter einer SQLite-Datenbank für das Verwalten von Nutzern und deren Tokens.
+Nutzer und Tokens liegen in eigenen Tabellen mit Indizes auf dem Identifikator des Nutzers und dem Token.
+Die Datenbank läuft im WAL-Modus, sodass lesende Zugriffe nie durch einen schreibenden blockiert werden.
+Alle Anfragen sind feste, parametrisierte SQL-Anweisungen und werden daher von sqlite3 nur einmal übersetzt.
+Jede Änderung an den Tokens wird über Trigger in einer Tabelle protokolliert, aus der get_token_changes_since
+beantwortet wird.
+Ist die Datenbank beim ersten Zugriff leer, werden die Nutzer einmalig aus der Textdatei der validen Tokens
+übernommen. Passwörter werden als gesalzene Hashes gespeichert, noch im Klartext gespeicherte Passwörter werden
+beim ersten Zugriff einmalig umgestellt.
+Classes:
+    ServerAdapterFromSQLite: Diese Klasse stellt die Schnittstelle zwischen einer SQLite-Datenbank und Python dar.
+    Sie implementiert alle abstrakten Methoden der Elternklasse ServerAdapter.
+@author Lukas Wittenzellner
+@version 1.2
+"""
+import os
+import sqlite3
+import threading
+
+from RaspberryPi.src.data_model.configuration import PiConfiguration
+from RaspberryPi.src.data_model.key_token import AuthorizedNFCToken, Identifier, Token
+from RaspberryPi.src.data_model.password import Password
+from RaspberryPi.src.data_model.user import UnauthenticatedUser
+from RaspberryPi.src.door_controller.entities.log import LogError, LogInfo
+from RaspberryPi.src.door_controller.server_adapter.password_hasher import PasswordHasher
+from RaspberryPi.src.door_controller.server_adapter.server_adapter import ServerAdapter
+from RaspberryPi.src.door_controller.server_adapter.token_changes import TokenChanges
+from RaspberryPi.src.door_controller.server_adapter.token_store import UserRecord
+
+
+class ServerAdapterFromSQLite(ServerAdapter):
+    """
+    Diese Klasse stellt die Schnittstelle zwischen einer SQLite-Datenbank und Python dar.
+    Sie implementiert alle abstrakten Methoden der Elternklasse ServerAdapter.
+    Jeder Thread verwendet eine eigene Verbindung zur Datenbank.
+    Methods:
+        migrate_from_text_file: Übernimmt die Nutzer aus einer Textdatei im Format der validen Tokens.
+        add_token_to_user: Fügt einem Nutzer einen Token hinzu.
+        delete_token_from_user: Löscht einen Token von einem Nutzer.
+        delete_all_tokens_from_user: Löscht alle Tokens eines Nutzers.
+        get_user: Gibt die Daten eines Nutzers zurück.
+        get_all_valid_tokens: Gibt eine Liste aller validen Token zurück.
+        get_token_generation: Gibt die Nummer der letzten Änderung an den Tokens zurück.
+        get_token_changes_since: Gibt die Änderungen an den validen Tokens seit einer Nummer zurück.
+        authenticate: Überprüft Identifikator und Passwort eines Admins.
+        apply_token_operations: Führt mehrere Änderungen an Tokens in einer Transaktion aus.
+    """
+    __SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS users (id TEXT PRIMARY KEY, name TEXT NOT NULL, password TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS tokens (token TEXT PRIMARY KEY, "
+        "user_id TEXT NOT NULL REFERENCES users(id) ON DELETE CASCADE)",
+        "CREATE INDEX IF NOT EXISTS tokens_user_id ON tokens(user_id)",
+        "CREATE TABLE IF NOT EXISTS token_changes (version INTEGER PRIMARY KEY AUTOINCREMENT, "
+        "token TEXT NOT NULL, added INTEGER NOT NULL)",
+        "CREATE TRIGGER IF NOT EXISTS tokens_inserted AFTER INSERT ON tokens BEGIN "
+        "INSERT INTO token_changes (token, added) VALUES (NEW.token, 1); END",
+        "CREATE TRIGGER IF NOT EXISTS tokens_deleted AFTER DELETE ON tokens BEGIN "
+        "INSERT INTO token_changes (token, added) VALUES (OLD.token, 0); END",
+    )
+    __SELECT_PASSWORD = "SELECT password FROM users WHERE id = ?"
+    __SELECT_USER = "SELECT name, password FROM users WHERE id = ?"
+    __SELECT_TOKEN_EXISTS = "SELECT 1 FROM tokens WHERE token = ?"
+    __SELECT_USER_TOKENS = "SELECT token FROM tokens WHERE user_id = ? ORDER BY rowid"
+    __SELECT_ALL_TOKENS = "SELECT token FROM tokens"
+    __SELECT_USER_COUNT = "SELECT COUNT(*) FROM users"
+    __SELECT_PASSWORDS = "SELECT id, password FROM users"
+    __SELECT_VERSION = "SELECT seq FROM sqlite_sequence WHERE name = 'token_changes'"
+    __SELECT_CHANGES = "SELECT version, token, added FROM token_changes WHERE version > ? ORDER BY version"
+    __INSERT_USER = "INSERT OR IGNORE INTO users (id, name, password) VALUES (?, ?, ?)"
+    __INSERT_TOKEN = "INSERT OR IGNORE INTO tokens (token, user_id) SELECT ?, id FROM users WHERE id = ?"
+    __UPDATE_PASSWORD = "UPDATE users SET password = ? WHERE id = ? AND password = ?"
+    __DELETE_TOKEN = "DELETE FROM tokens WHERE token = ? AND user_id = ?"
+    __DELETE_USER_TOKENS = "DELETE FROM tokens WHERE user_id = ?"
+    __TRIM_CHANGES = "DELETE FROM token_changes WHERE version <= ?"
+
+    # Pfade, deren Datenbank bereits eingerichtet wurde -> PasswordHasher dieser Datenbank
+    __initialized = dict()
+    __initialized_lock = threading.Lock()
+    # Verbindungen je Thread und Pfad
+    __local = threading.local()
+
+    def __init__(self, path: str = None, migration_path: str = None):
+        """
+        Konstruktor für eine ServerAdapterFromSQLite Instanz.
+        :param path: Ist der Pfad zur Datenbank. Ohne Angabe wird der Pfad aus der PiConfiguration verwendet.
+        :type path: str
+        :param migration_path: Ist der Pfad zur Textdatei, aus der eine leere Datenbank einmalig befüllt wird.
+            Ohne Angabe wird der Pfad der validen Tokens aus der PiConfiguration verwendet.
+        :type migration_path: str
+        """
+        self.__pi_conf = PiConfiguration()
+        self.__path = path if path is not None else self.__pi_conf.path_sqlite_database
+        self.__history_size = self.__pi_conf.token_change_history
+        with ServerAdapterFromSQLite.__initialized_lock:
+            if self.__path not in ServerAdapterFromSQLite.__initialized:
+                # Der Zwischenspeicher der Überprüfungen wird von allen Adaptern derselben Datenbank geteilt
+                self.__hasher = PasswordHasher(self.__pi_conf.password_hash_iterations,
+                                               self.__pi_conf.credential_cache_ttl,
+                                               self.__pi_conf.credential_cache_size)
+                self.__create_schema()
+                migration_path = migration_path if migration_path is not None else self.__pi_conf.path_valid_tokens
+                if self.__count_users() == 0 and os.path.exists(migration_path):
+                    self.migrate_from_text_file(migration_path)
+                self.__migrate_passwords()
+                ServerAdapterFromSQLite.__initialized[self.__path] = self.__hasher
+            self.__hasher = ServerAdapterFromSQLite.__initialized[self.__path]
+
+    def __connection(self) -> sqlite3.Connection:
+        # Gibt die Verbindung des aktuellen Threads zurück und öffnet sie bei Bedarf
+        connections = getattr(ServerAdapterFromSQLite.__local, "connections", None)
+        if connections is None:
+            connections = dict()
+            ServerAdapterFromSQLite.__local.connections = connections
+        connection = connections.get(self.__path)
+        if connection is None:
+            # Transaktionen werden explizit begonnen, siehe __write
+            connection = sqlite3.connect(self.__path, isolation_level=None, cached_statements=64)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.execute("PRAGMA busy_timeout=5000")
+            connections[self.__path] = connection
+        return connection
+
+    def __write(self, statements: list) -> list:
+        # Führt die Anweisungen in einer Transaktion aus und gibt die Anzahl geänderter Zeilen je Anweisung zurück
+        connection = self.__connection()
+        changed = list()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for statement, parameters in statements:
+                changed.append(connection.execute(statement, parameters).rowcount)
+            if sum(changed) > 0:
+                version = self.__version(connection)
+                connection.execute(self.__TRIM_CHANGES, (version - self.__history_size,))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return changed
+
+    def __create_schema(self):
+        connection = self.__connection()
+        for statement in self.__SCHEMA:
+            connection.execute(statement)
+
+    def __count_users(self) -> int:
+        return self.__connection().execute(self.__SELECT_USER_COUNT).fetchone()[0]
+
+    def __version(self, connection: sqlite3.Connection) -> int:
+        row = connection.execute(self.__SELECT_VERSION).fetchone()
+        return row[0] if row is not None else 0
+
+    def migrate_from_text_file(self, path: str) -> int:
+        """
+        Übernimmt die Nutzer und Tokens aus einer Textdatei im Format "Nachname,Vorname;Identifikator;Passwort:
+        Token1;Token2" in einer einzigen Transaktion. Bereits vorhandene Nutzer und Tokens bleiben unverändert.
+        Passwörter im Klartext werden dabei als Hash gespeichert.
+        :param path: Ist der Pfad zur Textdatei.
+        :type path: str
+        :return: Die Anzahl der übernommenen Nutzer.
+        :rtype: int
+        """
+        users = list()
+        tokens = list()
+        with open(path, "r") as file:
+            for line in file:
+                record = UserRecord.parse(line.strip())
+                if record is None:
+                    continue
+                password = record.password if PasswordHasher.is_hashed(record.password) \
+                    else self.__hasher.hash(record.password)
+                users.append((self.__INSERT_USER, (record.identifier, record.user_data.split(";")[0], password)))
+                tokens += [(self.__INSERT_TOKEN, (token, record.identifier)) for token in record.tokens]
+        self.__write(users + tokens)
+        LogInfo.get_instance().send_log_msg("Es wurden " + str(len(users)) + " Nutzer aus der Datei " + path
+                                            + " in die Datenbank " + self.__path + " übernommen")
+        return len(users)
+
+    def __migrate_passwords(self):
+        # Stellt noch im Klartext gespeicherte Passwörter auf Hashes um, ist danach ohne Schreibzugriff
+        rows = self.__connection().execute(self.__SELECT_PASSWORDS).fetchall()
+        updates = [(self.__UPDATE_PASSWORD, (self.__hasher.hash(password), identifier, password))
+                   for identifier, password in rows if not PasswordHasher.is_hashed(password)]
+        if len(updates) == 0:
+            return
+        self.__write(updates)
+        LogInfo.get_instance().send_log_msg("Es wurden " + str(len(updates)) + " Passwörter in der Datenbank "
+                                            + self.__path + " auf Hashes umgestellt")
+
+    def __authenticate(self, user: UnauthenticatedUser, password: Password) -> bool:
+        identifier = str(user.identifier)
+        row = self.__connection().execute(self.__SELECT_PASSWORD, (identifier,)).fetchone()
+        # Eine zwischengespeicherte Überprüfung gilt nur, solange der gespeicherte Hash unverändert ist
+        if row is not None and self.__hasher.verify(identifier, password.password, row[0]):
+            return True
+        LogError.get_instance().send_log_msg("Authentifizierung des Admins fehlgeschlagen!")
+        return False
+
+    def __check_token_exists(self, token: Token) -> bool:
+        return self.__connection().execute(self.__SELECT_TOKEN_EXISTS, (str(token.identifier),)).fetchone() \
+            is not None
+
+    def add_token_to_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser,
+                          user_token: Token):
+        """
+        Fügt einem Nutzer einen Token hinzu. Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :param user: Ist der Nutzer, dem ein Token hinzugefügt werden soll.
+        :type user: UnauthenticatedUser.
+        :param user_token: Ist der Token, der dem Nutzer hinzugefügt werden soll.
+        :type user_token: Token.
+        """
+        if not self.__authenticate(admin, password):
+            return
+        # Ein bereits vergebener Token wird durch den Primärschlüssel ignoriert
+        self.__write([(self.__INSERT_TOKEN, (str(user_token.identifier), str(user.identifier)))])
+
+    def delete_token_from_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser,
+                               token: Token):
+        """
+        Löscht einen Token von einem Nutzer. Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :param user: Ist der Nutzer, von dem ein Token gelöscht werden soll.
+        :type user: UnauthenticatedUser.
+        :param token: Ist der Token, der gelöscht werden soll.
+        :type token: Token.
+        """
+        if not self.__authenticate(admin, password):
+            return
+        self.__write([(self.__DELETE_TOKEN, (str(token.identifier), str(user.identifier)))])
+
+    def delete_all_tokens_from_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser):
+        """
+        Löscht alle Tokens eines Nutzers. Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :param user: Ist der Nutzer, von dem alle Token gelöscht werden sollen.
+        :type user: UnauthenticatedUser.
+        """
+        if not self.__authenticate(admin, password):
+            return
+        self.__write([(self.__DELETE_USER_TOKENS, (str(user.identifier),))])
+
+    def get_user(self, admin: UnauthenticatedUser, password: Password, user: UnauthenticatedUser):
+        """
+        Gibt die Daten eines Nutzers im Format der Textdatei der validen Tokens zurück.
+        Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins.
+        :type password: Password.
+        :param user: Ist der Nutzer, dessen Daten zurückgegeben werden sollen.
+        :type user: UnauthenticatedUser.
+        :return: Den Nutzer und dessen Daten oder einen leeren String, wenn der Nutzer nicht existiert.
+        :rtype: str
+        """
+        if not self.__authenticate(admin, password):
+            return ""
+        connection = self.__connection()
+        identifier = str(user.identifier)
+        row = connection.execute(self.__SELECT_USER, (identifier,)).fetchone()
+        if row is None:
+            return ""
+        tokens = [token for (token,) in connection.execute(self.__SELECT_USER_TOKENS, (identifier,))]
+        return row[0] + ";" + identifier + ";" + row[1] + ":" + ";".join(tokens)
+
+    def get_all_valid_tokens(self, admin: UnauthenticatedUser, password: Password) -> list:
+        """
+        Gibt eine Liste aller validen Token zurück. Nur autorisierte Nutzer dürfen diese Operation ausführen.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :return: Liste aller validen Tokens.
+        :rtype: Liste von Tokens.
+        """
+        if not self.__authenticate(admin, password):
+            return list()
+        return [AuthorizedNFCToken(Identifier(token))
+                for (token,) in self.__connection().execute(self.__SELECT_ALL_TOKENS)]
+
+    def get_token_generation(self) -> int:
+        """
+        Gibt die Nummer der letzten Änderung an den Tokens zurück.
+        :return: Die Nummer der letzten Änderung.
+        :rtype: int.
+        """
+        return self.__version(self.__connection())
+
+    def get_token_changes_since(self, admin: UnauthenticatedUser, password: Password, version) -> TokenChanges:
+        """
+        Gibt die Änderungen an den validen Tokens seit der angegebenen Nummer zurück. Nur autorisierte Nutzer
+        dürfen diese Operation ausführen. Sind die Änderungen seit dieser Nummer nicht mehr vollständig
+        protokolliert, wird der vollständige Stand zurückgegeben.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :param version: Ist die Nummer aus der letzten Abfrage oder None.
+        :type version: int
+        :return: Die Änderungen und die neue Nummer.
+        :rtype: TokenChanges.
+        """
+        if not self.__authenticate(admin, password):
+            return TokenChanges(list(), list(), version, False)
+        connection = self.__connection()
+        # Protokoll und Tokens werden in derselben Lesetransaktion gelesen
+        connection.execute("BEGIN")
+        try:
+            current = self.__version(connection)
+            rows = connection.execute(self.__SELECT_CHANGES, (version,)).fetchall() if version is not None else []
+            complete = version is not None and version <= current \
+                and (len(rows) == 0 or rows[0][0] == version + 1)
+            if not complete:
+                tokens = [AuthorizedNFCToken(Identifier(token))
+                          for (token,) in connection.execute(self.__SELECT_ALL_TOKENS)]
+                return TokenChanges(tokens, list(), current, True)
+        finally:
+            connection.execute("COMMIT")
+        added = set()
+        removed = set()
+        for _, token, is_added in rows:
+            if is_added:
+                if token in removed:
+                    removed.discard(token)
+                else:
+                    added.add(token)
+            elif token in added:
+                added.discard(token)
+            else:
+                removed.add(token)
+        return TokenChanges([AuthorizedNFCToken(Identifier(token)) for token in added],
+                            [AuthorizedNFCToken(Identifier(token)) for token in removed], current, False)
+
+    def authenticate(self, admin: UnauthenticatedUser, password: Password) -> bool:
+        """
+        Überprüft, ob ein Admin mit dem Identifikator und dem Passwort in der Datenbank existiert.
+        :param admin: Ist der Nutzer, der angemeldet werden soll.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Nutzers.
+        :type password: Password.
+        :return: True, wenn Identifikator und Passwort übereinstimmen, anderenfalls False.
+        :rtype: bool.
+        """
+        return self.__authenticate(admin, password)
+
+    def apply_token_operations(self, admin: UnauthenticatedUser, password: Password, operations: list) -> list:
+        """
+        Führt mehrere Änderungen an Tokens in einer einzigen Transaktion aus. Nur autorisierte Nutzer dürfen diese
+        Operation ausführen.
+        :param admin: Ist der Nutzer, der diese Methode durchführen möchte.
+        :type admin: UnauthenticatedUser.
+        :param password: Ist das Passwort des Admins
+        :type password: Password
+        :param operations: Ist die Liste der Änderungen als Tupel (Operation, Nutzer, Token).
+        :type operations: list.
+        :return: Für jede Änderung True, wenn sie wirksam war, anderenfalls False.
+        :rtype: list.
+        """
+        if not self.__authenticate(admin, password):
+            return [False] * len(operations)
+        results = [False] * len(operations)
+        statements = list()
+        indices = list()
+        for index, (operation, user, token) in enumerate(operations):
+            if operation == self.OPERATION_ADD_TOKEN and token is not None:
+                statements.append((self.__INSERT_TOKEN, (str(token.identifier), str(user.identifier))))
+            elif operation == self.OPERATION_DELETE_TOKEN and token is not None:
+                statements.append((self.__DELETE_TOKEN, (str(token.identifier), str(user.identifier))))
+            elif operation == self.OPERATION_DELETE_ALL and token is None:
+                statements.append((self.__DELETE_USER_TOKENS, (str(user.identifier),)))
+            else:
+                continue
+            indices.append(index)
+        for index, changed in zip(indices, self.__write(statements)):
+            results[index] = changed > 0
+        return results
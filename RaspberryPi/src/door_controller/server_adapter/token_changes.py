@@ -0,0 +1,43 @@
+"""
+Dieses Modul beschreibt das Ergebnis einer Abfrage der Änderungen an den validen Tokens seit einem bekannten Stand.
+Classes:
+    TokenChanges: Enthält die hinzugefügten und gelöschten Tokens sowie den neuen Stand der Datenquelle.
+@author Lukas Wittenzellner
+@version 1.0
+"""
+
+
+class TokenChanges:
+    """
+    Enthält die seit einem bekannten Stand hinzugefügten und gelöschten Tokens sowie den neuen Stand der Datenquelle.
+    Konnte der Adapter die Änderungen seit diesem Stand nicht mehr ermitteln (z.B. weil seine Historie zu kurz ist),
+    enthält added alle validen Tokens und full ist True. Der Empfänger muss dann seine Tokens vollständig ersetzen.
+    Attributes:
+        added: list: Sind die hinzugefügten Tokens, bei einem vollständigen Stand alle validen Tokens.
+        removed: list: Sind die gelöschten Tokens.
+        version: Ist der neue Stand der Datenquelle, der bei der nächsten Abfrage übergeben wird.
+        full: bool: Ist True, wenn added alle validen Tokens enthält.
+    """
+    def __init__(self, added: list, removed: list, version, full: bool):
+        """
+        Konstruktor für eine TokenChanges Instanz.
+        :param added: Sind die hinzugefügten Tokens.
+        :type added: list
+        :param removed: Sind die gelöschten Tokens.
+        :type removed: list
+        :param version: Ist der neue Stand der Datenquelle.
+        :param full: Ist True, wenn added alle validen Tokens enthält.
+        :type full: bool
+        """
+        self.added = added
+        self.removed = removed
+        self.version = version
+        self.full = full
+
+    def is_empty(self) -> bool:
+        """
+        Überprüft, ob sich seit dem bekannten Stand nichts geändert hat.
+        :return: True, wenn es keine Änderungen gibt, anderenfalls False.
+        :rtype: bool
+        """
+        return not self.full and len(self.added) == 0 and len(self.removed) == 0
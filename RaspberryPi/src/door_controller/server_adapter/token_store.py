@@ -0,0 +1,646 @@
+"""
+Dieses Modul hält den Inhalt der Textdatei der validen Tokens im Arbeitsspeicher vor, damit nicht bei jeder Anfrage
+die gesamte Datei eingelesen und zerlegt werden muss.
+Änderungen werden nicht durch Neuschreiben der Textdatei gespeichert, sondern als Einträge an ein Journal angehängt.
+Ein Hintergrund-Thread übernimmt das Journal regelmäßig in eine neue Textdatei (Schreiben und anschließendes
+Umbenennen), sodass ein Absturz die Datei nie abgeschnitten hinterlässt.
+Passwörter werden über einen PasswordHasher überprüft und können einmalig von Klartext auf gesalzene Hashes
+umgestellt werden.
+Classes:
+    UserRecord: Repräsentiert eine Zeile der Textdatei, also einen Nutzer mit seinen Daten und Tokens.
+    TokenStore: Lädt die Textdatei einmalig und hält Hash-Indizes über die Nutzer-IDs und die Tokens vor.
+        Die Datei wird nur dann erneut geladen, wenn sie sich auf dem Datenträger verändert hat.
+@author Lukas Wittenzellner
+@version 1.7
+"""
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from RaspberryPi.src.door_controller.entities.log import LogError
+from RaspberryPi.src.door_controller.server_adapter.file_watcher import FileWatcher
+from RaspberryPi.src.door_controller.server_adapter.password_hasher import PasswordHasher
+from RaspberryPi.src.door_controller.server_adapter.read_write_lock import ReadWriteLock
+
+
+class UserRecord:
+    """
+    Repräsentiert eine Zeile der Textdatei der validen Tokens.
+    Eine Zeile hat das Format "Nachname,Vorname;Identifikator;Passwort:Token1;Token2;...".
+    Attributes:
+        user_data: str: Ist der Teil der Zeile vor dem ":", also Name, Identifikator und Passwort.
+        identifier: str: Ist der Identifikator des Nutzers.
+        password: str: Ist das gespeicherte Passwort des Nutzers, als Hash oder im Klartext.
+        tokens: list: Ist die Liste der Tokens des Nutzers in der Reihenfolge der Datei.
+    """
+    def __init__(self, user_data: str, identifier: str, password: str, tokens: list):
+        self.user_data = user_data
+        self.identifier = identifier
+        self.password = password
+        self.tokens = tokens
+
+    @staticmethod
+    def parse(line: str):
+        """
+        Zerlegt eine Zeile der Textdatei in einen UserRecord.
+        :param line: Ist die Zeile, die zerlegt werden soll.
+        :type line: str
+        :return: Den zerlegten Nutzer oder None, wenn die Zeile nicht dem erwarteten Format entspricht.
+        :rtype: UserRecord
+        """
+        line_split = line.split(":", 1)
+        user_data = line_split[0].split(";")
+        if len(line_split) < 2 or len(user_data) < 3:
+            return None
+        tokens = [token.strip() for token in line_split[1].split(";") if token.strip() != ""]
+        return UserRecord(line_split[0], user_data[1], user_data[2], tokens)
+
+    def set_password(self, password: str):
+        """
+        Ersetzt das gespeicherte Passwort des Nutzers, auch im Teil der Zeile vor dem ":".
+        :param password: Ist das neue gespeicherte Passwort.
+        :type password: str
+        """
+        user_data = self.user_data.split(";")
+        user_data[2] = password
+        self.user_data = ";".join(user_data)
+        self.password = password
+
+    def to_line(self) -> str:
+        """
+        Setzt den Nutzer wieder zu einer Zeile der Textdatei zusammen.
+        :return: Die Zeile ohne abschließenden Zeilenumbruch.
+        :rtype: str
+        """
+        return self.user_data + ":" + ";".join(self.tokens)
+
+
+class TokenStore:
+    """
+    Lädt die Textdatei der validen Tokens einmalig und hält Hash-Indizes über die Nutzer-IDs und die Tokens vor.
+    Vor jedem Zugriff wird anhand des Fingerabdrucks der Datei und des Journals (Änderungszeit, Größe und Inode)
+    geprüft, ob sie sich auf dem Datenträger verändert haben. Nur dann werden sie neu eingelesen.
+
+    Jede Änderung wird als eine Zeile an das Journal angehängt und mit genau einem fsync gesichert.
+    Die erste Zeile der Textdatei enthält eine Sequenznummer, die sich mit jedem Neuschreiben erhöht, und die
+    erste Zeile des Journals die Sequenznummer der Textdatei, auf die sich das Journal bezieht. Ein Kopieren,
+    Berühren oder Zurückspielen der Textdatei verändert die Sequenznummer nicht. Passt sie nicht mehr zur
+    Textdatei (z.B. weil die Datei von Hand ohne Sequenznummer ersetzt wurde oder das Journal bereits übernommen,
+    aber noch nicht geleert wurde), wird das Journal beim Laden verworfen und das Verwerfen geloggt.
+    Eine Textdatei ohne Sequenznummer wird bei der ersten Änderung einmalig mit Sequenznummer neu geschrieben.
+    Für jeden Pfad existiert genau eine Instanz, die über get_instance geteilt wird.
+    Lesende Zugriffe laufen parallel, Änderungen warten fair in einer Warteschlange auf exklusiven Zugriff.
+    Methods:
+        get_instance: Gibt die geteilte Instanz für einen Pfad zurück.
+        authenticate: Überprüft Identifikator und Passwort eines Nutzers.
+        has_token: Überprüft, ob ein Token bereits einem Nutzer zugeordnet ist.
+        get_user_line: Gibt die Zeile eines Nutzers zurück.
+        get_all_tokens: Gibt alle Tokens aller Nutzer zurück.
+        add_token: Fügt einem Nutzer einen Token hinzu.
+        delete_token: Löscht einen Token eines Nutzers.
+        delete_all_tokens: Löscht alle Tokens eines Nutzers.
+        apply_operations: Wendet mehrere Änderungen gemeinsam mit einem einzigen Schreibzugriff an.
+        migrate_passwords: Ersetzt alle im Klartext gespeicherten Passwörter durch gesalzene Hashes.
+        compact: Übernimmt das Journal in eine neue Textdatei und leert es anschließend.
+        add_change_listener: Registriert eine Funktion, die bei einer Änderung der Dateien aufgerufen wird.
+        remove_change_listener: Entfernt eine registrierte Funktion wieder.
+        generation: Gibt die Generation des Inhalts zurück, die sich mit jeder Änderung erhöht.
+        changes_since: Gibt die seit einer Generation hinzugefügten und gelöschten Tokens zurück.
+    """
+    JOURNAL_HEADER = "#base"
+    SNAPSHOT_HEADER = "#sequence"
+    OPERATION_ADD = "add"
+    OPERATION_DELETE = "delete"
+    OPERATION_DELETE_ALL = "deleteAll"
+
+    __instances = dict()
+    __instances_lock = threading.Lock()
+
+    def __init__(self, path: str, journal_path=None, compaction_threshold=100, history_size=1000,
+                 password_hasher: PasswordHasher = None):
+        """
+        Konstruktor für eine TokenStore Instanz.
+        :param path: Ist der Pfad zur Textdatei der validen Tokens.
+        :type path: str
+        :param journal_path: Ist der Pfad zum Journal. Ohne Angabe wird ".journal" an den Pfad der Textdatei angehängt.
+        :type journal_path: str
+        :param compaction_threshold: Ist die Anzahl an Journaleinträgen, ab der das Journal übernommen wird.
+        :type compaction_threshold: int
+        :param history_size: Ist die maximale Anzahl an Änderungen, die für changes_since vorgehalten werden.
+        :type history_size: int
+        :param password_hasher: Überprüft die Passwörter. Ohne Angabe wird ein PasswordHasher mit seinen
+            Standardwerten verwendet.
+        :type password_hasher: PasswordHasher
+        """
+        self.__path = path
+        self.__hasher = password_hasher if password_hasher is not None else PasswordHasher()
+        self.__journal_path = journal_path if journal_path is not None else path + ".journal"
+        self.__compaction_threshold = compaction_threshold
+        # Lesende Zugriffe laufen parallel, Änderungen und das Neueinlesen exklusiv
+        self.__lock = ReadWriteLock()
+        self.__fingerprint = None
+        # Sequenznummer der Textdatei, None falls die Datei keine enthält
+        self.__snapshot_sequence = None
+        # Wird bei jedem Neuladen und jeder Änderung erhöht
+        self.__generation = 0
+        # Änderungen an der Menge der Tokens als (Generation, hinzugefügt, Token), die älteste zuerst
+        self.__history = deque()
+        self.__history_size = history_size
+        # Kleinste Generation, ab der die Änderungen lückenlos in der Historie enthalten sind
+        self.__history_start = 0
+        # Nutzer-ID -> UserRecord, in der Reihenfolge der Datei
+        self.__users = dict()
+        # Token -> Nutzer-ID
+        self.__token_owners = dict()
+        # Zeilen, die nicht dem Format entsprechen, werden beim Schreiben unverändert übernommen
+        self.__foreign_lines = list()
+        # Anzahl der gültigen Einträge im Journal, None falls das Journal nicht zur Textdatei passt
+        self.__journal_records = None
+        self.__compaction_requested = threading.Event()
+        self.__compactor = None
+        self.__change_listeners = list()
+        self.__watcher = None
+
+    @classmethod
+    def get_instance(cls, path: str, journal_path=None, compaction_threshold=100, history_size=1000,
+                     password_hasher: PasswordHasher = None):
+        """
+        Gibt die geteilte Instanz für den angegebenen Pfad zurück und erzeugt sie bei Bedarf.
+        Die übrigen Parameter werden nur beim Erzeugen berücksichtigt.
+        :param path: Ist der Pfad zur Textdatei der validen Tokens.
+        :type path: str
+        :param journal_path: Ist der Pfad zum Journal, siehe Konstruktor.
+        :type journal_path: str
+        :param compaction_threshold: Ist die Anzahl an Journaleinträgen, ab der das Journal übernommen wird.
+        :type compaction_threshold: int
+        :param history_size: Ist die maximale Anzahl an Änderungen, die für changes_since vorgehalten werden.
+        :type history_size: int
+        :param password_hasher: Überprüft die Passwörter, siehe Konstruktor.
+        :type password_hasher: PasswordHasher
+        :return: Die Instanz für diesen Pfad.
+        :rtype: TokenStore
+        """
+        with cls.__instances_lock:
+            if path not in cls.__instances:
+                cls.__instances[path] = TokenStore(path, journal_path, compaction_threshold, history_size,
+                                                   password_hasher)
+            return cls.__instances[path]
+
+    @staticmethod
+    def __read_fingerprint(path: str):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def __current_fingerprint(self):
+        return self.__read_fingerprint(self.__path), self.__read_fingerprint(self.__journal_path)
+
+    @staticmethod
+    def __format_base(sequence: int) -> str:
+        return TokenStore.JOURNAL_HEADER + ";" + str(sequence)
+
+    @staticmethod
+    def __parse_sequence(line: str):
+        entry = line.split(";")
+        if len(entry) != 2 or entry[0] != TokenStore.SNAPSHOT_HEADER or not entry[1].isdigit():
+            return None
+        return int(entry[1])
+
+    def __ensure_loaded(self):
+        # Muss mit exklusiv gehaltenem Lock aufgerufen werden
+        fingerprint = self.__current_fingerprint()
+        if fingerprint == self.__fingerprint:
+            return
+        self.__users = dict()
+        self.__token_owners = dict()
+        self.__foreign_lines = list()
+        # Ob sich Passwörter geändert haben, ist nicht bekannt
+        self.__hasher.clear()
+        self.__snapshot_sequence = None
+        if fingerprint[0] is not None:
+            with open(self.__path, "r") as f:
+                first = True
+                for line in f:
+                    line = line.strip()
+                    if line == "":
+                        continue
+                    if first:
+                        first = False
+                        self.__snapshot_sequence = self.__parse_sequence(line)
+                        if self.__snapshot_sequence is not None:
+                            continue
+                    record = UserRecord.parse(line)
+                    if record is None or record.identifier in self.__users:
+                        # Wie bisher gilt bei doppelten Identifikatoren die erste Zeile
+                        self.__foreign_lines.append(line)
+                        continue
+                    self.__users[record.identifier] = record
+                    for token in record.tokens:
+                        self.__token_owners.setdefault(token, record.identifier)
+        if self.__replay_journal():
+            # Das Journal wurde beim Nachspielen gekürzt
+            fingerprint = (fingerprint[0], self.__read_fingerprint(self.__journal_path))
+        self.__fingerprint = fingerprint
+        self.__generation += 1
+        # Was sich durch das Neueinlesen geändert hat, ist nicht bekannt
+        self.__history.clear()
+        self.__history_start = self.__generation
+        if self.__journal_records is not None and self.__journal_records >= self.__compaction_threshold:
+            self.__request_compaction()
+
+    @contextmanager
+    def __reading(self):
+        # Hält das Lock zum Lesen. Haben sich die Dateien verändert, werden sie zuvor exklusiv neu eingelesen.
+        while True:
+            self.__lock.acquire_read()
+            if self.__current_fingerprint() == self.__fingerprint:
+                break
+            self.__lock.release_read()
+            with self.__lock.write_locked():
+                self.__ensure_loaded()
+        try:
+            yield
+        finally:
+            self.__lock.release_read()
+
+    def __replay_journal(self) -> bool:
+        # Gibt zurück, ob das Journal dabei gekürzt wurde
+        self.__journal_records = None
+        try:
+            with open(self.__journal_path, "rb") as f:
+                content = f.read()
+        except FileNotFoundError:
+            return False
+        lines = content.decode(errors="replace").split("\n")
+        # Die letzte Zeile ist nur dann vollständig, wenn die Datei mit einem Zeilenumbruch endet
+        lines = lines[:-1]
+        if len(lines) == 0:
+            return False
+        if self.__snapshot_sequence is None or lines[0] != self.__format_base(self.__snapshot_sequence):
+            if len(lines) > 1:
+                LogError.get_instance().send_log_msg(
+                    "Das Journal der validen Tokens (" + lines[0] + ") passt nicht zur Sequenznummer der Textdatei ("
+                    + str(self.__snapshot_sequence) + "). " + str(len(lines) - 1) + " Einträge wurden verworfen.")
+            return False
+        truncated = not content.endswith(b"\n")
+        if truncated:
+            # Eine beim Absturz unvollständig geschriebene letzte Zeile wird entfernt, da die nächste Änderung
+            # sonst an sie angehängt und beim nächsten Laden mit ihr verworfen würde
+            with open(self.__journal_path, "r+b") as f:
+                f.truncate(content.rfind(b"\n") + 1)
+                f.flush()
+                os.fsync(f.fileno())
+        self.__journal_records = 0
+        for line in lines[1:]:
+            entry = line.split(";")
+            if len(entry) == 3 and entry[0] in (self.OPERATION_ADD, self.OPERATION_DELETE):
+                self.__apply(entry[0], entry[1], entry[2])
+            elif len(entry) == 2 and entry[0] == self.OPERATION_DELETE_ALL:
+                self.__apply(entry[0], entry[1], None)
+            else:
+                continue
+            self.__journal_records += 1
+        return truncated
+
+    def __apply(self, operation: str, identifier: str, token) -> bool:
+        # Wendet eine Änderung auf die Indizes an, ohne sie zu speichern
+        record = self.__users.get(identifier)
+        if record is None:
+            return False
+        # Ändert sich der Eintrag eines Nutzers, gelten seine zwischengespeicherten Überprüfungen nicht mehr
+        self.__hasher.invalidate(identifier)
+        if operation == self.OPERATION_ADD:
+            if token in self.__token_owners:
+                return False
+            record.tokens.append(token)
+            self.__token_owners[token] = identifier
+            return True
+        if operation == self.OPERATION_DELETE:
+            if token not in record.tokens:
+                return False
+            record.tokens = [token_temp for token_temp in record.tokens if token_temp != token]
+            if self.__token_owners.get(token) == identifier:
+                del self.__token_owners[token]
+            return True
+        for token_temp in record.tokens:
+            if self.__token_owners.get(token_temp) == identifier:
+                del self.__token_owners[token_temp]
+        record.tokens = []
+        return True
+
+    def __mutate(self, operation: str, identifier: str, token) -> bool:
+        return self.apply_operations([(operation, identifier, token)])[0]
+
+    def apply_operations(self, operations: list) -> list:
+        """
+        Wendet mehrere Änderungen gemeinsam an. Alle wirksamen Änderungen werden mit einem einzigen Schreibzugriff
+        und genau einem fsync an das Journal angehängt.
+        :param operations: Ist die Liste der Änderungen als Tupel (Operation, Identifikator, Token). Die Operation
+            ist OPERATION_ADD, OPERATION_DELETE oder OPERATION_DELETE_ALL, bei letzterer ist der Token None.
+        :type operations: list
+        :return: Für jede Änderung True, wenn sie wirksam war, anderenfalls False.
+        :rtype: list
+        """
+        with self.__lock.write_locked():
+            self.__ensure_loaded()
+            results = list()
+            entries = list()
+            for operation, identifier, token in operations:
+                record = self.__users.get(identifier)
+                removed = list(record.tokens) if record is not None and operation == self.OPERATION_DELETE_ALL \
+                    else [token]
+                if not self.__apply(operation, identifier, token):
+                    results.append(False)
+                    continue
+                self.__generation += 1
+                if operation == self.OPERATION_ADD:
+                    self.__record_change(True, token)
+                else:
+                    for token_temp in removed:
+                        if token_temp not in self.__token_owners:
+                            self.__record_change(False, token_temp)
+                entries.append(operation + ";" + identifier + ("" if token is None else ";" + token) + "\n")
+                results.append(True)
+            if len(entries) == 0:
+                return results
+            try:
+                self.__append_journal(entries)
+            except OSError:
+                # Der Zustand im Speicher weicht nun vom Datenträger ab und wird beim nächsten Zugriff neu geladen
+                self.__fingerprint = None
+                raise
+            if self.__journal_records >= self.__compaction_threshold:
+                self.__request_compaction()
+            return results
+
+    def __record_change(self, added: bool, token: str):
+        # Muss mit exklusiv gehaltenem Lock aufgerufen werden
+        if len(self.__history) >= self.__history_size:
+            # Die älteste Änderung fällt heraus, ältere Generationen können nicht mehr beantwortet werden
+            self.__history_start = self.__history.popleft()[0]
+        self.__history.append((self.__generation, added, token))
+
+    def __append_journal(self, entries: list):
+        # Muss mit exklusiv gehaltenem Lock aufgerufen werden
+        if self.__journal_records is None and self.__snapshot_sequence is None:
+            # Die Textdatei hat noch keine Sequenznummer, auf die sich ein Journal beziehen könnte. Sie wird
+            # einmalig mit den Änderungen neu geschrieben.
+            self.__rewrite()
+            return
+        content = "".join(entries)
+        if self.__journal_records is None:
+            # Das Journal passt nicht zur Textdatei und wird neu begonnen
+            content = self.__format_base(self.__snapshot_sequence) + "\n" + content
+            mode = "w"
+        else:
+            mode = "a"
+        with open(self.__journal_path, mode) as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        self.__journal_records = (self.__journal_records or 0) + len(entries)
+        self.__fingerprint = self.__current_fingerprint()
+
+    def __request_compaction(self):
+        # Muss mit exklusiv gehaltenem Lock aufgerufen werden
+        if self.__compactor is None:
+            self.__compactor = threading.Thread(target=self.__run_compactor, daemon=True)
+            self.__compactor.start()
+        self.__compaction_requested.set()
+
+    def __run_compactor(self):
+        while True:
+            self.__compaction_requested.wait()
+            self.__compaction_requested.clear()
+            try:
+                self.compact()
+            except OSError:
+                # Das Journal bleibt gültig und wird beim nächsten Anstoß erneut übernommen
+                pass
+
+    def migrate_passwords(self) -> int:
+        """
+        Ersetzt alle im Klartext gespeicherten Passwörter durch gesalzene Hashes und schreibt die Textdatei
+        wie compact neu. Sind bereits alle Passwörter Hashes, wird nichts geschrieben.
+        :return: Die Anzahl der umgestellten Passwörter.
+        :rtype: int
+        """
+        with self.__lock.write_locked():
+            self.__ensure_loaded()
+            records = [record for record in self.__users.values() if not PasswordHasher.is_hashed(record.password)]
+            if len(records) == 0:
+                return 0
+            for record in records:
+                record.set_password(self.__hasher.hash(record.password))
+                self.__hasher.invalidate(record.identifier)
+            try:
+                self.__rewrite()
+            except OSError:
+                # Die Passwörter im Speicher weichen vom Datenträger ab und werden beim nächsten Zugriff neu geladen
+                self.__fingerprint = None
+                raise
+            return len(records)
+
+    def compact(self):
+        """
+        Übernimmt das Journal in eine neue Textdatei und leert es anschließend.
+        Die neue Textdatei wird zuerst vollständig unter einem temporären Namen geschrieben und gesichert
+        und ersetzt dann durch Umbenennen die alte Datei.
+        """
+        with self.__lock.write_locked():
+            self.__ensure_loaded()
+            if not self.__journal_records:
+                return
+            self.__rewrite()
+
+    def __rewrite(self):
+        # Muss mit exklusiv gehaltenem Lock aufgerufen werden
+        sequence = (self.__snapshot_sequence or 0) + 1
+        lines = [self.SNAPSHOT_HEADER + ";" + str(sequence)] + [record.to_line() for record in self.__users.values()] \
+            + self.__foreign_lines
+        temp_path = self.__path + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write("\n".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.__path)
+        self.__fsync_directory(self.__path)
+        self.__snapshot_sequence = sequence
+        # Ab hier bezieht sich das alte Journal nicht mehr auf die Textdatei und wird neu begonnen
+        with open(self.__journal_path, "w") as f:
+            f.write(self.__format_base(sequence) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.__journal_records = 0
+        self.__fingerprint = self.__current_fingerprint()
+
+    @staticmethod
+    def __fsync_directory(path: str):
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+    def add_change_listener(self, listener, debounce=0.2):
+        """
+        Registriert eine Funktion, die aufgerufen wird, sobald sich die Textdatei oder das Journal auf dem
+        Datenträger ändern, egal ob durch diesen oder einen anderen Prozess.
+        Mit der ersten registrierten Funktion wird die Überwachung der Dateien gestartet.
+        :param listener: Ist die Funktion ohne Parameter, die aufgerufen werden soll.
+        :type listener: Callable
+        :param debounce: Ist die Zeit in Sekunden, über die mehrere Änderungen zusammengefasst werden.
+        :type debounce: float
+        """
+        with self.__lock.write_locked():
+            self.__change_listeners.append(listener)
+            if self.__watcher is None:
+                self.__watcher = FileWatcher([self.__path, self.__journal_path], self.__notify_change_listeners,
+                                             debounce)
+                self.__watcher.start()
+
+    def remove_change_listener(self, listener):
+        """
+        Entfernt eine registrierte Funktion wieder. Mit der letzten Funktion wird die Überwachung beendet.
+        :param listener: Ist die Funktion, die entfernt werden soll.
+        :type listener: Callable
+        """
+        with self.__lock.write_locked():
+            if listener in self.__change_listeners:
+                self.__change_listeners.remove(listener)
+            watcher = self.__watcher if len(self.__change_listeners) == 0 else None
+            if watcher is not None:
+                self.__watcher = None
+        if watcher is not None:
+            watcher.stop()
+
+    def __notify_change_listeners(self):
+        with self.__lock.read_locked():
+            listeners = list(self.__change_listeners)
+        for listener in listeners:
+            listener()
+
+    def generation(self) -> int:
+        """
+        Gibt die Generation des Inhalts zurück. Sie erhöht sich, sobald die Dateien neu eingelesen wurden oder
+        ein Token hinzugefügt oder gelöscht wurde. Das Übernehmen des Journals verändert sie nicht.
+        :return: Die aktuelle Generation.
+        :rtype: int
+        """
+        with self.__reading():
+            return self.__generation
+
+    def changes_since(self, generation: int):
+        """
+        Gibt die Tokens zurück, die seit der angegebenen Generation hinzugefügt oder gelöscht wurden.
+        Ein Token, der hinzugefügt und wieder gelöscht wurde, taucht in keiner der beiden Mengen auf.
+        :param generation: Ist die Generation, die dem Aufrufer zuletzt bekannt war.
+        :type generation: int
+        :return: Ein Tupel aus hinzugefügten Tokens, gelöschten Tokens und aktueller Generation oder None, wenn
+            die Änderungen seit dieser Generation nicht mehr vollständig bekannt sind.
+        :rtype: tuple
+        """
+        with self.__reading():
+            if generation is None or generation < self.__history_start or generation > self.__generation:
+                return None
+            added = set()
+            removed = set()
+            for generation_temp, is_added, token in self.__history:
+                if generation_temp <= generation:
+                    continue
+                if is_added:
+                    if token in removed:
+                        removed.discard(token)
+                    else:
+                        added.add(token)
+                elif token in added:
+                    added.discard(token)
+                else:
+                    removed.add(token)
+            return added, removed, self.__generation
+
+    def authenticate(self, identifier: str, password: str) -> bool:
+        """
+        Überprüft, ob ein Nutzer mit dem Identifikator und dem Passwort existiert. Das Passwort wird gegen den
+        gespeicherten Hash überprüft, dessen Berechnung erst nach dem Freigeben des Locks erfolgt.
+        :param identifier: Ist der Identifikator des Nutzers.
+        :type identifier: str
+        :param password: Ist das Passwort des Nutzers im Klartext.
+        :type password: str
+        :return: True, wenn Identifikator und Passwort übereinstimmen, anderenfalls False.
+        :rtype: bool
+        """
+        with self.__reading():
+            record = self.__users.get(identifier)
+            stored = record.password if record is not None else None
+        return stored is not None and self.__hasher.verify(identifier, password, stored)
+
+    def has_token(self, token: str) -> bool:
+        """
+        Überprüft, ob der Token bereits einem Nutzer zugeordnet ist.
+        :param token: Ist der Token, der überprüft werden soll.
+        :type token: str
+        :return: True, wenn der Token bereits existiert, anderenfalls False.
+        :rtype: bool
+        """
+        with self.__reading():
+            return token in self.__token_owners
+
+    def get_user_line(self, identifier: str) -> str:
+        """
+        Gibt die Zeile des Nutzers mit dem Identifikator zurück.
+        :param identifier: Ist der Identifikator des Nutzers.
+        :type identifier: str
+        :return: Die Zeile des Nutzers oder einen leeren String, wenn der Nutzer nicht existiert.
+        :rtype: str
+        """
+        with self.__reading():
+            record = self.__users.get(identifier)
+            return record.to_line() if record is not None else ""
+
+    def get_all_tokens(self) -> list:
+        """
+        Gibt alle Tokens aller Nutzer in der Reihenfolge der Datei zurück.
+        :return: Liste aller Tokens.
+        :rtype: Liste von str.
+        """
+        with self.__reading():
+            return [token for record in self.__users.values() for token in record.tokens]
+
+    def add_token(self, identifier: str, token: str) -> bool:
+        """
+        Fügt dem Nutzer mit dem Identifikator einen Token hinzu und hängt die Änderung an das Journal an.
+        :param identifier: Ist der Identifikator des Nutzers.
+        :type identifier: str
+        :param token: Ist der Token, der hinzugefügt werden soll.
+        :type token: str
+        :return: True, wenn der Token hinzugefügt wurde. False, wenn der Nutzer nicht existiert
+            oder der Token bereits vergeben ist.
+        :rtype: bool
+        """
+        return self.__mutate(self.OPERATION_ADD, identifier, token)
+
+    def delete_token(self, identifier: str, token: str) -> bool:
+        """
+        Löscht den Token des Nutzers mit dem Identifikator und hängt die Änderung an das Journal an.
+        :param identifier: Ist der Identifikator des Nutzers.
+        :type identifier: str
+        :param token: Ist der Token, der gelöscht werden soll.
+        :type token: str
+        :return: True, wenn der Token gelöscht wurde, anderenfalls False.
+        :rtype: bool
+        """
+        return self.__mutate(self.OPERATION_DELETE, identifier, token)
+
+    def delete_all_tokens(self, identifier: str) -> bool:
+        """
+        Löscht alle Tokens des Nutzers mit dem Identifikator und hängt die Änderung an das Journal an.
+        :param identifier: Ist der Identifikator des Nutzers.
+        :type identifier: str
+        :return: True, wenn der Nutzer existiert, anderenfalls False.
+        :rtype: bool
+        """
+        return self.__mutate(self.OPERATION_DELETE_ALL, identifier, None)
@@ -0,0 +1,94 @@
+"""
+Dieses Modul stellt einen kleinen, threadsicheren Zwischenspeicher bereit, dessen Einträge nach einer festen Zeit
+verfallen. Er wird von Adaptern verwendet, deren Datenquelle nur über das Netzwerk erreichbar ist, sowie für
+erfolgreiche Überprüfungen von Passwörtern.
+Classes:
+    TTLCache: Zwischenspeicher mit begrenzter Größe, dessen Einträge nach einer festen Zeit verfallen.
+@author Lukas Wittenzellner
+@version 1.1
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Zwischenspeicher mit begrenzter Größe, dessen Einträge nach einer festen Zeit verfallen.
+    Ist der Zwischenspeicher voll, wird der am längsten nicht verwendete Eintrag verdrängt.
+    Methods:
+        get: Gibt den Wert zu einem Schlüssel zurück, sofern er noch nicht verfallen ist.
+        put: Speichert einen Wert zu einem Schlüssel.
+        invalidate: Entfernt den Eintrag zu einem Schlüssel.
+        invalidate_where: Entfernt alle Einträge, deren Schlüssel eine Bedingung erfüllen.
+        clear: Entfernt alle Einträge.
+    """
+    def __init__(self, ttl: float, max_size: int):
+        """
+        Konstruktor für eine TTLCache Instanz.
+        :param ttl: Ist die Zeit in Sekunden, nach der ein Eintrag verfällt.
+        :type ttl: float
+        :param max_size: Ist die maximale Anzahl an Einträgen.
+        :type max_size: int
+        """
+        self.__ttl = ttl
+        self.__max_size = max_size
+        # Schlüssel -> (Ablaufzeitpunkt, Wert), der zuletzt verwendete Eintrag zuletzt
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Gibt den Wert zu einem Schlüssel zurück, sofern er existiert und noch nicht verfallen ist.
+        :param key: Ist der Schlüssel des Eintrags.
+        :param default: Ist der Wert, der zurückgegeben wird, falls kein gültiger Eintrag existiert.
+        :return: Den gespeicherten Wert oder default.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self.__entries[key]
+                return default
+            self.__entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value):
+        """
+        Speichert einen Wert zu einem Schlüssel. Ein bereits vorhandener Eintrag wird überschrieben.
+        :param key: Ist der Schlüssel des Eintrags.
+        :param value: Ist der Wert, der gespeichert werden soll.
+        """
+        if self.__max_size <= 0:
+            return
+        with self.__lock:
+            self.__entries[key] = (time.monotonic() + self.__ttl, value)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """
+        Entfernt den Eintrag zu einem Schlüssel, sofern er existiert.
+        :param key: Ist der Schlüssel des Eintrags.
+        """
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        """
+        Entfernt alle Einträge, deren Schlüssel die Bedingung erfüllen.
+        :param predicate: Ist die Funktion, die für einen Schlüssel True zurückgibt, wenn er entfernt werden soll.
+        :type predicate: Callable
+        """
+        with self.__lock:
+            for key in [key for key in self.__entries if predicate(key)]:
+                del self.__entries[key]
+
+    def clear(self):
+        """
+        Entfernt alle Einträge.
+        """
+        with self.__lock:
+            self.__entries.clear()
@@ -1,13 +1,10 @@
-import ssl
 import sys
-import ast
 
 # Hier Pfad einfügen:
 sys.path.append("")
 
 import urllib.error
-from gpiozero import Button, LED
-import time
+from gpiozero import LED
 import threading
 import socket
 import slack
@@ -15,6 +12,7 @@ from slack.errors import SlackApiError
 import re
 
 from RaspberryPi.src.data_model.key_token import UnauthorizedNFCToken
+from RaspberryPi.src.door_controller.app_server import AppServer
 from RaspberryPi.src.door_controller.bell_push_handler import BotNotifier
 from RaspberryPi.src.door_controller.bell_push_handler import CameraNotifier
 from RaspberryPi.src.door_controller.bell_push_handler import BellPushEventHandler
@@ -22,16 +20,22 @@ from RaspberryPi.src.door_controller.bell_push_handler import DoorbellNotifier
 from RaspberryPi.src.door_controller.door_control_handler.token_validation import TokenValidation
 from RaspberryPi.src.door_controller.door_control_handler.door_opener import DoorOpener
 from RaspberryPi.src.door_controller.door_control_handler.nfc_reader import NFCReader
+from RaspberryPi.src.door_controller.door_control_handler.token_pipeline import TokenPipeline
 from RaspberryPi.src.door_controller.door_control_handler.user_list_updates_notifier import UserListUpdatesNotifier
 from RaspberryPi.src.data_model.door import DoorDataStorage
+from RaspberryPi.src.data_model.token_database import TokenDatabase
 from RaspberryPi.src.door_controller.server_adapter.server_adapter_from_python_filemanager import ServerAdapterFromPythonFilemanager
+from RaspberryPi.src.door_controller.server_adapter.server_adapter import ServerAdapter
 from RaspberryPi.src.data_model.identifier import Identifier
 from RaspberryPi.src.door_controller.door_control_handler.token_updater import TokenUpdater
 from RaspberryPi.src.door_controller.entities.log import LogFatal, LogInfo, LogError
+from RaspberryPi.src.door_controller.entities.log_store import LogStore
 from RaspberryPi.src.exceptions.exception import SyntaxException, ConnectionException
 from RaspberryPi.src.data_model.configuration import BotConfiguration, CameraConfiguration, PiConfiguration
 from RaspberryPi.src.data_model.configuration import MQTTProtocolConfiguration
 from RaspberryPi.src.door_controller.entities.button import DoorOpenButtonObserver
+from RaspberryPi.src.door_controller.entities.bell_button import BellButton
+from RaspberryPi.src.door_controller.event_loop import EventLoop
 from RaspberryPi.src.data_model.user import UnauthenticatedUser, Name
 from RaspberryPi.src.data_model.name import LastName, FirstName
 from RaspberryPi.src.data_model.password import Password
@@ -49,6 +53,9 @@ Classes:
 
 @author Ahmad Eynawi
 @version 19.02.2022
+
+@author Lukas Wittenzellner
+@version 1.1
 """
 
 
@@ -58,24 +65,44 @@ class Main:
     Methods:
         main: Diese Methode ist der Einstiegspunkt für Türsteuerungsprogramm.
     """
+    EVENT_SOCKET_CLOSED = "socket_closed"
+
     def __init__(self):
         self.__log_bot_fatal = LogFatal.get_instance()
         self.__log_bot_error = LogError.get_instance()
         self.__log_bot_info = LogInfo.get_instance()
         self.__bell_push_event_handler = BellPushEventHandler()
         self.__door_opener = DoorOpener()
-        self.__door_data_storage = DoorDataStorage()
+        self.__pi_conf = PiConfiguration()
+        self.__door_data_storage = self.__open_door_data_storage()
         self.__token_validation = TokenValidation(self.__door_data_storage)
         self.__user_updater = UserListUpdatesNotifier()
         self.__adapter_python = ServerAdapterFromPythonFilemanager()
+        self.__app_server = AppServer(self.__process_request, pi_conf=self.__pi_conf)
         self.__reader = NFCReader()
+        # Die rote LED bleibt für die gesamte Laufzeit geöffnet und zeigt ungültige Tokens im Hintergrund an
+        self.__red_led = LED(pin=self.__pi_conf.pin_red)
+        self.__token_pipeline = TokenPipeline(self.__reader, self.__process_token, self.__pi_conf.nfc_duplicate_window,
+                                              self.__pi_conf.nfc_queue_size)
         self.__token_updater = TokenUpdater(self.__door_data_storage, self.__adapter_python)
         self.__bot_conf = BotConfiguration()
         self.__cam_conf = CameraConfiguration()
-        self.__pi_conf = PiConfiguration()
         self.__mqttConfig = MQTTProtocolConfiguration(topic=DoorOpenButtonObserver.TOPIC,
                                                       payload=DoorOpenButtonObserver.DOOR_OPEN_BUTTON_SHORT_PUSH_EVENT)
-        self.button = Button(self.__pi_conf.button, pull_up=False)
+        # Der Klingeltaster meldet jede Betätigung per Rückruf an die zentrale Ereignisschleife
+        self.__events = EventLoop()
+        self.__bell_button = BellButton(self.__pi_conf.button, self.__events.post, self.__pi_conf.sleep_after_ring,
+                                        self.__pi_conf.button_bounce_time)
+
+    def __open_door_data_storage(self):
+        # Eine beschädigte Token-Datenbank darf den Start nicht verhindern. Die Tür prüft dann gegen die Tokens im
+        # Speicher, die beim Start vollständig vom Adapter geladen werden (siehe main).
+        try:
+            return DoorDataStorage(tokenDatabase=TokenDatabase(self.__pi_conf.path_token_database))
+        except ValueError as e:
+            self.__log_bot_error.send_log_msg("Die Token-Datenbank konnte nicht geladen werden, die gültigen Tokens "
+                                              "werden im Speicher gehalten: " + str(e))
+            return DoorDataStorage()
 
     def __add_bot_notifiers(self):
         if len(self.__bot_conf.bot_msg) <= 0 | len(self.__bot_conf.bot_token) <= 0 \
@@ -127,93 +154,109 @@ class Main:
 
     def __runDoorOpenButtonObserver(self):
         """
-        Startet den mit dem Benachrichtiger des Türöffnertasters verbundenen MQTT-Subscriber mit einer Endlosschleife,
-        in der auf das Eintreffen von Nachrichten zum vordefinierten Topic für das Öffnen der Tür
-        gewartet bzw. reagiert wird.
+        Abonniert über die gemeinsame MQTT-Sitzung das vordefinierte Topic des Türöffnertasters. Bei einer kurzen
+        Betätigung des Tasters wird ein Signal zum Öffnen der Tür gesendet.
         """
 
-        def on_connect(client, userdata, flags, resultCode):
-            LogInfo.get_instance().send_log_msg("Der Beobachter des Türöffnertasters hat sich mit dem MQTT-Broker "
-                                                "mit Ergebniscode " + str(resultCode) + " verbunden.")
-            client.subscribe(self.__mqttConfig.topic)
-            LogInfo.get_instance().send_log_msg(f"Der Beobachter des Türöffnertasters hat das Topic \""
-                                                + self.__mqttConfig.topic + "\" abonniert.")
-
-        def on_message(client, userdata, message):
-            messageString = message.payload.decode()
-            inputDictionary = ast.literal_eval(messageString)
+        def on_push(topic, inputDictionary):
             LogInfo.get_instance().send_log_msg("Der Beobachter des Türöffnertasters hat die Nachricht \"" +
-                                                messageString + "\" zum Thema \"" + message.topic + "\" erhalten.")
-            if inputDictionary.get(DoorOpenButtonObserver.DOOR_OPEN_BUTTON_INPUT_EVENT_IDENTIFIER) == \
-                    self.__mqttConfig.payload:
-                self.__door_opener.openDoor()
+                                                str(inputDictionary) + "\" zum Thema \"" + topic + "\" erhalten.")
+            self.__door_opener.openDoor()
 
-        doorOpenButtonObserver = DoorOpenButtonObserver(self.__mqttConfig, on_connect, on_message)
-        doorOpenButtonObserver.run()
+        self.__doorOpenButtonObserver = DoorOpenButtonObserver(self.__mqttConfig, on_push)
+        self.__doorOpenButtonObserver.run()
+        LogInfo.get_instance().send_log_msg(f"Der Beobachter des Türöffnertasters hat das Topic \""
+                                            + self.__mqttConfig.topic + "\" abonniert.")
 
     def __add_token_updater(self):
         self.__user_updater.addObserver(self.__token_updater)
-
-    def __process_request(self, request, lock):
+        # Die Nutzerverwaltung kann auch außerhalb dieses Prozesses geschehen. Daher meldet der Adapter jede Änderung
+        # der Datenquelle, woraufhin die validen Tokens aller über den Notifier verbundenen Türen aktualisiert werden.
+        if not self.__adapter_python.add_change_listener(self.__user_updater.setState):
+            self.__log_bot_error.send_log_msg("Der Adapter meldet keine Änderungen an den validen Tokens!")
+
+    def __process_token(self, digest, timestamp):
+        # Läuft im Thread der Prüfung, das Lesegerät liest in dieser Zeit bereits den nächsten Token
+        # Geprüft wird nur gegen den aktuellen Stand der Tür. Dieser wird bei jeder Änderung der
+        # Datenquelle aktualisiert, sodass hier kein Neuladen der Tokens nötig ist.
+        if self.__token_validation.validateToken(UnauthorizedNFCToken(Identifier(digest))):
+            self.__log_bot_info.send_log_msg("Der Token ist gültig")
+            self.__door_opener.openDoor()
+        else:
+            self.__log_bot_info.send_log_msg("Der Token ist ungültig")
+            # Kehrt sofort zurück, gpiozero schaltet die LED im Hintergrund wieder aus
+            self.__red_led.blink(on_time=self.__pi_conf.nfc_reject_led_time, off_time=0, n=1, background=True)
+
+    def __user(self, identifier):
+        # erstellt einen Nutzer, von dem nur der Identifikator bekannt ist
+        return UnauthenticatedUser(Name(FirstName(self.__pi_conf.no_firstname), LastName(self.__pi_conf.no_lastname)),
+                                   Identifier(identifier))
+
+    def __process_request(self, request, session):
 
         # verarbeitet eine Anfrage
-        match = re.fullmatch(self.__pi_conf.app_request_pattern, request)
-        if not match:
-            return ""
-
-        command, admin_id, admin_password, uid, token_id = match.groups()
+        command, _, operations = request.partition("\n")
+        if command == self.__pi_conf.command_batch:
+            return self.__process_batch(operations.split("\n"), session)
+
+        match = re.fullmatch(self.__pi_conf.app_login_pattern, request)
+        if match:
+            admin, password = self.__user(match.group(1)), Password(match.group(2))
+            if not self.__adapter_python.authenticate(admin, password):
+                return self.__pi_conf.app_response_denied
+            session.login(admin, password)
+            return self.__pi_conf.app_response_ok
 
-        admin = UnauthenticatedUser(Name(FirstName(self.__pi_conf.no_firstname), LastName(self.__pi_conf.no_lastname)),
-                                    Identifier(admin_id))
-        password = Password(admin_password)
-        user = UnauthenticatedUser(Name(FirstName(self.__pi_conf.no_firstname), LastName(self.__pi_conf.no_lastname)),
-                                   Identifier(uid))
+        match = re.fullmatch(self.__pi_conf.app_request_pattern, request)
+        if match:
+            command, admin_id, admin_password, uid, token_id = match.groups()
+            admin, password = self.__user(admin_id), Password(admin_password)
+        else:
+            # nach einer Anmeldung enthalten Anfragen weder Identifikator noch Passwort des Admins
+            match = re.fullmatch(self.__pi_conf.app_session_request_pattern, request)
+            if not match:
+                return ""
+            if not session.is_logged_in():
+                return self.__pi_conf.app_response_denied
+            command, uid, token_id = match.groups()
+            admin, password = session.admin, session.password
+
+        user = self.__user(uid)
         token = UnauthorizedNFCToken(Identifier(token_id)) if token_id is not None else None
 
-        with lock:
-            if command == self.__pi_conf.command_search:
-                result = ServerAdapterFromPythonFilemanager().get_user(admin, password, user)
-                return result
-            elif command == self.__pi_conf.command_add_token and token is not None:
-                ServerAdapterFromPythonFilemanager().add_token_to_user(admin, password, user, token)
-            elif command == self.__pi_conf.command_delete_token and token is not None:
-                ServerAdapterFromPythonFilemanager().delete_token_from_user(admin, password, user, token)
-            elif command == self.__pi_conf.command_delete_all:
-                ServerAdapterFromPythonFilemanager().delete_all_tokens_from_user(admin, password, user)
-            return ""
-
-    def __communicate(self, connection, lock):
-        # verarbeitet die Kommunikation mit einer einzelnen Verbindung
-        with connection:
-            while True:
-                try:
-                    data = connection.recv(self.__pi_conf.app_socket_buf_size)
-                except ConnectionResetError:
-                    # Klient nicht mehr erreichbar
-                    break
-                if not data:
-                    # Klient schließt Verbindung
-                    break
-                resp = self.__process_request(data.decode(self.__pi_conf.app_encoding).strip('\n'), lock)
-                connection.sendall((resp + '\n').encode(self.__pi_conf.app_encoding))
-
-    def __start_app_socket(self):
-        # nimmt Anfragen der App entgegen
-        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
-        context.load_cert_chain(self.__pi_conf.path_pem, self.__pi_conf.path_key)
-        lock = threading.Lock()
-        with socket.socket(socket.AF_INET6, socket.SOCK_STREAM) as server_socket:
-            server_socket.bind(("", self.__pi_conf.app_socket_port))
-            server_socket.listen()
-            with context.wrap_socket(server_socket, server_side=True) as tls_server_socket:
-                while True:
-                    try:
-                        connection, address = tls_server_socket.accept()
-                        # die Kommunikation mit jeder Verbindung wird parallel behandelt
-                        threading.Thread(target=self.__communicate, args=(connection, lock)).start()
-                    except ssl.SSLError:
-                        # Verifikation des Zertifikats des Klienten fehlgeschlagen
-                        pass
+        # Der TokenStore des Adapters schützt jede Anfrage mit seinem eigenen Lese-Schreib-Lock, Suchen laufen
+        # parallel. Das Passwort wird außerhalb dieses Locks geprüft.
+        if command == self.__pi_conf.command_search:
+            return self.__adapter_python.get_user(admin, password, user)
+        if command == self.__pi_conf.command_add_token and token is not None:
+            self.__adapter_python.add_token_to_user(admin, password, user, token)
+        elif command == self.__pi_conf.command_delete_token and token is not None:
+            self.__adapter_python.delete_token_from_user(admin, password, user, token)
+        elif command == self.__pi_conf.command_delete_all:
+            self.__adapter_python.delete_all_tokens_from_user(admin, password, user)
+        return ""
+
+    def __process_batch(self, lines, session):
+
+        # verarbeitet mehrere Änderungen gemeinsam, jede Zeile enthält eine Änderung im Format nach einer Anmeldung
+        if not session.is_logged_in():
+            return self.__pi_conf.app_response_denied
+        commands = {self.__pi_conf.command_add_token: ServerAdapter.OPERATION_ADD_TOKEN,
+                    self.__pi_conf.command_delete_token: ServerAdapter.OPERATION_DELETE_TOKEN,
+                    self.__pi_conf.command_delete_all: ServerAdapter.OPERATION_DELETE_ALL}
+        operations = list()
+        for line in lines:
+            if line == "":
+                continue
+            match = re.fullmatch(self.__pi_conf.app_session_request_pattern, line)
+            if not match or match.group(1) not in commands:
+                return ""
+            command, uid, token_id = match.groups()
+            token = UnauthorizedNFCToken(Identifier(token_id)) if token_id is not None else None
+            operations.append((commands[command], self.__user(uid), token))
+        results = self.__adapter_python.apply_token_operations(session.admin, session.password, operations)
+        # Antwort ist die Anzahl der wirksamen Änderungen
+        return str(sum(1 for result in results if result))
 
     def main(self):
         """
@@ -236,67 +279,8 @@ class Main:
         log_bot_info = self.__log_bot_info
         log_bot_fatal = self.__log_bot_fatal
         log_bot_error = self.__log_bot_error
-        door_data_storage = self.__door_data_storage
-        user_updater = self.__user_updater
-
-        class ThreadUpdateValidToken(threading.Thread):
-            """
-            Diese Klasse repräsentiert ein Thread, der für eine periodische Aktualisierung der validen Tokens sorgt.
-            Dies ist notwendig, da die Nutzerverwaltung von außerhalb unseres Systems passiert und sich somit die Tokens
-            auch ohne unser Wissen ändern können.
-
-            Methods:
-                run: Die run Methode des Threads, sie wird beim Start des Threads aufgerufen.
-            """
-
-            def __init__(self, updater: TokenUpdater):
-                threading.Thread.__init__(self)
-                self.daemon = False
-                self.token_updater = updater
-
-            def run(self):
-                while True:
-                    # Aktualisiert die validen Tokens der Tür dreimal am Tag.
-                    # Hier nur die Aktualisierung der Tokens dieser Tür nicht aller über den Notifier verbundenen Türen,
-                    # da diese ja selber eine Aktualisierung besitzten.
-                    time.sleep(28800)
-                    self.token_updater.update()
-
-        class ThreadReadToken(threading.Thread):
-            """
-            Diese Klasse repräsentiert ein Thread, der den Token einließt.
-
-            Methods:
-                run: Die run Methode des Threads, sie wird beim Start des Threads aufgerufen.
-            """
-
-            def __init__(self, reader: NFCReader):
-                threading.Thread.__init__(self)
-                self.daemon = False
-                self.reader = reader
-                user_updater.setState()
-
-            def run(self):
-                log_bot_info.send_log_msg("Token lesen...")
-
-                token = self.reader.readToken()
-                user_updater.setState()
-                __token_validation = TokenValidation(door_data_storage)
-
-                valid = __token_validation.validateToken(UnauthorizedNFCToken(Identifier(token.hexdigest())))
-
-                if valid:
-                    log_bot_info.send_log_msg("Der Token ist gültig")
-                    door_opener.openDoor()
-                else:
-                    led = LED(pin=PiConfiguration().pin_red)
-                    led.on()
-                    log_bot_info.send_log_msg("Der Token ist ungültig")
-                    time.sleep(5)
-                    led.off()
-                    led.close()
-
-                time.sleep(2)
+        events = self.__events
+        pi_conf = self.__pi_conf
 
         class ThreadSocket(threading.Thread):
             """
@@ -311,6 +295,13 @@ class Main:
                 self.daemon = False
 
             def run(self):
+                try:
+                    self.__serve()
+                finally:
+                    # Die Ereignisschleife öffnet den Socket nach einer kurzen Wartezeit erneut
+                    events.post_later(Main.EVENT_SOCKET_CLOSED, pi_conf.socket_restart_delay)
+
+            def __serve(self):
                 s = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
                 s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
                 s.bind(("", 10000))
@@ -319,7 +310,15 @@ class Main:
                 connection, address = s.accept()
                 resp = connection.recv(1024).__repr__().strip('b' '\'')
 
-                if resp == "fatal":
+                if resp.startswith(LogStore.COMMAND_QUERY):
+                    # Die Webseite fragt gefilterte Log-Einträge aus dem lokalen LogStore ab
+                    try:
+                        answer = LogStore.get_instance().answer_query(resp)
+                    except ValueError as e:
+                        answer = str(e)
+                    connection.sendall(answer.encode())
+                    connection.close()
+                elif resp == "fatal":
                     log_bot_fatal.clear_log_history()
                 elif resp == "error":
                     log_bot_error.clear_log_history()
@@ -330,46 +329,27 @@ class Main:
                 else:
                     LogError.get_instance().send_log_msg("Kein Log mit dieser Logstufe vorhanden!")
 
-        # Ein Thread für das Einlesen von Tokens über den NFC-Reader
-        thread_read_token = ThreadReadToken(self.__reader)
-        thread_read_token.start()
+        # Ein dauerhaft laufender Thread liest die Tokens ein, ein weiterer prüft sie
+        self.__token_pipeline.start()
 
         # Ein Thread für den UNIX Socket, damit das Signal über das WebsitePi Programm weiter geleitet werden kann.
-        thread_socket_website = ThreadSocket()
-        thread_socket_website.start()
+        ThreadSocket().start()
 
         # Ein Thread um mit der App zu kommunizieren.
-        threading.Thread(target=self.__start_app_socket, daemon=True).start()
-
-        # Ein Thread um die validen Tokens zyklisch zu aktualisieren.
-        thread_update_token = ThreadUpdateValidToken(self.__token_updater)
-        thread_update_token.start()
+        threading.Thread(target=self.__app_server.serve_forever, daemon=True).start()
 
-        # Ein Thread für die Ausführung des Codes für den Türöffnertaster
-        doorOpenButtonThread = threading.Thread(target=self.__runDoorOpenButtonObserver)
+        # Der Türöffnertaster wird über die gemeinsame MQTT-Sitzung abonniert, deren Netzwerkschleife bereits
+        # im Hintergrund läuft. Ein eigener Thread oder eine eigene Verbindung ist dafür nicht nötig.
+        self.__runDoorOpenButtonObserver()
 
-        # Startet einen neuen Thread, der in einer Endlosschleife auf das Eintreffen
-        # eines Signals vom Türöffnertaster wartet und dann ein Signal an das Türschloss
-        # zum Öffnen der Tür sendet
-        doorOpenButtonThread.start()
+        # Kehrt sofort zurück, die Observer werden im Pool des BellPushEventHandler benachrichtigt
+        events.register(BellButton.EVENT, lambda pressed_at: self.__bell_push_event_handler.setState())
+        # Falls eine Nachricht vom Webserver gesendet wurde, wird der Thread wieder neu gestartet.
+        events.register(Main.EVENT_SOCKET_CLOSED, lambda data: ThreadSocket().start())
 
         self.__log_bot_info.send_log_msg("Die Initialisierung des Systems wurde erfolgreich abgeschlossen.")
-        while True:
-            time.sleep(0.1)
-            if self.button.wait_for_active(0.1):
-                self.__bell_push_event_handler.setState()
-                time.sleep(self.__pi_conf.sleep_after_ring)
-
-            if not thread_read_token.is_alive():
-                # Falls ein Token eingelesen wurde, wird der Thread wieder neu gestartet.
-                thread_read_token = ThreadReadToken(self.__reader)
-                thread_read_token.start()
-
-            if not thread_socket_website.is_alive():
-                # Falls eine Nachricht vom Webserver gesendet wurde, wird der Thread wieder neu gestartet.
-                time.sleep(0.5)
-                thread_socket_website = ThreadSocket()
-                thread_socket_website.start()
+        # Wartet blockierend auf das nächste Ereignis, ohne den Prozess im Leerlauf regelmäßig zu wecken
+        events.run()
 
 
 if __name__ == '__main__':
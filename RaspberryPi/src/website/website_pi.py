@@ -4,7 +4,8 @@ import sys
 sys.path.append("")
 
 import socket
-from flask import Flask
+from datetime import datetime
+from flask import Flask, Response, request
 
 app = Flask(__name__)
 
@@ -53,6 +54,47 @@ def log_clear_history_fatal():
     return "Clear fatal"
 
 
+def _parse_time(value):
+    """Wandelt eine Uhrzeit wie 2022-03-05T03:12 oder Sekunden seit 1970 in Sekunden seit 1970 um."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _build_query(level, since, until, limit):
+    """Erzeugt den Befehl "query;Logstufe;von;bis;Anzahl", den LogStore.answer_query im Main Programm beantwortet.
+    Der Befehl wird hier erzeugt, damit die Webseite nicht die Konfiguration des Main Programms laden muss."""
+    return ";".join(["query"] + ["" if field is None else str(field) for field in (level, since, until, limit)])
+
+
+@app.route('/log/', methods=['Post', 'Get'])
+def log_query():
+    """Fragt die Log-Einträge mit den Filtern level, since, until und limit aus dem lokalen Log des Main Programms
+    ab, z.B. /log/?level=info&since=2022-03-05T03:00&until=2022-03-05T03:30."""
+    try:
+        command = _build_query(request.args.get("level") or None,
+                               _parse_time(request.args.get("since")),
+                               _parse_time(request.args.get("until")),
+                               int(request.args.get("limit", 100)))
+    except ValueError:
+        return Response("Ungültiger Filter", status=400, mimetype="text/plain")
+    s = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+    s.connect(("localhost", 10000))
+    s.send(str.encode(command))
+    chunks = []
+    while True:
+        chunk = s.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    s.close()
+
+    return Response(b"".join(chunks).decode(), mimetype="text/plain")
+
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0")
 
@@ -0,0 +1,372 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import os
+import shutil
+import socket
+import ssl
+import subprocess
+import tempfile
+import time
+import unittest
+from unittest import mock
+from RaspberryPi.src.data_model.configuration import PiConfiguration
+from RaspberryPi.src.data_model.identifier import Identifier
+from RaspberryPi.src.data_model.name import Name, LastName, FirstName
+from RaspberryPi.src.data_model.password import Password
+from RaspberryPi.src.data_model.user import UnauthenticatedUser
+from RaspberryPi.src.door_controller.app_server import AppServer
+from RaspberryPi.src.door_controller.server_adapter import server_adapter_from_python_filemanager
+from RaspberryPi.src.door_controller.server_adapter.server_adapter_from_python_filemanager import ServerAdapterFromPythonFilemanager
+from RaspberryPi.src.main import Main
+
+"""
+Dieses Modul ist zum Testen des Moduls app_server.
+Für die Tests wird mit openssl ein selbst signiertes Zertifikat erzeugt.
+Classes:
+    TestAppServer(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse AppServer
+    TestMainRequests(unittest.TestCase): Diese Klasse testet die Verarbeitung von Anfragen der App durch die Klasse Main
+
+@author Lukas Wittenzellner
+@version 1.4
+"""
+
+
+def create_certificate(directory: str):
+    """
+    Erzeugt mit openssl ein selbst signiertes Zertifikat im gegebenen Verzeichnis.
+
+    @return: Die Pfade zum Zertifikat und zum privaten Schlüssel.
+    @rtype: tuple
+    """
+    if shutil.which("openssl") is None:
+        raise unittest.SkipTest("openssl ist nicht installiert")
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-subj", "/CN=localhost",
+                    "-days", "1", "-keyout", key, "-out", cert], check=True, capture_output=True)
+    return cert, key
+
+
+class TestAppServer(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse AppServer.
+
+    Methods:
+        setUpClass: Erzeugt ein selbst signiertes Zertifikat für den Server.
+        setUp: Startet einen Server, der nach der ersten Anfrage jede Anfrage in Großbuchstaben beantwortet.
+        test_request: Testet das Beantworten mehrerer Anfragen über eine Verbindung.
+        test_framed_request: Testet Anfragen mit vorangestellter Länge.
+        test_max_connections: Testet, dass überzählige Verbindungen abgewiesen werden.
+        test_connection_burst: Testet, dass die Obergrenze auch bei vielen gleichzeitigen Verbindungen gilt.
+        test_idle_timeout: Testet, dass Verbindungen ohne Anfrage geschlossen werden.
+        test_heartbeat: Testet, dass Prüfungen der Verbindung direkt beantwortet werden.
+        test_session_resumption: Testet das Fortsetzen einer TLS-Sitzung bei einer neuen Verbindung.
+        test_evict_idle_connection: Testet, dass eine ruhende Verbindung für eine neue geschlossen wird.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Erzeugt ein selbst signiertes Zertifikat für den Server.
+        """
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.cert, cls.key = create_certificate(cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.directory.cleanup()
+
+    def setUp(self) -> None:
+        """
+        Startet einen Server, der nach der ersten Anfrage jede Anfrage in Großbuchstaben beantwortet.
+        """
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.cert, self.key)
+        self.server = AppServer(self.handle, ssl_context=context, port=0,
+                                pi_conf=PiConfiguration(app_max_connections=1, app_idle_timeout=0.5,
+                                                        app_metrics_interval=0))
+        self.server.start()
+        self.client_context = ssl.create_default_context(cafile=self.cert)
+        self.client_context.check_hostname = False
+
+    def tearDown(self) -> None:
+        self.server.stop()
+
+    @staticmethod
+    def handle(request, session):
+        # Die erste Anfrage einer Verbindung meldet sie an, jede weitere wird in Großbuchstaben beantwortet
+        if not session.is_logged_in():
+            session.login(request, None)
+            return "login " + request
+        return request.upper()
+
+    def __connect(self, server=None, session=None):
+        server = server if server is not None else self.server
+        connection = socket.create_connection(("localhost", server.port), timeout=5)
+        return self.client_context.wrap_socket(connection, session=session)
+
+    @staticmethod
+    def __request(connection, request):
+        connection.sendall(request)
+        response = b""
+        while response.count(b"\n") < request.count(b"\n"):
+            response += connection.recv(1024)
+        return response
+
+    def __wait_closed(self):
+        # Der Server gibt eine geschlossene Verbindung erst frei, wenn er das Schließen bemerkt hat
+        deadline = time.monotonic() + 5
+        while self.server.metrics.snapshot()["connections_active"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_request(self):
+        """
+        Testet das Beantworten mehrerer Anfragen über eine Verbindung.
+        """
+        with self.__connect() as connection:
+            connection.sendall(b"admin\nsearch$admin\nsearch$")
+            connection.sendall(b"user\n")
+            response = b""
+            while response.count(b"\n") < 3:
+                response += connection.recv(1024)
+        self.assertEqual(response, b"login admin\nSEARCH$ADMIN\nSEARCH$USER\n")
+        metrics = self.server.metrics.snapshot()
+        self.assertEqual(metrics["request_count"], 3)
+        self.assertEqual(metrics["handshake_count"], 1)
+
+    def test_framed_request(self):
+        """
+        Testet Anfragen mit vorangestellter Länge.
+        """
+        with self.__connect() as connection:
+            for request in (b"admin", b"batch\naddToken$1$a\ndeleteAll$2"):
+                connection.sendall(len(request).to_bytes(4, "big") + request)
+            response = b""
+            while len(response) < 8 + len(b"login admin") + len(b"BATCH\nADDTOKEN$1$A\nDELETEALL$2"):
+                response += connection.recv(1024)
+        self.assertEqual(response, len(b"login admin").to_bytes(4, "big") + b"login admin"
+                         + (30).to_bytes(4, "big") + b"BATCH\nADDTOKEN$1$A\nDELETEALL$2")
+
+    def test_max_connections(self):
+        """
+        Testet, dass überzählige Verbindungen abgewiesen werden.
+        """
+        with self.__connect():
+            with self.assertRaises(OSError):
+                with self.__connect() as second:
+                    second.sendall(b"search\n")
+                    if not second.recv(1024):
+                        raise ConnectionResetError()
+        self.assertEqual(self.server.metrics.snapshot()["connections_rejected"], 1)
+
+    def test_connection_burst(self):
+        """
+        Testet, dass die Obergrenze auch bei vielen gleichzeitigen Verbindungen gilt.
+        """
+        count = 20
+        # Die Ereignisschleife wird kurz blockiert, damit alle Verbindungen in derselben Iteration angenommen werden
+        self.server._AppServer__loop.call_soon_threadsafe(time.sleep, 0.5)
+        connections = [socket.create_connection(("localhost", self.server.port), timeout=5) for _ in range(count)]
+        try:
+            deadline = time.monotonic() + 5
+            while self.server.metrics.snapshot().get("connections_rejected", 0) < count - 1 \
+                    and time.monotonic() < deadline:
+                time.sleep(0.01)
+            metrics = self.server.metrics.snapshot()
+            self.assertEqual(metrics.get("connections_rejected", 0), count - 1)
+            self.assertEqual(metrics["connections_active"], 1)
+        finally:
+            for connection in connections:
+                connection.close()
+
+    def test_idle_timeout(self):
+        """
+        Testet, dass Verbindungen ohne Anfrage geschlossen werden.
+        """
+        with self.__connect() as connection:
+            start = time.monotonic()
+            self.assertEqual(connection.recv(1024), b"")
+            self.assertLess(time.monotonic() - start, 4)
+        self.assertEqual(self.server.metrics.snapshot()["connections_timed_out"], 1)
+
+    def test_heartbeat(self):
+        """
+        Testet, dass Prüfungen der Verbindung direkt beantwortet werden.
+        """
+        with self.__connect() as connection:
+            self.assertEqual(self.__request(connection, b"admin\n\nping\n"), b"login admin\n\npong\n")
+        self.assertEqual(self.server.metrics.snapshot()["heartbeats"], 2)
+
+    def test_session_resumption(self):
+        """
+        Testet das Fortsetzen einer TLS-Sitzung bei einer neuen Verbindung.
+        """
+        with self.__connect() as connection:
+            self.__request(connection, b"admin\n")
+            # Bei TLS 1.3 ist das Ticket erst nach dem Empfang der ersten Daten vorhanden
+            session = connection.session
+        self.__wait_closed()
+        with self.__connect(session=session) as connection:
+            self.assertEqual(self.__request(connection, b"admin\n"), b"login admin\n")
+            self.assertTrue(connection.session_reused)
+        metrics = self.server.metrics.snapshot()
+        self.assertEqual(metrics["handshakes_full"], 1)
+        self.assertEqual(metrics["handshakes_resumed"], 1)
+        self.assertEqual(metrics["handshake_resumption_ratio"], 0.5)
+
+    def test_evict_idle_connection(self):
+        """
+        Testet, dass eine ruhende Verbindung für eine neue geschlossen wird.
+        """
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.cert, self.key)
+        server = AppServer(self.handle, ssl_context=context, port=0,
+                           pi_conf=PiConfiguration(app_max_connections=1, app_idle_timeout=5,
+                                                   app_evict_idle_after=0.1, app_metrics_interval=0))
+        server.start()
+        try:
+            with self.__connect(server) as first:
+                self.__request(first, b"admin\n")
+                time.sleep(0.3)
+                with self.__connect(server) as second:
+                    self.assertEqual(self.__request(second, b"admin\n"), b"login admin\n")
+                    try:
+                        self.assertEqual(first.recv(1024), b"")
+                    except ConnectionResetError:
+                        pass
+            self.assertEqual(server.metrics.snapshot()["connections_evicted"], 1)
+        finally:
+            server.stop()
+
+
+class TestMainRequests(unittest.TestCase):
+    """
+    Diese Klasse testet die Verarbeitung von Anfragen der App durch die Klasse Main. Die Anfragen werden mit
+    vorangestellter Länge über einen AppServer gesendet, der sie an Main weitergibt. Main wird ohne die Hardware
+    erzeugt und verwendet einen Adapter auf einer temporären Tokendatei.
+
+    Methods:
+        setUpClass: Erzeugt ein selbst signiertes Zertifikat für den Server.
+        setUp: Legt die Tokendatei an und startet einen Server mit den Anfragen von Main.
+        test_login: Testet eine Anmeldung und eine anschließende Anfrage ohne Zugangsdaten.
+        test_invalid_session: Testet Anfragen mit falschem Passwort und nach dem Ende einer Sitzung.
+        test_malformed_batch: Testet, dass eine fehlerhafte Sammelanfrage nichts ändert.
+        test_mixed_batch: Testet eine Sammelanfrage mit wirksamen und unwirksamen Änderungen.
+    """
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        Erzeugt ein selbst signiertes Zertifikat für den Server.
+        """
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.cert, cls.key = create_certificate(cls.directory.name)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.directory.cleanup()
+
+    def setUp(self) -> None:
+        """
+        Legt die Tokendatei an und startet einen Server mit den Anfragen von Main.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        with open(os.path.join(directory.name, "ValidTokens.txt"), "w") as file:
+            file.write("#sequence;1\n"
+                       "admin,admin;admin;admin:admintoken\n"
+                       "Mustermann,Max;1;passwort:token1")
+        self.pi_conf = PiConfiguration(path_project=directory.name + os.sep, path_valid_tokens="ValidTokens.txt",
+                                       path_valid_tokens_journal="ValidTokens.journal", password_hash_iterations=1000,
+                                       app_metrics_interval=0)
+        patcher = mock.patch.multiple(server_adapter_from_python_filemanager, LogError=mock.DEFAULT,
+                                      LogInfo=mock.DEFAULT, PiConfiguration=mock.Mock(return_value=self.pi_conf))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.adapter = ServerAdapterFromPythonFilemanager()
+        # Die Hardware wird für die Verarbeitung von Anfragen nicht benötigt
+        main = Main.__new__(Main)
+        main._Main__pi_conf = self.pi_conf
+        main._Main__adapter_python = self.adapter
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.cert, self.key)
+        self.server = AppServer(main._Main__process_request, ssl_context=context, port=0, pi_conf=self.pi_conf)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.client_context = ssl.create_default_context(cafile=self.cert)
+        self.client_context.check_hostname = False
+
+    def __connect(self):
+        connection = socket.create_connection(("localhost", self.server.port), timeout=5)
+        return self.client_context.wrap_socket(connection)
+
+    @staticmethod
+    def __request(connection, request: str) -> str:
+        request = request.encode()
+        connection.sendall(len(request).to_bytes(4, "big") + request)
+        response = b""
+        while len(response) < 4 or len(response) < 4 + int.from_bytes(response[:4], "big"):
+            data = connection.recv(1024)
+            if not data:
+                raise ConnectionResetError()
+            response += data
+        return response[4:].decode()
+
+    def __tokens(self, identifier: str) -> str:
+        # Gibt die gespeicherte Zeile des Nutzers mit seinen Tokens zurück
+        admin = UnauthenticatedUser(Name(FirstName("a"), LastName("a")), Identifier("admin"))
+        user = UnauthenticatedUser(Name(FirstName("a"), LastName("a")), Identifier(identifier))
+        return self.adapter.get_user(admin, Password("admin"), user)
+
+    def test_login(self):
+        """
+        Testet eine Anmeldung und eine anschließende Anfrage ohne Zugangsdaten.
+        """
+        with self.__connect() as connection:
+            self.assertEqual(self.__request(connection, "login$admin$admin"), "ok")
+            self.assertEqual(self.__request(connection, "addToken$1$token2"), "")
+            self.assertIn("token2", self.__request(connection, "search$1"))
+        self.assertIn("token2", self.__tokens("1"))
+
+    def test_invalid_session(self):
+        """
+        Testet Anfragen mit falschem Passwort und nach dem Ende einer Sitzung.
+        """
+        with self.__connect() as connection:
+            self.assertEqual(self.__request(connection, "login$admin$falsch"), "denied")
+            self.assertEqual(self.__request(connection, "addToken$1$token2"), "denied")
+            self.assertEqual(self.__request(connection, "batch\naddToken$1$token2"), "denied")
+        with self.__connect() as connection:
+            self.assertEqual(self.__request(connection, "login$admin$admin"), "ok")
+        # Die Anmeldung gilt nur für die Dauer ihrer Verbindung
+        with self.__connect() as connection:
+            self.assertEqual(self.__request(connection, "deleteAll$1"), "denied")
+        self.assertIn("token1", self.__tokens("1"))
+        self.assertNotIn("token2", self.__tokens("1"))
+
+    def test_malformed_batch(self):
+        """
+        Testet, dass eine fehlerhafte Sammelanfrage nichts ändert.
+        """
+        with self.__connect() as connection:
+            self.assertEqual(self.__request(connection, "login$admin$admin"), "ok")
+            self.assertEqual(self.__request(connection, "batch\naddToken$1$token2\nsearch$1"), "")
+            self.assertEqual(self.__request(connection, "batch\naddToken$1$token2\nunbekannt"), "")
+        self.assertNotIn("token2", self.__tokens("1"))
+
+    def test_mixed_batch(self):
+        """
+        Testet eine Sammelanfrage mit wirksamen und unwirksamen Änderungen.
+        """
+        with self.__connect() as connection:
+            self.assertEqual(self.__request(connection, "login$admin$admin"), "ok")
+            # Der Token des Admins ist bereits vergeben und ein nicht vorhandener Token kann nicht gelöscht werden
+            response = self.__request(connection, "batch\naddToken$1$token2\naddToken$1$admintoken\n"
+                                                  "deleteToken$1$token3\ndeleteToken$1$token1")
+        self.assertEqual(response, "2")
+        tokens = self.__tokens("1")
+        self.assertIn("token2", tokens)
+        self.assertNotIn("token1", tokens)
+        self.assertNotIn("admintoken", tokens)
+
+
+if __name__ == '__main__':
+    unittest.main()
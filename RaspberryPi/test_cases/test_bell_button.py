@@ -0,0 +1,73 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import queue
+import time
+import unittest
+from gpiozero.pins.mock import MockFactory
+from RaspberryPi.src.door_controller.entities.bell_button import BellButton
+
+"""
+Dieses Modul ist zum Testen des Moduls bell_button.
+Classes:
+    TestBellButton(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse BellButton
+
+@author Lukas Wittenzellner
+@version 1.0
+"""
+
+
+class TestBellButton(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse BellButton mit den simulierten Pins von gpiozero.
+
+    Methods:
+        setUp: Richtet den Klingeltaster an einem simulierten Pin ein.
+        test_event: Testet, dass eine Betätigung sofort als Ereignis gemeldet wird.
+        test_cooldown: Testet, dass Betätigungen während der Sperrzeit verworfen werden.
+    """
+    PIN = 17
+    COOLDOWN = 0.3
+
+    def setUp(self) -> None:
+        """
+        Richtet den Klingeltaster an einem simulierten Pin ein.
+        """
+        self.factory = MockFactory()
+        self.events = queue.Queue()
+        self.button = BellButton(self.PIN, lambda event, data: self.events.put((event, data)), self.COOLDOWN,
+                                 pin_factory=self.factory)
+        self.addCleanup(self.button.close)
+        self.pin = self.factory.pin(self.PIN)
+
+    def press(self):
+        self.pin.drive_high()
+        self.pin.drive_low()
+
+    def test_event(self):
+        """
+        Testet, dass eine Betätigung sofort als Ereignis gemeldet wird.
+        """
+        before = time.monotonic()
+        self.press()
+        event, pressed_at = self.events.get(timeout=1)
+        self.assertEqual(event, BellButton.EVENT)
+        self.assertGreaterEqual(pressed_at, before)
+        self.assertLess(pressed_at - before, 0.1)
+
+    def test_cooldown(self):
+        """
+        Testet, dass Betätigungen während der Sperrzeit verworfen werden.
+        """
+        self.press()
+        self.events.get(timeout=1)
+        self.press()
+        self.press()
+        self.assertTrue(self.events.empty())
+        self.assertEqual(self.button.suppressed(), 2)
+        time.sleep(self.COOLDOWN)
+        self.press()
+        self.assertEqual(self.events.get(timeout=1)[0], BellButton.EVENT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,14 @@
 import sys
 
 sys.path.append('/home/pi/src-Building-Security-System')
+import threading
+import time
 import unittest
+from unittest import mock
+import requests
+from RaspberryPi.src.data_model.configuration import PiConfiguration
+from RaspberryPi.src.door_controller import bell_push_handler
+from RaspberryPi.src.door_controller.bell_push_handler import BellEventObserver
 from RaspberryPi.src.door_controller.bell_push_handler import BotNotifier
 from RaspberryPi.src.door_controller.bell_push_handler import CameraNotifier
 from RaspberryPi.src.door_controller.entities.bot import SlackBot
@@ -21,9 +28,14 @@ Classes:
                          :class:`~bell_push_handler.CameraNotifier` testet.
     TestBellPushHandler: Repräsentiert eine Testklasse, welche die Methoden der Klasse
                          :class:`~bell_push_handler.BellPushHandler` testet.
+    TestBellEventDispatch: Testet die Benachrichtigung der Observer im Pool der Klasse
+                         :class:`~bell_push_handler.BellPushHandler` ohne echten Bot und ohne echte Kamera.
                          
 @author Fabian Schiekel
 @version 10.03.2022
+
+@author Lukas Wittenzellner
+@version 1.2
 """
 
 
@@ -76,7 +88,7 @@ class TestBellPushHandler(unittest.TestCase):
         self.assertGreater(ret, 0)
 
     def test_notifyObserver(self):
-        ret = self.bell_push_handler.notifyObservers()
+        ret = self.bell_push_handler.notifyObservers().result(timeout=30)
         self.assertGreater(ret, 0)
 
     def test_deleteObserver(self):
@@ -85,3 +97,103 @@ class TestBellPushHandler(unittest.TestCase):
 
         ret = self.bell_push_handler.deleteObserver(self.bot_notifier)
         self.assertGreater(ret, 0)
+
+
+class WaitingObserver(BellEventObserver):
+    """
+    Ein Observer für die Tests, der bis zur Freigabe wartet und dann den angegebenen Wert zurückgibt.
+    """
+    def __init__(self, ret):
+        self.ret = ret
+        self.release = threading.Event()
+        self.calls = 0
+        self.threads = set()
+
+    def update(self):
+        self.calls += 1
+        self.threads.add(threading.current_thread().name)
+        self.release.wait(5)
+        return self.ret
+
+
+class DisconnectedCamera:
+    """
+    Eine Kamera für die Tests, die nicht erreichbar ist.
+    """
+    def ringEvent(self):
+        raise requests.exceptions.ConnectionError("Keine Verbindung")
+
+
+class TestBellEventDispatch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.bell_push_handler = BellPushEventHandler(PiConfiguration(bell_observer_workers=2,
+                                                                      bell_observer_timeout=0.5))
+
+    def tearDown(self) -> None:
+        self.bell_push_handler.shutdown(wait=False)
+
+    def test_setState_returns_immediately(self):
+        observers = [WaitingObserver(1), WaitingObserver(None)]
+        for observer in observers:
+            self.bell_push_handler.addObserver(observer)
+        start = time.monotonic()
+        result = self.bell_push_handler.setState()
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertFalse(result.done())
+        for observer in observers:
+            observer.release.set()
+        self.assertEqual(result.result(timeout=5), 1)
+
+    def test_failed_observer(self):
+        observers = [WaitingObserver(1), WaitingObserver(-1)]
+        for observer in observers:
+            self.bell_push_handler.addObserver(observer)
+            observer.release.set()
+        self.assertEqual(self.bell_push_handler.notifyObservers().result(timeout=5), -1)
+
+    def test_disconnected_camera(self):
+        observer = WaitingObserver(1)
+        observer.release.set()
+        self.bell_push_handler.addObserver(observer)
+        self.bell_push_handler.addObserver(CameraNotifier(DisconnectedCamera()))
+        with mock.patch.object(bell_push_handler, "LogError") as log_error:
+            self.assertEqual(self.bell_push_handler.notifyObservers().result(timeout=5), -1)
+        self.assertIn("Die Kamera ist nicht verbunden", log_error.get_instance().send_log_msg.call_args[0][0])
+
+    def test_timeout(self):
+        observer = WaitingObserver(1)
+        self.bell_push_handler.addObserver(observer)
+        start = time.monotonic()
+        self.assertEqual(self.bell_push_handler.setState().result(timeout=5), -1)
+        self.assertLess(time.monotonic() - start, 2)
+        observer.release.set()
+
+    def test_hung_observers_do_not_starve_pool(self):
+        hung = [WaitingObserver(1), WaitingObserver(1)]
+        for observer in hung:
+            self.bell_push_handler.addObserver(observer)
+        self.addCleanup(lambda: [observer.release.set() for observer in hung])
+        start = time.monotonic()
+        result = self.bell_push_handler.notifyObservers()
+        self.assertLess(time.monotonic() - start, 0.2)
+        self.assertEqual(result.result(timeout=5), -1)
+        self.assertLess(time.monotonic() - start, 2)
+        # Beide Threads des alten Pools hängen, die nächste Benachrichtigung erhält einen neuen Pool
+        for observer in hung:
+            self.bell_push_handler.deleteObserver(observer)
+        observer = WaitingObserver(1)
+        observer.release.set()
+        self.bell_push_handler.addObserver(observer)
+        self.assertEqual(self.bell_push_handler.setState().result(timeout=5), 1)
+
+    def test_persistent_pool(self):
+        observer = WaitingObserver(1)
+        observer.release.set()
+        self.bell_push_handler.addObserver(observer)
+        for _ in range(5):
+            self.assertEqual(self.bell_push_handler.setState().result(timeout=5), 1)
+        self.assertEqual(observer.calls, 5)
+        # Alle Benachrichtigungen laufen in den höchstens zwei Threads des Pools
+        self.assertLessEqual(len(observer.threads), 2)
+        self.assertTrue(all(name.startswith("BellObserver") for name in observer.threads))
@@ -57,6 +57,25 @@ class TestDoorDataStorage(unittest.TestCase):
         self.assertTrue(self.__doorDataStorage.hasToken(self.__authorizedNFCToken))
         self.assertTrue(self.__doorDataStorage.hasToken(self.__unauthorizedNFCToken))
 
+    def test_replaceTokens(self):
+        self.__doorDataStorage.addToken(self.__authorizedNFCToken)
+        snapshot = self.__doorDataStorage.doorTokens
+        self.__doorDataStorage.replaceTokens([self.__unauthorizedNFCToken])
+        # Eine bereits gelesene Momentaufnahme bleibt von der Änderung unberührt
+        self.assertIn(self.__authorizedNFCToken, snapshot)
+        self.assertFalse(self.__doorDataStorage.hasToken(self.__authorizedNFCToken))
+        self.assertTrue(self.__doorDataStorage.hasToken(self.__unauthorizedNFCToken))
+
+    def test_applyChanges(self):
+        self.__doorDataStorage.addToken(self.__authorizedNFCToken)
+        self.__doorDataStorage.applyChanges([self.__unauthorizedNFCToken], [self.__authorizedNFCToken])
+        self.assertFalse(self.__doorDataStorage.hasToken(self.__authorizedNFCToken))
+        self.assertTrue(self.__doorDataStorage.hasToken(self.__unauthorizedNFCToken))
+
+    def test_separateStorages(self):
+        self.__doorDataStorage.addToken(self.__authorizedNFCToken)
+        self.assertFalse(DoorDataStorage().hasToken(self.__authorizedNFCToken))
+
     def test_equals(self):
         self.assertFalse(self.__doorDataStorage.__eq__(DoorDataStorage()))
 
@@ -1,16 +1,21 @@
 import sys
 
 sys.path.append('/home/pi/src-Building-Security-System')
+import threading
+import time
 import unittest
+from gpiozero.pins.mock import MockFactory
 from RaspberryPi.src.door_controller.door_control_handler.door_opener import DoorOpener
 
 """
 Dieses Modul ist zum Testen des Moduls door_opener.
 Classes:
     TestDoorOpener(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse DoorOpener
+    TestDoorOpenerWindow(unittest.TestCase): Diese Klasse testet das nicht blockierende Öffnen der Tür an einem
+        simulierten Pin
         
 @author Lukas Wittenzellner
-@version 1.0
+@version 1.1
 """
 
 
@@ -40,3 +45,79 @@ class TestDoorOpener(unittest.TestCase):
         self.assertTrue(self.door_opener.openDoor())
 
 
+class TestDoorOpenerWindow(unittest.TestCase):
+    """
+    Diese Klasse testet das nicht blockierende Öffnen der Tür an einem simulierten Pin.
+
+    Methods:
+        setUp: Erstellt einen DoorOpener an einem simulierten Pin.
+        test_non_blocking: Testet, dass das Öffnen sofort zurückkehrt und die Tür danach schließt.
+        test_extend: Testet, dass eine Anfrage bei geöffneter Tür die Zeitspanne verlängert.
+        test_concurrent: Testet gleichzeitige Anfragen aus mehreren Threads.
+        test_close: Testet das Freigeben des Pins.
+    """
+    PIN = 22
+    DURATION = 0.3
+
+    def setUp(self) -> None:
+        """
+        Erstellt einen DoorOpener an einem simulierten Pin.
+        """
+        factory = MockFactory()
+        self.pin = factory.pin(self.PIN)
+        self.door_opener = DoorOpener(self.PIN, self.DURATION, pin_factory=factory)
+        self.addCleanup(self.door_opener.close)
+        self.events = []
+        self.door_opener.addListener(lambda event, timestamp: self.events.append((event, timestamp)))
+
+    def test_non_blocking(self):
+        """
+        Testet, dass das Öffnen sofort zurückkehrt und die Tür danach schließt.
+        """
+        start = time.monotonic()
+        self.assertTrue(self.door_opener.openDoor())
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertTrue(self.door_opener.isOpen())
+        self.assertTrue(self.pin.state)
+        self.assertTrue(self.door_opener.waitUntilClosed(2))
+        self.assertGreaterEqual(time.monotonic() - start, self.DURATION)
+        self.assertFalse(self.pin.state)
+        self.assertEqual([event for event, _ in self.events], [DoorOpener.EVENT_OPENED, DoorOpener.EVENT_CLOSED])
+        self.assertLessEqual(self.events[0][1], self.events[1][1])
+
+    def test_extend(self):
+        """
+        Testet, dass eine Anfrage bei geöffneter Tür die Zeitspanne verlängert.
+        """
+        start = time.monotonic()
+        self.door_opener.openDoor()
+        time.sleep(self.DURATION * 2 / 3)
+        self.assertTrue(self.door_opener.openDoor())
+        self.assertFalse(self.door_opener.waitUntilClosed(self.DURATION * 2 / 3))
+        self.assertTrue(self.door_opener.isOpen())
+        self.assertTrue(self.door_opener.waitUntilClosed(2))
+        self.assertGreaterEqual(time.monotonic() - start, self.DURATION * 5 / 3)
+        self.assertEqual([event for event, _ in self.events], [DoorOpener.EVENT_OPENED, DoorOpener.EVENT_CLOSED])
+
+    def test_concurrent(self):
+        """
+        Testet gleichzeitige Anfragen aus mehreren Threads.
+        """
+        threads = [threading.Thread(target=self.door_opener.openDoor) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(self.door_opener.waitUntilClosed(2))
+        self.assertEqual([event for event, _ in self.events], [DoorOpener.EVENT_OPENED, DoorOpener.EVENT_CLOSED])
+
+    def test_close(self):
+        """
+        Testet das Freigeben des Pins.
+        """
+        self.door_opener.openDoor()
+        self.door_opener.close()
+        self.assertFalse(self.door_opener.isOpen())
+        self.assertFalse(self.door_opener.openDoor())
+        self.assertEqual([event for event, _ in self.events], [DoorOpener.EVENT_OPENED, DoorOpener.EVENT_CLOSED])
+
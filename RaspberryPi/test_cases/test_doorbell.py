@@ -1,5 +1,9 @@
+import os
+import tempfile
 import unittest
+from unittest import mock
 
+from RaspberryPi.src.door_controller.entities import doorbell
 from RaspberryPi.src.door_controller.entities.doorbell import Doorbell
 from RaspberryPi.src.exceptions.exception import SemanticsException, FileFormatException
 
@@ -10,9 +14,13 @@ mithilfe von Unittests.
 Classes:
     TestDoorbell: Repräsentiert eine Testklasse, welche die Methoden der Klasse
                   :class:`~doorbell.Doorbell` testet.
+    TestDoorbellPlayback: Testet das Abspielen des vorab geladenen Klingeltons mit einem simulierten Mixer.
 
 @author Ahmad Eynawi
 @version 03.03.2022
+
+@author Lukas Wittenzellner
+@version 1.0
 """
 
 
@@ -50,5 +58,91 @@ class TestDoorbell(unittest.TestCase):
             self.__doorbell.speakerVolume = -0.5
 
 
+class TestDoorbellPlayback(unittest.TestCase):
+    """
+    Testet das Abspielen des vorab geladenen Klingeltons mit einem simulierten Mixer.
+
+    Methods:
+        setUp: Ersetzt pygame durch ein Mock-Objekt und legt eine Tondatei an.
+        test_preloaded: Testet, dass der Mixer einmalig initialisiert und der Klingelton einmalig geladen wird.
+        test_restart: Testet die Strategie "restart".
+        test_queue: Testet die Strategie "queue".
+        test_ignore: Testet die Strategie "ignore".
+    """
+    LENGTH = 0.2
+
+    def setUp(self) -> None:
+        """
+        Ersetzt pygame durch ein Mock-Objekt und legt eine Tondatei an.
+        """
+        patcher = mock.patch.object(doorbell, "pygame")
+        self.pygame = patcher.start()
+        self.addCleanup(patcher.stop)
+        initialized = []
+        self.pygame.mixer.get_init.side_effect = lambda: (44100, -16, 2) if initialized else None
+        self.pygame.mixer.init.side_effect = lambda: initialized.append(True)
+        self.pygame.mixer.Sound.return_value.get_length.return_value = self.LENGTH
+        self.ringtone = self.pygame.mixer.Sound.return_value
+        file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+        file.close()
+        self.addCleanup(os.remove, file.name)
+        self.path = file.name
+
+    def test_preloaded(self):
+        """
+        Testet, dass der Mixer einmalig initialisiert und der Klingelton einmalig geladen wird.
+        """
+        bell = Doorbell(self.path, 0.5)
+        Doorbell(self.path)
+        self.assertEqual(self.pygame.mixer.init.call_count, 1)
+        bell.sound()
+        self.assertTrue(bell.isPlaying())
+        self.ringtone.set_volume.assert_called_with(0.5)
+        self.assertTrue(bell.waitUntilFinished(2))
+        self.assertFalse(bell.isPlaying())
+        bell.sound()
+        self.assertTrue(bell.waitUntilFinished(2))
+        self.assertEqual(self.pygame.mixer.Sound.call_count, 2)
+        self.assertEqual(self.ringtone.play.call_count, 2)
+        self.assertFalse(self.pygame.mixer.music.load.called)
+
+    def test_restart(self):
+        """
+        Testet die Strategie "restart".
+        """
+        bell = Doorbell(self.path, overlapPolicy=Doorbell.OVERLAP_RESTART)
+        self.assertTrue(bell.sound())
+        self.assertTrue(bell.sound())
+        self.assertEqual(self.ringtone.play.return_value.stop.call_count, 1)
+        self.assertEqual(self.ringtone.play.call_count, 2)
+        self.assertTrue(bell.waitUntilFinished(2))
+        self.assertEqual(self.ringtone.play.call_count, 2)
+
+    def test_queue(self):
+        """
+        Testet die Strategie "queue".
+        """
+        bell = Doorbell(self.path, overlapPolicy=Doorbell.OVERLAP_QUEUE)
+        bell.sound()
+        bell.sound()
+        self.assertFalse(bell.waitUntilFinished(self.LENGTH / 2))
+        self.assertEqual(self.ringtone.play.call_count, 1)
+        self.assertTrue(bell.waitUntilFinished(2))
+        self.assertEqual(self.ringtone.play.call_count, 2)
+        self.assertFalse(self.ringtone.play.return_value.stop.called)
+
+    def test_ignore(self):
+        """
+        Testet die Strategie "ignore".
+        """
+        bell = Doorbell(self.path, overlapPolicy=Doorbell.OVERLAP_IGNORE)
+        self.assertTrue(bell.sound())
+        self.assertFalse(bell.sound())
+        self.assertTrue(bell.waitUntilFinished(2))
+        self.assertEqual(self.ringtone.play.call_count, 1)
+        with self.assertRaises(SemanticsException):
+            Doorbell(self.path, overlapPolicy="loop")
+
+
 if __name__ == '__main__':
     unittest.main()
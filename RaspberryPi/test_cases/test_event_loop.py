@@ -0,0 +1,83 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import threading
+import time
+import unittest
+from RaspberryPi.src.door_controller.event_loop import EventLoop
+
+"""
+Dieses Modul ist zum Testen des Moduls event_loop.
+Classes:
+    TestEventLoop(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse EventLoop
+
+@author Lukas Wittenzellner
+@version 1.0
+"""
+
+
+class TestEventLoop(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse EventLoop.
+
+    Methods:
+        setUp: Startet eine Ereignisschleife in einem eigenen Thread.
+        test_dispatch: Testet die Verteilung der Ereignisse in der Reihenfolge ihres Eintreffens.
+        test_failing_handler: Testet, dass ein fehlerhafter Handler die Schleife nicht beendet.
+        test_post_later: Testet das verzögerte Melden eines Ereignisses.
+    """
+    def setUp(self) -> None:
+        """
+        Startet eine Ereignisschleife in einem eigenen Thread.
+        """
+        self.events = EventLoop()
+        self.received = []
+        self.done = threading.Event()
+        self.events.register("done", lambda data: self.done.set())
+        self.thread = threading.Thread(target=self.events.run)
+
+    def tearDown(self) -> None:
+        self.events.stop()
+        self.thread.join(timeout=1)
+        self.assertFalse(self.thread.is_alive())
+
+    def test_dispatch(self):
+        """
+        Testet die Verteilung der Ereignisse in der Reihenfolge ihres Eintreffens.
+        """
+        self.events.register("bell", lambda data: self.received.append(("bell", data)))
+        self.events.register("bell", lambda data: self.received.append(("second", data)))
+        self.events.register("token_read", lambda data: self.received.append(("token_read", data)))
+        self.events.post("bell", 1)
+        self.events.post("unknown")
+        self.events.post("token_read")
+        self.events.post("done")
+        self.thread.start()
+        self.assertTrue(self.done.wait(1))
+        self.assertEqual(self.received, [("bell", 1), ("second", 1), ("token_read", None)])
+
+    def test_failing_handler(self):
+        """
+        Testet, dass ein fehlerhafter Handler die Schleife nicht beendet.
+        """
+        self.events.register("bell", lambda data: 1 / 0)
+        self.events.register("bell", lambda data: self.received.append(data))
+        self.thread.start()
+        self.events.post("bell", "a")
+        self.events.post("done")
+        self.assertTrue(self.done.wait(1))
+        self.assertEqual(self.received, ["a"])
+
+    def test_post_later(self):
+        """
+        Testet das verzögerte Melden eines Ereignisses.
+        """
+        self.thread.start()
+        start = time.monotonic()
+        self.events.post_later("done", 0.2)
+        self.assertFalse(self.done.wait(0.1))
+        self.assertTrue(self.done.wait(1))
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
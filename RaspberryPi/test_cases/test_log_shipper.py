@@ -0,0 +1,186 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import time
+import unittest
+from RaspberryPi.src.data_model.configuration import BotConfiguration
+from RaspberryPi.src.door_controller.entities.log_shipper import LogShipper
+
+"""
+Dieses Modul ist zum Testen des Moduls log_shipper.
+Classes:
+    TestLogShipper(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse LogShipper
+
+@author Lukas Wittenzellner
+@version 1.1
+"""
+
+
+class RateLimited(Exception):
+    """
+    Simuliert die Ablehnung einer Nachricht durch Slack wegen zu vieler Anfragen.
+    """
+    class Response:
+        headers = {"Retry-After": "0.1"}
+
+    response = Response()
+
+
+class TestLogShipper(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse LogShipper.
+
+    Methods:
+        setUp: Erzeugt einen LogShipper mit kurzen Intervallen.
+        test_coalesce: Testet, dass die Nachrichten eines Intervalls zu einer Nachricht je Log zusammengefasst werden.
+        test_enqueue_does_not_block: Testet, dass das Einreihen nicht auf das Senden wartet.
+        test_backpressure: Testet das Verwerfen von Nachrichten bei vollem Puffer.
+        test_rate_limit: Testet den Mindestabstand und die Wiederholung nach einer Ablehnung.
+        test_split: Testet das Aufteilen zu langer Zusammenfassungen.
+        test_transient_error: Testet die Wiederholung mit exponentiell wachsendem Abstand nach vorübergehenden Fehlern.
+        test_permanent_error: Testet, dass andere Fehler nicht wiederholt werden.
+    """
+    def setUp(self) -> None:
+        """
+        Erzeugt einen LogShipper mit kurzen Intervallen.
+        """
+        self.conf = BotConfiguration(log_queue_size=4, log_ship_interval=0.2, log_min_post_interval=0.0,
+                                     log_max_post_length=60)
+        self.shipper = LogShipper(self.conf)
+        self.posts = []
+        self.timestamps = []
+
+    def tearDown(self) -> None:
+        self.shipper.stop()
+
+    def __send(self, name, delay=0.0):
+        def send(text):
+            time.sleep(delay)
+            self.posts.append((name, text, time.monotonic()))
+            return str(len(self.posts) + 1000) + ".0"
+        return send
+
+    def test_coalesce(self):
+        """
+        Testet, dass die Nachrichten eines Intervalls zu einer Nachricht je Log zusammengefasst werden.
+        """
+        info = self.shipper.register(self.__send("info"), self.timestamps.append, 0)
+        error = self.shipper.register(self.__send("error"), self.timestamps.append, 1)
+        self.assertTrue(self.shipper.enqueue(info, "a"))
+        self.assertTrue(self.shipper.enqueue(error, "b"))
+        self.assertTrue(self.shipper.enqueue(info, "c"))
+        self.assertTrue(self.shipper.flush(5))
+        self.assertEqual(sorted((name, text) for name, text, _ in self.posts), [("error", "b"), ("info", "a\nc")])
+        self.assertEqual(len(self.timestamps), 2)
+
+    def test_enqueue_does_not_block(self):
+        """
+        Testet, dass das Einreihen nicht auf das Senden wartet.
+        """
+        info = self.shipper.register(self.__send("info", delay=0.5), self.timestamps.append, 0)
+        start = time.monotonic()
+        self.assertTrue(self.shipper.enqueue(info, "a"))
+        self.assertLess(time.monotonic() - start, 0.1)
+        self.assertTrue(self.shipper.flush(5))
+        self.assertEqual(self.posts[0][1], "a")
+
+    def test_backpressure(self):
+        """
+        Testet das Verwerfen von Nachrichten bei vollem Puffer.
+        """
+        info = self.shipper.register(self.__send("info"), self.timestamps.append, 0)
+        fatal = self.shipper.register(self.__send("fatal"), self.timestamps.append, 2)
+        for msg in ("i1", "i2", "i3", "i4"):
+            self.assertTrue(self.shipper.enqueue(info, msg))
+        # Bei vollem Puffer wird die älteste Nachricht der niedrigsten Priorität verworfen
+        self.assertTrue(self.shipper.enqueue(info, "i5"))
+        for msg in ("f1", "f2", "f3", "f4"):
+            self.assertTrue(self.shipper.enqueue(fatal, msg))
+        # Eine unwichtigere Nachricht verdrängt keine wichtigere
+        self.assertFalse(self.shipper.enqueue(info, "i6"))
+        self.assertTrue(self.shipper.flush(5))
+        texts = dict((name, text) for name, text, _ in self.posts)
+        self.assertEqual(texts["fatal"], "f1\nf2\nf3\nf4")
+        self.assertEqual(texts["info"], "6 Log-Nachrichten wurden verworfen.")
+
+    def test_rate_limit(self):
+        """
+        Testet den Mindestabstand und die Wiederholung nach einer Ablehnung.
+        """
+        self.shipper.stop()
+        self.shipper = LogShipper(BotConfiguration(log_ship_interval=0.0, log_min_post_interval=0.2,
+                                                   log_max_post_length=1))
+        attempts = []
+
+        def send(text):
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise RateLimited()
+            self.posts.append(("info", text, time.monotonic()))
+            return "1000.0"
+
+        info = self.shipper.register(send, self.timestamps.append, 0)
+        self.shipper.enqueue(info, "ab")
+        self.assertTrue(self.shipper.flush(5))
+        self.assertEqual([text for _, text, _ in self.posts], ["a", "b"])
+        self.assertGreaterEqual(attempts[1] - attempts[0], 0.2)
+        self.assertGreaterEqual(attempts[2] - attempts[1], 0.19)
+
+    def test_split(self):
+        """
+        Testet das Aufteilen zu langer Zusammenfassungen.
+        """
+        info = self.shipper.register(self.__send("info"), self.timestamps.append, 0)
+        self.shipper.enqueue(info, "x" * 40)
+        self.shipper.enqueue(info, "y" * 70)
+        self.assertTrue(self.shipper.flush(5))
+        self.assertEqual([text for _, text, _ in self.posts], ["x" * 40, "y" * 60, "y" * 10])
+
+    def test_transient_error(self):
+        """
+        Testet die Wiederholung mit exponentiell wachsendem Abstand nach vorübergehenden Fehlern.
+        """
+        self.shipper.stop()
+        self.shipper = LogShipper(BotConfiguration(log_ship_interval=0.0, log_min_post_interval=0.0,
+                                                   log_retry_backoff=0.1))
+        attempts = []
+
+        def send(text):
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise ConnectionResetError()
+            if len(attempts) == 2:
+                return "-1"
+            self.posts.append(("info", text, time.monotonic()))
+            return "1000.0"
+
+        info = self.shipper.register(send, self.timestamps.append, 0)
+        self.shipper.enqueue(info, "a")
+        self.assertTrue(self.shipper.flush(5))
+        self.assertEqual([text for _, text, _ in self.posts], ["a"])
+        self.assertGreaterEqual(attempts[1] - attempts[0], 0.1)
+        self.assertGreaterEqual(attempts[2] - attempts[1], 0.2)
+
+    def test_permanent_error(self):
+        """
+        Testet, dass andere Fehler nicht wiederholt werden.
+        """
+        attempts = []
+
+        def send(text):
+            attempts.append(text)
+            if text == "a":
+                raise ValueError("invalid_auth")
+            self.posts.append(("info", text, time.monotonic()))
+            return "1000.0"
+
+        info = self.shipper.register(send, self.timestamps.append, 0)
+        self.shipper.enqueue(info, "a")
+        self.assertTrue(self.shipper.flush(5))
+        self.shipper.enqueue(info, "b")
+        self.assertTrue(self.shipper.flush(5))
+        self.assertEqual(attempts, ["a", "b"])
+        self.assertEqual(self.timestamps, ["1000.0"])
+
+
+if __name__ == '__main__':
+    unittest.main()
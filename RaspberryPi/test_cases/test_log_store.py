@@ -0,0 +1,120 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from RaspberryPi.src.door_controller.entities.log_store import LogStore, LogRecord
+
+"""
+Dieses Modul ist zum Testen des Moduls log_store.
+Classes:
+    TestLogStore(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse LogStore
+
+@author Lukas Wittenzellner
+@version 1.0
+"""
+
+
+class TestLogStore(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse LogStore.
+
+    Methods:
+        setUp: Legt ein temporäres Verzeichnis für die Segmentdateien an.
+        test_ring: Testet, dass der Ringpuffer nur die neuesten Einträge behält.
+        test_level_and_time: Testet die Abfrage nach Logstufe und Zeitraum.
+        test_segments: Testet das Rotieren der Segmentdateien und das Lesen älterer Einträge nach einem Neustart.
+        test_query_command: Testet die Abfrage über den Befehl des Sockets.
+    """
+    def setUp(self) -> None:
+        """
+        Legt ein temporäres Verzeichnis für die Segmentdateien an.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.stores = []
+
+    def tearDown(self) -> None:
+        for store in self.stores:
+            store.close()
+        self.directory.cleanup()
+
+    def __store(self, capacity, directory=None, segment_size=1000000, segment_count=5):
+        store = LogStore(directory, capacity, segment_size, segment_count)
+        self.stores.append(store)
+        return store
+
+    def __append_at(self, store, wall, level, message):
+        with mock.patch.object(time, "time", return_value=wall):
+            return store.append(level, message, "test")
+
+    def test_ring(self):
+        """
+        Testet, dass der Ringpuffer nur die neuesten Einträge behält.
+        """
+        store = self.__store(3)
+        for i in range(5):
+            store.append("info", str(i))
+        self.assertEqual([record.message for record in store.query()], ["2", "3", "4"])
+        self.assertEqual([record.message for record in store.query(limit=2)], ["3", "4"])
+        self.assertEqual(store.query()[0].source, __name__)
+
+    def test_level_and_time(self):
+        """
+        Testet die Abfrage nach Logstufe und Zeitraum.
+        """
+        store = self.__store(100)
+        for i in range(50):
+            self.__append_at(store, 1000.0 + i, "error" if i % 5 == 0 else "info", str(i))
+        self.assertEqual([record.message for record in store.query("error")],
+                         [str(i) for i in range(0, 50, 5)])
+        self.assertEqual([record.message for record in store.query("error", since=1012.0, until=1030.0)],
+                         ["15", "20", "25", "30"])
+        self.assertEqual([record.message for record in store.query(since=1047.5)], ["48", "49"])
+        self.assertEqual(store.query("fatal"), [])
+        # Ein Zurückstellen der Uhr zerstört die Sortierung des Zeitindex nicht
+        self.__append_at(store, 500.0, "error", "zurück")
+        self.assertEqual(store.query("error", since=1049.0)[-1].message, "zurück")
+        # Nach dem Überschreiben bleibt der Index der Logstufe korrekt
+        small = self.__store(4)
+        for i in range(20):
+            self.__append_at(small, 2000.0 + i, "error" if i % 2 == 0 else "info", str(i))
+        self.assertEqual([record.message for record in small.query("error")], ["16", "18"])
+        self.assertEqual([record.message for record in small.query("info", since=2017.0)], ["17", "19"])
+
+    def test_segments(self):
+        """
+        Testet das Rotieren der Segmentdateien und das Lesen älterer Einträge nach einem Neustart.
+        """
+        store = self.__store(2, self.directory.name, segment_size=100, segment_count=3)
+        for i in range(10):
+            self.__append_at(store, 3000.0 + i, "info", "Nachricht\n" + str(i))
+        store.close()
+        names = os.listdir(self.directory.name)
+        self.assertLessEqual(len(names), 3)
+        # Nicht mehr im Ringpuffer liegende Einträge werden aus den Segmentdateien gelesen
+        restarted = self.__store(2, self.directory.name, segment_size=100, segment_count=3)
+        self.__append_at(restarted, 3010.0, "info", "neu")
+        records = restarted.query("info", since=3008.0)
+        self.assertEqual([record.message for record in records], ["Nachricht\n8", "Nachricht\n9", "neu"])
+        self.assertEqual([record.seq for record in records], [8, 9, 10])
+
+    def test_query_command(self):
+        """
+        Testet die Abfrage über den Befehl des Sockets.
+        """
+        store = self.__store(10)
+        self.__append_at(store, 4000.0, "info", "Die Tür wurde geöffnet")
+        self.__append_at(store, 4001.0, "error", "Fehler")
+        command = LogStore.build_query("info", 3999.0, None, 10)
+        self.assertEqual(command, "query;info;3999.0;;10")
+        answer = store.answer_query(command)
+        self.assertEqual(answer.split("\n"), [store.query("info")[0].format()])
+        self.assertTrue(answer.endswith("[info] test: Die Tür wurde geöffnet"))
+        self.assertRaises(ValueError, store.answer_query, "query;info")
+        self.assertIsNone(LogRecord.parse("kaputt"))
+
+
+if __name__ == '__main__':
+    unittest.main()
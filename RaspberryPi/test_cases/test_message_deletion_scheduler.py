@@ -0,0 +1,141 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import os
+import tempfile
+import threading
+import time
+import unittest
+from RaspberryPi.src.data_model.configuration import BotConfiguration
+from RaspberryPi.src.door_controller.entities.message_deletion_scheduler import MessageDeletionScheduler
+
+"""
+Dieses Modul ist zum Testen des Moduls message_deletion_scheduler.
+Classes:
+    TestMessageDeletionScheduler(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse
+        MessageDeletionScheduler
+
+@author Lukas Wittenzellner
+@version 1.1
+"""
+
+
+class TestMessageDeletionScheduler(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse MessageDeletionScheduler.
+
+    Methods:
+        setUp: Legt ein temporäres Verzeichnis für das Journal an.
+        test_batch: Testet, dass gemeinsam fällige Löschungen zusammen ausgeführt werden.
+        test_restart: Testet, dass ausstehende Löschungen einen Neustart überstehen.
+        test_torn_journal: Testet, dass eine Löschung nach einer unvollständigen letzten Zeile erhalten bleibt.
+        test_retry: Testet, dass eine fehlgeschlagene Löschung wiederholt und dann verworfen wird.
+    """
+    def setUp(self) -> None:
+        """
+        Legt ein temporäres Verzeichnis für das Journal an.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "BotDeletions.journal")
+        self.conf = BotConfiguration(bot_delete_batch_window=0.5, bot_delete_retry_delay=0.05,
+                                     bot_delete_max_attempts=2)
+        self.deleted = []
+        self.done = threading.Event()
+        self.schedulers = []
+
+    def tearDown(self) -> None:
+        for scheduler in self.schedulers:
+            scheduler.stop()
+        self.directory.cleanup()
+
+    def __scheduler(self):
+        scheduler = MessageDeletionScheduler(self.path, self.conf)
+        self.schedulers.append(scheduler)
+        return scheduler
+
+    def __delete(self, count):
+        def delete(channel, ts):
+            self.deleted.append((channel, ts, threading.current_thread().name))
+            if len(self.deleted) >= count:
+                self.done.set()
+            return True
+        return delete
+
+    def test_batch(self):
+        """
+        Testet, dass gemeinsam fällige Löschungen zusammen ausgeführt werden.
+        """
+        scheduler = self.__scheduler()
+        scheduler.register_deleter("bot", self.__delete(3))
+        self.assertTrue(scheduler.schedule("bot", "C1", "2.0", 0.3))
+        self.assertTrue(scheduler.schedule("bot", "C1", "1.0", 0.1))
+        self.assertTrue(scheduler.schedule("bot", "C2", "3.0", 0.2))
+        self.assertTrue(self.done.wait(5))
+        # Die früheste Löschung zuerst, alle im selben Thread
+        self.assertEqual([(channel, ts) for channel, ts, _ in self.deleted],
+                         [("C1", "1.0"), ("C2", "3.0"), ("C1", "2.0")])
+        self.assertEqual({name for _, _, name in self.deleted}, {"MessageDeletionScheduler"})
+        deadline = time.monotonic() + 5
+        while scheduler.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(scheduler.pending(), [])
+        # Alle drei Löschungen wurden mit einem Schreibzugriff als erledigt vermerkt
+        with open(self.path) as file:
+            lines = file.read().splitlines()
+        self.assertEqual([line.split(";")[0] for line in lines], ["add"] * 3 + ["done"] * 3)
+
+    def test_restart(self):
+        """
+        Testet, dass ausstehende Löschungen einen Neustart überstehen.
+        """
+        scheduler = self.__scheduler()
+        scheduler.schedule("bot", "C1", "1.0", 0.1)
+        scheduler.stop()
+        restarted = self.__scheduler()
+        self.assertEqual([entry[1:] for entry in restarted.pending()], [("bot", "C1", "1.0")])
+        # Erst mit der Anmeldung des Bots wird die Löschung ausgeführt
+        time.sleep(0.2)
+        self.assertEqual(self.deleted, [])
+        restarted.register_deleter("bot", self.__delete(1))
+        self.assertTrue(self.done.wait(5))
+        self.assertEqual(self.deleted[0][:2], ("C1", "1.0"))
+
+    def test_torn_journal(self):
+        """
+        Testet, dass eine Löschung nach einer unvollständigen letzten Zeile erhalten bleibt.
+        """
+        scheduler = self.__scheduler()
+        scheduler.schedule("bot", "C1", "1.0", 60)
+        scheduler.stop()
+        with open(self.path, "a") as file:
+            file.write("add;bot;C1;2.")
+        restarted = self.__scheduler()
+        restarted.schedule("bot", "C1", "3.0", 60)
+        restarted.stop()
+        self.assertEqual(sorted(entry[1:] for entry in self.__scheduler().pending()),
+                         [("bot", "C1", "1.0"), ("bot", "C1", "3.0")])
+
+    def test_retry(self):
+        """
+        Testet, dass eine fehlgeschlagene Löschung wiederholt und dann verworfen wird.
+        """
+        attempts = []
+
+        def delete(channel, ts):
+            attempts.append(ts)
+            if len(attempts) >= 2:
+                self.done.set()
+            return False
+
+        scheduler = self.__scheduler()
+        scheduler.register_deleter("bot", delete)
+        scheduler.schedule("bot", "C1", "1.0", 0)
+        self.assertTrue(self.done.wait(5))
+        deadline = time.monotonic() + 5
+        while scheduler.pending() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(attempts, ["1.0", "1.0"])
+        self.assertEqual(scheduler.pending(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,372 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import json
+import threading
+import unittest
+from unittest import mock
+from RaspberryPi.src.data_model import mqtt_protocol
+from RaspberryPi.src.data_model.configuration import MQTTProtocolConfiguration
+from RaspberryPi.src.data_model.mqtt_protocol import MQTTSession, PersistentMQTTPublisher, TopicTrie
+
+"""
+Dieses Modul ist zum Testen des Moduls mqtt_protocol.
+Classes:
+    FakeClient: Ersetzt den paho MQTT-Client und bestätigt Nachrichten aus einem eigenen Thread.
+    TestPersistentMQTTPublisher(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse
+        PersistentMQTTPublisher
+    TestTopicTrie(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse TopicTrie
+    TestMQTTSession(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse MQTTSession
+
+@author Lukas Wittenzellner
+@version 1.2
+"""
+
+
+class FakeClient:
+    """
+    Ersetzt den paho MQTT-Client. Nachrichten werden aus einem eigenen Thread bestätigt, solange der Client
+    verbunden ist, sonst werden sie bis zum Wiederverbinden zwischengespeichert.
+    """
+    instances = []
+
+    def __init__(self):
+        self.on_connect = None
+        self.on_message = None
+        self.on_disconnect = None
+        self.on_publish = None
+        self.connected = False
+        self.connects = 0
+        self.loop_started = False
+        self.queued = []
+        self.mid = 0
+        self.subscriptions = []
+        self.lock = threading.Lock()
+        FakeClient.instances.append(self)
+
+    def username_pw_set(self, username, password):
+        pass
+
+    def connect_async(self, broker, port, keepalive):
+        self.connects += 1
+
+    def max_queued_messages_set(self, size):
+        pass
+
+    def reconnect_delay_set(self, min_delay, max_delay):
+        pass
+
+    def loop_start(self):
+        self.loop_started = True
+        self.reconnect()
+
+    def reconnect(self):
+        self.connected = True
+        self.on_connect(self, None, {}, 0)
+        with self.lock:
+            queued, self.queued = self.queued, []
+        for mid in queued:
+            self.__acknowledge(mid)
+
+    def drop(self):
+        self.connected = False
+        self.on_disconnect(self, None, 1)
+
+    def __acknowledge(self, mid):
+        threading.Thread(target=self.on_publish, args=(self, None, mid)).start()
+
+    def publish(self, topic, payload=None, qos=0, retain=False):
+        with self.lock:
+            self.mid += 1
+            mid = self.mid
+            if not self.connected:
+                self.queued.append(mid)
+        if self.connected:
+            self.__acknowledge(mid)
+        return mock.Mock(rc=0 if self.connected else 4, mid=mid)
+
+    def subscribe(self, topic, qos=0):
+        if isinstance(topic, list):
+            self.subscriptions.extend(topicFilter for topicFilter, _ in topic)
+        else:
+            self.subscriptions.append(topic)
+
+    def unsubscribe(self, topic):
+        self.subscriptions.remove(topic)
+
+    def deliver(self, topic, payload):
+        self.on_message(self, None, mock.Mock(topic=topic, payload=payload))
+
+    def disconnect(self):
+        self.connected = False
+
+    def loop_stop(self):
+        self.loop_started = False
+
+
+class TestPersistentMQTTPublisher(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse PersistentMQTTPublisher.
+
+    Methods:
+        setUp: Ersetzt den paho MQTT-Client durch den FakeClient.
+        test_shared_connection: Testet, dass je Broker nur eine Verbindung aufgebaut wird.
+        test_puback_latency: Testet die Bestätigung und die gemessene Latenz.
+        test_offline_queue: Testet das Zwischenspeichern während einer Verbindungsunterbrechung.
+        test_late_puback: Testet, dass eine Bestätigung nach Ablauf der Wartezeit nicht gespeichert bleibt.
+    """
+    def setUp(self) -> None:
+        """
+        Ersetzt den paho MQTT-Client durch den FakeClient.
+        """
+        FakeClient.instances = []
+        patcher = mock.patch.multiple(mqtt_protocol.mqtt, Client=FakeClient, MQTT_ERR_SUCCESS=0, MQTT_ERR_NO_CONN=4,
+                                      create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.config = MQTTProtocolConfiguration("sound", "ring", publishTimeout=2.0)
+
+    def test_shared_connection(self):
+        """
+        Testet, dass je Broker nur eine Verbindung aufgebaut wird.
+        """
+        config = MQTTProtocolConfiguration("sound", "ring", broker="broker.test")
+        first = PersistentMQTTPublisher.get_instance(config)
+        self.assertIs(PersistentMQTTPublisher.get_instance(MQTTProtocolConfiguration("other", "x",
+                                                                                     broker="broker.test")), first)
+        self.assertEqual(len(FakeClient.instances), 1)
+        self.assertTrue(FakeClient.instances[0].loop_started)
+        self.assertTrue(first.isConnected())
+        first.stop()
+        self.assertFalse(FakeClient.instances[0].loop_started)
+
+    def test_puback_latency(self):
+        """
+        Testet die Bestätigung und die gemessene Latenz.
+        """
+        publisher = PersistentMQTTPublisher(self.config)
+        self.addCleanup(publisher.stop)
+        for _ in range(5):
+            mid = publisher.publish("sound", "ring")
+            latency = publisher.waitForPublish(mid)
+            self.assertIsNotNone(latency)
+            self.assertGreaterEqual(latency, 0)
+        statistics = publisher.statistics()
+        self.assertEqual(statistics["published"], 5)
+        self.assertEqual(statistics["confirmed"], 5)
+        self.assertEqual(statistics["pending"], 0)
+        self.assertLess(statistics["max_latency_ms"], 2000)
+        self.assertEqual(FakeClient.instances[0].connects, 1)
+
+    def test_offline_queue(self):
+        """
+        Testet das Zwischenspeichern während einer Verbindungsunterbrechung.
+        """
+        publisher = PersistentMQTTPublisher(self.config)
+        self.addCleanup(publisher.stop)
+        client = FakeClient.instances[0]
+        client.drop()
+        self.assertFalse(publisher.isConnected())
+        mid = publisher.publish("sound", "ring")
+        self.assertIsNotNone(mid)
+        self.assertEqual(publisher.statistics()["pending"], 1)
+        client.reconnect()
+        self.assertIsNotNone(publisher.waitForPublish(mid))
+        self.assertTrue(publisher.isConnected())
+        self.assertEqual(publisher.statistics()["pending"], 0)
+
+    def test_late_puback(self):
+        """
+        Testet, dass eine Bestätigung nach Ablauf der Wartezeit nicht gespeichert bleibt.
+        """
+        publisher = PersistentMQTTPublisher(self.config)
+        self.addCleanup(publisher.stop)
+        client = FakeClient.instances[0]
+        client.drop()
+        mid = publisher.publish("sound", "ring")
+        self.assertIsNone(publisher.waitForPublish(mid, timeout=0.1))
+        self.assertEqual(publisher.statistics()["pending"], 1)
+        client.reconnect()
+        for _ in range(50):
+            if publisher.statistics()["confirmed"] == 1:
+                break
+            threading.Event().wait(0.05)
+        statistics = publisher.statistics()
+        self.assertEqual(statistics["confirmed"], 1)
+        self.assertEqual(statistics["pending"], 0)
+        self.assertEqual(publisher._PersistentMQTTPublisher__confirmed, {})
+        self.assertEqual(publisher._PersistentMQTTPublisher__early, {})
+        # Auf eine abgeschlossene Nachricht wird nicht gewartet
+        self.assertIsNone(publisher.waitForPublish(mid, timeout=2.0))
+
+
+class TestTopicTrie(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse TopicTrie.
+
+    Methods:
+        test_wildcards: Testet die Platzhalter "+" und "#".
+        test_system_topics: Testet, dass Topics mit "$" nicht von Platzhaltern auf der ersten Ebene erfasst werden.
+        test_remove: Testet das Entfernen von Handlern.
+        test_invalid_filter: Testet das Zurückweisen ungültiger Topic-Filter.
+    """
+    def test_wildcards(self):
+        """
+        Testet die Platzhalter "+" und "#".
+        """
+        trie = TopicTrie()
+        trie.add("shellies/+/input_event/0", "button")
+        trie.add("shellies/#", "all")
+        trie.add("RaspberryPiZeroW/Doorbell", "doorbell")
+        self.assertEqual(sorted(trie.match("shellies/shellybutton1/input_event/0")), ["all", "button"])
+        self.assertEqual(trie.match("shellies"), ["all"])
+        self.assertEqual(trie.match("shellies/shellybutton1/input_event/1"), ["all"])
+        self.assertEqual(trie.match("RaspberryPiZeroW/Doorbell"), ["doorbell"])
+        self.assertEqual(trie.match("RaspberryPiZeroW/Doorbell/x"), [])
+
+    def test_system_topics(self):
+        """
+        Testet, dass Topics mit "$" nicht von Platzhaltern auf der ersten Ebene erfasst werden.
+        """
+        trie = TopicTrie()
+        trie.add("#", "all")
+        trie.add("+/broker/uptime", "uptime")
+        trie.add("$SYS/#", "sys")
+        self.assertEqual(trie.match("$SYS/broker/uptime"), ["sys"])
+        self.assertEqual(sorted(trie.match("a/broker/uptime")), ["all", "uptime"])
+
+    def test_remove(self):
+        """
+        Testet das Entfernen von Handlern.
+        """
+        trie = TopicTrie()
+        trie.add("a/+", "first")
+        trie.add("a/+", "second")
+        self.assertFalse(trie.remove("a/+", "first"))
+        self.assertEqual(trie.match("a/b"), ["second"])
+        self.assertTrue(trie.remove("a/+", "second"))
+        self.assertEqual(trie.match("a/b"), [])
+        self.assertEqual(trie.filters(), [])
+        self.assertFalse(trie.remove("x/y", "first"))
+
+    def test_invalid_filter(self):
+        """
+        Testet das Zurückweisen ungültiger Topic-Filter.
+        """
+        trie = TopicTrie()
+        for topicFilter in ["a/#/b", "a/b#", "a+/b"]:
+            with self.assertRaises(ValueError):
+                trie.add(topicFilter, "handler")
+
+
+class TestMQTTSession(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse MQTTSession.
+
+    Methods:
+        setUp: Ersetzt den paho MQTT-Client durch den FakeClient.
+        test_shared_session: Testet, dass Publisher und Abonnenten dieselbe Verbindung nutzen.
+        test_existing_publisher: Testet, dass neben einem vorhandenen Publisher keine zweite Verbindung entsteht.
+        test_dispatch: Testet die Zuordnung und Dekodierung empfangener Nachrichten.
+        test_resubscribe: Testet das erneute Abonnieren nach einem Wiederverbinden.
+    """
+    def setUp(self) -> None:
+        """
+        Ersetzt den paho MQTT-Client durch den FakeClient.
+        """
+        FakeClient.instances = []
+        patcher = mock.patch.multiple(mqtt_protocol.mqtt, Client=FakeClient, MQTT_ERR_SUCCESS=0, MQTT_ERR_NO_CONN=4,
+                                      create=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.config = MQTTProtocolConfiguration("sound", "ring", broker="session.test")
+
+    def test_shared_session(self):
+        """
+        Testet, dass Publisher und Abonnenten dieselbe Verbindung nutzen.
+        """
+        session = MQTTSession.get_instance(self.config)
+        self.addCleanup(session.stop)
+        self.assertIs(PersistentMQTTPublisher.get_instance(self.config), session)
+        self.assertIs(MQTTSession.get_instance(MQTTProtocolConfiguration("other", "x", broker="session.test")),
+                      session)
+        session.subscribe("a/+", lambda topic, payload: None)
+        session.subscribe("b/#", lambda topic, payload: None)
+        self.assertEqual(len(FakeClient.instances), 1)
+        self.assertEqual(FakeClient.instances[0].subscriptions, ["a/+", "b/#"])
+
+    def test_existing_publisher(self):
+        """
+        Testet, dass neben einem vorhandenen Publisher keine zweite Verbindung entsteht.
+        """
+        config = MQTTProtocolConfiguration("sound", "ring", broker="publisher.test")
+        publisher = PersistentMQTTPublisher.get_instance(config)
+        with self.assertRaises(ValueError):
+            MQTTSession.get_instance(config)
+        self.assertIs(PersistentMQTTPublisher.get_instance(config), publisher)
+        self.assertEqual(len(FakeClient.instances), 1)
+        publisher.stop()
+        session = MQTTSession.get_instance(config)
+        self.addCleanup(session.stop)
+        self.assertIsNot(session, publisher)
+        self.assertEqual(len(FakeClient.instances), 2)
+
+    def test_dispatch(self):
+        """
+        Testet die Zuordnung und Dekodierung empfangener Nachrichten.
+        """
+        session = MQTTSession(self.config)
+        self.addCleanup(session.stop)
+        client = FakeClient.instances[0]
+        received = []
+        done = threading.Semaphore(0)
+
+        def handler(name):
+            def handle(topic, payload):
+                received.append((name, topic, payload, threading.current_thread().name))
+                done.release()
+            return handle
+
+        session.subscribe("shellies/+/input_event/0", handler("json"), MQTTSession.PAYLOAD_JSON)
+        session.subscribe("shellies/#", handler("text"))
+        client.deliver("shellies/button/input_event/0", json.dumps({"event": "S", "event_cnt": 3}).encode())
+        for _ in range(2):
+            self.assertTrue(done.acquire(timeout=2))
+        self.assertIn(("json", "shellies/button/input_event/0", {"event": "S", "event_cnt": 3}),
+                      [entry[:3] for entry in received])
+        self.assertIn("text", [entry[0] for entry in received])
+        self.assertTrue(all(entry[3].startswith("MQTTSession") for entry in received))
+
+        # Ungültiges JSON wird für den JSON-Handler verworfen, der Text-Handler erhält die Nachricht dennoch
+        received.clear()
+        for payload in [b"__import__('os')", b"[1, 2]", b"{kein json"]:
+            client.deliver("shellies/button/input_event/0", payload)
+            self.assertTrue(done.acquire(timeout=2))
+        self.assertEqual([entry[0] for entry in received], ["text"] * 3)
+        self.assertFalse(done.acquire(timeout=0.1))
+
+    def test_resubscribe(self):
+        """
+        Testet das erneute Abonnieren nach einem Wiederverbinden.
+        """
+        session = MQTTSession(self.config)
+        self.addCleanup(session.stop)
+        client = FakeClient.instances[0]
+
+        def handler(topic, payload):
+            pass
+
+        session.subscribe("a/+", handler)
+        session.subscribe("a/+", handler, MQTTSession.PAYLOAD_JSON)
+        self.assertEqual(client.subscriptions, ["a/+"])
+        client.drop()
+        client.subscriptions = []
+        client.reconnect()
+        self.assertEqual(client.subscriptions, ["a/+"])
+        session.unsubscribe("a/+", handler)
+        self.assertEqual(client.subscriptions, ["a/+"])
+        session.unsubscribe("a/+", handler, MQTTSession.PAYLOAD_JSON)
+        self.assertEqual(client.subscriptions, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import hashlib
+import unittest
+from unittest import mock
+from RaspberryPi.src.door_controller.server_adapter.password_hasher import PasswordHasher
+
+"""
+Dieses Modul ist zum Testen des Moduls password_hasher.
+Classes:
+    TestPasswordHasher(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse PasswordHasher
+
+@author Lukas Wittenzellner
+@version 1.0
+"""
+
+
+class TestPasswordHasher(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse PasswordHasher.
+
+    Methods:
+        setUp: Erzeugt einen PasswordHasher mit wenigen Iterationen.
+        test_hash: Testet das Format und die Überprüfung eines Hashes.
+        test_plaintext: Testet, dass noch im Klartext gespeicherte Passwörter akzeptiert werden.
+        test_cache: Testet, dass eine erfolgreiche Überprüfung den Hash nicht erneut berechnet.
+        test_invalidate: Testet, dass nach einer Änderung des Nutzers der Hash erneut berechnet wird.
+    """
+    def setUp(self) -> None:
+        """
+        Erzeugt einen PasswordHasher mit wenigen Iterationen.
+        """
+        self.hasher = PasswordHasher(iterations=1000)
+
+    def test_hash(self):
+        """
+        Testet das Format und die Überprüfung eines Hashes.
+        """
+        stored = self.hasher.hash("passwort")
+        self.assertTrue(PasswordHasher.is_hashed(stored))
+        self.assertTrue(stored.startswith("pbkdf2-sha256.1000."))
+        for separator in (",", ";", ":", "$"):
+            self.assertNotIn(separator, stored)
+        # Jeder Hash hat ein eigenes Salz
+        self.assertNotEqual(stored, self.hasher.hash("passwort"))
+        self.assertTrue(self.hasher.verify("1", "passwort", stored))
+        self.assertFalse(self.hasher.verify("1", "falsch", stored))
+        self.assertFalse(self.hasher.verify("1", "passwort", "pbkdf2-sha256.1000.kaputt"))
+
+    def test_plaintext(self):
+        """
+        Testet, dass noch im Klartext gespeicherte Passwörter akzeptiert werden.
+        """
+        self.assertFalse(PasswordHasher.is_hashed("passwort"))
+        self.assertTrue(self.hasher.verify("1", "passwort", "passwort"))
+        self.assertFalse(self.hasher.verify("1", "falsch", "passwort"))
+
+    def test_cache(self):
+        """
+        Testet, dass eine erfolgreiche Überprüfung den Hash nicht erneut berechnet.
+        """
+        stored = self.hasher.hash("passwort")
+        with mock.patch.object(hashlib, "pbkdf2_hmac", wraps=hashlib.pbkdf2_hmac) as pbkdf2:
+            for _ in range(3):
+                self.assertTrue(self.hasher.verify("1", "passwort", stored))
+            self.assertEqual(pbkdf2.call_count, 1)
+            # Ein falsches Passwort wird nie aus dem Zwischenspeicher bestätigt
+            self.assertFalse(self.hasher.verify("1", "falsch", stored))
+            self.assertFalse(self.hasher.verify("1", "falsch", stored))
+            self.assertEqual(pbkdf2.call_count, 3)
+
+    def test_invalidate(self):
+        """
+        Testet, dass nach einer Änderung des Nutzers der Hash erneut berechnet wird.
+        """
+        stored = self.hasher.hash("passwort")
+        other = self.hasher.hash("passwort")
+        with mock.patch.object(hashlib, "pbkdf2_hmac", wraps=hashlib.pbkdf2_hmac) as pbkdf2:
+            self.assertTrue(self.hasher.verify("1", "passwort", stored))
+            self.hasher.invalidate("1")
+            self.assertTrue(self.hasher.verify("1", "passwort", stored))
+            self.assertEqual(pbkdf2.call_count, 2)
+            # Ein anderes gespeichertes Passwort passt nicht zum zwischengespeicherten Eintrag
+            self.assertTrue(self.hasher.verify("1", "passwort", other))
+            self.assertEqual(pbkdf2.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
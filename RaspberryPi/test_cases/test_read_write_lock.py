@@ -0,0 +1,88 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import threading
+import time
+import unittest
+from RaspberryPi.src.door_controller.server_adapter.read_write_lock import ReadWriteLock
+
+"""
+Dieses Modul ist zum Testen des Moduls read_write_lock.
+Classes:
+    TestReadWriteLock(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse ReadWriteLock
+
+@author Lukas Wittenzellner
+@version 1.0
+"""
+
+
+class TestReadWriteLock(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse ReadWriteLock.
+
+    Methods:
+        test_concurrent_readers: Testet, dass mehrere Leser das Lock gleichzeitig halten.
+        test_writer_exclusive: Testet, dass ein Schreiber das Lock allein hält.
+        test_writer_not_starved: Testet, dass ein wartender Schreiber vor später ankommenden Lesern bedient wird.
+    """
+    def setUp(self) -> None:
+        self.lock = ReadWriteLock()
+
+    def test_concurrent_readers(self):
+        """
+        Testet, dass mehrere Leser das Lock gleichzeitig halten.
+        """
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read():
+            with self.lock.read_locked():
+                # Alle drei Leser müssen gleichzeitig im Block sein, sonst läuft die Barriere ab
+                barrier.wait()
+
+        threads = [threading.Thread(target=read) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(barrier.broken)
+
+    def test_writer_exclusive(self):
+        """
+        Testet, dass ein Schreiber das Lock allein hält.
+        """
+        events = list()
+        self.lock.acquire_read()
+        writer = threading.Thread(target=lambda: self.__run(self.lock.write_locked, events, "write"))
+        writer.start()
+        time.sleep(0.1)
+        events.append("read end")
+        self.lock.release_read()
+        writer.join()
+        self.assertEqual(events, ["read end", "write"])
+
+    def test_writer_not_starved(self):
+        """
+        Testet, dass ein wartender Schreiber vor später ankommenden Lesern bedient wird.
+        """
+        events = list()
+        self.lock.acquire_read()
+        writer = threading.Thread(target=lambda: self.__run(self.lock.write_locked, events, "write"))
+        writer.start()
+        time.sleep(0.1)
+        reader = threading.Thread(target=lambda: self.__run(self.lock.read_locked, events, "read"))
+        reader.start()
+        time.sleep(0.1)
+        # Der neue Leser wartet hinter dem Schreiber, obwohl gerade nur gelesen wird
+        self.assertEqual(events, [])
+        self.lock.release_read()
+        writer.join()
+        reader.join()
+        self.assertEqual(events, ["write", "read"])
+
+    @staticmethod
+    def __run(locked, events, name):
+        with locked():
+            events.append(name)
+
+
+if __name__ == '__main__':
+    unittest.main()
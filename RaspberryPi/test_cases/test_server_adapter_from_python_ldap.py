@@ -0,0 +1,102 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import unittest
+from RaspberryPi.src.data_model.configuration import LDAPConfiguration
+from RaspberryPi.src.data_model.identifier import Identifier
+from RaspberryPi.src.data_model.key_token import UnauthorizedNFCToken
+from RaspberryPi.src.data_model.name import Name, LastName, FirstName
+from RaspberryPi.src.data_model.password import Password
+from RaspberryPi.src.data_model.user import UnauthenticatedUser
+from RaspberryPi.src.door_controller.server_adapter.server_adapter_from_python_ldap import ServerAdapterFromPythonLDAP
+
+"""
+Dieses Modul ist zum Testen des Moduls server_adapter_from_python_ldap.
+Die Tests laufen ohne LDAP-Server über die Strategie MOCK_SYNC von ldap3.
+Classes:
+    TestServerAdapterFromPythonLDAP(unittest.TestCase): Diese Klasse implementiert Test Methoden für
+        die Klasse ServerAdapterFromPythonLDAP
+
+@author Lukas Wittenzellner
+@version 1.0
+"""
+
+BASE = "ou=people,dc=example,dc=com"
+
+
+class TestServerAdapterFromPythonLDAP(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse ServerAdapterFromPythonLDAP.
+
+    Methods:
+        setUp: Legt ein Dienstkonto, einen Admin und einen Nutzer im simulierten Verzeichnis an.
+        test_authentication: Testet, dass nur mit dem richtigen Passwort Daten zurückgegeben werden.
+        test_get_user: Testet das Bekommen der gespeicherten Informationen eines Nutzers.
+        test_add_and_delete_token: Testet das Hinzufügen und Löschen von Tokens.
+        test_get_all_valid_tokens: Testet das seitenweise Bekommen aller Tokens aller Nutzer.
+    """
+    def setUp(self) -> None:
+        """
+        Legt ein Dienstkonto, einen Admin und einen Nutzer im simulierten Verzeichnis an.
+        """
+        self.adapter = ServerAdapterFromPythonLDAP(LDAPConfiguration(client_strategy="MOCK_SYNC",
+                                                                     bind_dn="cn=service,dc=example,dc=com",
+                                                                     bind_password="service", search_base=BASE,
+                                                                     page_size=1))
+        strategy = self.adapter.get_connection().strategy
+        strategy.add_entry("cn=service,dc=example,dc=com", {"objectClass": ["person"], "cn": "service",
+                                                            "sn": "service", "userPassword": "service"})
+        strategy.add_entry("uid=admin," + BASE, {"objectClass": ["person", "inetOrgPerson"], "uid": "admin",
+                                                 "sn": "admin", "givenName": "admin", "userPassword": "admin",
+                                                 "description": ["admintoken"]})
+        strategy.add_entry("uid=1," + BASE, {"objectClass": ["person", "inetOrgPerson"], "uid": "1",
+                                             "sn": "Mustermann", "givenName": "Max", "userPassword": "passwort",
+                                             "description": ["token1", "token2"]})
+        self.admin = UnauthenticatedUser(Name(FirstName("admin"), LastName("admin")), Identifier("admin"))
+        self.password = Password("admin")
+        self.user = UnauthenticatedUser(Name(FirstName("Max"), LastName("Mustermann")), Identifier("1"))
+
+    def test_authentication(self):
+        """
+        Testet, dass nur mit dem richtigen Passwort Daten zurückgegeben werden.
+        """
+        self.assertEqual(self.adapter.get_user(self.admin, Password("falsch"), self.user), "")
+        self.assertEqual(self.adapter.get_all_valid_tokens(self.admin, Password("falsch")), [])
+
+    def test_get_user(self):
+        """
+        Testet das Bekommen der gespeicherten Informationen eines Nutzers.
+        """
+        self.assertEqual(self.adapter.get_user(self.admin, self.password, self.user),
+                         "Mustermann,Max;1;*:token1;token2")
+        unknown = UnauthenticatedUser(Name(FirstName("a"), LastName("a")), Identifier("unbekannt"))
+        self.assertEqual(self.adapter.get_user(self.admin, self.password, unknown), "")
+
+    def test_add_and_delete_token(self):
+        """
+        Testet das Hinzufügen und Löschen von Tokens.
+        """
+        self.adapter.add_token_to_user(self.admin, self.password, self.user, UnauthorizedNFCToken(Identifier("t3")))
+        # Ein bereits vergebener Token wird nicht ein zweites Mal vergeben
+        self.adapter.add_token_to_user(self.admin, self.password, self.user,
+                                       UnauthorizedNFCToken(Identifier("admintoken")))
+        self.assertEqual(self.adapter.get_user(self.admin, self.password, self.user),
+                         "Mustermann,Max;1;*:token1;token2;t3")
+
+        self.adapter.delete_token_from_user(self.admin, self.password, self.user,
+                                            UnauthorizedNFCToken(Identifier("token1")))
+        self.assertEqual(self.adapter.get_user(self.admin, self.password, self.user),
+                         "Mustermann,Max;1;*:token2;t3")
+
+        self.adapter.delete_all_tokens_from_user(self.admin, self.password, self.user)
+        self.assertEqual(self.adapter.get_user(self.admin, self.password, self.user), "Mustermann,Max;1;*:")
+
+    def test_get_all_valid_tokens(self):
+        """
+        Testet das seitenweise Bekommen aller Tokens aller Nutzer.
+        """
+        tokens = self.adapter.get_all_valid_tokens(self.admin, self.password)
+        self.assertEqual({str(token.identifier) for token in tokens}, {"admintoken", "token1", "token2"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import os
+import tempfile
+import unittest
+from RaspberryPi.src.data_model.identifier import Identifier
+from RaspberryPi.src.data_model.key_token import UnauthorizedNFCToken
+from RaspberryPi.src.data_model.name import Name, LastName, FirstName
+from RaspberryPi.src.data_model.password import Password
+from RaspberryPi.src.data_model.user import UnauthenticatedUser
+from RaspberryPi.src.door_controller.server_adapter.password_hasher import PasswordHasher
+from RaspberryPi.src.door_controller.server_adapter.server_adapter_from_sqlite import ServerAdapterFromSQLite
+
+"""
+Dieses Modul ist zum Testen des Moduls server_adapter_from_sqlite.
+Classes:
+    TestServerAdapterFromSQLite(unittest.TestCase): Diese Klasse implementiert Test Methoden für
+        die Klasse ServerAdapterFromSQLite
+
+@author Lukas Wittenzellner
+@version 1.2
+"""
+
+CONTENT = "admin,admin;admin;admin:admintoken\nMustermann,Max;1;passwort:token1;token2\n"
+
+
+class TestServerAdapterFromSQLite(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse ServerAdapterFromSQLite.
+
+    Methods:
+        setUp: Legt eine Textdatei an, aus der eine neue Datenbank befüllt wird.
+        test_migration: Testet die einmalige Übernahme der Nutzer aus der Textdatei.
+        test_authentication: Testet, dass nur mit dem richtigen Passwort Daten zurückgegeben werden.
+        test_add_and_delete_token: Testet das Hinzufügen und Löschen von Tokens.
+        test_token_changes: Testet das Bekommen der Änderungen an den Tokens seit einer Nummer.
+        test_apply_token_operations: Testet das gemeinsame Ausführen mehrerer Änderungen.
+        test_password_hashes: Testet, dass die Passwörter als Hashes gespeichert werden.
+    """
+    def setUp(self) -> None:
+        """
+        Legt eine Textdatei an, aus der eine neue Datenbank befüllt wird.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.text_path = os.path.join(self.directory.name, "ValidTokens.txt")
+        self.path = os.path.join(self.directory.name, "ValidTokens.sqlite")
+        with open(self.text_path, "w") as file:
+            file.write(CONTENT)
+        self.adapter = ServerAdapterFromSQLite(self.path, self.text_path)
+        self.admin = UnauthenticatedUser(Name(FirstName("admin"), LastName("admin")), Identifier("admin"))
+        self.password = Password("admin")
+        self.user = UnauthenticatedUser(Name(FirstName("Max"), LastName("Mustermann")), Identifier("1"))
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def __get_user(self, user):
+        # Die Passwörter sind als Hash mit zufälligem Salz gespeichert und werden für den Vergleich ersetzt
+        line = self.adapter.get_user(self.admin, self.password, user)
+        if line == "":
+            return line
+        user_data, tokens = line.split(":", 1)
+        user_data = user_data.split(";")
+        self.assertTrue(PasswordHasher.is_hashed(user_data[2]))
+        user_data[2] = "*"
+        return ";".join(user_data) + ":" + tokens
+
+    def test_migration(self):
+        """
+        Testet die einmalige Übernahme der Nutzer aus der Textdatei.
+        """
+        self.assertEqual(self.__get_user(self.user),
+                         "Mustermann,Max;1;*:token1;token2")
+        # Eine befüllte Datenbank wird nicht erneut aus der Textdatei befüllt
+        with open(self.text_path, "w") as file:
+            file.write("admin,admin;admin;admin:\n")
+        adapter = ServerAdapterFromSQLite(self.path, self.text_path)
+        tokens = adapter.get_all_valid_tokens(self.admin, self.password)
+        self.assertEqual({str(token.identifier) for token in tokens}, {"admintoken", "token1", "token2"})
+
+    def test_authentication(self):
+        """
+        Testet, dass nur mit dem richtigen Passwort Daten zurückgegeben werden.
+        """
+        self.assertEqual(self.adapter.get_user(self.admin, Password("falsch"), self.user), "")
+        self.assertEqual(self.adapter.get_all_valid_tokens(self.admin, Password("falsch")), [])
+
+    def test_add_and_delete_token(self):
+        """
+        Testet das Hinzufügen und Löschen von Tokens.
+        """
+        self.adapter.add_token_to_user(self.admin, self.password, self.user, UnauthorizedNFCToken(Identifier("t3")))
+        # Ein bereits vergebener Token wird nicht ein zweites Mal vergeben
+        self.adapter.add_token_to_user(self.admin, self.password, self.user,
+                                       UnauthorizedNFCToken(Identifier("admintoken")))
+        self.assertEqual(self.__get_user(self.user),
+                         "Mustermann,Max;1;*:token1;token2;t3")
+
+        self.adapter.delete_token_from_user(self.admin, self.password, self.user,
+                                            UnauthorizedNFCToken(Identifier("token1")))
+        self.assertEqual(self.__get_user(self.user),
+                         "Mustermann,Max;1;*:token2;t3")
+
+        self.adapter.delete_all_tokens_from_user(self.admin, self.password, self.user)
+        self.assertEqual(self.__get_user(self.user), "Mustermann,Max;1;*:")
+
+    def test_token_changes(self):
+        """
+        Testet das Bekommen der Änderungen an den Tokens seit einer Nummer.
+        """
+        full = self.adapter.get_token_changes_since(self.admin, self.password, None)
+        self.assertTrue(full.full)
+        self.assertEqual({str(token.identifier) for token in full.added}, {"admintoken", "token1", "token2"})
+
+        self.adapter.add_token_to_user(self.admin, self.password, self.user, UnauthorizedNFCToken(Identifier("t3")))
+        self.adapter.delete_token_from_user(self.admin, self.password, self.user,
+                                            UnauthorizedNFCToken(Identifier("token1")))
+        changes = self.adapter.get_token_changes_since(self.admin, self.password, full.version)
+        self.assertFalse(changes.full)
+        self.assertEqual([str(token.identifier) for token in changes.added], ["t3"])
+        self.assertEqual([str(token.identifier) for token in changes.removed], ["token1"])
+        self.assertEqual(changes.version, self.adapter.get_token_generation())
+        self.assertTrue(self.adapter.get_token_changes_since(self.admin, self.password, changes.version).is_empty())
+
+    def test_apply_token_operations(self):
+        """
+        Testet das gemeinsame Ausführen mehrerer Änderungen.
+        """
+        operations = [(ServerAdapterFromSQLite.OPERATION_ADD_TOKEN, self.user,
+                       UnauthorizedNFCToken(Identifier("t3"))),
+                      (ServerAdapterFromSQLite.OPERATION_ADD_TOKEN, self.user,
+                       UnauthorizedNFCToken(Identifier("admintoken"))),
+                      (ServerAdapterFromSQLite.OPERATION_DELETE_TOKEN, self.user,
+                       UnauthorizedNFCToken(Identifier("token1"))),
+                      (ServerAdapterFromSQLite.OPERATION_DELETE_ALL, self.admin, None)]
+        self.assertEqual(self.adapter.apply_token_operations(self.admin, Password("falsch"), operations),
+                         [False] * 4)
+        self.assertEqual(self.adapter.apply_token_operations(self.admin, self.password, operations),
+                         [True, False, True, True])
+        self.assertEqual(self.__get_user(self.user),
+                         "Mustermann,Max;1;*:token2;t3")
+        self.assertEqual(self.__get_user(self.admin), "admin,admin;admin;*:")
+
+
+    def test_password_hashes(self):
+        """
+        Testet, dass die Passwörter als Hashes gespeichert werden.
+        """
+        line = self.adapter.get_user(self.admin, self.password, self.admin)
+        self.assertTrue(PasswordHasher.is_hashed(line.split(":")[0].split(";")[2]))
+        self.assertTrue(self.adapter.authenticate(self.admin, self.password))
+        self.assertFalse(self.adapter.authenticate(self.admin, Password("falsch")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import os
+import tempfile
+import time
+import unittest
+from RaspberryPi.src.door_controller.entities.timestamp_store import TimestampStore, ClearJob
+
+"""
+Dieses Modul ist zum Testen des Moduls timestamp_store.
+Classes:
+    RateLimited: Simuliert die Ablehnung einer Löschung durch Slack wegen zu vieler Anfragen.
+    TestTimestampStore(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klassen TimestampStore und
+        ClearJob
+
+@author Lukas Wittenzellner
+@version 1.2
+"""
+
+
+class RateLimited(Exception):
+    """
+    Simuliert die Ablehnung einer Löschung durch Slack wegen zu vieler Anfragen.
+    """
+    class Response:
+        status_code = 429
+        headers = {"Retry-After": "0.2"}
+
+    response = Response()
+
+
+class TestTimestampStore(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klassen TimestampStore und ClearJob.
+
+    Methods:
+        setUp: Legt ein temporäres Verzeichnis für die Datei der Timestamps an.
+        test_conversion: Testet die verlustfreie Umwandlung der Slack Timestamps.
+        test_bounded: Testet, dass nur die neuesten Timestamps gespeichert bleiben, auch nach einem Neustart.
+        test_torn_record: Testet, dass ein unvollständiger letzter Eintrag folgende Einträge nicht verschiebt.
+        test_clear: Testet das Löschen mit begrenzter Rate und Fortschritt.
+        test_retry_after: Testet das Warten und Wiederholen nach einer Ablehnung wegen zu vieler Anfragen.
+        test_resume: Testet das Fortsetzen eines unterbrochenen Löschens.
+    """
+    def setUp(self) -> None:
+        """
+        Legt ein temporäres Verzeichnis für die Datei der Timestamps an.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "info.ts")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_conversion(self):
+        """
+        Testet die verlustfreie Umwandlung der Slack Timestamps.
+        """
+        for ts in ("1646478123.123456", "1646478123.000001", "1646478123.100000"):
+            self.assertEqual(TimestampStore.to_str(TimestampStore.to_int(ts)), ts)
+        self.assertEqual(TimestampStore.to_str(TimestampStore.to_int("12.5")), "12.500000")
+        self.assertRaises(ValueError, TimestampStore.to_int, "kein Timestamp")
+
+    def test_bounded(self):
+        """
+        Testet, dass nur die neuesten Timestamps gespeichert bleiben, auch nach einem Neustart.
+        """
+        store = TimestampStore(self.path, capacity=3)
+        for i in range(10):
+            store.add("100" + str(i) + ".000001")
+        self.assertEqual(store.snapshot(), ["1007.000001", "1008.000001", "1009.000001"])
+        # Die Datei wächst höchstens auf die doppelte Maximalgröße
+        self.assertLessEqual(os.path.getsize(self.path), 2 * 3 * 8)
+        restarted = TimestampStore(self.path, capacity=3)
+        self.assertEqual(restarted.snapshot(), store.snapshot())
+        restarted.remove(["1008.000001"])
+        self.assertEqual(TimestampStore(self.path, capacity=3).snapshot(), ["1007.000001", "1009.000001"])
+
+    def test_torn_record(self):
+        """
+        Testet, dass ein unvollständiger letzter Eintrag folgende Einträge nicht verschiebt.
+        """
+        TimestampStore(self.path).add("1646478100.000001")
+        with open(self.path, "ab") as file:
+            file.write(b"\x01\x02\x03")
+        TimestampStore(self.path).add("1646478200.000001")
+        self.assertEqual(TimestampStore(self.path).snapshot(), ["1646478100.000001", "1646478200.000001"])
+
+    def test_clear(self):
+        """
+        Testet das Löschen mit begrenzter Rate und Fortschritt.
+        """
+        store = TimestampStore(self.path, capacity=100)
+        for i in range(20):
+            store.add(str(1000 + i) + ".5")
+        upto = store.begin_clear()
+        store.add("2000.5")
+        progress = []
+        job = ClearJob(store, lambda ts: ts != "1003.500000", upto, rate=200.0, batch_size=8,
+                       on_progress=lambda *values: progress.append(values))
+        job.start()
+        self.assertTrue(job.wait(5))
+        self.assertFalse(job.running())
+        self.assertEqual(job.progress(), (19, 1, 20))
+        self.assertEqual([values[2] for values in progress], [20, 20, 20])
+        self.assertEqual(progress[-1], (19, 1, 20))
+        # Der fehlgeschlagene und der neue Timestamp bleiben erhalten
+        self.assertEqual(store.snapshot(), ["1003.500000", "2000.500000"])
+        self.assertIsNone(store.pending_clear())
+
+        # Die Rate begrenzt die Anfragen
+        for i in range(5):
+            store.add(str(3000 + i) + ".5")
+        start = time.monotonic()
+        job = ClearJob(store, lambda ts: True, store.begin_clear(), rate=20.0)
+        job.start()
+        self.assertTrue(job.wait(5))
+        self.assertGreaterEqual(time.monotonic() - start, 5 / 20.0)
+
+    def test_retry_after(self):
+        """
+        Testet, dass nach einer Ablehnung wegen zu vieler Anfragen die verlangte Zeit gewartet und wiederholt wird.
+        """
+        store = TimestampStore(self.path, capacity=100)
+        for i in range(3):
+            store.add(str(1000 + i) + ".5")
+        attempts = []
+
+        def delete(ts):
+            attempts.append((ts, time.monotonic()))
+            if len(attempts) == 2:
+                raise RateLimited()
+            return True
+
+        job = ClearJob(store, delete, store.begin_clear(), rate=0)
+        job.start()
+        self.assertTrue(job.wait(5))
+        self.assertEqual(job.progress(), (3, 0, 3))
+        self.assertEqual([ts for ts, _ in attempts], ["1000.500000", "1001.500000", "1001.500000", "1002.500000"])
+        self.assertGreaterEqual(attempts[2][1] - attempts[1][1], 0.2)
+        self.assertEqual(store.snapshot(), [])
+
+    def test_resume(self):
+        """
+        Testet das Fortsetzen eines unterbrochenen Löschens.
+        """
+        store = TimestampStore(self.path, capacity=100)
+        for i in range(4):
+            store.add(str(1000 + i) + ".5")
+        upto = store.begin_clear()
+        store.remove(["1000.500000", "1001.500000"])
+        store.add("2000.5")
+        # Nach einem Neustart sind nur noch die nicht gelöschten Timestamps bis zum Vermerk zu löschen
+        restarted = TimestampStore(self.path, capacity=100)
+        self.assertEqual(restarted.pending_clear(), upto)
+        deleted = []
+        job = ClearJob(restarted, lambda ts: deleted.append(ts) or True, restarted.pending_clear(), rate=0)
+        job.start()
+        self.assertTrue(job.wait(5))
+        self.assertEqual(sorted(deleted), ["1002.500000", "1003.500000"])
+        self.assertEqual(restarted.snapshot(), ["2000.500000"])
+        self.assertIsNone(restarted.pending_clear())
+
+
+if __name__ == '__main__':
+    unittest.main()
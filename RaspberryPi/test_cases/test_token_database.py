@@ -0,0 +1,79 @@
+import sys
+
+sys.path.append('/home/pi/src-Building-Security-System')
+import hashlib
+import os
+import tempfile
+import unittest
+
+from RaspberryPi.src.data_model.identifier import Identifier
+from RaspberryPi.src.data_model.key_token import UnauthorizedNFCToken
+from RaspberryPi.src.data_model.token_database import TokenDatabase
+
+"""
+Dieses Modul testet die Funktionalität der Klasse :class:`~token_database.TokenDatabase`
+mithilfe von Unittests.
+
+Classes:
+    TestTokenDatabase: Repräsentiert eine Testklasse, welche die Methoden der Klasse
+                       :class:`~token_database.TokenDatabase` testet.
+
+@author Ahmad Eynawi
+@version 1.0
+
+@author Lukas Wittenzellner
+@version 1.1
+"""
+
+
+class TestTokenDatabase(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.__directory = tempfile.TemporaryDirectory()
+        self.__path = os.path.join(self.__directory.name, "ValidTokens.db")
+        self.__tokens = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(100)]
+
+    def tearDown(self) -> None:
+        self.__directory.cleanup()
+
+    def test_missing_file(self):
+        database = TokenDatabase(self.__path)
+        self.assertEqual(len(database), 0)
+        self.assertFalse(database.hasToken(UnauthorizedNFCToken(Identifier(self.__tokens[0]))))
+
+    def test_write_and_search(self):
+        self.assertEqual(TokenDatabase.write(self.__path, self.__tokens + ["kein_digest", self.__tokens[0]]), 100)
+        self.assertEqual(os.path.getsize(self.__path), TokenDatabase.HEADER.size + 100 * TokenDatabase.DIGEST_SIZE)
+        database = TokenDatabase(self.__path)
+        self.assertEqual(len(database), 100)
+        for token in self.__tokens:
+            self.assertTrue(database.hasToken(UnauthorizedNFCToken(Identifier(token))))
+        self.assertFalse(database.hasToken(UnauthorizedNFCToken(Identifier(hashlib.sha256(b"x").hexdigest()))))
+        self.assertFalse(database.hasToken(UnauthorizedNFCToken(Identifier("kein_digest"))))
+        database.close()
+
+    def test_merge(self):
+        TokenDatabase.write(self.__path, self.__tokens[:50])
+        database = TokenDatabase(self.__path)
+        removed = self.__tokens[:10] + [self.__tokens[60], "kein_digest"]
+        added = self.__tokens[40:70] + [self.__tokens[5]]
+        self.assertEqual(database.merge(added, removed), 61)
+        self.assertEqual(len(database), 50)
+        merged = TokenDatabase(self.__path)
+        self.assertEqual(list(merged.tokens()), sorted(set(self.__tokens[5:6] + self.__tokens[10:70])))
+        database.close()
+        merged.close()
+
+    def test_merge_missing_file(self):
+        database = TokenDatabase(self.__path)
+        self.assertEqual(database.merge(self.__tokens[:3], self.__tokens[3:5]), 3)
+        self.assertEqual(list(TokenDatabase(self.__path).tokens()), sorted(self.__tokens[:3]))
+
+    def test_invalid_file(self):
+        with open(self.__path, "wb") as file:
+            file.write(b"ValidTokens")
+        self.assertRaises(ValueError, TokenDatabase, self.__path)
+
+
+if __name__ == '__main__':
+    unittest.main()
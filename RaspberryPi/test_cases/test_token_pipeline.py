@@ -0,0 +1,142 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import hashlib
+import queue
+import threading
+import time
+import unittest
+from RaspberryPi.src.door_controller.door_control_handler.token_pipeline import TokenPipeline
+
+"""
+Dieses Modul ist zum Testen des Moduls token_pipeline.
+Classes:
+    FakeReader: Ersetzt das NFC-Lesegerät und gibt die Tokens einer Warteschlange zurück.
+    TestTokenPipeline(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse TokenPipeline
+
+@author Lukas Wittenzellner
+@version 1.1
+"""
+
+
+class FakeReader:
+    """
+    Ersetzt das NFC-Lesegerät. readToken blockiert, bis ein Token in die Warteschlange gelegt wird.
+    """
+    def __init__(self):
+        self.tokens = queue.Queue()
+
+    def present(self, token_id: str):
+        self.tokens.put(token_id)
+
+    def readToken(self):
+        token_id = self.tokens.get()
+        if isinstance(token_id, Exception):
+            raise token_id
+        return hashlib.sha256(token_id.encode())
+
+
+class TestTokenPipeline(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse TokenPipeline.
+
+    Methods:
+        setUp: Erstellt eine Pipeline mit einem FakeReader.
+        test_handled: Testet, dass gelesene Tokens mit Zeitpunkt an den Handler übergeben werden.
+        test_reader_not_blocked: Testet, dass ein langsamer Handler das Lesen nicht blockiert.
+        test_duplicates: Testet das Verwerfen wiederholt gelesener Tokens.
+        test_read_error: Testet, dass ein fehlgeschlagenes Lesen das Lesen nicht beendet.
+        test_stop_full_queue: Testet, dass stop bei voller Warteschlange nicht blockiert.
+    """
+    WINDOW = 0.3
+
+    def setUp(self) -> None:
+        """
+        Erstellt eine Pipeline mit einem FakeReader.
+        """
+        self.reader = FakeReader()
+        self.handled = queue.Queue()
+        self.release = threading.Event()
+        self.release.set()
+        self.pipeline = TokenPipeline(self.reader, self.handle, self.WINDOW, 4)
+        self.pipeline.start()
+        self.addCleanup(self.pipeline.stop, 1)
+        self.addCleanup(self.release.set)
+
+    def handle(self, digest, timestamp):
+        self.release.wait()
+        self.handled.put((digest, timestamp, threading.current_thread().name))
+
+    def test_handled(self):
+        """
+        Testet, dass gelesene Tokens mit Zeitpunkt an den Handler übergeben werden.
+        """
+        before = time.monotonic()
+        self.reader.present("a1b2")
+        digest, timestamp, thread = self.handled.get(timeout=1)
+        self.assertEqual(digest, hashlib.sha256("a1b2".encode()).hexdigest())
+        self.assertGreaterEqual(timestamp, before)
+        self.assertEqual(thread, "TokenWorker")
+
+    def test_reader_not_blocked(self):
+        """
+        Testet, dass ein langsamer Handler das Lesen nicht blockiert.
+        """
+        self.release.clear()
+        for token_id in ["1", "2", "3"]:
+            self.reader.present(token_id)
+        deadline = time.monotonic() + 1
+        while self.pipeline.statistics()["read"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.pipeline.statistics()["read"], 3)
+        self.assertTrue(self.handled.empty())
+        self.release.set()
+        self.assertEqual(sorted(self.handled.get(timeout=1)[0] for _ in range(3)),
+                         sorted(hashlib.sha256(token_id.encode()).hexdigest() for token_id in ["1", "2", "3"]))
+
+    def test_duplicates(self):
+        """
+        Testet das Verwerfen wiederholt gelesener Tokens.
+        """
+        for _ in range(5):
+            self.reader.present("card")
+            time.sleep(self.WINDOW / 3)
+        self.reader.present("other")
+        self.assertEqual(self.handled.get(timeout=1)[0], hashlib.sha256("card".encode()).hexdigest())
+        self.assertEqual(self.handled.get(timeout=1)[0], hashlib.sha256("other".encode()).hexdigest())
+        self.assertEqual(self.pipeline.statistics()["duplicates"], 4)
+        time.sleep(self.WINDOW)
+        self.reader.present("card")
+        self.assertEqual(self.handled.get(timeout=1)[0], hashlib.sha256("card".encode()).hexdigest())
+
+    def test_read_error(self):
+        """
+        Testet, dass ein fehlgeschlagenes Lesen das Lesen nicht beendet.
+        """
+        TokenPipeline.READ_ERROR_DELAY = 0
+        self.addCleanup(setattr, TokenPipeline, "READ_ERROR_DELAY", 1.0)
+        self.reader.present(IOError("Kein Token"))
+        self.reader.present("card")
+        self.assertEqual(self.handled.get(timeout=1)[0], hashlib.sha256("card".encode()).hexdigest())
+
+    def test_stop_full_queue(self):
+        """
+        Testet, dass stop bei voller Warteschlange nicht blockiert und die gelesenen Tokens noch geprüft werden.
+        """
+        self.release.clear()
+        for token_id in ["1", "2", "3", "4", "5", "6"]:
+            self.reader.present(token_id)
+        deadline = time.monotonic() + 1
+        while self.pipeline.statistics()["dropped"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        dropped = self.pipeline.statistics()["dropped"]
+        self.assertGreaterEqual(dropped, 1)
+        start = time.monotonic()
+        self.pipeline.stop(0)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.release.set()
+        for _ in range(6 - dropped):
+            self.handled.get(timeout=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,282 @@
+import sys
+sys.path.append('/home/pi/src-Building-Security-System')
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from RaspberryPi.src.door_controller.server_adapter import token_store
+from RaspberryPi.src.door_controller.server_adapter.password_hasher import PasswordHasher
+from RaspberryPi.src.door_controller.server_adapter.token_store import TokenStore, UserRecord
+
+"""
+Dieses Modul ist zum Testen des Moduls token_store.
+Classes:
+    TestTokenStore(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse TokenStore.
+
+@author Lukas Wittenzellner
+@version 1.5
+"""
+
+
+class TestTokenStore(unittest.TestCase):
+    """
+    Diese Klasse testet die Methoden der Klasse TokenStore.
+
+    Methods:
+        setUp: Legt eine temporäre Tokendatei mit zwei Nutzern an.
+        tearDown: Löscht die temporäre Tokendatei und das Journal.
+        test_get_instance: Testet, dass für einen Pfad immer dieselbe Instanz zurückgegeben wird.
+        test_authenticate: Testet die Authentifizierung über den Index der Nutzer-IDs.
+        test_add_and_delete_token: Testet das Hinzufügen und Löschen von Tokens.
+        test_reload_on_change: Testet, dass eine von außen veränderte Datei neu eingelesen wird.
+        test_parse: Testet das Zerlegen einer Zeile der Tokendatei.
+        test_journal_replay: Testet, dass Änderungen nur im Journal landen und beim Laden nachgespielt werden.
+        test_torn_journal: Testet, dass eine Änderung nach einer unvollständigen letzten Zeile erhalten bleibt.
+        test_compact: Testet das Übernehmen des Journals in die Tokendatei.
+        test_stale_journal: Testet, dass ein nicht mehr zur Tokendatei passendes Journal verworfen wird.
+        test_copied_snapshot: Testet, dass das Journal nach dem Kopieren oder Berühren der Tokendatei gültig bleibt.
+        test_snapshot_without_sequence: Testet, dass eine Tokendatei ohne Sequenznummer einmalig neu geschrieben wird.
+        test_change_listener: Testet, dass eine von außen veränderte Datei gemeldet wird.
+        test_generation: Testet, dass sich die Generation nur bei einer Änderung des Inhalts erhöht.
+        test_changes_since: Testet das Abfragen der Änderungen seit einer Generation.
+        test_apply_operations: Testet das gemeinsame Anwenden mehrerer Änderungen.
+        test_migrate_passwords: Testet das einmalige Umstellen der Passwörter auf Hashes.
+    """
+
+    def setUp(self) -> None:
+        """
+        Legt eine temporäre Tokendatei mit zwei Nutzern an.
+        """
+        file_descriptor, self.path = tempfile.mkstemp(suffix=".txt")
+        with os.fdopen(file_descriptor, "w") as file:
+            file.write("#sequence;1\n"
+                       "admin,admin;admin;admin:admintoken\n"
+                       "Mustermann,Max;1;passwort:token1;token2")
+        self.store = TokenStore(self.path)
+
+    def tearDown(self) -> None:
+        """
+        Löscht die temporäre Tokendatei und das Journal.
+        """
+        for path in (self.path, self.path + ".journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_get_instance(self):
+        """
+        Testet, dass für einen Pfad immer dieselbe Instanz zurückgegeben wird.
+        """
+        self.assertIs(TokenStore.get_instance(self.path), TokenStore.get_instance(self.path))
+
+    def test_authenticate(self):
+        """
+        Testet die Authentifizierung über den Index der Nutzer-IDs.
+        """
+        self.assertTrue(self.store.authenticate("admin", "admin"))
+        self.assertFalse(self.store.authenticate("admin", "falsch"))
+        self.assertFalse(self.store.authenticate("unbekannt", "admin"))
+
+    def test_add_and_delete_token(self):
+        """
+        Testet das Hinzufügen und Löschen von Tokens.
+        """
+        self.assertTrue(self.store.add_token("1", "token3"))
+        # Ein bereits vergebener Token darf kein zweites Mal vergeben werden
+        self.assertFalse(self.store.add_token("admin", "token3"))
+        self.assertEqual(self.store.get_user_line("1"), "Mustermann,Max;1;passwort:token1;token2;token3")
+
+        self.assertTrue(self.store.delete_token("1", "token1"))
+        self.assertFalse(self.store.has_token("token1"))
+        self.assertTrue(self.store.delete_all_tokens("1"))
+        self.assertEqual(self.store.get_user_line("1"), "Mustermann,Max;1;passwort:")
+
+        # Die Änderungen müssen in der Datei gespeichert worden sein
+        self.assertEqual(TokenStore(self.path).get_all_tokens(), ["admintoken"])
+
+    def test_reload_on_change(self):
+        """
+        Testet, dass eine von außen veränderte Datei neu eingelesen wird.
+        """
+        self.assertTrue(self.store.has_token("token1"))
+        with open(self.path, "w") as file:
+            file.write("admin,admin;admin;admin:neuer_token_mit_anderer_laenge")
+        self.assertFalse(self.store.has_token("token1"))
+        self.assertTrue(self.store.has_token("neuer_token_mit_anderer_laenge"))
+        self.assertEqual(self.store.get_user_line("1"), "")
+
+    def test_parse(self):
+        """
+        Testet das Zerlegen einer Zeile der Tokendatei.
+        """
+        record = UserRecord.parse("Doe,John;3;passwort3:")
+        self.assertEqual(record.identifier, "3")
+        self.assertEqual(record.tokens, [])
+        self.assertIsNone(UserRecord.parse("kein gültiges Format"))
+
+    def test_journal_replay(self):
+        """
+        Testet, dass Änderungen nur im Journal landen und beim Laden nachgespielt werden.
+        """
+        with open(self.path) as file:
+            content = file.read()
+        self.assertTrue(self.store.add_token("1", "token3"))
+        self.assertTrue(self.store.delete_token("1", "token1"))
+        with open(self.path) as file:
+            self.assertEqual(file.read(), content)
+        # Eine unvollständig geschriebene letzte Zeile wird ignoriert
+        with open(self.path + ".journal", "a") as file:
+            file.write("deleteAll;1")
+        self.assertEqual(TokenStore(self.path).get_user_line("1"), "Mustermann,Max;1;passwort:token2;token3")
+
+    def test_torn_journal(self):
+        """
+        Testet, dass eine Änderung nach einer unvollständigen letzten Zeile erhalten bleibt.
+        """
+        self.assertTrue(self.store.add_token("1", "token3"))
+        with open(self.path + ".journal", "a") as file:
+            file.write("add;1;tok")
+        store = TokenStore(self.path)
+        self.assertTrue(store.add_token("1", "token4"))
+        with open(self.path + ".journal") as file:
+            self.assertTrue(file.read().endswith("add;1;token3\nadd;1;token4\n"))
+        self.assertEqual(TokenStore(self.path).get_user_line("1"),
+                         "Mustermann,Max;1;passwort:token1;token2;token3;token4")
+
+    def test_compact(self):
+        """
+        Testet das Übernehmen des Journals in die Tokendatei.
+        """
+        self.assertTrue(self.store.add_token("admin", "token3"))
+        self.store.compact()
+        with open(self.path) as file:
+            self.assertEqual(file.read(), "#sequence;2\n"
+                                          "admin,admin;admin;admin:admintoken;token3\n"
+                                          "Mustermann,Max;1;passwort:token1;token2")
+        with open(self.path + ".journal") as file:
+            self.assertEqual(len(file.read().splitlines()), 1)
+        self.assertEqual(TokenStore(self.path).get_all_tokens(), ["admintoken", "token3", "token1", "token2"])
+
+    def test_stale_journal(self):
+        """
+        Testet, dass ein nicht mehr zur Tokendatei passendes Journal verworfen wird.
+        """
+        self.assertTrue(self.store.add_token("1", "token3"))
+        with open(self.path, "w") as file:
+            file.write("Mustermann,Max;1;passwort:token_von_hand")
+        with mock.patch.object(token_store, "LogError") as log_error:
+            self.assertEqual(TokenStore(self.path).get_all_tokens(), ["token_von_hand"])
+            self.assertEqual(self.store.get_all_tokens(), ["token_von_hand"])
+        self.assertIn("1 Einträge wurden verworfen", log_error.get_instance().send_log_msg.call_args[0][0])
+
+    def test_copied_snapshot(self):
+        """
+        Testet, dass das Journal nach dem Kopieren oder Berühren der Tokendatei gültig bleibt.
+        """
+        self.assertTrue(self.store.add_token("1", "token3"))
+        os.utime(self.path, (0, 0))
+        self.assertTrue(self.store.has_token("token3"))
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        copy = os.path.join(directory, "tokens.txt")
+        shutil.copy(self.path, copy)
+        shutil.copy(self.path + ".journal", copy + ".journal")
+        self.assertEqual(TokenStore(copy).get_user_line("1"), "Mustermann,Max;1;passwort:token1;token2;token3")
+
+    def test_snapshot_without_sequence(self):
+        """
+        Testet, dass eine Tokendatei ohne Sequenznummer einmalig neu geschrieben wird.
+        """
+        with open(self.path, "w") as file:
+            file.write("Mustermann,Max;1;passwort:token1")
+        store = TokenStore(self.path)
+        self.assertTrue(store.add_token("1", "token2"))
+        with open(self.path) as file:
+            content = file.read()
+        self.assertEqual(content, "#sequence;1\nMustermann,Max;1;passwort:token1;token2")
+        self.assertTrue(store.add_token("1", "token3"))
+        with open(self.path) as file:
+            self.assertEqual(file.read(), content)
+        self.assertEqual(TokenStore(self.path).get_all_tokens(), ["token1", "token2", "token3"])
+
+    def test_change_listener(self):
+        """
+        Testet, dass eine von außen veränderte Datei gemeldet wird.
+        """
+        changed = threading.Event()
+        self.store.add_change_listener(changed.set, debounce=0.05)
+        try:
+            with open(self.path, "a") as file:
+                file.write("\nDoe,John;3;passwort3:token4")
+            self.assertTrue(changed.wait(5))
+            self.assertTrue(self.store.has_token("token4"))
+        finally:
+            self.store.remove_change_listener(changed.set)
+
+    def test_generation(self):
+        """
+        Testet, dass sich die Generation nur bei einer Änderung des Inhalts erhöht.
+        """
+        generation = self.store.generation()
+        self.assertEqual(self.store.generation(), generation)
+        self.assertTrue(self.store.add_token("1", "token3"))
+        self.assertGreater(self.store.generation(), generation)
+        generation = self.store.generation()
+        self.store.compact()
+        self.assertEqual(self.store.generation(), generation)
+
+    def test_changes_since(self):
+        """
+        Testet das Abfragen der Änderungen seit einer Generation.
+        """
+        generation = self.store.generation()
+        self.assertEqual(self.store.changes_since(generation), (set(), set(), generation))
+        self.assertTrue(self.store.add_token("1", "token3"))
+        self.assertTrue(self.store.add_token("1", "token4"))
+        self.assertTrue(self.store.delete_token("1", "token4"))
+        self.assertTrue(self.store.delete_all_tokens("admin"))
+        added, removed, new_generation = self.store.changes_since(generation)
+        self.assertEqual(added, {"token3"})
+        self.assertEqual(removed, {"admintoken"})
+        # Unbekannte Generationen und von außen veränderte Dateien erfordern den vollständigen Stand
+        self.assertIsNone(self.store.changes_since(None))
+        self.assertIsNone(self.store.changes_since(new_generation + 1))
+        with open(self.path, "a") as file:
+            file.write("\nDoe,John;3;passwort3:token5")
+        self.assertIsNone(self.store.changes_since(new_generation))
+
+    def test_apply_operations(self):
+        """
+        Testet das gemeinsame Anwenden mehrerer Änderungen.
+        """
+        results = self.store.apply_operations([(TokenStore.OPERATION_ADD, "1", "token3"),
+                                               (TokenStore.OPERATION_ADD, "1", "admintoken"),
+                                               (TokenStore.OPERATION_DELETE, "1", "token1"),
+                                               (TokenStore.OPERATION_DELETE_ALL, "unbekannt", None)])
+        self.assertEqual(results, [True, False, True, False])
+        self.assertEqual(self.store.get_user_line("1"), "Mustermann,Max;1;passwort:token2;token3")
+        # Beide wirksamen Änderungen stehen im Journal, das einmal geschrieben wurde
+        with open(self.path + ".journal") as file:
+            self.assertEqual(file.read().splitlines()[1:], ["add;1;token3", "delete;1;token1"])
+        self.assertEqual(TokenStore(self.path).get_all_tokens(), ["admintoken", "token2", "token3"])
+
+    def test_migrate_passwords(self):
+        """
+        Testet das einmalige Umstellen der Passwörter auf Hashes.
+        """
+        store = TokenStore(self.path, password_hasher=PasswordHasher(iterations=1000))
+        store.add_token("1", "token3")
+        self.assertEqual(store.migrate_passwords(), 2)
+        self.assertEqual(store.migrate_passwords(), 0)
+        self.assertTrue(store.authenticate("1", "passwort"))
+        self.assertFalse(store.authenticate("1", "falsch"))
+        # Die Datei enthält nur noch Hashes, das Journal wurde dabei übernommen
+        with open(self.path) as file:
+            content = file.read()
+        self.assertNotIn(";passwort:", content)
+        reloaded = TokenStore(self.path)
+        record = UserRecord.parse(reloaded.get_user_line("1"))
+        self.assertTrue(PasswordHasher.is_hashed(record.password))
+        self.assertEqual(record.tokens, ["token1", "token2", "token3"])
+        self.assertTrue(reloaded.authenticate("1", "passwort"))
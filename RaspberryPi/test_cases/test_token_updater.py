@@ -1,7 +1,9 @@
 import sys
 
 sys.path.append('/home/pi/src-Building-Security-System')
+import hashlib
 import os
+import tempfile
 import unittest
 from RaspberryPi.src.data_model.key_token import UnauthorizedNFCToken
 from RaspberryPi.src.data_model.name import Name, FirstName, LastName
@@ -14,17 +16,33 @@ import RaspberryPi.src.door_controller.server_adapter.server_adapter_from_python
 from RaspberryPi.src.data_model.door import DoorDataStorage
 from RaspberryPi.src.data_model.identifier import Identifier
 from RaspberryPi.src.data_model.configuration import PiConfiguration
+from RaspberryPi.src.data_model.token_database import TokenDatabase
+from RaspberryPi.src.door_controller.server_adapter.token_changes import TokenChanges
 
 """
 Dieses Modul ist zum Testen des Moduls token_updater
 Classes:
+    FakeServerAdapter: Liefert vorgegebene Änderungen an den validen Tokens.
     TestTokenUpdater(unittest.TestCase): Diese Klasse implementiert Test Methoden für die Klasse TokenUpdater
         
 @author Lukas Wittenzellner
-@version 1.0
+@version 1.1
 """
 
 
+class FakeServerAdapter:
+    """
+    Liefert bei jeder Abfrage die nächsten vorgegebenen Änderungen an den validen Tokens.
+    """
+    def __init__(self, changes: list):
+        self.changes = changes
+        self.versions = list()
+
+    def get_token_changes_since(self, admin, password, version):
+        self.versions.append(version)
+        return self.changes.pop(0)
+
+
 class TestTokenUpdater(unittest.TestCase):
     """
     Diese Klasse testet die Methoden der Klasse TokenUpdater.
@@ -33,6 +51,7 @@ class TestTokenUpdater(unittest.TestCase):
         setUp: Bereitet einige nötige Variablen für die Testmethoden vor.
         test_init: Testet den Konstruktor der Klasse TokenUpdater.
         test_getValidTokens: Testet das Bekommen der Liste aller gültigen Token.
+        test_update_database_delta: Testet das Übernehmen einzelner Änderungen in die Token-Datenbank.
     """
 
     def setUp(self) -> None:
@@ -76,3 +95,23 @@ class TestTokenUpdater(unittest.TestCase):
             for line in temp_file:
                 file.write(line)
         os.remove(self.temp_path)
+
+    def test_update_database_delta(self):
+        """
+        Testet das Übernehmen einzelner Änderungen in die Token-Datenbank.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "ValidTokens.db")
+        tokens = [UnauthorizedNFCToken(Identifier(hashlib.sha256(str(i).encode()).hexdigest())) for i in range(5)]
+        adapter = FakeServerAdapter([TokenChanges(tokens[:3], [], 1, True),
+                                     TokenChanges(tokens[3:], [tokens[0]], 2, False)])
+        doorDataStorage = DoorDataStorage(tokenDatabase=TokenDatabase(path))
+        token_updater = TokenUpdater(doorDataStorage, adapter)
+        token_updater.update()
+        token_updater.update()
+        self.assertEqual(adapter.versions, [None, 1])
+        self.assertEqual(len(doorDataStorage.tokenDatabase), 4)
+        self.assertFalse(doorDataStorage.hasToken(tokens[0]))
+        for token in tokens[1:]:
+            self.assertTrue(doorDataStorage.hasToken(token))